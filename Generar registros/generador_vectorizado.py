@@ -0,0 +1,508 @@
+"""
+Generador vectorizado (NumPy) de Ventas/Entregas para pruebas de carga.
+
+Mismo modelo de datos que 'generar registros cvs.py', pero en lugar de armar un dict por
+venta se genera un mes por vez con arrays de NumPy y se escribe directo a Ventas.csv,
+Ventas_add.csv (año 2025) y Entregas.csv, por bloques de --lote filas. La memoria depende
+del tamaño de un mes, no del total: con --scale-factor 500 salen ~11M ventas y con 5000
+~110M.
+
+  --scale-factor  multiplica las ventas por día (5..15 en la escala 1)
+  --seed          misma semilla + misma escala = mismos archivos
+  --salida        carpeta destino (por defecto, la de este script)
+  --formato       csv (por defecto) | parquet: formato columnar por año-mes que lee
+                  extract_data.py con [EXTRACCION] formato = parquet (dataset_columnar.py)
+  --shards        reparte los meses entre N procesos; cada uno escribe particiones por
+                  año-mes (salida/particiones) que después se concatenan. La salida es
+                  idéntica byte a byte a la de un solo proceso con la misma semilla.
+
+Errores inyectados (los mismos del generador original, en la misma posición relativa):
+  - venta 50 * escala : Fecha_Entrega 10 días antes de la venta
+  - venta 75 * escala : Fecha_Envio inexistente (2024-02-31)
+  - producto 13       : PrecioVentaSugerido negativo (todas sus ventas lo heredan)
+Como en el original, los de entregas solo aparecen si esa venta generó entrega.
+
+Uso: python generador_vectorizado.py --scale-factor 500 --seed 42 [--shards 8]
+"""
+import argparse
+import importlib.util
+import os
+import random
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# El formato columnar se define en Scripts/dataset_columnar.py (el mismo que lee la extracción)
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', 'Scripts'))
+import dataset_columnar  # noqa: E402
+
+DIMENSIONES = ['Clientes.csv', 'Productos.csv', 'Tiendas.csv', 'EstadoDelPedido.csv', 'Almacenes.csv']
+
+ESTADOS = {1: "En preparación", 2: "En tránsito", 3: "Entregado", 4: "Devuelto"}
+PROBABILIDAD_ENTREGA = 0.7
+FECHA_ENVIO_INEXISTENTE = "2024-02-31"
+
+# CodVenta al final: es el que referencia Entregas.csv y no depende de la posición de la fila
+V_HEADERS = ['FechaVenta', 'CodigoProducto', 'Producto', 'Cantidad', 'PrecioVenta',
+             'CodigoCliente', 'Cliente', 'CodigoTienda', 'Tienda', 'CodVenta']
+E_HEADERS = ['CodEntrega', 'CodVenta', 'CodProveedor', 'Proveedor', 'CodAlmacen', 'Almacen',
+             'CodEstado', 'Estado', 'Fecha_Envio', 'Fecha_Entrega']
+
+# csv.DictWriter termina las líneas con \r\n: se respeta para que los archivos sean equivalentes
+FIN_LINEA = '\r\n'
+
+
+def cargar_generador_base():
+    """Importa 'generar registros cvs.py' (el nombre con espacios impide un import normal)."""
+    ruta = os.path.join(SCRIPT_DIR, 'generar registros cvs.py')
+    spec = importlib.util.spec_from_file_location('generar_registros_cvs', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def campo_csv(valor):
+    """Mismo entrecomillado que csv.writer (QUOTE_MINIMAL)."""
+    texto = str(valor)
+    if any(c in texto for c in ',"\r\n'):
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+
+def unir_columnas(columnas):
+    """Concatena columnas de texto (arrays de NumPy) separadas por coma."""
+    filas = columnas[0]
+    for columna in columnas[1:]:
+        filas = np.char.add(np.char.add(filas, ','), columna)
+    return filas
+
+
+# ----------------------------------------------------------------------
+# Plan por mes
+
+def meses(inicio, fin):
+    """(año, mes) desde inicio hasta fin inclusive."""
+    anio, mes = inicio.year, inicio.month
+    while (anio, mes) <= (fin.year, fin.month):
+        yield anio, mes
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def plan_mes(seed, anio, mes, escala, inicio, fin):
+    """
+    Cantidades del mes sin generar las filas: ventas por día y total de entregas.
+    Cada mes tiene su propia SeedSequence (seed, año, mes), así que el plan y las filas de un
+    mes no dependen de los meses anteriores; el plan usa un flujo y las filas otro.
+    """
+    semilla_plan, semilla_filas = np.random.SeedSequence([seed, anio, mes]).spawn(2)
+    rng = np.random.default_rng(semilla_plan)
+
+    primero = np.datetime64(f"{anio:04d}-{mes:02d}", 'M').astype('datetime64[D]')
+    siguiente = (np.datetime64(f"{anio:04d}-{mes:02d}", 'M') + 1).astype('datetime64[D]')
+    dias = np.arange(
+        max(primero, np.datetime64(inicio.date(), 'D')),
+        min(siguiente, np.datetime64(fin.date(), 'D') + 1),
+        dtype='datetime64[D]'
+    )
+
+    minimo = max(1, int(round(5 * escala)))
+    maximo = max(minimo, int(round(15 * escala)))
+    ventas_por_dia = rng.integers(minimo, maximo, size=len(dias), endpoint=True)
+    total_ventas = int(ventas_por_dia.sum())
+    total_entregas = int(rng.binomial(total_ventas, PROBABILIDAD_ENTREGA))
+
+    return {
+        'anio': anio, 'mes': mes, 'dias': dias, 'ventas_por_dia': ventas_por_dia,
+        'ventas': total_ventas, 'entregas': total_entregas, 'semilla_filas': semilla_filas,
+    }
+
+
+# ----------------------------------------------------------------------
+# Generación vectorizada
+
+class GeneradorVectorizado:
+    """Genera y escribe las filas de hechos de a un mes, con tablas de texto precalculadas."""
+
+    def __init__(self, clientes, productos, tiendas, proveedores, almacenes, escala):
+        self.escala = escala
+        self.error_fecha_entrega = int(round(50 * escala))
+        self.error_fecha_envio = int(round(75 * escala))
+
+        # Texto ya formateado por dimensión: cada fila es una indexación, no un format()
+        self.t_producto = np.array([
+            f"{campo_csv(p['CodigoProducto'])},{campo_csv(p['Descripcion'])}" for p in productos
+        ])
+        self.t_precio = np.array([campo_csv(p['PrecioVentaSugerido']) for p in productos])
+        self.t_cliente = np.array([
+            f"{campo_csv(c['CodCliente'])},{campo_csv(c['RazonSocial'])}" for c in clientes
+        ])
+        self.t_tienda = np.array([
+            f"{campo_csv(t['CodigoTienda'])},{campo_csv(t['Descripcion'])}" for t in tiendas
+        ])
+        self.t_cantidad = np.array(['1', '2', '3'])
+
+        # Como en el original, CodProveedor (1..4) y Proveedor se sortean por separado
+        self.t_cod_proveedor = np.array(['1', '2', '3', '4'])
+        self.t_proveedor = np.array([campo_csv(p) for p in proveedores])
+        self.t_almacen = np.array([f"{cod},{campo_csv(nombre)}" for cod, nombre, _ in almacenes])
+        self.t_estado = np.array([f"{cod},{campo_csv(desc)}" for cod, desc in ESTADOS.items()])
+
+        # Los mismos valores sin formato CSV, columna por columna (formato columnar)
+        self.c_producto = np.array([str(p['CodigoProducto']) for p in productos])
+        self.c_producto_desc = np.array([str(p['Descripcion']) for p in productos])
+        self.c_cliente = np.array([str(c['CodCliente']) for c in clientes])
+        self.c_cliente_desc = np.array([str(c['RazonSocial']) for c in clientes])
+        self.c_tienda = np.array([str(t['CodigoTienda']) for t in tiendas])
+        self.c_tienda_desc = np.array([str(t['Descripcion']) for t in tiendas])
+        self.c_proveedor = np.array([str(p) for p in proveedores])
+        self.c_almacen = np.array([str(cod) for cod, _, _ in almacenes])
+        self.c_almacen_nombre = np.array([str(nombre) for _, nombre, _ in almacenes])
+        self.c_estado = np.array([str(cod) for cod in ESTADOS])
+        self.c_estado_desc = np.array(list(ESTADOS.values()))
+
+    def generar_mes(self, plan, id_venta_inicial, id_entrega_inicial):
+        """
+        Arrays del mes. Los sorteos se hacen siempre en el mismo orden, así que el resultado
+        depende solo de la semilla, la escala y el mes (no del tamaño de lote).
+        """
+        rng = np.random.default_rng(plan['semilla_filas'])
+        n = plan['ventas']
+        m = plan['entregas']
+
+        ventas = {
+            'id': np.arange(id_venta_inicial, id_venta_inicial + n, dtype=np.int64),
+            'fecha': np.repeat(plan['dias'], plan['ventas_por_dia']),
+            'producto': rng.integers(0, len(self.t_producto), size=n),
+            'cliente': rng.integers(0, len(self.t_cliente), size=n),
+            'tienda': rng.integers(0, len(self.t_tienda), size=n),
+            'cantidad': rng.integers(0, 3, size=n),
+        }
+
+        # 70% de las ventas generan entrega: se eligen m ventas del mes, en orden
+        posiciones = np.sort(rng.choice(n, size=m, replace=False)) if m else np.empty(0, dtype=np.int64)
+        fecha_venta = ventas['fecha'][posiciones]
+        fecha_envio = fecha_venta + rng.integers(1, 3, size=m, endpoint=True).astype('timedelta64[D]')
+        fecha_entrega = fecha_envio + rng.integers(1, 5, size=m, endpoint=True).astype('timedelta64[D]')
+        entregas = {
+            'id': np.arange(id_entrega_inicial, id_entrega_inicial + m, dtype=np.int64),
+            'venta': ventas['id'][posiciones],
+            'cod_proveedor': rng.integers(0, len(self.t_cod_proveedor), size=m),
+            'proveedor': rng.integers(0, len(self.t_proveedor), size=m),
+            'almacen': rng.integers(0, len(self.t_almacen), size=m),
+            'estado': rng.integers(0, len(self.t_estado), size=m),
+            'fecha_envio': np.datetime_as_string(fecha_envio, unit='D'),
+            'fecha_entrega': fecha_entrega,
+        }
+
+        # ERROR 1: Fecha entrega < Venta
+        error = entregas['venta'] == self.error_fecha_entrega
+        entregas['fecha_entrega'][error] = fecha_venta[error] - np.timedelta64(10, 'D')
+        # ERROR 2: Fecha de envío inexistente
+        entregas['fecha_envio'][entregas['venta'] == self.error_fecha_envio] = FECHA_ENVIO_INEXISTENTE
+        entregas['fecha_entrega'] = np.datetime_as_string(entregas['fecha_entrega'], unit='D')
+
+        return ventas, entregas
+
+    def texto_ventas(self, ventas, desde, hasta):
+        tramo = slice(desde, hasta)
+        producto = ventas['producto'][tramo]
+        filas = unir_columnas([
+            np.datetime_as_string(ventas['fecha'][tramo], unit='D'),
+            self.t_producto[producto],
+            self.t_cantidad[ventas['cantidad'][tramo]],
+            self.t_precio[producto],
+            self.t_cliente[ventas['cliente'][tramo]],
+            self.t_tienda[ventas['tienda'][tramo]],
+            ventas['id'][tramo].astype(str),
+        ])
+        return FIN_LINEA.join(filas.tolist()) + FIN_LINEA
+
+    def texto_entregas(self, entregas, desde, hasta):
+        tramo = slice(desde, hasta)
+        filas = unir_columnas([
+            entregas['id'][tramo].astype(str),
+            entregas['venta'][tramo].astype(str),
+            self.t_cod_proveedor[entregas['cod_proveedor'][tramo]],
+            self.t_proveedor[entregas['proveedor'][tramo]],
+            self.t_almacen[entregas['almacen'][tramo]],
+            self.t_estado[entregas['estado'][tramo]],
+            entregas['fecha_envio'][tramo],
+            entregas['fecha_entrega'][tramo],
+        ])
+        return FIN_LINEA.join(filas.tolist()) + FIN_LINEA
+
+
+    def columnas_ventas(self, ventas):
+        producto = ventas['producto']
+        return dict(zip(V_HEADERS, [
+            np.datetime_as_string(ventas['fecha'], unit='D'),
+            self.c_producto[producto],
+            self.c_producto_desc[producto],
+            self.t_cantidad[ventas['cantidad']],
+            self.t_precio[producto],
+            self.c_cliente[ventas['cliente']],
+            self.c_cliente_desc[ventas['cliente']],
+            self.c_tienda[ventas['tienda']],
+            self.c_tienda_desc[ventas['tienda']],
+            ventas['id'].astype(str),
+        ]))
+
+    def columnas_entregas(self, entregas):
+        return dict(zip(E_HEADERS, [
+            entregas['id'].astype(str),
+            entregas['venta'].astype(str),
+            self.t_cod_proveedor[entregas['cod_proveedor']],
+            self.c_proveedor[entregas['proveedor']],
+            self.c_almacen[entregas['almacen']],
+            self.c_almacen_nombre[entregas['almacen']],
+            self.c_estado[entregas['estado']],
+            self.c_estado_desc[entregas['estado']],
+            entregas['fecha_envio'],
+            entregas['fecha_entrega'],
+        ]))
+
+
+def escribir_por_lotes(archivo, formatear, datos, total, lote):
+    for desde in range(0, total, lote):
+        archivo.write(formatear(datos, desde, min(desde + lote, total)))
+
+
+def escribir_mes(generador, plan, archivo_ventas, archivo_entregas, lote):
+    ventas, entregas = generador.generar_mes(plan, plan['id_venta'], plan['id_entrega'])
+    escribir_por_lotes(archivo_ventas, generador.texto_ventas, ventas, plan['ventas'], lote)
+    escribir_por_lotes(archivo_entregas, generador.texto_entregas, entregas, plan['entregas'], lote)
+
+
+def escribir_mes_columnar(generador, plan, raiz):
+    """
+    Un mes al formato columnar. Cada mes escribe sus propios archivos (part-AAAAMM-*) porque
+    sus entregas pueden caer en la partición del mes siguiente.
+    """
+    ventas, entregas = generador.generar_mes(plan, plan['id_venta'], plan['id_entrega'])
+    nombre_parte = f"part-{plan['anio']:04d}{plan['mes']:02d}-{{i}}.parquet"
+    dataset_columnar.escribir_tabla(
+        raiz, plan['destino'], dataset_columnar.tabla_de_columnas(generador.columnas_ventas(ventas)),
+        reemplazar=False, nombre_parte=nombre_parte
+    )
+    dataset_columnar.escribir_tabla(
+        raiz, 'Entregas.csv', dataset_columnar.tabla_de_columnas(generador.columnas_entregas(entregas)),
+        reemplazar=False, nombre_parte=nombre_parte
+    )
+
+
+def abrir_csv(salida, nombre, headers):
+    archivo = open(os.path.join(salida, nombre), 'w', newline='', encoding='utf-8')
+    archivo.write(','.join(headers) + FIN_LINEA)
+    return archivo
+
+
+def planificar(seed, escala, inicio, fin, anio_add):
+    """
+    Plan de todos los meses con su rango de IDs. Es barato (no genera filas) y fija de
+    antemano CodVenta/CodEntrega de cada mes, así que los meses se pueden generar en
+    cualquier orden o proceso y los IDs quedan disjuntos y consecutivos.
+    """
+    planes = []
+    id_venta = 1
+    id_entrega = 1
+    for anio, mes in meses(inicio, fin):
+        plan = plan_mes(seed, anio, mes, escala, inicio, fin)
+        plan['id_venta'] = id_venta
+        plan['id_entrega'] = id_entrega
+        # Ventas del último año a Ventas_add.csv, igual que el original (2025)
+        plan['destino'] = 'Ventas_add.csv' if anio == anio_add else 'Ventas.csv'
+        id_venta += plan['ventas']
+        id_entrega += plan['entregas']
+        planes.append(plan)
+    return planes
+
+
+# ----------------------------------------------------------------------
+# Generación por shards (un proceso por shard)
+
+def repartir(planes, shards):
+    """Divide los meses en shards contiguos con cantidades de ventas parecidas."""
+    total = sum(plan['ventas'] for plan in planes) or 1
+    grupos = [[] for _ in range(shards)]
+    acumulado = 0
+    for plan in planes:
+        grupos[min(shards - 1, acumulado * shards // total)].append(plan)
+        acumulado += plan['ventas']
+    return [grupo for grupo in grupos if grupo]
+
+
+def nombre_particion(nombre_csv, plan):
+    """Ventas.csv + 2020-01 -> Ventas_2020-01.csv"""
+    return f"{nombre_csv[:-4]}_{plan['anio']:04d}-{plan['mes']:02d}.csv"
+
+
+def generar_shard(trabajo):
+    """
+    Genera los meses de un shard, un par de particiones (ventas, entregas) por mes, sin
+    encabezado para poder concatenarlas. La semilla de cada mes sale de (seed, año, mes),
+    por lo que el contenido no depende de qué shard ni qué proceso lo genere.
+    """
+    numero, planes, dimensiones, escala, carpeta, lote, formato = trabajo
+    inicio = time.perf_counter()
+    generador = GeneradorVectorizado(*dimensiones, escala)
+
+    for plan in planes:
+        if formato == 'parquet':
+            # Las particiones columnares ya son el resultado final: no hay que unirlas
+            escribir_mes_columnar(generador, plan, carpeta)
+            continue
+        ruta_ventas = os.path.join(carpeta, nombre_particion(plan['destino'], plan))
+        ruta_entregas = os.path.join(carpeta, nombre_particion('Entregas.csv', plan))
+        with open(ruta_ventas, 'w', newline='', encoding='utf-8') as archivo_ventas, \
+                open(ruta_entregas, 'w', newline='', encoding='utf-8') as archivo_entregas:
+            escribir_mes(generador, plan, archivo_ventas, archivo_entregas, lote)
+
+    return numero, sum(plan['ventas'] for plan in planes), time.perf_counter() - inicio
+
+
+def unir_particiones(salida, carpeta, planes):
+    """Concatena las particiones en orden de mes bajo un único encabezado."""
+    archivos = [('Ventas.csv', V_HEADERS), ('Ventas_add.csv', V_HEADERS), ('Entregas.csv', E_HEADERS)]
+    for nombre, headers in archivos:
+        with open(os.path.join(salida, nombre), 'wb') as destino:
+            destino.write((','.join(headers) + FIN_LINEA).encode('utf-8'))
+            for plan in planes:
+                if nombre != 'Entregas.csv' and plan['destino'] != nombre:
+                    continue
+                with open(os.path.join(carpeta, nombre_particion(nombre, plan)), 'rb') as particion:
+                    shutil.copyfileobj(particion, destino, 16 * 1024 * 1024)
+
+
+def generar_en_shards(planes, dimensiones, escala, salida, lote, shards, conservar_particiones, formato='csv'):
+    carpeta = salida if formato == 'parquet' else os.path.join(salida, 'particiones')
+    os.makedirs(carpeta, exist_ok=True)
+
+    grupos = repartir(planes, shards)
+    trabajos = [
+        (numero, grupo, dimensiones, escala, carpeta, lote, formato)
+        for numero, grupo in enumerate(grupos, start=1)
+    ]
+    with ProcessPoolExecutor(max_workers=len(trabajos)) as pool:
+        for numero, ventas, duracion in pool.map(generar_shard, trabajos):
+            grupo = grupos[numero - 1]
+            print(f" Shard {numero}: {grupo[0]['anio']}-{grupo[0]['mes']:02d} a "
+                  f"{grupo[-1]['anio']}-{grupo[-1]['mes']:02d} | {ventas:,} ventas en {duracion:.1f}s")
+
+    if formato == 'parquet':
+        return
+    if conservar_particiones:
+        print(f" Particiones en: {carpeta}")
+        return
+    unir_particiones(salida, carpeta, planes)
+    shutil.rmtree(carpeta)
+
+
+# ----------------------------------------------------------------------
+# Ejecución
+
+def generar_dimensiones(base, salida, seed):
+    """Dimensiones y tablas estáticas con el generador original (son chicas)."""
+    random.seed(seed)
+    clientes, c_h = base.gen_clientes()
+    productos, p_h = base.gen_productos()
+    tiendas, t_h = base.gen_tiendas()
+
+    estados_data = [{'CodEstado': cod, 'Descripcion_Estado': desc} for cod, desc in ESTADOS.items()]
+    almacenes_data = [{'CodAlmacen': a[0], 'Nombre_Almacen': a[1], 'Ubicacion': a[2]} for a in base.ALMACENES_LIST]
+
+    base.SCRIPT_DIR = salida
+    base.save_csv('Clientes.csv', c_h, clientes)
+    base.save_csv('Productos.csv', p_h, productos)
+    base.save_csv('Tiendas.csv', t_h, tiendas)
+    base.save_csv('EstadoDelPedido.csv', ['CodEstado', 'Descripcion_Estado'], estados_data)
+    base.save_csv('Almacenes.csv', ['CodAlmacen', 'Nombre_Almacen', 'Ubicacion'], almacenes_data)
+    return clientes, productos, tiendas
+
+
+def preparar_columnar(salida):
+    """Dimensiones CSV -> formato columnar y tablas de hechos vacías (se escriben de a un mes)."""
+    dataset_columnar.convertir(salida, salida, DIMENSIONES)
+    for csv_file in DIMENSIONES:
+        os.remove(os.path.join(salida, csv_file))
+    for csv_file in ('Ventas.csv', 'Ventas_add.csv', 'Entregas.csv'):
+        ruta = dataset_columnar.ruta_tabla(salida, csv_file)
+        if os.path.isdir(ruta):
+            shutil.rmtree(ruta)
+
+
+def generar(escala=1.0, seed=42, salida=SCRIPT_DIR, lote=200000, shards=1, conservar_particiones=False,
+            formato='csv'):
+    if escala <= 0:
+        raise ValueError("--scale-factor debe ser mayor que 0")
+    if formato not in ('csv', 'parquet'):
+        raise ValueError(f"Formato desconocido: '{formato}'")
+    os.makedirs(salida, exist_ok=True)
+    inicio = time.perf_counter()
+
+    base = cargar_generador_base()
+    clientes, productos, tiendas = generar_dimensiones(base, salida, seed)
+    dimensiones = (clientes, productos, tiendas, base.PROVEEDORES, base.ALMACENES_LIST)
+    planes = planificar(seed, escala, base.START_DATE, base.END_DATE, base.END_DATE.year)
+    if formato == 'parquet':
+        preparar_columnar(salida)
+
+    if shards > 1:
+        generar_en_shards(planes, dimensiones, escala, salida, lote, shards, conservar_particiones, formato)
+    elif formato == 'parquet':
+        generador = GeneradorVectorizado(*dimensiones, escala)
+        for plan in planes:
+            escribir_mes_columnar(generador, plan, salida)
+    else:
+        generador = GeneradorVectorizado(*dimensiones, escala)
+        archivos = {
+            'Ventas.csv': abrir_csv(salida, 'Ventas.csv', V_HEADERS),
+            'Ventas_add.csv': abrir_csv(salida, 'Ventas_add.csv', V_HEADERS),
+            'Entregas.csv': abrir_csv(salida, 'Entregas.csv', E_HEADERS),
+        }
+        try:
+            for plan in planes:
+                escribir_mes(generador, plan, archivos[plan['destino']], archivos['Entregas.csv'], lote)
+                if plan['mes'] == 12:
+                    print(f" Año {plan['anio']} generado "
+                          f"({plan['id_venta'] + plan['ventas'] - 1:,} ventas acumuladas)")
+        finally:
+            for archivo in archivos.values():
+                archivo.close()
+
+    totales = {'Ventas.csv': 0, 'Ventas_add.csv': 0, 'Entregas.csv': 0}
+    for plan in planes:
+        totales[plan['destino']] += plan['ventas']
+        totales['Entregas.csv'] += plan['entregas']
+    for nombre, total in totales.items():
+        destino = dataset_columnar.ruta_tabla(salida, nombre) if formato == 'parquet' else nombre
+        print(f" Archivo creado: {destino} ({total:,} registros)")
+    print(f"\n ¡Listo! Escala {escala}, semilla {seed}, shards {shards}: {time.perf_counter() - inicio:.1f}s")
+    return totales
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador vectorizado de CSVs para pruebas de carga")
+    parser.add_argument('--scale-factor', type=float, default=1.0,
+                        help="multiplicador de ventas por día (1 = volumen del generador original)")
+    parser.add_argument('--seed', type=int, default=42, help="semilla (misma semilla = mismos archivos)")
+    parser.add_argument('--salida', default=SCRIPT_DIR, help="carpeta destino de los CSV")
+    parser.add_argument('--lote', type=int, default=200000, help="filas por escritura")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="procesos en paralelo, cada uno con un rango de meses (1 = un solo proceso)")
+    parser.add_argument('--conservar-particiones', action='store_true',
+                        help="con --shards, dejar los CSV por año-mes en salida/particiones sin unirlos")
+    parser.add_argument('--formato', choices=['csv', 'parquet'], default='csv',
+                        help="csv = archivos de DATASET | parquet = formato columnar particionado por año-mes")
+    args = parser.parse_args()
+    generar(args.scale_factor, args.seed, os.path.abspath(args.salida), args.lote,
+            args.shards, args.conservar_particiones, args.formato)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,20 @@ PRINT '1. Iniciando eliminación de objetos existentes...';
 GO
 
 -- Eliminación en orden correcto considerando dependencias
+IF OBJECT_ID('Agg_Entregas_Mes', 'U') IS NOT NULL
+BEGIN
+    DROP TABLE Agg_Entregas_Mes;
+    PRINT 'Tabla Agg_Entregas_Mes eliminada.';
+END
+GO
+
+IF OBJECT_ID('Agg_Ventas_Mes', 'U') IS NOT NULL
+BEGIN
+    DROP TABLE Agg_Ventas_Mes;
+    PRINT 'Tabla Agg_Ventas_Mes eliminada.';
+END
+GO
+
 IF OBJECT_ID('Fact_Entregas', 'U') IS NOT NULL
 BEGIN
     DROP TABLE Fact_Entregas;
@@ -265,6 +279,9 @@ CREATE TABLE Fact_Ventas (
     PrecioVenta DECIMAL(18,2) NOT NULL CHECK (PrecioVenta >= 0),
     Total_IVA DECIMAL(18,2) NOT NULL,
     FechaCarga DATETIME DEFAULT GETDATE(),
+    -- Número de la venta en el origen: Fact_Entregas resuelve INT_Entregas.CodVenta -> ID_Venta
+    -- con este índice (no depende de que ID_Venta coincida con el número de origen)
+    CodVenta BIGINT NULL,
 
     CONSTRAINT FK_Ventas_Tiempo FOREIGN KEY (Tiempo_Key) 
         REFERENCES Dim_Tiempo(Tiempo_Key),
@@ -280,6 +297,7 @@ CREATE INDEX IDX_Fecha ON Fact_Ventas (Tiempo_Key);
 CREATE INDEX IDX_Producto ON Fact_Ventas (ID_Producto);
 CREATE INDEX IDX_Cliente ON Fact_Ventas (ID_Cliente);
 CREATE INDEX IDX_Tienda ON Fact_Ventas (ID_Tienda);
+CREATE UNIQUE INDEX IDX_Ventas_CodVenta ON Fact_Ventas (CodVenta) WHERE CodVenta IS NOT NULL;
 PRINT 'Tabla Fact_Ventas creada.';
 GO
 
@@ -356,6 +374,53 @@ CREATE INDEX IDX_Entregas_ProveedorFecha ON Fact_Entregas (ID_Proveedor, Tiempo_
 PRINT 'Tabla Fact_Entregas creada.';
 GO
 
+-- Índices por fecha de carga: SP_DW_Actualizar_Agregados busca los meses que tocó cada proceso
+CREATE INDEX IDX_Ventas_FechaCarga ON Fact_Ventas (FechaCarga) INCLUDE (Tiempo_Key);
+CREATE INDEX IDX_Entregas_FechaCarga ON Fact_Entregas (FechaCarga) INCLUDE (Tiempo_Key_Envio);
+GO
+
+PRINT '4b. Creando tablas agregadas (Agg_Ventas_Mes, Agg_Entregas_Mes)...';
+GO
+
+-- Agregados mensuales para el tablero (DirectQuery): los mantiene SP_DW_Actualizar_Agregados
+-- después de cargar los hechos, recalculando solo los meses que tocó el proceso.
+-- AnioMes = Tiempo_Key / 100 (AAAAMM)
+CREATE TABLE Agg_Ventas_Mes (
+    AnioMes INT NOT NULL,
+    Anio INT NOT NULL,
+    Mes INT NOT NULL,
+    ID_Producto INT NOT NULL,
+    ID_Tienda INT NOT NULL,
+    Cant_Ventas INT NOT NULL,
+    Cantidad BIGINT NOT NULL,
+    -- Importe = Cantidad x PrecioVenta (sin IVA); Total_IVA = IVA de las ventas
+    Importe DECIMAL(18,2) NOT NULL,
+    Total_IVA DECIMAL(18,2) NOT NULL,
+    FechaActualizacion DATETIME DEFAULT GETDATE(),
+
+    CONSTRAINT PK_Agg_Ventas_Mes PRIMARY KEY (AnioMes, ID_Producto, ID_Tienda)
+);
+
+-- AnioMes del envío; Entregas_A_Tiempo = entregadas hasta FechaEstimadaEntrega
+CREATE TABLE Agg_Entregas_Mes (
+    AnioMes INT NOT NULL,
+    Anio INT NOT NULL,
+    Mes INT NOT NULL,
+    ID_Proveedor INT NOT NULL,
+    ID_Almacen INT NOT NULL,
+    ID_Estado INT NOT NULL,
+    Cant_Entregas INT NOT NULL,
+    Cantidad_Productos BIGINT NOT NULL,
+    Costo_Entrega DECIMAL(18,2) NOT NULL,
+    Entregas_Entregadas INT NOT NULL,
+    Entregas_A_Tiempo INT NOT NULL,
+    FechaActualizacion DATETIME DEFAULT GETDATE(),
+
+    CONSTRAINT PK_Agg_Entregas_Mes PRIMARY KEY (AnioMes, ID_Proveedor, ID_Almacen, ID_Estado)
+);
+PRINT 'Tablas agregadas creadas.';
+GO
+
 -- CREACIÓN DEL STORED PROCEDURE DIM TIEMPO CORREGIDO
 PRINT '5. Creando Stored Procedure Sp_Genera_Dim_Tiempo...';
 GO
@@ -372,10 +437,13 @@ BEGIN
     SET NOCOUNT ON;
     SET DATEFIRST 1;  -- Lunes
 
+    -- sys.objects solo tiene unos cientos de filas: TOP (n) sobre esa tabla cortaba el rango
+    -- sin avisar. El producto cruzado de sys.all_columns alcanza para millones de días.
     ;WITH N AS (
         SELECT TOP (DATEDIFF(DAY, @FechaInicio, @FechaFin) + 1)
                ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS n
-        FROM sys.objects
+        FROM sys.all_columns a
+        CROSS JOIN sys.all_columns b
     ),
     Fechas AS (
         SELECT DATEADD(DAY, n, @FechaInicio) AS Fecha
@@ -201,6 +201,8 @@ CREATE TABLE INT_Ventas (
     ID_INT BIGINT IDENTITY(1,1) PRIMARY KEY,
     
     -- Claves naturales 
+    -- Número de la venta en el origen (el CodVenta de Entregas.csv)
+    CodVenta BIGINT NULL,
     FechaVenta DATE NOT NULL,
     CodigoProducto VARCHAR(100) NOT NULL,
     CodigoCliente VARCHAR(50) NOT NULL,
@@ -224,6 +226,7 @@ CREATE INDEX IDX_INT_Ventas_Fecha ON INT_Ventas(FechaVenta);
 CREATE INDEX IDX_INT_Ventas_Producto ON INT_Ventas(CodigoProducto);
 CREATE INDEX IDX_INT_Ventas_Cliente ON INT_Ventas(CodigoCliente);
 CREATE INDEX IDX_INT_Ventas_Tienda ON INT_Ventas(CodigoTienda);
+CREATE INDEX IDX_INT_Ventas_CodVenta ON INT_Ventas(CodVenta);
 PRINT ' Tabla INT_Ventas creada';
 GO
 
@@ -316,6 +319,7 @@ CREATE TABLE ETL_Registros_Rechazados (
     Registro_Original VARCHAR(MAX) NOT NULL,
     Motivo_Rechazo VARCHAR(500) NOT NULL,
     Fecha_Rechazo DATETIME DEFAULT GETDATE(),
+    Codigo_Motivo INT NULL,
     
     CONSTRAINT FK_Rechazos_Proceso FOREIGN KEY (ID_Proceso)
         REFERENCES ETL_Control_Procesos(ID_Proceso)
@@ -327,3 +331,135 @@ PRINT ' Tabla ETL_Registros_Rechazados creada';
 GO
 
 
+-- CATÁLOGO DE MOTIVOS DE RECHAZO
+-- Un código por regla (los mismos de rechazos.py y validacion.py). Tope = filas de detalle
+-- que se guardan por regla y proceso en ETL_Registros_Rechazados (NULL = todas); los
+-- loaders lo copian de [RECHAZOS] en config.ini antes de cada etapa.
+IF OBJECT_ID('ETL_Rechazos_Motivos', 'U') IS NOT NULL
+    DROP TABLE ETL_Rechazos_Motivos;
+GO
+
+CREATE TABLE ETL_Rechazos_Motivos (
+    Codigo_Motivo INT NOT NULL PRIMARY KEY,
+    Descripcion VARCHAR(200) NOT NULL,
+    Tope INT NULL
+);
+
+INSERT INTO ETL_Rechazos_Motivos (Codigo_Motivo, Descripcion) VALUES
+    (10, 'FechaVenta nula o inválida'),
+    (11, 'CodigoProducto nulo o vacío'),
+    (12, 'CodigoCliente nulo o vacío'),
+    (13, 'CodigoTienda nulo o vacío'),
+    (14, 'Cantidad no entera o <= 0'),
+    (15, 'PrecioVenta no numérico o negativo'),
+    (20, 'CodEntrega nulo o vacío'),
+    (21, 'CodProveedor nulo o vacío'),
+    (22, 'CodEstado nulo o vacío'),
+    (23, 'Fecha_Envio nula o inválida'),
+    (24, 'Fecha_Entrega anterior a Fecha_Envio'),
+    (30, 'CodEstado nulo o vacío (STG)'),
+    (31, 'Descripcion_Estado nulo o vacío'),
+    (32, 'CodAlmacen o Nombre_Almacen nulo o vacío'),
+    (40, 'Fecha no existe en Dim_Tiempo'),
+    (41, 'Producto no existe en Dim_Producto'),
+    (42, 'Cliente no existe en Dim_Cliente'),
+    (43, 'Tienda no existe en Dim_Tienda'),
+    (50, 'Venta inexistente'),
+    (51, 'Fecha de entrega inválida'),
+    (99, 'Error desconocido');
+PRINT ' Tabla ETL_Rechazos_Motivos creada';
+GO
+
+
+-- TABLA DE RECHAZOS POR MOTIVO
+-- Cantidad real de rechazos por proceso, tabla y código (el detalle puede estar acotado).
+IF OBJECT_ID('ETL_Rechazos_Resumen', 'U') IS NOT NULL
+    DROP TABLE ETL_Rechazos_Resumen;
+GO
+
+CREATE TABLE ETL_Rechazos_Resumen (
+    ID_Proceso INT NOT NULL,
+    Tabla_Origen VARCHAR(100) NOT NULL,
+    Codigo_Motivo INT NOT NULL,
+    Cantidad BIGINT NOT NULL
+);
+
+CREATE INDEX IDX_ETL_Rechazos_Resumen_Proceso ON ETL_Rechazos_Resumen(ID_Proceso);
+PRINT ' Tabla ETL_Rechazos_Resumen creada';
+GO
+
+
+-- TABLA DE DETALLE DE PROCESOS (métricas por paso)
+-- Una fila por archivo o SP de cada proceso, más el total de la etapa (Paso = 'TOTAL').
+-- La escriben SP_ETL_Registrar_Detalle y los loaders (extract_data.py, load_STG_to_INT.py,
+-- dw_loader.py), que además guardan la corrida en un archivo local (metricas.py).
+IF OBJECT_ID('ETL_Control_Detalle', 'U') IS NOT NULL
+    DROP TABLE ETL_Control_Detalle;
+GO
+
+CREATE TABLE ETL_Control_Detalle (
+    ID_Detalle BIGINT IDENTITY(1,1) PRIMARY KEY,
+    ID_Proceso INT NOT NULL,
+    Etapa VARCHAR(50) NOT NULL, -- 'CSV_to_STG', 'STG_to_INT', 'INT_to_DW'
+    Paso VARCHAR(100) NOT NULL, -- archivo, SP o 'TOTAL'
+    Fecha_Inicio DATETIME2(3) NOT NULL,
+    Fecha_Fin DATETIME2(3) NOT NULL,
+    Duracion_Seg DECIMAL(12,3) NOT NULL,
+    Filas_Entrada BIGINT NULL,
+    Filas_Salida BIGINT NULL,
+    Filas_Rechazadas BIGINT NULL,
+    Filas_Seg DECIMAL(18,1) NULL,
+
+    CONSTRAINT FK_Detalle_Proceso FOREIGN KEY (ID_Proceso)
+        REFERENCES ETL_Control_Procesos(ID_Proceso)
+);
+
+CREATE INDEX IDX_ETL_Detalle_Proceso ON ETL_Control_Detalle(ID_Proceso);
+PRINT ' Tabla ETL_Control_Detalle creada';
+GO
+
+
+
+
+-- TABLA DE MARCAS DE AGUA (carga incremental de hechos)
+-- Último CodVenta y última fecha cargados por tabla de hechos: con @Incremental = 1 solo se
+-- consideran las filas de INT con CodVenta posterior a la marca (las ventas tardías de días
+-- ya cargados también entran: CodVenta crece con cada venta nueva del origen).
+IF OBJECT_ID('ETL_Watermark', 'U') IS NOT NULL
+    DROP TABLE ETL_Watermark;
+GO
+
+CREATE TABLE ETL_Watermark (
+    Tabla VARCHAR(100) NOT NULL PRIMARY KEY,
+    Ultimo_Tiempo_Key INT NOT NULL,
+    Ultima_Fecha DATE NOT NULL,
+    -- Marca de agua de la carga incremental: último CodVenta (número de venta del origen) cargado
+    Ultimo_CodVenta BIGINT NULL,
+    ID_Proceso INT NULL,
+    Fecha_Actualizacion DATETIME DEFAULT GETDATE()
+);
+PRINT ' Tabla ETL_Watermark creada';
+GO
+
+
+
+
+-- TABLA DE MESES REPROCESADOS (reproceso por meses de los hechos)
+-- SP_DW_Reprocesar_Meses registra por ID_Proceso los meses (AAAAMM) borrados de cada tabla
+-- de hechos: Fact_Ventas por mes de venta y Fact_Entregas por mes de envío. Con filas para
+-- su proceso, SP_INT_to_DW_Fact_Ventas recarga solo esos meses y SP_DW_Actualizar_Agregados
+-- los recalcula aunque no hayan vuelto filas.
+IF OBJECT_ID('ETL_Reproceso_Meses', 'U') IS NOT NULL
+    DROP TABLE ETL_Reproceso_Meses;
+GO
+
+CREATE TABLE ETL_Reproceso_Meses (
+    ID_Proceso INT NOT NULL,
+    Tabla VARCHAR(50) NOT NULL, -- 'Fact_Ventas', 'Fact_Entregas'
+    AnioMes INT NOT NULL,
+    Fecha_Registro DATETIME DEFAULT GETDATE(),
+
+    CONSTRAINT PK_ETL_Reproceso_Meses PRIMARY KEY (ID_Proceso, Tabla, AnioMes)
+);
+PRINT ' Tabla ETL_Reproceso_Meses creada';
+GO
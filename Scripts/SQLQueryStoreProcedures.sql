@@ -1,5 +1,94 @@
 
 
+-- SP_ETL_Registrar_Detalle
+-- Registra las métricas de un paso (un SP) en ETL_Control_Detalle: duración, filas de
+-- entrada, de salida, rechazadas y filas/seg. Los loaders leen los conteos de esta tabla
+-- por ID_Proceso en lugar de interpretar los mensajes PRINT.
+IF OBJECT_ID('SP_ETL_Registrar_Detalle', 'P') IS NOT NULL
+    DROP PROCEDURE SP_ETL_Registrar_Detalle;
+GO
+
+CREATE PROCEDURE SP_ETL_Registrar_Detalle
+    @ID_Proceso INT,
+    @Etapa VARCHAR(50),
+    @Paso VARCHAR(100),
+    @Fecha_Inicio DATETIME2(3),
+    @Filas_Entrada BIGINT = NULL,
+    @Filas_Salida BIGINT = NULL,
+    @Filas_Rechazadas BIGINT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- Un SP ejecutado a mano, sin proceso, no deja detalle
+    IF @ID_Proceso IS NULL
+        RETURN;
+
+    DECLARE @Fecha_Fin DATETIME2(3) = SYSDATETIME();
+    DECLARE @Duracion DECIMAL(12,3) = DATEDIFF(MILLISECOND, @Fecha_Inicio, @Fecha_Fin) / 1000.0;
+
+    INSERT INTO ETL_Control_Detalle (
+        ID_Proceso, Etapa, Paso, Fecha_Inicio, Fecha_Fin, Duracion_Seg,
+        Filas_Entrada, Filas_Salida, Filas_Rechazadas, Filas_Seg
+    )
+    VALUES (
+        @ID_Proceso, @Etapa, @Paso, @Fecha_Inicio, @Fecha_Fin, @Duracion,
+        @Filas_Entrada, @Filas_Salida, @Filas_Rechazadas,
+        CASE WHEN @Duracion > 0 THEN @Filas_Salida / @Duracion END
+    );
+END;
+GO
+
+
+
+-- SP_ETL_Registrar_Rechazos
+-- Registra los rechazos de un paso que el SP que llama juntó en #Rechazos
+-- (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo): la cantidad por tabla y
+-- código en ETL_Rechazos_Resumen y, en ETL_Registros_Rechazados, como mucho Tope filas al
+-- azar por tabla y código (ETL_Rechazos_Motivos; NULL = todas). Un Motivo_Rechazo NULL se
+-- completa con la descripción del código. Devuelve la cantidad total en @Rechazados.
+IF OBJECT_ID('SP_ETL_Registrar_Rechazos', 'P') IS NOT NULL
+    DROP PROCEDURE SP_ETL_Registrar_Rechazos;
+GO
+
+CREATE PROCEDURE SP_ETL_Registrar_Rechazos
+    @ID_Proceso INT,
+    @Rechazados INT OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    SELECT @Rechazados = COUNT(*) FROM #Rechazos;
+
+    -- Un SP ejecutado a mano, sin proceso, solo devuelve la cantidad
+    IF @ID_Proceso IS NULL OR @Rechazados = 0
+        RETURN;
+
+    INSERT INTO ETL_Rechazos_Resumen (ID_Proceso, Tabla_Origen, Codigo_Motivo, Cantidad)
+    SELECT @ID_Proceso, Tabla_Origen, Codigo_Motivo, COUNT(*)
+    FROM #Rechazos
+    GROUP BY Tabla_Origen, Codigo_Motivo;
+
+    INSERT INTO ETL_Registros_Rechazados (
+        ID_Proceso, Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo
+    )
+    SELECT
+        @ID_Proceso,
+        r.Tabla_Origen,
+        r.Registro_Original,
+        r.Codigo_Motivo,
+        ISNULL(r.Motivo_Rechazo, '[' + CAST(r.Codigo_Motivo AS VARCHAR) + '] ' + ISNULL(m.Descripcion, ''))
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY Tabla_Origen, Codigo_Motivo ORDER BY NEWID()) AS Orden
+        FROM #Rechazos
+    ) r
+    LEFT JOIN ETL_Rechazos_Motivos m ON m.Codigo_Motivo = r.Codigo_Motivo
+    WHERE m.Tope IS NULL OR r.Orden <= m.Tope;
+END;
+GO
+
+
+
 -- SP_STG_to_INT_EstadoPedido
 IF OBJECT_ID('SP_STG_to_INT_EstadoPedido', 'P') IS NOT NULL
     DROP PROCEDURE SP_STG_to_INT_EstadoPedido;
@@ -14,6 +103,9 @@ BEGIN
     DECLARE @RegistrosProcesados INT = 0;
     DECLARE @RegistrosRechazados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_EstadoDelPedido);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -80,18 +172,23 @@ BEGIN
         
         SET @RegistrosProcesados = @@ROWCOUNT;
         
-        -- Registrar rechazados
-        INSERT INTO ETL_Registros_Rechazados (
-            ID_Proceso, Tabla_Origen, Registro_Original, Motivo_Rechazo
-        )
+        -- Registrar rechazados (conteo por motivo y muestra, SP_ETL_Registrar_Rechazos)
+        CREATE TABLE #Rechazos (
+            Tabla_Origen VARCHAR(100) NOT NULL,
+            Registro_Original VARCHAR(MAX) NOT NULL,
+            Codigo_Motivo INT NOT NULL,
+            Motivo_Rechazo VARCHAR(500) NULL
+        );
+
+        INSERT INTO #Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
         SELECT 
-            @ID_Proceso,
             'STG_EstadoDelPedido',
             'CodEstado: ' + ISNULL(CodEstado, 'NULL') + 
             ', Descripcion: ' + ISNULL(Descripcion_Estado, 'NULL'),
+            CASE WHEN CodEstado IS NULL OR LTRIM(RTRIM(CodEstado)) = '' THEN 30 ELSE 31 END,
             CASE 
                 WHEN CodEstado IS NULL OR LTRIM(RTRIM(CodEstado)) = '' 
-                    THEN 'CodEstado nulo o vacío'
+                    THEN 'CodEstado nulo o vacío (STG)'
                 WHEN Descripcion_Estado IS NULL OR LTRIM(RTRIM(Descripcion_Estado)) = '' 
                     THEN 'Descripcion_Estado nulo o vacío'
             END
@@ -102,9 +199,13 @@ BEGIN
             OR Descripcion_Estado IS NULL
             OR LTRIM(RTRIM(Descripcion_Estado)) = '';
         
-        SET @RegistrosRechazados = @@ROWCOUNT;
+        EXEC SP_ETL_Registrar_Rechazos @ID_Proceso, @RegistrosRechazados OUTPUT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_EstadoPedido', @Inicio,
+            @FilasEntrada, @RegistrosProcesados, @RegistrosRechazados;
         
         PRINT 'SP_STG_to_INT_EstadoPedido: ' + 
               CAST(@RegistrosProcesados AS VARCHAR) + ' registros procesados, ' +
@@ -142,6 +243,9 @@ BEGIN
     DECLARE @RegistrosProcesados INT = 0;
     DECLARE @RegistrosRechazados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_Almacenes);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -192,20 +296,31 @@ BEGIN
         
         SET @RegistrosProcesados = @@ROWCOUNT;
         
-        -- Registrar rechazados
-        INSERT INTO ETL_Registros_Rechazados (ID_Proceso, Tabla_Origen, Registro_Original, Motivo_Rechazo)
+        -- Registrar rechazados (conteo por motivo y muestra, SP_ETL_Registrar_Rechazos)
+        CREATE TABLE #Rechazos (
+            Tabla_Origen VARCHAR(100) NOT NULL,
+            Registro_Original VARCHAR(MAX) NOT NULL,
+            Codigo_Motivo INT NOT NULL,
+            Motivo_Rechazo VARCHAR(500) NULL
+        );
+
+        INSERT INTO #Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
         SELECT 
-            @ID_Proceso,
             'STG_Almacenes',
             'CodAlmacen: ' + ISNULL(CodAlmacen, 'NULL') + ', Nombre: ' + ISNULL(Nombre_Almacen, 'NULL'),
+            32,
             'Campos críticos nulos o vacíos'
         FROM STG_Almacenes
         WHERE CodAlmacen IS NULL OR LTRIM(RTRIM(CodAlmacen)) = ''
            OR Nombre_Almacen IS NULL OR LTRIM(RTRIM(Nombre_Almacen)) = '';
         
-        SET @RegistrosRechazados = @@ROWCOUNT;
+        EXEC SP_ETL_Registrar_Rechazos @ID_Proceso, @RegistrosRechazados OUTPUT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_Almacen', @Inicio,
+            @FilasEntrada, @RegistrosProcesados, @RegistrosRechazados;
         
         PRINT 'SP_STG_to_INT_Almacen: ' + 
               CAST(@RegistrosProcesados AS VARCHAR) + ' procesados, ' +
@@ -239,6 +354,9 @@ BEGIN
     
     DECLARE @RegistrosProcesados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_Clientes);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -269,6 +387,10 @@ BEGIN
         SET @RegistrosProcesados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_Cliente', @Inicio,
+            @FilasEntrada, @RegistrosProcesados, 0;
         
         PRINT 'SP_STG_to_INT_Cliente: ' + CAST(@RegistrosProcesados AS VARCHAR) + ' procesados';
         RETURN @RegistrosProcesados;
@@ -298,6 +420,9 @@ BEGIN
     
     DECLARE @RegistrosProcesados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_Productos);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -342,6 +467,10 @@ BEGIN
         SET @RegistrosProcesados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_Producto', @Inicio,
+            @FilasEntrada, @RegistrosProcesados, 0;
         
         PRINT 'SP_STG_to_INT_Producto: ' + CAST(@RegistrosProcesados AS VARCHAR) + ' procesados';
         RETURN @RegistrosProcesados;
@@ -370,6 +499,9 @@ BEGIN
     
     DECLARE @RegistrosProcesados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_Tiendas);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -400,6 +532,10 @@ BEGIN
         SET @RegistrosProcesados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_Tienda', @Inicio,
+            @FilasEntrada, @RegistrosProcesados, 0;
         
         PRINT 'SP_STG_to_INT_Tienda: ' + CAST(@RegistrosProcesados AS VARCHAR) + ' procesados';
         RETURN @RegistrosProcesados;
@@ -430,6 +566,9 @@ BEGIN
 
     DECLARE @Insertados INT = 0;
 
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_Entregas);
+
     BEGIN TRY
         BEGIN TRANSACTION;
 
@@ -468,6 +607,10 @@ BEGIN
 
         COMMIT TRANSACTION;
 
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_Proveedor', @Inicio,
+            @FilasEntrada, @Insertados, 0;
+
         PRINT 'SP_STG_to_INT_Proveedor OK | Insertados: ' + CAST(@Insertados AS VARCHAR);
 
     END TRY
@@ -511,6 +654,9 @@ BEGIN
     DECLARE @RegistrosProcesados INT = 0;
     DECLARE @RegistrosRechazados INT = 0;
 
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_Ventas) + (SELECT COUNT(*) FROM STG_Ventas_Add);
+
     BEGIN TRY
         BEGIN TRANSACTION;
 
@@ -518,6 +664,7 @@ BEGIN
         TRUNCATE TABLE INT_Ventas;
 
         INSERT INTO INT_Ventas (
+            CodVenta,
             FechaVenta,
             CodigoProducto,
             CodigoCliente,
@@ -529,6 +676,7 @@ BEGIN
             ID_Proceso
         )
         SELECT 
+            TRY_CAST(CodVenta AS BIGINT),
             TRY_CAST(FechaVenta AS DATE),
             UPPER(LTRIM(RTRIM(CodigoProducto))),
             UPPER(LTRIM(RTRIM(CodigoCliente))),
@@ -551,6 +699,7 @@ BEGIN
         UNION ALL
 
         SELECT 
+            TRY_CAST(CodVenta AS BIGINT),
             TRY_CAST(FechaVenta AS DATE),
             UPPER(LTRIM(RTRIM(CodigoProducto))),
             UPPER(LTRIM(RTRIM(CodigoCliente))),
@@ -573,23 +722,39 @@ BEGIN
         SET @RegistrosProcesados = @@ROWCOUNT;
 
         
-        -- REGISTROS RECHAZADOS
+        -- REGISTROS RECHAZADOS (conteo por motivo y muestra, SP_ETL_Registrar_Rechazos)
         
-        INSERT INTO ETL_Registros_Rechazados (
-            ID_Proceso,
-            Tabla_Origen,
-            Registro_Original,
-            Motivo_Rechazo,
-            Fecha_Rechazo
-        )
+        CREATE TABLE #Rechazos (
+            Tabla_Origen VARCHAR(100) NOT NULL,
+            Registro_Original VARCHAR(MAX) NOT NULL,
+            Codigo_Motivo INT NOT NULL,
+            Motivo_Rechazo VARCHAR(500) NULL
+        );
+
+        -- Las dos tablas STG que se unen en INT_Ventas, cada una con su Tabla_Origen
+        INSERT INTO #Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo)
         SELECT 
-            @ID_Proceso,
-            'STG_Ventas',
+            v.Tabla_Origen,
             'Fecha=' + ISNULL(FechaVenta, 'NULL') +
             ' | Producto=' + ISNULL(CodigoProducto, 'NULL'),
-            'Datos inválidos o campos críticos nulos',
-            GETDATE()
-        FROM STG_Ventas
+            -- Primera regla incumplida, con los códigos de validacion.py
+            CASE
+                WHEN TRY_CAST(FechaVenta AS DATE) IS NULL THEN 10
+                WHEN CodigoProducto IS NULL OR LTRIM(RTRIM(CodigoProducto)) = '' THEN 11
+                WHEN CodigoCliente IS NULL OR LTRIM(RTRIM(CodigoCliente)) = '' THEN 12
+                WHEN CodigoTienda IS NULL OR LTRIM(RTRIM(CodigoTienda)) = '' THEN 13
+                WHEN TRY_CAST(Cantidad AS INT) IS NULL OR TRY_CAST(Cantidad AS INT) <= 0 THEN 14
+                ELSE 15
+            END
+        FROM (
+            SELECT 'STG_Ventas' AS Tabla_Origen, FechaVenta, CodigoProducto, CodigoCliente,
+                   CodigoTienda, Cantidad, PrecioVenta
+            FROM STG_Ventas
+            UNION ALL
+            SELECT 'STG_Ventas_Add', FechaVenta, CodigoProducto, CodigoCliente,
+                   CodigoTienda, Cantidad, PrecioVenta
+            FROM STG_Ventas_Add
+        ) v
         WHERE 
             TRY_CAST(FechaVenta AS DATE) IS NULL
             OR CodigoProducto IS NULL OR LTRIM(RTRIM(CodigoProducto)) = ''
@@ -599,10 +764,14 @@ BEGIN
             OR TRY_CAST(REPLACE(PrecioVenta, ',', '.') AS DECIMAL(18,2)) IS NULL
             OR TRY_CAST(REPLACE(PrecioVenta, ',', '.') AS DECIMAL(18,2)) < 0;
 
-        SET @RegistrosRechazados = @@ROWCOUNT;
+        EXEC SP_ETL_Registrar_Rechazos @ID_Proceso, @RegistrosRechazados OUTPUT;
 
         COMMIT TRANSACTION;
 
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_Ventas', @Inicio,
+            @FilasEntrada, @RegistrosProcesados, @RegistrosRechazados;
+
         PRINT 'SP_STG_to_INT_Ventas: ' +
               CAST(@RegistrosProcesados AS VARCHAR) + ' procesados, ' +
               CAST(@RegistrosRechazados AS VARCHAR) + ' rechazados';
@@ -635,6 +804,9 @@ BEGIN
     
     DECLARE @RegistrosProcesados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM STG_Entregas);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -696,6 +868,10 @@ BEGIN
         SET @RegistrosProcesados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'STG_to_INT', 'SP_STG_to_INT_Entregas', @Inicio,
+            @FilasEntrada, @RegistrosProcesados, 0;
         
         PRINT 'SP_STG_to_INT_Entregas: ' + CAST(@RegistrosProcesados AS VARCHAR) + ' procesados exitosamente.';
         RETURN @RegistrosProcesados;
@@ -719,6 +895,9 @@ IF OBJECT_ID('SP_Orquestador_STG_to_INT', 'P') IS NOT NULL
 GO
 
 CREATE PROCEDURE SP_Orquestador_STG_to_INT
+    -- Lista separada por comas de los SP a ejecutar (NULL = todos).
+    -- La usa el manifiesto de extract_data.py para saltear los archivos sin cambios.
+    @Procesos VARCHAR(MAX) = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -745,15 +924,39 @@ BEGIN
         PRINT '========================================';
         PRINT '';
         
-        -- Ejecutar transformaciones en orden
-        EXEC SP_STG_to_INT_EstadoPedido @ID_Proceso;
-        EXEC SP_STG_to_INT_Almacen @ID_Proceso;
-        EXEC SP_STG_to_INT_Cliente @ID_Proceso;
-        EXEC SP_STG_to_INT_Producto @ID_Proceso;
-        EXEC SP_STG_to_INT_Tienda @ID_Proceso;
-        EXEC SP_STG_to_INT_Proveedor @ID_Proceso;
-        EXEC SP_STG_to_INT_Ventas @ID_Proceso;
-        EXEC SP_STG_to_INT_Entregas @ID_Proceso;
+        -- Ejecutar transformaciones en orden (solo las pedidas en @Procesos)
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_EstadoPedido,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_EstadoPedido @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_EstadoPedido';
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_Almacen,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_Almacen @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_Almacen';
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_Cliente,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_Cliente @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_Cliente';
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_Producto,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_Producto @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_Producto';
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_Tienda,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_Tienda @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_Tienda';
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_Proveedor,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_Proveedor @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_Proveedor';
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_Ventas,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_Ventas @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_Ventas';
+        IF @Procesos IS NULL OR CHARINDEX(',SP_STG_to_INT_Entregas,', ',' + @Procesos + ',') > 0
+            EXEC SP_STG_to_INT_Entregas @ID_Proceso;
+        ELSE
+            PRINT 'Omitido (sin cambios): SP_STG_to_INT_Entregas';
         
         -- Actualizar proceso como completado
         UPDATE ETL_Control_Procesos
@@ -772,8 +975,8 @@ BEGIN
                     (SELECT COUNT(*) FROM INT_Entregas)
             ),
             Registros_Rechazados = (
-                SELECT COUNT(*) 
-                FROM ETL_Registros_Rechazados 
+                SELECT ISNULL(SUM(Cantidad), 0)
+                FROM ETL_Rechazos_Resumen
                 WHERE ID_Proceso = @ID_Proceso
             )
         WHERE ID_Proceso = @ID_Proceso;
@@ -806,6 +1009,7 @@ PRINT 'SPs STG->INT CREADOS EXITOSAMENTE';
 PRINT '========================================';
 PRINT '';
 PRINT 'Stored Procedures creados:';
+PRINT '  - SP_ETL_Registrar_Detalle (métricas por paso)';
 PRINT '  - SP_STG_to_INT_EstadoPedido';
 PRINT '  - SP_STG_to_INT_Almacen';
 PRINT '  - SP_STG_to_INT_Cliente';
@@ -818,6 +1022,8 @@ PRINT '  - SP_Orquestador_STG_to_INT (Ejecuta todos)';
 PRINT '';
 PRINT 'Para ejecutar todo el proceso:';
 PRINT '  EXEC SP_Orquestador_STG_to_INT;';
+PRINT 'Para ejecutar solo algunos:';
+PRINT '  EXEC SP_Orquestador_STG_to_INT @Procesos = ''SP_STG_to_INT_Ventas,SP_STG_to_INT_Entregas'';';
 PRINT '';
 GO  
 
@@ -844,6 +1050,9 @@ BEGIN
     DECLARE @RegistrosActualizados INT = 0;
     DECLARE @RegistrosInsertados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_EstadoPedido);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -884,6 +1093,11 @@ BEGIN
         SET @RegistrosInsertados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        DECLARE @FilasSalida BIGINT = @RegistrosInsertados + @RegistrosActualizados;
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Dim_EstadoPedido', @Inicio,
+            @FilasEntrada, @FilasSalida, 0;
         PRINT 'SP_INT_to_DW_Dim_EstadoPedido: ' + CAST(@RegistrosInsertados AS VARCHAR) + ' insertados, ' + CAST(@RegistrosActualizados AS VARCHAR) + ' actualizados';
     END TRY
     BEGIN CATCH
@@ -907,6 +1121,9 @@ BEGIN
     DECLARE @RegistrosActualizados INT = 0;
     DECLARE @RegistrosInsertados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_Almacen);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -942,6 +1159,11 @@ BEGIN
         SET @RegistrosInsertados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        DECLARE @FilasSalida BIGINT = @RegistrosInsertados + @RegistrosActualizados;
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Dim_Almacen', @Inicio,
+            @FilasEntrada, @FilasSalida, 0;
         PRINT 'SP_INT_to_DW_Dim_Almacen: ' + CAST(@RegistrosInsertados AS VARCHAR) + ' insertados, ' + CAST(@RegistrosActualizados AS VARCHAR) + ' actualizados';
     END TRY
     BEGIN CATCH
@@ -969,6 +1191,9 @@ BEGIN
     DECLARE @RegistrosActualizados INT = 0;
     DECLARE @RegistrosInsertados INT = 0;
 
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_Cliente);
+
     BEGIN TRY
         BEGIN TRANSACTION;
 
@@ -1001,6 +1226,11 @@ BEGIN
         SET @RegistrosInsertados = @@ROWCOUNT;
 
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        DECLARE @FilasSalida BIGINT = @RegistrosInsertados + @RegistrosActualizados;
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Dim_Cliente', @Inicio,
+            @FilasEntrada, @FilasSalida, 0;
         PRINT 'SP_INT_to_DW_Dim_Cliente: ' + CAST(@RegistrosInsertados AS VARCHAR) + ' insertados, ' + CAST(@RegistrosActualizados AS VARCHAR) + ' actualizados';
     END TRY
     BEGIN CATCH
@@ -1029,6 +1259,9 @@ BEGIN
     DECLARE @RegistrosActualizados INT = 0;
     DECLARE @RegistrosInsertados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_Producto);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -1060,6 +1293,11 @@ BEGIN
         SET @RegistrosInsertados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        DECLARE @FilasSalida BIGINT = @RegistrosInsertados + @RegistrosActualizados;
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Dim_Producto', @Inicio,
+            @FilasEntrada, @FilasSalida, 0;
         
         PRINT 'SP_INT_to_DW_Dim_Producto: ' + 
               CAST(@RegistrosInsertados AS VARCHAR) + ' insertados, ' +
@@ -1097,6 +1335,9 @@ BEGIN
     DECLARE @RegistrosActualizados INT = 0;
     DECLARE @RegistrosInsertados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_Tienda);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -1129,6 +1370,11 @@ BEGIN
         SET @RegistrosInsertados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        DECLARE @FilasSalida BIGINT = @RegistrosInsertados + @RegistrosActualizados;
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Dim_Tienda', @Inicio,
+            @FilasEntrada, @FilasSalida, 0;
         
         PRINT 'SP_INT_to_DW_Dim_Tienda: ' + 
               CAST(@RegistrosInsertados AS VARCHAR) + ' insertados, ' +
@@ -1160,6 +1406,9 @@ BEGIN
     DECLARE @RegistrosActualizados INT = 0;
     DECLARE @RegistrosInsertados INT = 0;
     
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_Proveedor);
+
     BEGIN TRY
         BEGIN TRANSACTION;
         
@@ -1190,6 +1439,11 @@ BEGIN
         SET @RegistrosInsertados = @@ROWCOUNT;
         
         COMMIT TRANSACTION;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        DECLARE @FilasSalida BIGINT = @RegistrosInsertados + @RegistrosActualizados;
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Dim_Proveedor', @Inicio,
+            @FilasEntrada, @FilasSalida, 0;
         PRINT 'SP_INT_to_DW_Dim_Proveedor: ' + CAST(@RegistrosInsertados AS VARCHAR) + ' insertados';
     END TRY
     BEGIN CATCH
@@ -1210,7 +1464,9 @@ GO
 
 CREATE PROCEDURE SP_INT_to_DW_Fact_Ventas
     @ID_Proceso INT = NULL,
-    @Reprocesar BIT = 0
+    @Reprocesar BIT = 0,
+    -- 1 = solo ventas con CodVenta posterior a la marca de agua de ETL_Watermark (sin anti-join contra todo Fact_Ventas)
+    @Incremental BIT = 0
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -1218,10 +1474,41 @@ BEGIN
     DECLARE @RegistrosInsertados INT = 0;
     DECLARE @RegistrosEliminados INT = 0;
     DECLARE @RegistrosRechazados INT = 0;
+    DECLARE @UltimoCodVenta BIGINT = NULL;
+    DECLARE @PrimerPendiente BIGINT;
+    DECLARE @MaxTiempoKey INT;
+
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_Ventas);
+
+    -- REPROCESO POR MESES: SP_DW_Reprocesar_Meses ya borró los meses registrados para este
+    -- proceso; solo se cargan las ventas de INT de esos meses, sin anti-join ni marca de agua
+    DECLARE @PorMeses BIT = CASE WHEN EXISTS (
+        SELECT 1 FROM ETL_Reproceso_Meses WHERE ID_Proceso = @ID_Proceso AND Tabla = 'Fact_Ventas'
+    ) THEN 1 ELSE 0 END;
 
     BEGIN TRY
         BEGIN TRANSACTION;
 
+        -- INCREMENTAL: leer la marca de agua (sin marca se hace la carga completa)
+        -- La marca es el último CodVenta cargado, no la última fecha: CodVenta crece con cada
+        -- venta que llega al origen, así que una venta tardía de un día ya cargado también entra.
+        -- Nunca pasa a una venta rechazada: esa vuelve a leerse en la corrida siguiente.
+        IF @Incremental = 1 AND @Reprocesar = 0 AND @PorMeses = 0
+        BEGIN
+            SELECT @UltimoCodVenta = Ultimo_CodVenta
+            FROM ETL_Watermark
+            WHERE Tabla = 'Fact_Ventas';
+
+            -- Filas de entrada del paso: solo las que quedan por encima de la marca
+            IF @UltimoCodVenta IS NOT NULL
+                SELECT @FilasEntrada = COUNT(*)
+                FROM INT_Ventas
+                WHERE CodVenta > @UltimoCodVenta OR CodVenta IS NULL;
+
+            PRINT '   Incremental desde CodVenta: ' + ISNULL(CAST(@UltimoCodVenta AS VARCHAR), 'sin marca (carga completa)');
+        END
+
         -- REPROCESO: Eliminar ventas del período
         IF @Reprocesar = 1
         BEGIN
@@ -1246,7 +1533,8 @@ BEGIN
             Cantidad,
             PrecioVenta,
             Total_IVA,
-            FechaCarga
+            FechaCarga,
+            CodVenta
         )
         SELECT 
             dt.Tiempo_Key,
@@ -1256,7 +1544,8 @@ BEGIN
             iv.Cantidad,
             iv.PrecioVenta,
             iv.Total_IVA,
-            GETDATE()
+            GETDATE(),
+            iv.CodVenta
         FROM INT_Ventas iv
         
 
@@ -1272,8 +1561,27 @@ BEGIN
         INNER JOIN Dim_Tienda dtie 
             ON LTRIM(RTRIM(iv.CodigoTienda)) = LTRIM(RTRIM(dtie.CodigoTienda))
         
-        WHERE @Reprocesar = 1
-           OR NOT EXISTS (
+        WHERE (@UltimoCodVenta IS NULL OR iv.CodVenta > @UltimoCodVenta OR iv.CodVenta IS NULL)
+          AND (
+               @PorMeses = 0
+            OR EXISTS (
+                SELECT 1 FROM ETL_Reproceso_Meses rm
+                WHERE rm.ID_Proceso = @ID_Proceso
+                  AND rm.Tabla = 'Fact_Ventas'
+                  AND rm.AnioMes = dt.Tiempo_Key / 100
+            )
+          )
+          AND (
+               @Reprocesar = 1
+            -- Los meses reprocesados se vaciaron antes
+            OR @PorMeses = 1
+            -- Con el número de venta del origen alcanza un seek sobre IDX_Ventas_CodVenta
+            OR (iv.CodVenta IS NOT NULL AND NOT EXISTS (
+                SELECT 1
+                FROM Fact_Ventas fv
+                WHERE fv.CodVenta = iv.CodVenta
+            ))
+            OR (iv.CodVenta IS NULL AND NOT EXISTS (
                 SELECT 1
                 FROM Fact_Ventas fv
                 WHERE fv.Tiempo_Key = dt.Tiempo_Key
@@ -1282,26 +1590,37 @@ BEGIN
                   AND fv.ID_Tienda = dtie.ID_Tienda
                   AND fv.Cantidad = iv.Cantidad
                   AND fv.PrecioVenta = iv.PrecioVenta
-           );
+            ))
+          )
+        -- RECOMPILE: el plan se arma con los valores reales (rango sobre IDX_INT_Ventas_CodVenta)
+        OPTION (RECOMPILE);
 
         SET @RegistrosInsertados = @@ROWCOUNT;
 
        
-        -- REGISTROS RECHAZADOS
+        -- REGISTROS RECHAZADOS (conteo por motivo y muestra, SP_ETL_Registrar_Rechazos)
         
-        INSERT INTO ETL_Registros_Rechazados (
-            ID_Proceso,
-            Tabla_Origen,
-            Registro_Original,
-            Motivo_Rechazo
-        )
+        CREATE TABLE #Rechazos (
+            Tabla_Origen VARCHAR(100) NOT NULL,
+            Registro_Original VARCHAR(MAX) NOT NULL,
+            Codigo_Motivo INT NOT NULL,
+            Motivo_Rechazo VARCHAR(500) NULL
+        );
+
+        INSERT INTO #Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
         SELECT
-            @ID_Proceso,
             'INT_Ventas',
             'Fecha=' + CONVERT(VARCHAR, iv.FechaVenta, 23) +
                 ', Producto=' + iv.CodigoProducto +
                 ', Cliente=' + iv.CodigoCliente +
                 ', Tienda=' + iv.CodigoTienda,
+            CASE
+                WHEN dt.Tiempo_Key IS NULL THEN 40
+                WHEN dp.ID_Producto IS NULL THEN 41
+                WHEN dc.ID_Cliente IS NULL THEN 42
+                WHEN dtie.ID_Tienda IS NULL THEN 43
+                ELSE 99
+            END,
             CASE
                 WHEN dt.Tiempo_Key IS NULL 
                     THEN 'Fecha [' + CONVERT(VARCHAR, iv.FechaVenta, 23) + '] no existe en Dim_Tiempo'
@@ -1322,15 +1641,63 @@ BEGIN
             ON LTRIM(RTRIM(iv.CodigoCliente)) = LTRIM(RTRIM(dc.CodigoCliente))
         LEFT JOIN Dim_Tienda dtie 
             ON LTRIM(RTRIM(iv.CodigoTienda)) = LTRIM(RTRIM(dtie.CodigoTienda))
-        WHERE dt.Tiempo_Key IS NULL
-           OR dp.ID_Producto IS NULL
-           OR dc.ID_Cliente IS NULL
-           OR dtie.ID_Tienda IS NULL;
+        WHERE (@UltimoCodVenta IS NULL OR iv.CodVenta > @UltimoCodVenta OR iv.CodVenta IS NULL)
+          AND (
+               @PorMeses = 0
+            OR EXISTS (
+                SELECT 1 FROM ETL_Reproceso_Meses rm
+                WHERE rm.ID_Proceso = @ID_Proceso
+                  AND rm.Tabla = 'Fact_Ventas'
+                  AND rm.AnioMes = YEAR(iv.FechaVenta) * 100 + MONTH(iv.FechaVenta)
+            )
+          )
+          AND (
+               dt.Tiempo_Key IS NULL
+            OR dp.ID_Producto IS NULL
+            OR dc.ID_Cliente IS NULL
+            OR dtie.ID_Tienda IS NULL
+          )
+        OPTION (RECOMPILE);
+
+        EXEC SP_ETL_Registrar_Rechazos @ID_Proceso, @RegistrosRechazados OUTPUT;
+
+        -- MARCA DE AGUA: último CodVenta y última fecha presentes en Fact_Ventas (se actualiza en todos los modos)
+        -- El CodVenta no pasa a la primera venta leída que no quedó cargada (rechazada): las de
+        -- arriba de la marca se comparan igual con IDX_Ventas_CodVenta en la corrida siguiente
+        SELECT @PrimerPendiente = MIN(iv.CodVenta)
+        FROM INT_Ventas iv
+        WHERE iv.CodVenta IS NOT NULL
+          AND (@UltimoCodVenta IS NULL OR iv.CodVenta > @UltimoCodVenta)
+          AND NOT EXISTS (SELECT 1 FROM Fact_Ventas fv WHERE fv.CodVenta = iv.CodVenta);
 
-        SET @RegistrosRechazados = @@ROWCOUNT;
+        SELECT @MaxTiempoKey = MAX(Tiempo_Key), @UltimoCodVenta = MAX(CodVenta) FROM Fact_Ventas;
+
+        IF @PrimerPendiente <= @UltimoCodVenta
+            SET @UltimoCodVenta = @PrimerPendiente - 1;
+
+        IF @MaxTiempoKey IS NOT NULL
+        BEGIN
+            UPDATE ETL_Watermark
+            SET Ultimo_Tiempo_Key = @MaxTiempoKey,
+                Ultima_Fecha = (SELECT Fecha FROM Dim_Tiempo WHERE Tiempo_Key = @MaxTiempoKey),
+                Ultimo_CodVenta = @UltimoCodVenta,
+                ID_Proceso = @ID_Proceso,
+                Fecha_Actualizacion = GETDATE()
+            WHERE Tabla = 'Fact_Ventas';
+
+            IF @@ROWCOUNT = 0
+                INSERT INTO ETL_Watermark (Tabla, Ultimo_Tiempo_Key, Ultima_Fecha, Ultimo_CodVenta, ID_Proceso)
+                SELECT 'Fact_Ventas', Tiempo_Key, Fecha, @UltimoCodVenta, @ID_Proceso
+                FROM Dim_Tiempo
+                WHERE Tiempo_Key = @MaxTiempoKey;
+        END
 
         COMMIT TRANSACTION;
 
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Fact_Ventas', @Inicio,
+            @FilasEntrada, @RegistrosInsertados, @RegistrosRechazados;
+
         PRINT 'SP_INT_to_DW_Fact_Ventas: ' +
               CAST(@RegistrosInsertados AS VARCHAR) + ' insertados, ' +
               CAST(@RegistrosRechazados AS VARCHAR) + ' rechazados';
@@ -1363,6 +1730,9 @@ BEGIN
     DECLARE @Insertados INT = 0;
     DECLARE @Rechazados INT = 0;
 
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @FilasEntrada BIGINT = (SELECT COUNT(*) FROM INT_Entregas);
+
     BEGIN TRY
         BEGIN TRANSACTION;
 
@@ -1416,7 +1786,7 @@ BEGIN
             GETDATE()
         FROM INT_Entregas ie
         INNER JOIN Fact_Ventas fv
-            ON CAST(ie.CodVenta AS INT) = fv.ID_Venta
+            ON fv.CodVenta = ie.CodVenta
         LEFT JOIN Dim_Tiempo dt_env
             ON CAST(ie.Fecha_Envio AS DATE) = dt_env.Fecha
         LEFT JOIN Dim_Tiempo dt_ent
@@ -1437,37 +1807,45 @@ BEGIN
         SET @Insertados = @@ROWCOUNT;
 
        
-        -- 3. REGISTRAR RECHAZOS REALES
+        -- 3. REGISTRAR RECHAZOS REALES (conteo por motivo y muestra, SP_ETL_Registrar_Rechazos)
        
-        INSERT INTO ETL_Registros_Rechazados (
-            ID_Proceso,
-            Tabla_Origen,
-            Registro_Original,
-            Motivo_Rechazo,
-            Fecha_Rechazo
-        )
+        CREATE TABLE #Rechazos (
+            Tabla_Origen VARCHAR(100) NOT NULL,
+            Registro_Original VARCHAR(MAX) NOT NULL,
+            Codigo_Motivo INT NOT NULL,
+            Motivo_Rechazo VARCHAR(500) NULL
+        );
+
+        INSERT INTO #Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
         SELECT
-            @ID_Proceso,
             'INT_Entregas',
             'CodEntrega=' + CAST(ie.CodEntrega AS VARCHAR),
+            CASE
+                WHEN fv.ID_Venta IS NULL THEN 50
+                WHEN dt_ent.Tiempo_Key IS NULL THEN 51
+                ELSE 99
+            END,
             CASE
                 WHEN fv.ID_Venta IS NULL THEN 'Venta inexistente'
                 WHEN dt_ent.Tiempo_Key IS NULL THEN 'Fecha de entrega inválida'
                 ELSE 'Error desconocido'
-            END,
-            GETDATE()
+            END
         FROM INT_Entregas ie
         LEFT JOIN Fact_Ventas fv
-            ON CAST(ie.CodVenta AS INT) = fv.ID_Venta
+            ON fv.CodVenta = ie.CodVenta
         LEFT JOIN Dim_Tiempo dt_ent
             ON CAST(ie.Fecha_Entrega AS DATE) = dt_ent.Fecha
         WHERE fv.ID_Venta IS NULL
            OR dt_ent.Tiempo_Key IS NULL;
 
-        SET @Rechazados = @@ROWCOUNT;
+        EXEC SP_ETL_Registrar_Rechazos @ID_Proceso, @Rechazados OUTPUT;
 
         COMMIT TRANSACTION;
 
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_INT_to_DW_Fact_Entregas', @Inicio,
+            @FilasEntrada, @Insertados, @Rechazados;
+
         PRINT 'Fact_Entregas -> Insertados: ' + CAST(@Insertados AS VARCHAR);
         PRINT 'Fact_Entregas -> Rechazados: ' + CAST(@Rechazados AS VARCHAR);
 
@@ -1483,6 +1861,343 @@ GO
 
 
 
+-- SP_DW_Reprocesar_Meses
+-- Reproceso de hechos por meses: en lugar de borrar todo el rango de INT_Ventas (o toda
+-- Fact_Entregas) borra solo los meses pedidos, mes por mes y en lotes de @TamanoLote filas
+-- (cada lote en su transacción: el log no crece con el rango). Primero las entregas de las
+-- ventas de cada mes (FK) y después las ventas. Los meses quedan en ETL_Reproceso_Meses
+-- para @ID_Proceso: SP_INT_to_DW_Fact_Ventas recarga solo esos meses, SP_INT_to_DW_Fact_Entregas
+-- vuelve a insertar las entregas borradas y SP_DW_Actualizar_Agregados los recalcula.
+--   @Meses = 'AAAAMM,AAAAMM,...' | NULL o 'auto' = los meses con ventas de INT_Ventas que no
+--            están en Fact_Ventas o que cambiaron (por CodVenta). Las ventas sin CodVenta y las
+--            que desaparecieron del origen no se detectan: para esas hace falta la lista explícita.
+IF OBJECT_ID('SP_DW_Reprocesar_Meses', 'P') IS NOT NULL
+    DROP PROCEDURE SP_DW_Reprocesar_Meses;
+GO
+
+CREATE PROCEDURE SP_DW_Reprocesar_Meses
+    @ID_Proceso INT,
+    @Meses VARCHAR(MAX) = NULL,
+    @TamanoLote INT = 50000
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @AnioMes INT;
+    DECLARE @Filas INT;
+    DECLARE @MesVentas INT;
+    DECLARE @MesEntregas INT;
+    DECLARE @VentasEliminadas BIGINT = 0;
+    DECLARE @EntregasEliminadas BIGINT = 0;
+
+    DECLARE @Lista TABLE (Valor VARCHAR(20));
+    DECLARE @MesesPedidos TABLE (AnioMes INT PRIMARY KEY);
+
+    IF @ID_Proceso IS NULL
+        THROW 50010, 'SP_DW_Reprocesar_Meses requiere @ID_Proceso', 1;
+    IF @TamanoLote IS NULL OR @TamanoLote <= 0
+        THROW 50011, '@TamanoLote debe ser mayor a 0', 1;
+
+    BEGIN TRY
+
+        -- 1. MESES A REPROCESAR
+        IF @Meses IS NULL OR LTRIM(RTRIM(@Meses)) = 'auto'
+        BEGIN
+            -- INT_Ventas se recarga entera en cada corrida: solo cuentan las ventas que cambiaron.
+            -- Una venta cambiada marca su mes en INT y su mes en Fact_Ventas (si cambió la fecha,
+            -- la fila vieja se borra y la nueva entra sin chocar con IDX_Ventas_CodVenta)
+            INSERT INTO @MesesPedidos (AnioMes)
+            SELECT DISTINCT m.AnioMes
+            FROM INT_Ventas iv
+            LEFT JOIN Fact_Ventas fv
+                ON fv.CodVenta = iv.CodVenta
+            LEFT JOIN Dim_Producto dp
+                ON dp.ID_Producto = fv.ID_Producto
+            LEFT JOIN Dim_Cliente dc
+                ON dc.ID_Cliente = fv.ID_Cliente
+            LEFT JOIN Dim_Tienda dtie
+                ON dtie.ID_Tienda = fv.ID_Tienda
+            CROSS APPLY (VALUES
+                (YEAR(iv.FechaVenta) * 100 + MONTH(iv.FechaVenta)),
+                (fv.Tiempo_Key / 100)
+            ) m (AnioMes)
+            WHERE iv.CodVenta IS NOT NULL
+              AND iv.FechaVenta IS NOT NULL
+              AND m.AnioMes IS NOT NULL
+              AND (
+                   fv.ID_Venta IS NULL
+                OR fv.Tiempo_Key <> YEAR(iv.FechaVenta) * 10000 + MONTH(iv.FechaVenta) * 100 + DAY(iv.FechaVenta)
+                OR LTRIM(RTRIM(dp.CodigoProducto)) <> LTRIM(RTRIM(iv.CodigoProducto))
+                OR LTRIM(RTRIM(dc.CodigoCliente)) <> LTRIM(RTRIM(iv.CodigoCliente))
+                OR LTRIM(RTRIM(dtie.CodigoTienda)) <> LTRIM(RTRIM(iv.CodigoTienda))
+                OR fv.Cantidad <> iv.Cantidad
+                OR fv.PrecioVenta <> iv.PrecioVenta
+                OR fv.Total_IVA <> iv.Total_IVA
+              );
+
+            PRINT '   Meses con cambios en INT_Ventas: ' + CAST(@@ROWCOUNT AS VARCHAR);
+        END
+        ELSE
+        BEGIN
+            INSERT INTO @Lista (Valor)
+            SELECT LTRIM(RTRIM(value)) FROM STRING_SPLIT(@Meses, ',') WHERE LTRIM(RTRIM(value)) <> '';
+
+            IF EXISTS (
+                SELECT 1 FROM @Lista
+                WHERE LEN(Valor) <> 6
+                   OR TRY_CAST(Valor AS INT) IS NULL
+                   OR TRY_CAST(Valor AS INT) % 100 NOT BETWEEN 1 AND 12
+            )
+                THROW 50012, 'Meses inválidos: se esperan AAAAMM separados por coma', 1;
+
+            INSERT INTO @MesesPedidos (AnioMes)
+            SELECT DISTINCT CAST(Valor AS INT) FROM @Lista;
+        END
+
+        -- 2. REGISTRO DE LOS MESES (un reintento del mismo proceso conserva los ya registrados)
+        INSERT INTO ETL_Reproceso_Meses (ID_Proceso, Tabla, AnioMes)
+        SELECT @ID_Proceso, 'Fact_Ventas', m.AnioMes
+        FROM @MesesPedidos m
+        WHERE NOT EXISTS (
+            SELECT 1 FROM ETL_Reproceso_Meses rm
+            WHERE rm.ID_Proceso = @ID_Proceso AND rm.Tabla = 'Fact_Ventas' AND rm.AnioMes = m.AnioMes
+        );
+
+        -- Meses de envío de las entregas que se van a borrar (Agg_Entregas_Mes va por envío)
+        INSERT INTO ETL_Reproceso_Meses (ID_Proceso, Tabla, AnioMes)
+        SELECT DISTINCT @ID_Proceso, 'Fact_Entregas', fe.Tiempo_Key_Envio / 100
+        FROM @MesesPedidos m
+        INNER JOIN Fact_Ventas fv
+            ON fv.Tiempo_Key BETWEEN m.AnioMes * 100 AND m.AnioMes * 100 + 99
+        INNER JOIN Fact_Entregas fe
+            ON fe.ID_Venta = fv.ID_Venta
+        WHERE NOT EXISTS (
+            SELECT 1 FROM ETL_Reproceso_Meses rm
+            WHERE rm.ID_Proceso = @ID_Proceso
+              AND rm.Tabla = 'Fact_Entregas'
+              AND rm.AnioMes = fe.Tiempo_Key_Envio / 100
+        );
+
+        -- 3. BORRADO POR MES Y POR LOTES
+        DECLARE cur_meses CURSOR LOCAL FAST_FORWARD FOR
+            SELECT AnioMes FROM @MesesPedidos ORDER BY AnioMes;
+        OPEN cur_meses;
+        FETCH NEXT FROM cur_meses INTO @AnioMes;
+
+        WHILE @@FETCH_STATUS = 0
+        BEGIN
+            SET @MesEntregas = 0;
+            SET @MesVentas = 0;
+
+            -- Entregas de las ventas del mes (referencian a Fact_Ventas)
+            SET @Filas = 1;
+            WHILE @Filas > 0
+            BEGIN
+                BEGIN TRANSACTION;
+                DELETE TOP (@TamanoLote) fe
+                FROM Fact_Entregas fe
+                WHERE EXISTS (
+                    SELECT 1 FROM Fact_Ventas fv
+                    WHERE fv.ID_Venta = fe.ID_Venta
+                      AND fv.Tiempo_Key BETWEEN @AnioMes * 100 AND @AnioMes * 100 + 99
+                );
+                SET @Filas = @@ROWCOUNT;
+                COMMIT TRANSACTION;
+                SET @MesEntregas = @MesEntregas + @Filas;
+            END
+
+            -- Ventas del mes (rango sobre IDX_Fecha)
+            SET @Filas = 1;
+            WHILE @Filas > 0
+            BEGIN
+                BEGIN TRANSACTION;
+                DELETE TOP (@TamanoLote)
+                FROM Fact_Ventas
+                WHERE Tiempo_Key BETWEEN @AnioMes * 100 AND @AnioMes * 100 + 99;
+                SET @Filas = @@ROWCOUNT;
+                COMMIT TRANSACTION;
+                SET @MesVentas = @MesVentas + @Filas;
+            END
+
+            SET @EntregasEliminadas = @EntregasEliminadas + @MesEntregas;
+            SET @VentasEliminadas = @VentasEliminadas + @MesVentas;
+            PRINT '   ' + CAST(@AnioMes AS VARCHAR) + ': ' +
+                  CAST(@MesVentas AS VARCHAR) + ' ventas, ' +
+                  CAST(@MesEntregas AS VARCHAR) + ' entregas eliminadas';
+
+            FETCH NEXT FROM cur_meses INTO @AnioMes;
+        END
+
+        CLOSE cur_meses;
+        DEALLOCATE cur_meses;
+
+        -- Métricas del paso (ETL_Control_Detalle): filas eliminadas
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_DW_Reprocesar_Meses', @Inicio,
+            NULL, @VentasEliminadas + @EntregasEliminadas, 0;
+
+        PRINT 'SP_DW_Reprocesar_Meses: ' +
+              CAST((SELECT COUNT(*) FROM @MesesPedidos) AS VARCHAR) + ' meses, ' +
+              CAST(@VentasEliminadas AS VARCHAR) + ' ventas y ' +
+              CAST(@EntregasEliminadas AS VARCHAR) + ' entregas eliminadas';
+
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0 ROLLBACK;
+        PRINT 'ERROR en SP_DW_Reprocesar_Meses: ' + ERROR_MESSAGE();
+        THROW;
+    END CATCH
+END;
+GO
+
+
+
+
+
+-- SP_DW_Actualizar_Agregados
+-- Mantiene Agg_Ventas_Mes y Agg_Entregas_Mes después de la carga de hechos. Solo se
+-- recalculan los meses (AnioMes = Tiempo_Key / 100) con filas cargadas por @ID_Proceso
+-- (FechaCarga >= Fecha_Inicio del proceso) o borradas por SP_DW_Reprocesar_Meses: se
+-- borran y se vuelven a agrupar desde los hechos. Con @Reprocesar = 1, sin proceso o con
+-- el agregado vacío se reconstruye entero.
+IF OBJECT_ID('SP_DW_Actualizar_Agregados', 'P') IS NOT NULL
+    DROP PROCEDURE SP_DW_Actualizar_Agregados;
+GO
+
+CREATE PROCEDURE SP_DW_Actualizar_Agregados
+    @ID_Proceso INT = NULL,
+    @Reprocesar BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @Inicio DATETIME2(3) = SYSDATETIME();
+    DECLARE @Desde DATETIME = (
+        SELECT Fecha_Inicio FROM ETL_Control_Procesos WHERE ID_Proceso = @ID_Proceso
+    );
+    DECLARE @CompletoVentas BIT = 0;
+    DECLARE @CompletoEntregas BIT = 0;
+    DECLARE @FilasVentas INT = 0;
+    DECLARE @FilasEntregas INT = 0;
+    DECLARE @FilasEntrada BIGINT = 0;
+
+    DECLARE @MesesVentas TABLE (AnioMes INT PRIMARY KEY);
+    DECLARE @MesesEntregas TABLE (AnioMes INT PRIMARY KEY);
+
+    IF @Reprocesar = 1 OR @Desde IS NULL OR NOT EXISTS (SELECT 1 FROM Agg_Ventas_Mes)
+        SET @CompletoVentas = 1;
+    IF @Reprocesar = 1 OR @Desde IS NULL OR NOT EXISTS (SELECT 1 FROM Agg_Entregas_Mes)
+        SET @CompletoEntregas = 1;
+
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        -- 1. MESES A RECALCULAR
+        IF @CompletoVentas = 1
+            INSERT INTO @MesesVentas (AnioMes)
+            SELECT DISTINCT Tiempo_Key / 100 FROM Fact_Ventas;
+        ELSE
+            INSERT INTO @MesesVentas (AnioMes)
+            SELECT Tiempo_Key / 100 FROM Fact_Ventas WHERE FechaCarga >= @Desde
+            UNION
+            SELECT AnioMes FROM ETL_Reproceso_Meses WHERE ID_Proceso = @ID_Proceso AND Tabla = 'Fact_Ventas';
+
+        IF @CompletoEntregas = 1
+            INSERT INTO @MesesEntregas (AnioMes)
+            SELECT DISTINCT Tiempo_Key_Envio / 100 FROM Fact_Entregas;
+        ELSE
+            INSERT INTO @MesesEntregas (AnioMes)
+            SELECT Tiempo_Key_Envio / 100 FROM Fact_Entregas WHERE FechaCarga >= @Desde
+            UNION
+            SELECT AnioMes FROM ETL_Reproceso_Meses WHERE ID_Proceso = @ID_Proceso AND Tabla = 'Fact_Entregas';
+
+        -- 2. VENTAS POR MES x PRODUCTO x TIENDA
+        IF @CompletoVentas = 1
+            DELETE FROM Agg_Ventas_Mes;
+        ELSE
+            DELETE agg
+            FROM Agg_Ventas_Mes agg
+            INNER JOIN @MesesVentas m ON m.AnioMes = agg.AnioMes;
+
+        INSERT INTO Agg_Ventas_Mes (
+            AnioMes, Anio, Mes, ID_Producto, ID_Tienda,
+            Cant_Ventas, Cantidad, Importe, Total_IVA, FechaActualizacion
+        )
+        SELECT
+            m.AnioMes, m.AnioMes / 100, m.AnioMes % 100, fv.ID_Producto, fv.ID_Tienda,
+            COUNT(*), SUM(CAST(fv.Cantidad AS BIGINT)), SUM(fv.Cantidad * fv.PrecioVenta), SUM(fv.Total_IVA),
+            GETDATE()
+        FROM @MesesVentas m
+        INNER JOIN Fact_Ventas fv
+            ON fv.Tiempo_Key BETWEEN m.AnioMes * 100 AND m.AnioMes * 100 + 99
+        GROUP BY m.AnioMes, fv.ID_Producto, fv.ID_Tienda;
+
+        SET @FilasVentas = @@ROWCOUNT;
+
+        -- 3. ENTREGAS POR MES x PROVEEDOR x ALMACEN x ESTADO
+        IF @CompletoEntregas = 1
+            DELETE FROM Agg_Entregas_Mes;
+        ELSE
+            DELETE agg
+            FROM Agg_Entregas_Mes agg
+            INNER JOIN @MesesEntregas m ON m.AnioMes = agg.AnioMes;
+
+        INSERT INTO Agg_Entregas_Mes (
+            AnioMes, Anio, Mes, ID_Proveedor, ID_Almacen, ID_Estado,
+            Cant_Entregas, Cantidad_Productos, Costo_Entrega,
+            Entregas_Entregadas, Entregas_A_Tiempo, FechaActualizacion
+        )
+        SELECT
+            m.AnioMes, m.AnioMes / 100, m.AnioMes % 100, fe.ID_Proveedor, fe.ID_Almacen, fe.ID_Estado,
+            COUNT(*), SUM(CAST(fe.CantidadProductos AS BIGINT)), SUM(fe.CostoEntrega),
+            SUM(CASE WHEN fe.Tiempo_Key_Entrega IS NOT NULL THEN 1 ELSE 0 END),
+            SUM(CASE
+                    WHEN fe.Tiempo_Key_Entrega <= CONVERT(INT, CONVERT(CHAR(8), fe.FechaEstimadaEntrega, 112))
+                    THEN 1 ELSE 0
+                END),
+            GETDATE()
+        FROM @MesesEntregas m
+        INNER JOIN Fact_Entregas fe
+            ON fe.Tiempo_Key_Envio BETWEEN m.AnioMes * 100 AND m.AnioMes * 100 + 99
+        GROUP BY m.AnioMes, fe.ID_Proveedor, fe.ID_Almacen, fe.ID_Estado;
+
+        SET @FilasEntregas = @@ROWCOUNT;
+
+        COMMIT TRANSACTION;
+
+        -- Filas de hechos leídas = las que quedaron resumidas en los meses recalculados
+        SELECT @FilasEntrada = ISNULL(SUM(CAST(agg.Cant_Ventas AS BIGINT)), 0)
+        FROM Agg_Ventas_Mes agg
+        INNER JOIN @MesesVentas m ON m.AnioMes = agg.AnioMes;
+
+        SELECT @FilasEntrada = @FilasEntrada + ISNULL(SUM(CAST(agg.Cant_Entregas AS BIGINT)), 0)
+        FROM Agg_Entregas_Mes agg
+        INNER JOIN @MesesEntregas m ON m.AnioMes = agg.AnioMes;
+
+        -- Métricas del paso (ETL_Control_Detalle)
+        EXEC SP_ETL_Registrar_Detalle @ID_Proceso, 'INT_to_DW', 'SP_DW_Actualizar_Agregados', @Inicio,
+            @FilasEntrada, @FilasVentas + @FilasEntregas, 0;
+
+        PRINT 'Agg_Ventas_Mes   -> ' + CAST((SELECT COUNT(*) FROM @MesesVentas) AS VARCHAR) + ' meses' +
+              CASE WHEN @CompletoVentas = 1 THEN ' (completo)' ELSE '' END + ', ' +
+              CAST(@FilasVentas AS VARCHAR) + ' filas';
+        PRINT 'Agg_Entregas_Mes -> ' + CAST((SELECT COUNT(*) FROM @MesesEntregas) AS VARCHAR) + ' meses' +
+              CASE WHEN @CompletoEntregas = 1 THEN ' (completo)' ELSE '' END + ', ' +
+              CAST(@FilasEntregas AS VARCHAR) + ' filas';
+
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0 ROLLBACK;
+        PRINT 'ERROR en SP_DW_Actualizar_Agregados: ' + ERROR_MESSAGE();
+        THROW;
+    END CATCH
+END;
+GO
+
+
+
+
+
 -- SP ORQUESTADOR COMPLETO: INT -> DW
 -- Incluye inicialización automática de Dim_Tiempo
 
@@ -1495,7 +2210,15 @@ IF OBJECT_ID('SP_Orquestador_INT_to_DW', 'P') IS NOT NULL
 GO
 
 CREATE PROCEDURE SP_Orquestador_INT_to_DW
-    @Reprocesar BIT = 0
+    @Reprocesar BIT = 0,
+    @Incremental BIT = 0,
+    -- 0 = solo dimensiones: los hechos y los agregados los carga un paso aparte de dw_loader.py
+    --     (el loader con claves en memoria de key_cache.py, o las etapas DW_Fact_* del pipeline)
+    @CargarHechos BIT = 1,
+    -- Reproceso por meses ('AAAAMM,AAAAMM' o 'auto' = los meses con cambios en INT_Ventas): en lugar de
+    -- @Reprocesar, borra y recarga solo esos meses de los hechos (SP_DW_Reprocesar_Meses)
+    @MesesReproceso VARCHAR(MAX) = NULL,
+    @TamanoLote INT = 50000
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -1506,6 +2229,8 @@ BEGIN
     DECLARE @CountVentas INT;
     DECLARE @CountEntregas INT;
     DECLARE @TotalRechazados INT;
+    -- Con reproceso por meses los agregados solo recalculan esos meses
+    DECLARE @ReprocesarAgregados BIT = CASE WHEN @MesesReproceso IS NULL THEN @Reprocesar ELSE 0 END;
 
     BEGIN TRY
         
@@ -1529,6 +2254,9 @@ BEGIN
         PRINT 'INICIANDO PROCESO ETL COMPLETO';
         PRINT 'ID Proceso: ' + CAST(@ID_Proceso AS VARCHAR);
         PRINT 'Reprocesar: ' + CAST(@Reprocesar AS VARCHAR);
+        PRINT 'Incremental: ' + CAST(@Incremental AS VARCHAR);
+        IF @MesesReproceso IS NOT NULL
+            PRINT 'Reproceso por meses: ' + @MesesReproceso;
         PRINT '========================================';
         PRINT '';
 
@@ -1595,18 +2323,40 @@ BEGIN
         PRINT 'PASO 2: Cargando Tablas de Hechos...';
         PRINT '-----------------------------------';
         
-        EXEC SP_INT_to_DW_Fact_Ventas       @ID_Proceso, @Reprocesar;
-        EXEC SP_INT_to_DW_Fact_Entregas     @ID_Proceso, @Reprocesar;
+        IF @CargarHechos = 1 AND @MesesReproceso IS NOT NULL
+        BEGIN
+            EXEC SP_DW_Reprocesar_Meses         @ID_Proceso, @MesesReproceso, @TamanoLote;
+            EXEC SP_INT_to_DW_Fact_Ventas       @ID_Proceso, 0, @Incremental;
+            EXEC SP_INT_to_DW_Fact_Entregas     @ID_Proceso, 0;
+        END
+        ELSE IF @CargarHechos = 1
+        BEGIN
+            EXEC SP_INT_to_DW_Fact_Ventas       @ID_Proceso, @Reprocesar, @Incremental;
+            EXEC SP_INT_to_DW_Fact_Entregas     @ID_Proceso, @Reprocesar;
+        END
+        ELSE
+            PRINT 'Hechos: omitidos (@CargarHechos = 0, se cargan en un paso aparte)';
         PRINT '';
 
         
-        -- PASO 3: Actualizar proceso como completado
+        -- PASO 3: AGREGADOS DEL TABLERO (solo los meses que tocó este proceso)
+        
+        IF @CargarHechos = 1
+        BEGIN
+            PRINT 'PASO 3: Actualizando Agregados...';
+            PRINT '-----------------------------------';
+            EXEC SP_DW_Actualizar_Agregados     @ID_Proceso, @ReprocesarAgregados;
+            PRINT '';
+        END
+
+        
+        -- PASO 4: Actualizar proceso como completado
        
         -- Calcular métricas ANTES del UPDATE 
         SELECT @CountVentas = COUNT(*) FROM Fact_Ventas;
         SELECT @CountEntregas = COUNT(*) FROM Fact_Entregas;
-        SELECT @TotalRechazados = COUNT(*) 
-        FROM ETL_Registros_Rechazados 
+        SELECT @TotalRechazados = ISNULL(SUM(Cantidad), 0)
+        FROM ETL_Rechazos_Resumen
         WHERE ID_Proceso = @ID_Proceso;
         
         UPDATE ETL_Control_Procesos
@@ -0,0 +1,258 @@
+"""
+Backends de base de datos para los loaders del pipeline.
+
+Cada backend expone la misma interfaz, de modo que extract_data.py, load_STG_to_INT.py y
+dw_loader.py no dependen del motor:
+
+    connect()                         -> conexión (close() la libera)
+    prepare_cursor(cursor)            -> ajustes de inserción masiva
+    truncate(cursor, tabla)
+    set_input_sizes(cursor, columnas) -> columnas = [(tipo, largo), ...]
+    run_stg_to_int(connection, procesos) -> mensajes del proceso STG -> INT (procesos=None: todos)
+    run_int_to_dw(connection, reprocesar, incremental, cargar_hechos, meses, tamano_lote)
+    run_reproceso_meses(connection, id_proceso, meses, tamano_lote) -> borra por lotes los meses de los hechos
+    run_fact_ventas(connection, id_proceso, reprocesar, incremental)
+    run_fact_entregas(connection, id_proceso, reprocesar)
+    run_agregados(connection, id_proceso, reprocesar) -> Agg_Ventas_Mes / Agg_Entregas_Mes
+    run_sp(connection, sp, id_proceso, reprocesar, incremental) -> un paso suelto (planificador.py)
+    seleccionar_top(columnas, resto, n) -> SELECT limitado a n filas en el dialecto del motor
+    ultimo_proceso(cursor, nombre)    -> (estado, procesados, rechazados, duracion_seg)
+    top_rechazos(cursor, limite, id_proceso) -> [(tabla, '[código] motivo', cantidad), ...] de
+                                         ETL_Rechazos_Resumen (id_proceso None: el último proceso)
+    count(cursor, tabla)
+
+Backends disponibles (sección [BACKEND] de config.ini, motor = ...):
+    sqlserver -> SQL Server vía pyodbc y los Stored Procedures (por defecto)
+    sqlite    -> motor local embebido (local_engine.py), sin servidor
+
+Reproceso por meses: meses = None (sin reproceso por meses), 'auto' (los meses con ventas
+de INT_Ventas nuevas o cambiadas respecto de Fact_Ventas) o una lista de AAAAMM (lista_meses los lee de config.ini o de la línea de comandos).
+"""
+import os
+
+from db_session import BASE_DIR, load_config
+
+
+def lista_meses(texto):
+    """'' -> None | 'auto' -> 'auto' | '202403, 202404' -> [202403, 202404] (valida AAAAMM)."""
+    texto = (texto or '').strip()
+    if not texto:
+        return None
+    if texto.lower() == 'auto':
+        return 'auto'
+    meses = []
+    for valor in texto.split(','):
+        valor = valor.strip()
+        if not valor:
+            continue
+        if len(valor) != 6 or not valor.isdigit() or not 1 <= int(valor) % 100 <= 12:
+            raise ValueError(f"Mes inválido para reproceso: '{valor}' (se espera AAAAMM)")
+        meses.append(int(valor))
+    return sorted(set(meses)) or None
+
+
+def texto_meses(meses):
+    """Inverso de lista_meses: 'auto' o 'AAAAMM,AAAAMM' (parámetro @Meses de los SP)."""
+    return meses if meses == 'auto' else ','.join(str(mes) for mes in meses)
+
+
+class SQLServerBackend:
+    """SQL Server: la transformación corre en los SP_Orquestador_* del servidor."""
+
+    nombre = 'sqlserver'
+    soporta_paralelo = True
+    # Fecha y hora de la base (FechaCarga, inicio de los procesos)
+    ahora_sql = 'GETDATE()'
+
+    def __init__(self, config_file='config.ini'):
+        import pyodbc
+        from db_session import get_pool
+
+        self._pyodbc = pyodbc
+        self.Error = pyodbc.Error
+        self.pool = get_pool(config_file)
+        self.pool_size = self.pool.size
+
+        # Identifica la base destino (el manifiesto de DATASET se lleva por destino)
+        config = load_config(config_file)
+        server = config.get('DATABASE', 'server', fallback='').strip()
+        database = config.get('DATABASE', 'database', fallback='').strip()
+        self.destino = f"sqlserver:{server}/{database}"
+
+    def connect(self):
+        return self.pool.acquire()
+
+    def prepare_cursor(self, cursor):
+        cursor.fast_executemany = True
+
+    def truncate(self, cursor, tabla):
+        cursor.execute(f"TRUNCATE TABLE {tabla}")
+
+    def crear_temporal(self, cursor, nombre, columnas):
+        """Tabla temporal de la sesión (vacía); devuelve el nombre con que se la usa en SQL."""
+        cursor.execute(f"IF OBJECT_ID('tempdb..#{nombre}') IS NOT NULL DROP TABLE #{nombre}")
+        cursor.execute(f"CREATE TABLE #{nombre} ({columnas})")
+        return f"#{nombre}"
+
+    def set_input_sizes(self, cursor, columnas):
+        pyodbc = self._pyodbc
+        tipos_odbc = {
+            'timestamp': (pyodbc.SQL_TYPE_TIMESTAMP, 0, 0),
+            'date': (pyodbc.SQL_TYPE_DATE, 0, 0),
+            'int': (pyodbc.SQL_BIGINT, 0, 0),
+            'decimal': (pyodbc.SQL_DECIMAL, 18, 2),
+        }
+        cursor.setinputsizes([
+            tipos_odbc.get(tipo, (pyodbc.SQL_VARCHAR, largo, 0)) for tipo, largo in columnas
+        ])
+
+    def _exec_sp(self, cursor, sql, params=()):
+        """Ejecuta un SP y consume todos sus result sets; devuelve los mensajes PRINT."""
+        cursor.execute(sql, params)
+        mensajes = []
+        while True:
+            mensajes.extend(msg[1] for msg in getattr(cursor, 'messages', None) or [])
+            try:
+                if not cursor.nextset():
+                    break
+            except self._pyodbc.ProgrammingError:
+                break
+        return mensajes
+
+    def run_stg_to_int(self, connection, procesos=None):
+        if procesos is None:
+            return self._exec_sp(connection.cached_cursor(), "EXEC SP_Orquestador_STG_to_INT")
+        return self._exec_sp(
+            connection.cached_cursor(),
+            "EXEC SP_Orquestador_STG_to_INT @Procesos = ?",
+            (','.join(procesos),)
+        )
+
+    def run_int_to_dw(self, connection, reprocesar=0, incremental=0, cargar_hechos=1, meses=None,
+                      tamano_lote=50000):
+        if meses is None:
+            return self._exec_sp(
+                connection.cached_cursor(),
+                "EXEC SP_Orquestador_INT_to_DW @Reprocesar = ?, @Incremental = ?, @CargarHechos = ?",
+                (reprocesar, incremental, cargar_hechos)
+            )
+        return self._en_autocommit(
+            connection,
+            "EXEC SP_Orquestador_INT_to_DW @Reprocesar = ?, @Incremental = ?, @CargarHechos = ?, "
+            "@MesesReproceso = ?, @TamanoLote = ?",
+            (reprocesar, incremental, cargar_hechos, texto_meses(meses), tamano_lote)
+        )
+
+    def run_reproceso_meses(self, connection, id_proceso, meses, tamano_lote=50000):
+        return self._en_autocommit(
+            connection,
+            "EXEC SP_DW_Reprocesar_Meses @ID_Proceso = ?, @Meses = ?, @TamanoLote = ?",
+            (id_proceso, texto_meses(meses), tamano_lote)
+        )
+
+    def _en_autocommit(self, connection, sql, params):
+        """
+        SP_DW_Reprocesar_Meses confirma cada lote del borrado: dentro de la transacción
+        implícita de pyodbc los COMMIT del SP no liberarían nada. Se confirma lo pendiente y
+        se ejecuta con autocommit.
+        """
+        connection.commit()
+        connection.autocommit = True
+        try:
+            return self._exec_sp(connection.cursor(), sql, params)
+        finally:
+            connection.autocommit = False
+
+    def run_fact_ventas(self, connection, id_proceso, reprocesar=0, incremental=0):
+        return self._exec_sp(
+            connection.cached_cursor(),
+            "EXEC SP_INT_to_DW_Fact_Ventas @ID_Proceso = ?, @Reprocesar = ?, @Incremental = ?",
+            (id_proceso, reprocesar, incremental)
+        )
+
+    def run_fact_entregas(self, connection, id_proceso, reprocesar=0):
+        return self._exec_sp(
+            connection.cached_cursor(),
+            "EXEC SP_INT_to_DW_Fact_Entregas @ID_Proceso = ?, @Reprocesar = ?",
+            (id_proceso, reprocesar)
+        )
+
+    def run_agregados(self, connection, id_proceso, reprocesar=0):
+        return self._exec_sp(
+            connection.cached_cursor(),
+            "EXEC SP_DW_Actualizar_Agregados @ID_Proceso = ?, @Reprocesar = ?",
+            (id_proceso, reprocesar)
+        )
+
+    def run_sp(self, connection, sp, id_proceso, reprocesar=0, incremental=0):
+        """Un SP suelto, con los parámetros con que lo llama su orquestador (sin commit)."""
+        cursor = connection.cursor()
+        if sp == 'Sp_Genera_Dim_Tiempo':
+            # Igual que SP_Orquestador_INT_to_DW: solo si Dim_Tiempo está vacía
+            if self.count(cursor, 'Dim_Tiempo') > 0:
+                return []
+            return self._exec_sp(
+                cursor, "EXEC Sp_Genera_Dim_Tiempo @FechaInicio = ?, @FechaFin = ?", ('2020-01-01', '2030-12-31')
+            )
+        if sp.startswith('SP_STG_to_INT_'):
+            return self._exec_sp(cursor, f"EXEC {sp} @ID_Proceso = ?", (id_proceso,))
+        if sp == 'SP_INT_to_DW_Fact_Ventas':
+            return self._exec_sp(
+                cursor, f"EXEC {sp} @ID_Proceso = ?, @Reprocesar = ?, @Incremental = ?",
+                (id_proceso, reprocesar, incremental)
+            )
+        return self._exec_sp(cursor, f"EXEC {sp} @ID_Proceso = ?, @Reprocesar = ?", (id_proceso, reprocesar))
+
+    def seleccionar_top(self, columnas, resto, n):
+        return f"SELECT TOP ({int(n)}) {columnas} {resto}"
+
+    def ultimo_proceso(self, cursor, nombre):
+        cursor.execute("""
+            SELECT TOP 1
+                Estado,
+                Registros_Procesados,
+                Registros_Rechazados,
+                DATEDIFF(SECOND, Fecha_Inicio, Fecha_Fin) as Duracion
+            FROM ETL_Control_Procesos
+            WHERE Nombre_Proceso = ?
+            ORDER BY ID_Proceso DESC
+        """, (nombre,))
+        return cursor.fetchone()
+
+    def top_rechazos(self, cursor, limite=5, id_proceso=None):
+        cursor.execute(f"""
+            SELECT TOP {int(limite)}
+                r.Tabla_Origen,
+                '[' + CAST(r.Codigo_Motivo AS VARCHAR) + '] ' + ISNULL(m.Descripcion, '') as Motivo,
+                SUM(r.Cantidad) as Cantidad
+            FROM ETL_Rechazos_Resumen r
+            LEFT JOIN ETL_Rechazos_Motivos m ON m.Codigo_Motivo = r.Codigo_Motivo
+            WHERE r.ID_Proceso = ISNULL(?, (
+                SELECT MAX(ID_Proceso) FROM ETL_Control_Procesos
+            ))
+            GROUP BY r.Tabla_Origen, r.Codigo_Motivo, m.Descripcion
+            ORDER BY SUM(r.Cantidad) DESC
+        """, (id_proceso,))
+        return cursor.fetchall()
+
+    def count(self, cursor, tabla):
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        return cursor.fetchone()[0]
+
+
+def get_backend(config_file='config.ini'):
+    """Instancia el backend configurado en [BACKEND] motor (sqlserver por defecto)."""
+    config = load_config(config_file)
+    motor = config.get('BACKEND', 'motor', fallback='sqlserver').strip().lower()
+
+    if motor == 'sqlserver':
+        return SQLServerBackend(config_file)
+
+    if motor == 'sqlite':
+        from local_engine import SQLiteBackend
+        ruta = config.get('BACKEND', 'ruta_sqlite', fallback='datashop_local.db').strip()
+        if ruta != ':memory:' and not os.path.isabs(ruta):
+            ruta = os.path.join(BASE_DIR, ruta)
+        return SQLiteBackend(ruta)
+
+    raise ValueError(f"Backend desconocido en config.ini: '{motor}'")
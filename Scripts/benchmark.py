@@ -0,0 +1,240 @@
+"""
+Benchmark de las tres etapas con datos sintéticos a varias escalas.
+
+Para cada escala (1 = el volumen de DATASET) se generan los archivos con
+'Generar registros/generador_vectorizado.py' en una carpeta de trabajo y se corren, sobre
+una base SQLite nueva, las mismas clases que en producción:
+
+    CSV_to_STG -> extract_data.CSVToSQLServer
+    STG_to_INT -> load_STG_to_INT.DWLoader
+    INT_to_DW  -> dw_loader.ELTDataWarehouseLoader
+
+Cada etapa corre en un proceso nuevo, así el pico de memoria (RSS) es el de esa etapa
+y no el acumulado. Las filas salen del paso TOTAL de metricas.py y el resto de la
+configuración (modo, tipado, inserción, claves...) se toma de config.ini: para comparar
+configuraciones se pasa otra con --config. No hace falta ningún servicio externo.
+
+Resultado: tabla por consola y benchmark/benchmark_AAAAMMDD_HHMMSS.json. Si las filas/seg
+de una etapa caen a menos de la mitad respecto de la escala más chica se marca como
+posible quiebre de escala (memoria, índices, planes de ejecución...).
+
+Uso: python benchmark.py [--escalas 1,10,100] [--seed 42] [--config config.ini]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from configparser import ConfigParser
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from db_session import BASE_DIR
+
+
+GENERADOR_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', 'Generar registros'))
+
+ETAPAS = ('CSV_to_STG', 'STG_to_INT', 'INT_to_DW')
+
+# Filas/seg por debajo de esta fracción de la escala más chica = posible quiebre
+UMBRAL_QUIEBRE = 0.5
+
+
+def pico_rss_mb():
+    """Pico de memoria residente del proceso y sus hijos (workers de la extracción), en MB."""
+    propio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux informa KB (macOS, bytes)
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(max(propio, hijos) / divisor, 1)
+
+
+def correr_etapa(etapa, config_file, log):
+    """
+    Corre una etapa en el proceso actual (un proceso nuevo por etapa) con la salida en `log`.
+    Devuelve segundos, filas, filas/seg, pico de RSS y los pasos medidos.
+    """
+    from metricas import TOTAL, get_metricas
+
+    with open(log, 'w', encoding='utf-8') as salida, redirect_stdout(salida):
+        inicio = time.perf_counter()
+        if etapa == 'CSV_to_STG':
+            from extract_data import CSVToSQLServer
+            CSVToSQLServer(config_file).run_etl()
+        elif etapa == 'STG_to_INT':
+            from load_STG_to_INT import DWLoader
+            DWLoader(config_file).run()
+        else:
+            from dw_loader import ELTDataWarehouseLoader
+            ELTDataWarehouseLoader(config_file).run()
+        segundos = time.perf_counter() - inicio
+
+    # Las etapas atrapan sus errores: sin paso TOTAL la etapa no terminó bien
+    pasos = [paso for paso in get_metricas(config_file).pasos if paso['Etapa'] == etapa]
+    totales = [paso for paso in pasos if paso['Paso'] == TOTAL]
+    if not totales:
+        raise RuntimeError(f"{etapa} no terminó correctamente (ver {log})")
+
+    filas = totales[-1]['Filas_Salida'] or 0
+    return {
+        'segundos': round(segundos, 3),
+        'filas': filas,
+        'filas_seg': round(filas / segundos, 1) if segundos > 0 else None,
+        'pico_rss_mb': pico_rss_mb(),
+        'pasos': [paso for paso in pasos if paso['Paso'] != TOTAL],
+    }
+
+
+def generar_datos(escala, seed, carpeta, formato):
+    """Genera los archivos de la escala con el generador vectorizado (mismo proceso)."""
+    if GENERADOR_DIR not in sys.path:
+        sys.path.insert(0, GENERADOR_DIR)
+    from generador_vectorizado import generar
+
+    inicio = time.perf_counter()
+    with open(os.path.join(carpeta, 'generador.log'), 'w', encoding='utf-8') as salida, redirect_stdout(salida):
+        totales = generar(escala=escala, seed=seed, salida=os.path.join(carpeta, 'datos'), formato=formato)
+    return {'segundos': round(time.perf_counter() - inicio, 3), 'filas': totales}
+
+
+def escribir_config(base, carpeta):
+    """
+    Copia de la configuración base apuntada a la carpeta de trabajo: SQLite nuevo, datos
+    generados, métricas habilitadas y sin manifest (cada etapa procesa todo).
+    """
+    config = ConfigParser()
+    config.optionxform = str
+    config.read(os.path.join(BASE_DIR, base), encoding='utf-8')
+    for seccion in ('EXTRACCION', 'BACKEND', 'MANIFEST', 'METRICAS'):
+        if not config.has_section(seccion):
+            config.add_section(seccion)
+
+    datos = os.path.join(carpeta, 'datos')
+    config.set('EXTRACCION', 'ruta_dataset', datos)
+    config.set('EXTRACCION', 'ruta_columnar', datos)
+    config.set('BACKEND', 'motor', 'sqlite')
+    config.set('BACKEND', 'ruta_sqlite', os.path.join(carpeta, 'benchmark.db'))
+    config.set('MANIFEST', 'habilitado', 'no')
+    config.set('METRICAS', 'habilitado', 'yes')
+    config.set('METRICAS', 'carpeta', os.path.join(carpeta, 'metricas'))
+
+    ruta = os.path.join(carpeta, 'config.ini')
+    with open(ruta, 'w', encoding='utf-8') as f:
+        config.write(f)
+    formato = config.get('EXTRACCION', 'formato', fallback='csv').strip().lower()
+    return ruta, formato
+
+
+def medir_escala(escala, seed, trabajo, config_base):
+    carpeta = os.path.join(trabajo, f"escala_{escala:g}")
+    if os.path.isdir(carpeta):
+        shutil.rmtree(carpeta)
+    os.makedirs(carpeta)
+
+    config_file, formato = escribir_config(config_base, carpeta)
+    print(f"\n Escala {escala:g}: generando datos ({formato})...")
+    resultado = {'escala': escala, 'generacion': generar_datos(escala, seed, carpeta, formato), 'etapas': {}}
+    print(f"   generación: {resultado['generacion']['segundos']:.1f}s {resultado['generacion']['filas']}")
+
+    contexto = multiprocessing.get_context('spawn')
+    for etapa in ETAPAS:
+        log = os.path.join(carpeta, f"{etapa}.log")
+        # Un proceso por etapa: RSS propio y nada cacheado de la etapa anterior
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            medido = executor.submit(correr_etapa, etapa, config_file, log).result()
+        resultado['etapas'][etapa] = medido
+        print(f"   {etapa:<11} {medido['segundos']:>9.2f}s {medido['filas']:>12,} filas "
+              f"{medido['filas_seg'] or 0:>12,.0f} filas/seg {medido['pico_rss_mb']:>9,.1f} MB")
+    return resultado
+
+
+def quiebres(resultados):
+    """Etapas cuyas filas/seg caen bajo UMBRAL_QUIEBRE respecto de la escala más chica."""
+    if len(resultados) < 2:
+        return []
+    base = resultados[0]
+    encontrados = []
+    for resultado in resultados[1:]:
+        for etapa in ETAPAS:
+            referencia = base['etapas'][etapa]['filas_seg']
+            actual = resultado['etapas'][etapa]['filas_seg']
+            if referencia and actual is not None and actual < referencia * UMBRAL_QUIEBRE:
+                encontrados.append({
+                    'etapa': etapa,
+                    'escala': resultado['escala'],
+                    'relativo': round(actual / referencia, 2),
+                })
+    return encontrados
+
+
+def resumen(resultados, marcados):
+    print("\n BENCHMARK")
+    print(f" {'Escala':>8} {'Etapa':<11}{'Seg':>10}{'Filas':>13}{'Filas/seg':>13}{'RSS MB':>10}")
+    for resultado in resultados:
+        for etapa in ETAPAS:
+            medido = resultado['etapas'][etapa]
+            print(f" {resultado['escala']:>8g} {etapa:<11}{medido['segundos']:>10.2f}{medido['filas']:>13,}"
+                  f"{medido['filas_seg'] or 0:>13,.0f}{medido['pico_rss_mb']:>10,.1f}")
+    for quiebre in marcados:
+        print(f" ADVERTENCIA: {quiebre['etapa']} a escala {quiebre['escala']:g} rinde "
+              f"{quiebre['relativo']:.0%} de las filas/seg de la escala más chica (posible quiebre)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de CSV→STG, STG→INT e INT→DW a varias escalas")
+    parser.add_argument('--escalas', default='1,10,100',
+                        help="escalas separadas por coma (1 = volumen de DATASET)")
+    parser.add_argument('--seed', type=int, default=42, help="semilla del generador")
+    parser.add_argument('--config', default='config.ini',
+                        help="configuración base (relativa a Scripts); la conexión se reemplaza por SQLite")
+    parser.add_argument('--salida', default=os.path.join(BASE_DIR, 'benchmark'),
+                        help="carpeta del JSON de resultados")
+    parser.add_argument('--trabajo', default=None,
+                        help="carpeta de datos y bases temporales (por defecto, salida/trabajo)")
+    parser.add_argument('--conservar', action='store_true',
+                        help="no borrar los datos generados ni las bases al terminar")
+    args = parser.parse_args()
+
+    escalas = sorted(float(escala) for escala in args.escalas.split(',') if escala.strip())
+    if not escalas or min(escalas) <= 0:
+        parser.error("--escalas debe tener valores mayores que 0")
+    salida = os.path.abspath(args.salida)
+    trabajo = os.path.abspath(args.trabajo or os.path.join(salida, 'trabajo'))
+    os.makedirs(salida, exist_ok=True)
+
+    inicio = datetime.now()
+    resultados = []
+    try:
+        for escala in escalas:
+            resultados.append(medir_escala(escala, args.seed, trabajo, args.config))
+    finally:
+        if not args.conservar and os.path.isdir(trabajo):
+            shutil.rmtree(trabajo)
+
+    marcados = quiebres(resultados)
+    resumen(resultados, marcados)
+
+    ruta = os.path.join(salida, f"benchmark_{inicio.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({
+            'inicio': inicio.isoformat(timespec='seconds'),
+            'maquina': {
+                'sistema': platform.platform(),
+                'python': platform.python_version(),
+                'cpus': os.cpu_count(),
+            },
+            'config': args.config,
+            'seed': args.seed,
+            'resultados': resultados,
+            'quiebres': marcados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n Resultados: {ruta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Dimensión Tiempo calculada en Python a partir de las fechas que llegan a INT ([DW] calendario).
+
+Sp_Genera_Dim_Tiempo llena una sola vez el rango fijo 2020-2030: una venta o una entrega
+con fecha fuera de ese rango se rechaza con "no existe en Dim_Tiempo". Con
+calendario = observado, antes de las dimensiones se toma la fecha mínima y máxima de
+INT_Ventas e INT_Entregas, se calculan todos los días del rango con operaciones sobre
+columnas (pandas, sin recorrer día por día) y se insertan solo los que faltan en Dim_Tiempo.
+
+Los atributos son los de Sp_Genera_Dim_Tiempo, con la semana ISO real (como el motor local):
+
+    Tiempo_Key AAAAMMDD, Anio/Mes/Dia, nombres en castellano, Semana_ISO/Anio_ISO/Dia_Semana_ISO,
+    fin de semana y día laboral, Trimestre (Q1..Q4) y Semestre
+
+Es_Feriado queda en su valor por defecto (0).
+"""
+import numpy as np
+import pandas as pd
+
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio',
+         'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+DIAS = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+COLUMNAS = (
+    'Tiempo_Key', 'Fecha', 'Anio', 'Mes', 'Dia', 'Mes_Nombre', 'Mes_Nombre_Corto', 'Mes_Anio',
+    'Semana_ISO', 'Anio_ISO', 'Dia_Semana_ISO', 'Dia_Nombre', 'Es_Fin_Semana',
+    'Trimestre', 'Trimestre_Nombre', 'Semestre', 'Es_Dia_Laboral',
+)
+
+# Tipos de parámetro de cada columna (backend.set_input_sizes)
+TIPOS = [
+    ('int', 0), ('date', 0), ('int', 0), ('int', 0), ('int', 0), ('varchar', 20), ('varchar', 3), ('varchar', 7),
+    ('int', 0), ('int', 0), ('int', 0), ('varchar', 20), ('int', 0),
+    ('int', 0), ('varchar', 2), ('int', 0), ('int', 0),
+]
+
+INSERT_DIM_TIEMPO = (
+    f"INSERT INTO Dim_Tiempo ({', '.join(COLUMNAS)}) VALUES ({', '.join('?' for _ in COLUMNAS)})"
+)
+
+# Fechas de lo que se va a cargar a los hechos (INT_Ventas usa IDX_INT_Ventas_Fecha)
+RANGO_OBSERVADO = """
+    SELECT MIN(Fecha), MAX(Fecha)
+    FROM (
+        SELECT MIN(FechaVenta) AS Fecha FROM INT_Ventas
+        UNION ALL SELECT MAX(FechaVenta) FROM INT_Ventas
+        UNION ALL SELECT MIN(Fecha_Envio) FROM INT_Entregas
+        UNION ALL SELECT MAX(Fecha_Envio) FROM INT_Entregas
+        UNION ALL SELECT MIN(Fecha_Entrega) FROM INT_Entregas
+        UNION ALL SELECT MAX(Fecha_Entrega) FROM INT_Entregas
+    ) fechas
+"""
+
+
+def calendario(inicio, fin):
+    """DataFrame con una fila por día entre inicio y fin (inclusive) y las columnas de Dim_Tiempo."""
+    fechas = pd.date_range(pd.Timestamp(inicio).normalize(), pd.Timestamp(fin).normalize(), freq='D')
+    iso = fechas.isocalendar()
+    dia_iso = iso['day'].to_numpy(dtype=np.int64)
+    mes = fechas.month.to_numpy()
+    trimestre = fechas.quarter.to_numpy()
+    fin_semana = (dia_iso >= 6).astype(np.int64)
+
+    return pd.DataFrame({
+        'Tiempo_Key': fechas.year * 10000 + mes * 100 + fechas.day,
+        'Fecha': fechas.date,
+        'Anio': fechas.year,
+        'Mes': mes,
+        'Dia': fechas.day,
+        'Mes_Nombre': np.array(MESES, dtype=object)[mes - 1],
+        'Mes_Nombre_Corto': np.array([nombre[:3] for nombre in MESES], dtype=object)[mes - 1],
+        'Mes_Anio': fechas.strftime('%Y-%m'),
+        'Semana_ISO': iso['week'].to_numpy(dtype=np.int64),
+        'Anio_ISO': iso['year'].to_numpy(dtype=np.int64),
+        'Dia_Semana_ISO': dia_iso,
+        'Dia_Nombre': np.array(DIAS, dtype=object)[dia_iso - 1],
+        'Es_Fin_Semana': fin_semana,
+        'Trimestre': trimestre,
+        'Trimestre_Nombre': np.array(['Q1', 'Q2', 'Q3', 'Q4'], dtype=object)[trimestre - 1],
+        'Semestre': np.where(mes <= 6, 1, 2),
+        'Es_Dia_Laboral': 1 - fin_semana,
+    }, columns=list(COLUMNAS))
+
+
+def filas(df):
+    """Tuplas para executemany con tipos de Python (int/str/date), no de numpy."""
+    return list(df.astype(object).itertuples(index=False, name=None))
+
+
+def rango_observado(cursor):
+    """(inicio, fin) de las fechas de INT_Ventas e INT_Entregas, o None si no hay fechas."""
+    cursor.execute(RANGO_OBSERVADO)
+    inicio, fin = cursor.fetchone()
+    if inicio is None:
+        return None
+    return pd.Timestamp(inicio).date(), pd.Timestamp(fin).date()
+
+
+def extender_dim_tiempo(backend, connection, inicio=None, fin=None):
+    """
+    Inserta en Dim_Tiempo los días del rango (por defecto, rango_observado) que todavía no
+    están. No hace commit. Devuelve (días insertados, mensajes).
+    """
+    cursor = connection.cursor()
+    if inicio is None or fin is None:
+        rango = rango_observado(cursor)
+        if rango is None:
+            return 0, ["Dim_Tiempo: INT no tiene fechas, no hay días que agregar"]
+        inicio, fin = rango
+    inicio, fin = pd.Timestamp(inicio).date(), pd.Timestamp(fin).date()
+
+    dias = calendario(inicio, fin)
+    cursor.execute(
+        "SELECT Tiempo_Key FROM Dim_Tiempo WHERE Tiempo_Key BETWEEN ? AND ?",
+        (int(dias['Tiempo_Key'].iloc[0]), int(dias['Tiempo_Key'].iloc[-1]))
+    )
+    existentes = [fila[0] for fila in cursor.fetchall()]
+    faltantes = dias[~dias['Tiempo_Key'].isin(existentes)]
+
+    rango = f"{inicio.isoformat()} a {fin.isoformat()}"
+    if faltantes.empty:
+        return 0, [f"Dim_Tiempo: cubre las fechas de INT ({rango})"]
+
+    escritura = connection.cursor()
+    backend.prepare_cursor(escritura)
+    backend.set_input_sizes(escritura, TIPOS)
+    escritura.executemany(INSERT_DIM_TIEMPO, filas(faltantes))
+    return len(faltantes), [f"Dim_Tiempo: {len(faltantes)} días agregados para cubrir las fechas de INT ({rango})"]
@@ -0,0 +1,282 @@
+"""
+Formato columnar (Parquet) del DATASET, particionado por año-mes.
+
+Ventas, Ventas_add y Entregas se guardan en particiones Hive por mes de su columna de
+fecha (FechaVenta / Fecha_Envio); las dimensiones, que son chicas, en un solo archivo:
+
+    DATASET_columnar/
+        Ventas/anio=2024/mes=07/part-0.parquet
+        Entregas/anio=2024/mes=07/part-0.parquet
+        Clientes/part-0.parquet
+        ...
+
+Todas las columnas se guardan como texto, tal cual vienen en el CSV (vacío = NULL): a
+STAGING llega lo mismo que antes y los valores inválidos siguen llegando a la validación.
+Ventas y Ventas_add llevan siempre CodVenta (el que referencia Entregas.csv): el de la
+columna del CSV o, en CSV anteriores sin esa columna, la posición de la fila, que al
+particionar por mes se pierde.
+Lo que se gana es no tokenizar el archivo entero: se leen solo las columnas del
+column_mapping y, con [EXTRACCION] meses, solo las particiones pedidas.
+
+pyarrow solo hace falta con [EXTRACCION] formato = parquet (se importa al usarlo).
+
+Conversión de los CSV existentes:
+    python dataset_columnar.py [--origen ../DATASET] [--destino ../DATASET_columnar]
+"""
+import argparse
+import csv
+import os
+import re
+import shutil
+
+from db_session import BASE_DIR
+
+
+# Archivo -> columna de fecha que define la partición año-mes
+PARTICIONADOS = {
+    'Ventas.csv': 'FechaVenta',
+    'Ventas_add.csv': 'FechaVenta',
+    'Entregas.csv': 'Fecha_Envio',
+}
+
+# Fechas vacías o inválidas (p. ej. '2024-02-31' pasa, 'abc' no) van a esta partición
+PARTICION_SIN_FECHA = ('0000', '00')
+
+ARCHIVOS = [
+    'Clientes.csv', 'Productos.csv', 'Tiendas.csv', 'Ventas.csv', 'Ventas_add.csv',
+    'EstadoDelPedido.csv', 'Entregas.csv', 'Almacenes.csv',
+]
+
+# Archivos de ventas referenciados por el CodVenta de Entregas.csv. Los generadores escriben
+# la columna CodVenta; si falta, es el número de fila de la venta en Ventas.csv seguido de
+# Ventas_add.csv (en este orden), y editar Ventas.csv corre los de Ventas_add.csv
+NUMERADOS = ['Ventas.csv', 'Ventas_add.csv']
+
+
+def _pyarrow():
+    """Importa pyarrow solo cuando se usa el formato columnar."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.csv
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("El formato columnar requiere pyarrow (pip install pyarrow).") from e
+    return pyarrow
+
+
+def nombre_tabla(csv_file):
+    """'Ventas_add.csv' -> 'Ventas_add'"""
+    return os.path.splitext(csv_file)[0]
+
+
+def ruta_tabla(raiz, csv_file):
+    return os.path.join(raiz, nombre_tabla(csv_file))
+
+
+def esquema_particion():
+    pa = _pyarrow()
+    return pa.dataset.partitioning(
+        pa.schema([('anio', pa.string()), ('mes', pa.string())]), flavor='hive'
+    )
+
+
+def parsear_meses(valor):
+    """'2025-11, 2025-12' -> [('2025', '11'), ('2025', '12')] | 'ultimo' | '' -> None (todos)."""
+    valor = (valor or '').strip().lower()
+    if not valor:
+        return None
+    if valor == 'ultimo':
+        return 'ultimo'
+    meses = []
+    for mes in valor.split(','):
+        coincidencia = re.fullmatch(r'(\d{4})-(\d{2})', mes.strip())
+        if not coincidencia:
+            raise ValueError(f"Mes inválido en [EXTRACCION] meses: '{mes.strip()}' (formato YYYY-MM)")
+        meses.append(coincidencia.groups())
+    return meses
+
+
+# ----------------------------------------------------------------------
+# Escritura
+
+def agregar_particion(tabla, columna_fecha):
+    """Agrega las columnas anio/mes a partir del texto 'YYYY-MM...' de la fecha."""
+    pa = _pyarrow()
+    pc = pa.compute
+    fechas = tabla.column(columna_fecha)
+    valida = pc.fill_null(pc.match_substring_regex(fechas, r'^\d{4}-\d{2}'), False)
+    anio_mes = pc.if_else(valida, fechas, '-'.join(PARTICION_SIN_FECHA))
+    tabla = tabla.append_column('anio', pc.utf8_slice_codeunits(anio_mes, 0, 4))
+    return tabla.append_column('mes', pc.utf8_slice_codeunits(anio_mes, 5, 7))
+
+
+def tabla_de_columnas(columnas):
+    """{nombre: valores} -> tabla Arrow con todas las columnas como texto."""
+    pa = _pyarrow()
+    return pa.table({nombre: pa.array(valores, type=pa.string()) for nombre, valores in columnas.items()})
+
+
+def escribir_tabla(raiz, csv_file, tabla, reemplazar=True, nombre_parte='part-{i}.parquet'):
+    """
+    Escribe una tabla Arrow (columnas de texto) en el formato columnar.
+    reemplazar=True borra la tabla completa antes. Con reemplazar=False se agregan archivos
+    a las particiones existentes (el generador escribe de a un mes, con un nombre_parte
+    distinto por mes: las entregas de un mes pueden caer en la partición del siguiente).
+    """
+    pa = _pyarrow()
+    destino = ruta_tabla(raiz, csv_file)
+    if reemplazar and os.path.isdir(destino):
+        shutil.rmtree(destino)
+
+    if csv_file not in PARTICIONADOS:
+        os.makedirs(destino, exist_ok=True)
+        pa.parquet.write_table(tabla, os.path.join(destino, nombre_parte.format(i=0)))
+        return
+
+    pa.dataset.write_dataset(
+        agregar_particion(tabla, PARTICIONADOS[csv_file]),
+        destino,
+        format='parquet',
+        partitioning=esquema_particion(),
+        basename_template=nombre_parte,
+        existing_data_behavior='overwrite_or_ignore',
+        preserve_order=True,
+    )
+
+
+def contar_filas(ruta):
+    """Filas de datos de un CSV: líneas no vacías menos el encabezado."""
+    with open(ruta, 'rb') as f:
+        return max(0, sum(1 for linea in f if linea.strip()) - 1)
+
+
+def columnas_csv(ruta):
+    """Encabezado del CSV."""
+    with open(ruta, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def tiene_cod_venta(ruta):
+    """True si el CSV de ventas trae la columna CodVenta (si no, se numera por posición)."""
+    return 'CodVenta' in columnas_csv(ruta)
+
+
+def primer_cod_venta(carpeta, csv_file):
+    """CodVenta de la primera fila de csv_file: sigue a las filas de los archivos anteriores de NUMERADOS."""
+    primero = 1
+    for anterior in NUMERADOS[:NUMERADOS.index(csv_file)]:
+        ruta = os.path.join(carpeta, anterior)
+        if os.path.exists(ruta):
+            primero += contar_filas(ruta)
+    return primero
+
+
+def leer_csv(ruta):
+    """CSV -> tabla Arrow con todas las columnas como texto y los vacíos como NULL."""
+    pa = _pyarrow()
+    columnas = columnas_csv(ruta)
+    return pa.csv.read_csv(
+        ruta,
+        convert_options=pa.csv.ConvertOptions(
+            column_types={columna: pa.string() for columna in columnas},
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def convertir(origen, destino, archivos=ARCHIVOS):
+    """Convierte los CSV de origen al formato columnar en destino. Devuelve {archivo: filas}."""
+    convertidos = {}
+    for csv_file in archivos:
+        ruta = os.path.join(origen, csv_file)
+        if not os.path.exists(ruta):
+            print(f" ADVERTENCIA: {csv_file} no encontrado en {origen}")
+            continue
+        tabla = leer_csv(ruta)
+        if csv_file in NUMERADOS and 'CodVenta' not in tabla.column_names:
+            pa = _pyarrow()
+            primero = primer_cod_venta(origen, csv_file)
+            codigos = pa.array(range(primero, primero + tabla.num_rows), type=pa.int64())
+            tabla = tabla.append_column('CodVenta', codigos.cast(pa.string()))
+        escribir_tabla(destino, csv_file, tabla)
+        convertidos[csv_file] = tabla.num_rows
+        print(f" OK: {csv_file} → {ruta_tabla(destino, csv_file)} | {tabla.num_rows} filas")
+    return convertidos
+
+
+# ----------------------------------------------------------------------
+# Lectura
+
+def abrir(raiz, csv_file):
+    pa = _pyarrow()
+    ruta = ruta_tabla(raiz, csv_file)
+    if csv_file in PARTICIONADOS:
+        return pa.dataset.dataset(ruta, format='parquet', partitioning=esquema_particion())
+    return pa.dataset.dataset(ruta, format='parquet')
+
+
+def meses_disponibles(dataset):
+    """Particiones (anio, mes) presentes, ordenadas."""
+    meses = set()
+    for ruta in dataset.files:
+        coincidencia = re.search(r'anio=(\d{4})[/\\]mes=(\d{2})', ruta)
+        if coincidencia:
+            meses.add(coincidencia.groups())
+    return sorted(meses)
+
+
+def filtro_meses(dataset, csv_file, meses):
+    """Expresión de partición para los meses pedidos (None = sin filtro)."""
+    if meses is None or csv_file not in PARTICIONADOS:
+        return None
+    pa = _pyarrow()
+    if meses == 'ultimo':
+        disponibles = [mes for mes in meses_disponibles(dataset) if mes != PARTICION_SIN_FECHA]
+        meses = disponibles[-1:]
+
+    filtro = None
+    for anio, mes in meses:
+        condicion = (pa.dataset.field('anio') == anio) & (pa.dataset.field('mes') == mes)
+        filtro = condicion if filtro is None else filtro | condicion
+    # Sin meses que coincidan no se lee nada
+    return filtro if filtro is not None else pa.dataset.scalar(False)
+
+
+def leer_tabla(raiz, csv_file, columnas, meses=None):
+    """Solo las columnas y particiones pedidas, como tabla Arrow."""
+    dataset = abrir(raiz, csv_file)
+    return dataset.to_table(columns=columnas, filter=filtro_meses(dataset, csv_file, meses))
+
+
+def leer_lotes(raiz, csv_file, columnas, tamano, meses=None):
+    """Igual que leer_tabla pero por lotes de hasta `tamano` filas (RecordBatch)."""
+    dataset = abrir(raiz, csv_file)
+    return dataset.to_batches(
+        columns=columnas, filter=filtro_meses(dataset, csv_file, meses), batch_size=tamano
+    )
+
+
+def a_pandas(datos):
+    """
+    Tabla/lote Arrow -> DataFrame liberando los buffers Arrow a medida que se convierten
+    (el pico de memoria no duplica el lote). NULL -> None/NaN, como pd.read_csv.
+    """
+    return datos.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte los CSV de DATASET al formato columnar")
+    parser.add_argument('--origen', default=os.path.join(BASE_DIR, '..', 'DATASET'))
+    parser.add_argument('--destino', default=os.path.join(BASE_DIR, '..', 'DATASET_columnar'))
+    args = parser.parse_args()
+
+    origen = os.path.abspath(args.origen)
+    destino = os.path.abspath(args.destino)
+    print(f" Convirtiendo {origen} → {destino}")
+    convertir(origen, destino)
+
+
+if __name__ == "__main__":
+    main()
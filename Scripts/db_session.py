@@ -0,0 +1,236 @@
+import os
+import threading
+import time
+from configparser import ConfigParser
+
+
+# Carpeta de los scripts: config.ini y los .sql viven aca
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_configs = {}
+_pools = {}
+_lock = threading.Lock()
+
+
+def load_config(config_file='config.ini'):
+    """
+    Lee config.ini una sola vez por proceso y devuelve el ConfigParser cacheado.
+    La ruta es relativa a la carpeta Scripts, igual que en los scripts originales.
+    """
+    ruta_absoluta_config = os.path.join(BASE_DIR, config_file)
+
+    with _lock:
+        if ruta_absoluta_config in _configs:
+            return _configs[ruta_absoluta_config]
+
+        config = ConfigParser()
+        config.optionxform = str
+
+        # Verificar que el archivo de configuración exista y se lea correctamente
+        if not os.path.exists(ruta_absoluta_config) or not config.read(ruta_absoluta_config, encoding='utf-8'):
+            print(f" ERROR: No se pudo leer el archivo de configuración en: {ruta_absoluta_config}")
+            raise FileNotFoundError(f"Archivo '{config_file}' no encontrado.")
+
+        _configs[ruta_absoluta_config] = config
+        return config
+
+
+def build_connection_string(config):
+    """Arma el connection string ODBC a partir de la sección [DATABASE]."""
+    server = config.get('DATABASE', 'server', fallback='').strip()
+    database = config.get('DATABASE', 'database', fallback='').strip()
+    trusted_connection = config.get('DATABASE', 'trusted_connection', fallback='yes').strip()
+    driver = config.get('DATABASE', 'driver', fallback='ODBC Driver 17 for SQL Server').strip()
+
+    if not all([server, database, trusted_connection]):
+        raise ValueError("Faltan parámetros críticos en config.ini.")
+
+    return (
+        f"DRIVER={{{driver}}};"
+        f"SERVER={server};"
+        f"DATABASE={database};"
+        f"Trusted_Connection={trusted_connection};"
+    )
+
+
+class PooledConnection:
+    """
+    Envoltorio de una conexión del pool.
+    Se usa igual que una conexión pyodbc; close() la devuelve al pool en vez de cerrarla.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._cached_cursor = None
+        self.last_used = time.monotonic()
+
+    @property
+    def raw(self):
+        return self._raw
+
+    @property
+    def autocommit(self):
+        return self._raw.autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self._raw.autocommit = value
+
+    def cursor(self):
+        """Cursor nuevo (mismo comportamiento que pyodbc)."""
+        return self._raw.cursor()
+
+    def cached_cursor(self):
+        """Cursor reutilizable para consultas cortas de control (se crea una vez por conexión)."""
+        if self._cached_cursor is None:
+            self._cached_cursor = self._raw.cursor()
+        return self._cached_cursor
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        """Devuelve la conexión al pool."""
+        self._pool.release(self)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones reutilizables con verificación de salud.
+
+    - size: máximo de conexiones abiertas a la vez.
+    - factory: función que abre una conexión nueva (por ejemplo pyodbc.connect).
+    - health_check: consulta que se ejecuta al reutilizar una conexión ociosa;
+      si falla, la conexión se descarta y se abre otra.
+    """
+
+    def __init__(self, factory, size=4, health_check='SELECT 1', wait_timeout=30):
+        if size <= 0:
+            raise ValueError("El tamaño del pool debe ser mayor a 0.")
+
+        self.factory = factory
+        self.size = size
+        self.health_check = health_check
+        self.wait_timeout = wait_timeout
+
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.stats = {'creadas': 0, 'reutilizadas': 0, 'descartadas': 0}
+
+    def _is_healthy(self, conn):
+        if not self.health_check:
+            return True
+        try:
+            cursor = conn.cached_cursor()
+            cursor.execute(self.health_check)
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        self.stats['descartadas'] += 1
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Toma una conexión del pool (reutiliza una ociosa o abre una nueva)."""
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            raise TimeoutError(
+                f"No hay conexiones libres en el pool (tamaño {self.size}) tras {self.wait_timeout}s."
+            )
+
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    break
+                if self._is_healthy(conn):
+                    self.stats['reutilizadas'] += 1
+                    conn.last_used = time.monotonic()
+                    return conn
+                self._discard(conn)
+
+            raw = self.factory()
+            self.stats['creadas'] += 1
+            return PooledConnection(self, raw)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        """Devuelve una conexión: se descarta cualquier transacción pendiente."""
+        try:
+            if not conn.autocommit:
+                conn.rollback()
+            conn.last_used = time.monotonic()
+            with self._lock:
+                self._idle.append(conn)
+        except Exception:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        """Cierra las conexiones ociosas (las tomadas se cierran al devolverse)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            try:
+                conn.raw.close()
+            except Exception:
+                pass
+
+
+def get_pool(config_file='config.ini'):
+    """
+    Pool compartido del proceso para la BD de config.ini.
+    Todas las etapas que corren en el mismo proceso reutilizan las mismas conexiones.
+
+    Parámetros opcionales en la sección [POOL]:
+        tamano, timeout_conexion, timeout_espera, verificar_conexion
+    """
+    config = load_config(config_file)
+
+    with _lock:
+        if config_file in _pools:
+            return _pools[config_file]
+
+    # pyodbc solo hace falta para SQL Server (el backend local no lo necesita)
+    import pyodbc
+
+    connection_string = build_connection_string(config)
+    size = config.getint('POOL', 'tamano', fallback=4)
+    connect_timeout = config.getint('POOL', 'timeout_conexion', fallback=30)
+    wait_timeout = config.getint('POOL', 'timeout_espera', fallback=60)
+    health_check = 'SELECT 1' if config.getboolean('POOL', 'verificar_conexion', fallback=True) else None
+
+    def factory():
+        connection = pyodbc.connect(connection_string, timeout=connect_timeout)
+        connection.autocommit = False
+        return connection
+
+    pool = ConnectionPool(factory, size=size, health_check=health_check, wait_timeout=wait_timeout)
+
+    with _lock:
+        return _pools.setdefault(config_file, pool)
+
+
+def close_pools():
+    """Cierra todos los pools del proceso (al terminar el pipeline)."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
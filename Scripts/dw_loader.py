@@ -1,240 +1,420 @@
-
-import os
-import sys
-import pyodbc
-from configparser import ConfigParser
-from datetime import datetime
-
-
-class ELTDataWarehouseLoader:
-    """
-    Orquestador Python para ejecutar el proceso INT -> DW
-    """
-
-    def __init__(self, config_file='config.ini'):
-        self.config = ConfigParser()
-        self.config.optionxform = str
-
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        ruta_config = os.path.join(base_dir, config_file)
-
-        if not os.path.exists(ruta_config):
-            print(f"ERROR: No se encontró '{config_file}' en: {base_dir}")
-            raise FileNotFoundError(f"Archivo '{config_file}' no encontrado")
-
-        if not self.config.read(ruta_config, encoding='utf-8'):
-            raise Exception(f"No se pudo leer '{config_file}'")
-
-        self.connection = None
-        self.sp_orquestador = 'SP_Orquestador_INT_to_DW'
-        self.reprocesar = 0
-
- 
-    # ------------------------------------------------------------------
-    def log(self, message, level="INFO"):
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"[{timestamp}] [{level}] {message}")
-
-    # ------------------------------------------------------------------
-    def connect_db(self):
-        try:
-            server = self.config.get('DATABASE', 'server').strip()
-            database = self.config.get('DATABASE', 'database').strip()
-            trusted = self.config.get('DATABASE', 'trusted_connection', fallback='yes').strip()
-            driver = self.config.get('DATABASE', 'driver', fallback='ODBC Driver 17 for SQL Server').strip()
-
-            self.log(f"Conectando a: {server}\\{database}")
-
-            conn_str = (
-                f"DRIVER={{{driver}}};"
-                f"SERVER={server};"
-                f"DATABASE={database};"
-                f"Trusted_Connection={trusted};"
-            )
-
-            self.connection = pyodbc.connect(conn_str, timeout=30)
-            self.connection.autocommit = False
-            self.log("Conexion establecida", "SUCCESS")
-            return True
-
-        except pyodbc.Error as e:
-            self.log(f"Error de conexion: {str(e)}", "ERROR")
-            self.log("Verifique config.ini y que SQL Server este corriendo", "WARNING")
-            return False
-
-    # ------------------------------------------------------------------
-    def execute_orchestrator(self):
-        if not self.connection:
-            raise RuntimeError("Sin conexion a BD")
-
-        print("\n" + "=" * 70)
-        self.log(f"Ejecutando: {self.sp_orquestador}")
-        self.log(f"Reprocesar: {self.reprocesar}")
-        print("=" * 70 + "\n")
-
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(
-                f"EXEC {self.sp_orquestador} @Reprocesar = ?",
-                (self.reprocesar,)
-            )
-
-            while True:
-                try:
-                    if not cursor.nextset():
-                        break
-                except pyodbc.ProgrammingError:
-                    break
-
-            if hasattr(cursor, 'messages'):
-                for msg in cursor.messages:
-                    print(msg[1])
-
-            self.connection.commit()
-
-            print("\n" + "=" * 70)
-            self.log("Orquestador ejecutado correctamente", "SUCCESS")
-            print("=" * 70 + "\n")
-
-            return True
-
-        except pyodbc.Error as ex:
-            if self.connection:
-                self.connection.rollback()
-
-            print("\n" + "=" * 70)
-            self.log("ERROR AL EJECUTAR ORQUESTADOR", "ERROR")
-            print("=" * 70)
-            print(f"\n{str(ex)}\n")
-
-            try:
-                cursor = self.connection.cursor()
-                cursor.execute("""
-                    SELECT TOP 5
-                        Tabla_Origen,
-                        Motivo_Rechazo,
-                        COUNT(*) as Cantidad
-                    FROM ETL_Registros_Rechazados
-                    WHERE ID_Proceso = (
-                        SELECT MAX(ID_Proceso) FROM ETL_Control_Procesos
-                    )
-                    GROUP BY Tabla_Origen, Motivo_Rechazo
-                    ORDER BY COUNT(*) DESC
-                """)
-
-                rechazados = cursor.fetchall()
-                if rechazados:
-                    print("REGISTROS RECHAZADOS:")
-                    print("-" * 70)
-                    for tabla, motivo, cant in rechazados:
-                        print(f"  - {tabla}: {motivo} ({cant} registros)")
-                    print("-" * 70 + "\n")
-            except:
-                pass
-
-            return False
-
-    # ------------------------------------------------------------------
-    def show_summary(self):
-        print("=" * 70)
-        print("RESUMEN FINAL")
-        print("=" * 70)
-
-        try:
-            cursor = self.connection.cursor()
-
-            cursor.execute("""
-                SELECT TOP 1
-                    Estado,
-                    Registros_Procesados,
-                    Registros_Rechazados,
-                    DATEDIFF(SECOND, Fecha_Inicio, Fecha_Fin) as Duracion
-                FROM ETL_Control_Procesos
-                WHERE Nombre_Proceso = 'INT_to_DW_Completo'
-                ORDER BY ID_Proceso DESC
-            """)
-
-            row = cursor.fetchone()
-            if row:
-                estado, procesados, rechazados, duracion = row
-
-                print(f"\nEstado     : {estado}")
-                print(f"Tiempo     : {duracion} segundos")
-                print(f"Procesados : {procesados}")
-                print(f"Rechazados : {rechazados}")
-
-            cursor.execute("SELECT COUNT(*) FROM Fact_Ventas")
-            ventas = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM Fact_Entregas")
-            entregas = cursor.fetchone()[0]
-
-            print("\nTABLAS FACT:")
-            print(f"Fact_Ventas   : {ventas} registros")
-            print(f"Fact_Entregas : {entregas} registros")
-
-            print("\n" + "=" * 70 + "\n")
-
-        except Exception as e:
-            self.log(f"No se pudo generar resumen: {e}", "WARNING")
-
-    # ------------------------------------------------------------------
-    def run(self):
-        print("\n" + "=" * 70)
-        print("DATA WAREHOUSE LOADER - DATASHOP")
-        print("Proceso: INT -> DW (Final)")
-        print("=" * 70)
-
-        inicio = datetime.now()
-        self.log(f"Inicio: {inicio.strftime('%Y-%m-%d %H:%M:%S')}")
-
-        try:
-            if not self.connect_db():
-                return False
-
-            if not self.execute_orchestrator():
-                return False
-
-            self.show_summary()
-
-            fin = datetime.now()
-            duracion = (fin - inicio).total_seconds()
-
-            print("=" * 70)
-            print("PROCESO COMPLETADO")
-            print(f"Duracion total: {duracion:.1f} segundos")
-            print("=" * 70 + "\n")
-
-            return True
-
-        except Exception as e:
-            print("=" * 70)
-            print("PROCESO CON ERRORES")
-            print("=" * 70)
-            self.log(f"Error: {str(e)}", "ERROR")
-            return False
-
-        finally:
-            if self.connection:
-                self.connection.close()
-                self.log("Conexion cerrada")
-
-
-# ----------------------------------------------------------------------
-# EJECUCION
-if __name__ == "__main__":
-    try:
-        loader = ELTDataWarehouseLoader()
-        success = loader.run()
-        sys.exit(0 if success else 1)
-
-    except FileNotFoundError:
-        print("\nArchivo config.ini no encontrado")
-        print("""
-[DATABASE]
-server = localhost
-database = DataShop
-trusted_connection = yes
-driver = ODBC Driver 17 for SQL Server
-        """)
-        sys.exit(1)
+
+import sys
+from datetime import datetime
+
+from backends import get_backend, lista_meses
+from calendario import extender_dim_tiempo
+from db_session import load_config
+from key_cache import FactVentasLoader
+from manifest import Manifest, SP_POR_ARCHIVO, carpeta_dataset
+from metricas import get_metricas, ultimo_id_proceso
+from rechazos import SumideroRechazos, sincronizar_topes
+from planificador import (
+    DIM_TIEMPO, DIMENSIONES_DW, GRAFO_INT_TO_DW, TABLAS_FACT, Planificador, en_conexion,
+    finalizar_proceso, iniciar_proceso, marcar_error, paralelo_configurado, paso_sp,
+)
+
+
+class ELTDataWarehouseLoader:
+    """
+    Orquestador Python para ejecutar el proceso INT -> DW
+    """
+
+    def __init__(self, config_file='config.ini'):
+        # config.ini se lee una sola vez por proceso (db_session)
+        self.config = load_config(config_file)
+        self.config_file = config_file
+
+        self.connection = None
+        self.paso_fact_ventas = None
+        self.paso_calendario = None
+        self.sp_orquestador = 'SP_Orquestador_INT_to_DW'
+        self.reprocesar = 0
+        # 1 = Fact_Ventas solo carga ventas con CodVenta posterior a la marca de agua (ETL_Watermark)
+        self.incremental = 1 if self.config.getboolean('DW', 'incremental', fallback=False) else 0
+        # claves = sql    -> el SP une INT con las dimensiones (LTRIM/RTRIM)
+        # claves = python -> las claves de Fact_Ventas se resuelven en memoria (key_cache.py)
+        self.claves = self.config.get('DW', 'claves', fallback='sql').strip().lower()
+        self.tamano_lote = self.config.getint('DW', 'tamano_lote', fallback=50000)
+        # Reproceso por meses: None | 'auto' | [AAAAMM, ...] (borra y recarga solo esos meses)
+        self.meses_reproceso = lista_meses(self.config.get('DW', 'meses_reproceso', fallback=''))
+        # calendario = sp        -> Sp_Genera_Dim_Tiempo 2020-2030 si Dim_Tiempo está vacía
+        # calendario = observado -> antes se agregan los días que faltan entre las fechas de INT (calendario.py)
+        self.calendario = self.config.get('DW', 'calendario', fallback='sp').strip().lower()
+        if self.claves not in ('sql', 'python'):
+            raise ValueError(f"Resolución de claves desconocida: '{self.claves}'")
+        if self.calendario not in ('sp', 'observado'):
+            raise ValueError(f"Calendario desconocido: '{self.calendario}'")
+        # SQL Server o el motor local, según [BACKEND]
+        self.backend = get_backend(config_file)
+        self.manifest = Manifest(carpeta_dataset(self.config), self.backend.destino, config_file)
+        # Duración y filas por SP (ETL_Control_Detalle) y archivo de métricas de la corrida
+        self.metricas = get_metricas(config_file)
+        # 1 = SP_Orquestador_INT_to_DW (en serie) | >1 = grafo de dimensiones y hechos (planificador.py)
+        self.paralelo = paralelo_configurado(self.config, self.backend)
+
+ 
+    # ------------------------------------------------------------------
+    def log(self, message, level="INFO"):
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f"[{timestamp}] [{level}] {message}")
+
+    # ------------------------------------------------------------------
+    def connect_db(self):
+        if self.connection is not None:
+            return True
+
+        try:
+            if self.backend.nombre == 'sqlserver':
+                server = self.config.get('DATABASE', 'server').strip()
+                database = self.config.get('DATABASE', 'database').strip()
+                self.log(f"Conectando a: {server}\\{database}")
+            else:
+                self.log(f"Conectando a motor local: {self.backend.ruta}")
+
+            # Conexión del pool compartido: si otra etapa del mismo proceso ya la abrió, se reutiliza
+            self.connection = self.backend.connect()
+            self.log("Conexion establecida", "SUCCESS")
+            return True
+
+        except (self.backend.Error, TimeoutError) as e:
+            self.log(f"Error de conexion: {str(e)}", "ERROR")
+            self.log("Verifique config.ini y que SQL Server este corriendo", "WARNING")
+            return False
+
+    # ------------------------------------------------------------------
+    def execute_orchestrator(self):
+        if not self.connection:
+            raise RuntimeError("Sin conexion a BD")
+
+        print("\n" + "=" * 70)
+        self.log(f"Ejecutando: {self.sp_orquestador}")
+        self.log(f"Reprocesar: {self.reprocesar}")
+        self.log(f"Incremental: {self.incremental}")
+        if self.meses_reproceso is not None:
+            self.log(f"Reproceso por meses: {self.meses_reproceso}")
+        self.log(f"Claves: {self.claves}")
+        self.log(f"Calendario: {self.calendario}")
+        self.log(f"Paralelo: {self.paralelo}")
+        print("=" * 70 + "\n")
+
+        try:
+            inicio = datetime.now()
+            cargar_hechos = 0 if self.claves == 'python' else 1
+            if self.paralelo > 1:
+                self.run_planificado()
+            else:
+                self.extender_calendario()
+                for mensaje in self.backend.run_int_to_dw(
+                    self.connection, self.reprocesar, self.incremental, cargar_hechos,
+                    self.meses_reproceso, self.tamano_lote
+                ):
+                    print(mensaje)
+
+                if not cargar_hechos:
+                    self.cargar_hechos_python()
+
+            self.registrar_metricas(inicio, datetime.now())
+            self.connection.commit()
+
+            print("\n" + "=" * 70)
+            self.log("Orquestador ejecutado correctamente", "SUCCESS")
+            print("=" * 70 + "\n")
+
+            return True
+
+        except self.backend.Error as ex:
+            if self.connection:
+                self.connection.rollback()
+
+            print("\n" + "=" * 70)
+            self.log("ERROR AL EJECUTAR ORQUESTADOR", "ERROR")
+            print("=" * 70)
+            print(f"\n{str(ex)}\n")
+
+            try:
+                cursor = self.connection.cached_cursor()
+                rechazados = self.backend.top_rechazos(cursor, 5)
+                if rechazados:
+                    print("REGISTROS RECHAZADOS:")
+                    print("-" * 70)
+                    for tabla, motivo, cant in rechazados:
+                        print(f"  - {tabla}: {motivo} ({cant} registros)")
+                    print("-" * 70 + "\n")
+            except:
+                pass
+
+            return False
+
+    # ------------------------------------------------------------------
+    def cargar_hechos_python(self):
+        """
+        Fact_Ventas con las claves resueltas en memoria, después Fact_Entregas y los
+        agregados (SP), dentro de la misma transacción que las dimensiones.
+        """
+        cursor = self.connection.cached_cursor()
+        id_proceso = ultimo_id_proceso(cursor, 'INT_to_DW_Completo')
+        self.reprocesar_meses(id_proceso)
+        self.cargar_fact_ventas_python(id_proceso)
+        for mensaje in self.backend.run_fact_entregas(self.connection, id_proceso, self.reprocesar):
+            print(mensaje)
+        for mensaje in self.backend.run_agregados(self.connection, id_proceso, self.reprocesar):
+            print(mensaje)
+        self.actualizar_proceso(id_proceso)
+
+    def cargar_fact_ventas_python(self, id_proceso, connection=None):
+        inicio = datetime.now()
+        sumidero = SumideroRechazos(self.config, 'INT_to_DW', id_proceso)
+        loader = FactVentasLoader(self.backend, sumidero, self.tamano_lote)
+        for mensaje in loader.cargar(connection or self.connection, id_proceso, self.reprocesar, self.incremental):
+            print(mensaje)
+        for linea in sumidero.describir():
+            print(linea)
+        # Fact_Ventas no pasa por el SP: su paso se mide acá (se guarda con el total de la etapa)
+        leidas, insertados, rechazados = loader.conteos
+        self.paso_fact_ventas = self.metricas.registrar(
+            'INT_to_DW', 'Fact_Ventas (claves en memoria)', inicio, datetime.now(),
+            leidas, insertados, rechazados, id_proceso
+        )
+
+    def extender_calendario(self, connection=None):
+        """
+        Con calendario = observado, agrega a Dim_Tiempo los días entre las fechas de INT que
+        falten (sin commit). Después el orquestador ya no genera el rango fijo: Dim_Tiempo no está vacía.
+        """
+        if self.calendario != 'observado':
+            return []
+        inicio = datetime.now()
+        insertados, mensajes = extender_dim_tiempo(self.backend, connection or self.connection)
+        for mensaje in mensajes:
+            print(mensaje)
+        self.paso_calendario = self.metricas.registrar(
+            'INT_to_DW', 'Dim_Tiempo (calendario)', inicio, datetime.now(), None, insertados, 0
+        )
+        return mensajes
+
+    # ------------------------------------------------------------------
+    def run_planificado(self, pasos=None):
+        """
+        Dimensiones y hechos según GRAFO_INT_TO_DW (pasos=None: todos), cada paso en su
+        conexión. Con claves = python, Fact_Ventas la carga key_cache.py en su propia conexión.
+        """
+        self.log(f"Planificador INT -> DW: {self.paralelo} pasos en paralelo")
+        id_proceso = iniciar_proceso(self.backend, 'INT_to_DW_Completo')
+        paso = paso_sp(self.backend, id_proceso, self.reprocesar, self.incremental)
+
+        def ejecutar(sp):
+            if sp == DIM_TIEMPO and self.calendario == 'observado':
+                en_conexion(self.backend, self.extender_calendario)
+            if sp == 'SP_INT_to_DW_Fact_Ventas' and self.meses_reproceso is not None:
+                # El borrado por meses va antes de Fact_Ventas (y de Fact_Entregas, que depende de ella)
+                en_conexion(self.backend, lambda connection: self.reprocesar_meses(id_proceso, connection))
+            if sp == 'SP_INT_to_DW_Fact_Ventas' and self.claves == 'python':
+                return en_conexion(self.backend, lambda connection: self.cargar_fact_ventas_python(id_proceso, connection))
+            return paso(sp)
+
+        planificador = Planificador(GRAFO_INT_TO_DW, ejecutar, self.paralelo)
+        try:
+            planificador.run(pasos)
+        except Exception as e:
+            marcar_error(self.backend, id_proceso, e)
+            raise
+        finalizar_proceso(self.backend, id_proceso, TABLAS_FACT)
+        planificador.resumen()
+
+    # ------------------------------------------------------------------
+    # Pasos sueltos para pipeline.py: cada uno se confirma por separado (sin commit acá),
+    # así una falla en Fact_Entregas no obliga a recargar Fact_Ventas.
+    def cargar_dimensiones(self):
+        """Dimensiones (y Dim_Tiempo si está vacía): SP orquestador con @CargarHechos = 0."""
+        if self.paralelo > 1:
+            self.run_planificado([DIM_TIEMPO] + DIMENSIONES_DW)
+            return
+        self.extender_calendario()
+        for mensaje in self.backend.run_int_to_dw(self.connection, self.reprocesar, self.incremental, 0):
+            print(mensaje)
+
+    def reprocesar_meses(self, id_proceso=None, connection=None):
+        """
+        SP_DW_Reprocesar_Meses: borra por lotes los meses de [DW] meses_reproceso (cada lote
+        se confirma) y los registra para que Fact_Ventas y los agregados recarguen solo esos meses.
+        """
+        if self.meses_reproceso is None:
+            return
+        connection = connection or self.connection
+        if id_proceso is None:
+            id_proceso = ultimo_id_proceso(connection.cached_cursor(), 'INT_to_DW_Completo')
+        for mensaje in self.backend.run_reproceso_meses(
+            connection, id_proceso, self.meses_reproceso, self.tamano_lote
+        ):
+            print(mensaje)
+
+    def cargar_fact_ventas(self):
+        """Fact_Ventas del último proceso INT_to_DW_Completo, por SP o con las claves en memoria."""
+        id_proceso = ultimo_id_proceso(self.connection.cached_cursor(), 'INT_to_DW_Completo')
+        if self.claves == 'python':
+            self.cargar_fact_ventas_python(id_proceso)
+        else:
+            for mensaje in self.backend.run_fact_ventas(
+                self.connection, id_proceso, self.reprocesar, self.incremental
+            ):
+                print(mensaje)
+        self.actualizar_proceso(id_proceso)
+
+    def cargar_fact_entregas(self):
+        id_proceso = ultimo_id_proceso(self.connection.cached_cursor(), 'INT_to_DW_Completo')
+        for mensaje in self.backend.run_fact_entregas(self.connection, id_proceso, self.reprocesar):
+            print(mensaje)
+        self.actualizar_proceso(id_proceso)
+
+    def cargar_agregados(self):
+        """Agg_Ventas_Mes y Agg_Entregas_Mes: solo los meses que tocó el último proceso."""
+        id_proceso = ultimo_id_proceso(self.connection.cached_cursor(), 'INT_to_DW_Completo')
+        for mensaje in self.backend.run_agregados(self.connection, id_proceso, self.reprocesar):
+            print(mensaje)
+        # Fecha_Fin nueva: servicio_kpi.py detecta el cambio y vacía su caché
+        self.actualizar_proceso(id_proceso)
+
+    def actualizar_proceso(self, id_proceso):
+        """El orquestador cerró el proceso antes de cargar los hechos: se actualizan sus conteos."""
+        cursor = self.connection.cached_cursor()
+        procesados = self.backend.count(cursor, 'Fact_Ventas') + self.backend.count(cursor, 'Fact_Entregas')
+        cursor.execute("""
+            UPDATE ETL_Control_Procesos
+            SET Fecha_Fin = ?,
+                Registros_Procesados = ?,
+                Registros_Rechazados = (
+                    SELECT COALESCE(SUM(Cantidad), 0) FROM ETL_Rechazos_Resumen WHERE ID_Proceso = ?
+                )
+            WHERE ID_Proceso = ?
+        """, (datetime.now().replace(microsecond=0), procesados, id_proceso, id_proceso))
+
+    # ------------------------------------------------------------------
+    def registrar_metricas(self, inicio, fin):
+        """
+        Conteos por SP tal como los registró cada uno en ETL_Control_Detalle (no se
+        interpretan los PRINT), el paso de Fact_Ventas en Python si lo hubo y el total.
+        """
+        cursor = self.connection.cached_cursor()
+        id_proceso = ultimo_id_proceso(cursor, 'INT_to_DW_Completo')
+        self.metricas.leer_detalle(cursor, id_proceso)
+        pasos = [paso for paso in (self.paso_calendario, self.paso_fact_ventas) if paso]
+        for paso in pasos:
+            paso['ID_Proceso'] = paso['ID_Proceso'] or id_proceso
+        pasos.append(self.metricas.registrar_total('INT_to_DW', inicio, fin, id_proceso))
+        self.metricas.guardar_detalle(cursor, pasos)
+
+    # ------------------------------------------------------------------
+    def show_summary(self):
+        print("=" * 70)
+        print("RESUMEN FINAL")
+        print("=" * 70)
+
+        try:
+            cursor = self.connection.cached_cursor()
+
+            row = self.backend.ultimo_proceso(cursor, 'INT_to_DW_Completo')
+            if row:
+                estado, procesados, rechazados, duracion = row
+
+                print(f"\nEstado     : {estado}")
+                print(f"Tiempo     : {duracion} segundos")
+                print(f"Procesados : {procesados}")
+                print(f"Rechazados : {rechazados}")
+
+            # Conteos por motivo de la última carga (el detalle en la base puede estar acotado)
+            motivos = self.backend.top_rechazos(
+                cursor, 10, ultimo_id_proceso(cursor, 'INT_to_DW_Completo')
+            )
+            if motivos:
+                print("\nRECHAZOS POR MOTIVO:")
+                for tabla, motivo, cant in motivos:
+                    print(f"  - {tabla}: {motivo} ({cant} registros)")
+
+            ventas = self.backend.count(cursor, 'Fact_Ventas')
+            entregas = self.backend.count(cursor, 'Fact_Entregas')
+
+            print("\nTABLAS FACT:")
+            print(f"Fact_Ventas   : {ventas} registros")
+            print(f"Fact_Entregas : {entregas} registros")
+
+            print("\n" + "=" * 70 + "\n")
+
+        except Exception as e:
+            self.log(f"No se pudo generar resumen: {e}", "WARNING")
+
+    # ------------------------------------------------------------------
+    def run(self):
+        print("\n" + "=" * 70)
+        print("DATA WAREHOUSE LOADER - DATASHOP")
+        print("Proceso: INT -> DW (Final)")
+        print("=" * 70)
+
+        inicio = datetime.now()
+        self.log(f"Inicio: {inicio.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        try:
+            # Topes de [RECHAZOS] para los SP (en su propia conexión, antes de tomar la del loader)
+            sincronizar_topes(self.backend, self.config)
+            if not self.connect_db():
+                return False
+
+            # Si ningún archivo cambió desde la última carga al DW no hay nada que cargar
+            archivos = list(SP_POR_ARCHIVO)
+            pendientes = self.manifest.pendientes('dw', archivos)
+            if not pendientes and not self.reprocesar and self.meses_reproceso is None:
+                self.log("Sin cambios en INT desde la última carga: se omite INT -> DW")
+                self.show_summary()
+                return True
+
+            if not self.execute_orchestrator():
+                return False
+            self.manifest.confirmar('dw', pendientes)
+
+            self.show_summary()
+            self.metricas.resumen('INT_to_DW')
+            self.metricas.escribir()
+
+            fin = datetime.now()
+            duracion = (fin - inicio).total_seconds()
+
+            print("=" * 70)
+            print("PROCESO COMPLETADO")
+            print(f"Duracion total: {duracion:.1f} segundos")
+            print("=" * 70 + "\n")
+
+            return True
+
+        except Exception as e:
+            print("=" * 70)
+            print("PROCESO CON ERRORES")
+            print("=" * 70)
+            self.log(f"Error: {str(e)}", "ERROR")
+            return False
+
+        finally:
+            if self.connection:
+                # Devuelve la conexión al pool compartido
+                self.connection.close()
+                self.connection = None
+                self.log("Conexion devuelta al pool")
+
+
+# ----------------------------------------------------------------------
+# EJECUCION
+if __name__ == "__main__":
+    try:
+        loader = ELTDataWarehouseLoader()
+        success = loader.run()
+        sys.exit(0 if success else 1)
+
+    except FileNotFoundError:
+        print("\nArchivo config.ini no encontrado")
+        print("""
+[DATABASE]
+server = localhost
+database = DataShop
+trusted_connection = yes
+driver = ODBC Driver 17 for SQL Server
+        """)
+        sys.exit(1)
@@ -1,146 +1,784 @@
-import pandas as pd
-import pyodbc
-from configparser import ConfigParser
-from datetime import datetime
-import os
-
-
-class CSVToSQLServer:
-    """
-    Clase para Extracción y Carga de datos CSV a tablas STAGING en SQL Server.
-    """
-    def __init__(self, config_file='config.ini'):
-        self.config = ConfigParser()
-        self.config.optionxform = str
-        
-        # --- Localizar config.ini dinámicamente ---
-        # Obtiene la ruta de la carpeta donde está este script 
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        # Une la ruta de la carpeta con el nombre del archivo config.ini
-        ruta_absoluta_config = os.path.join(base_dir, config_file)
-        
-        # Verificar que el archivo de configuración exista
-        if not os.path.exists(ruta_absoluta_config) or not self.config.read(ruta_absoluta_config):
-            print(f" ERROR: No se pudo leer el archivo de configuración en: {ruta_absoluta_config}")
-            raise FileNotFoundError(f"Archivo '{config_file}' no encontrado.")
-
-        self.connection = None
-        
-        # --- Localizar carpeta DATASET ---
-        # Sube un nivel y entra en DATASET
-        self.dataset_folder = os.path.abspath(os.path.join(base_dir, '..', 'DATASET'))
-        
-        # Definición de columnas 
-        self.column_mapping = {
-            'Clientes.csv': ['CodCliente', 'RazonSocial', 'Telefono', 'Mail', 'Direccion', 'Localidad', 'Provincia', 'CP'],
-            'Productos.csv': ['CodigoProducto', 'Descripcion', 'Categoria', 'Marca', 'PrecioCosto', 'PrecioVentaSugerido'],
-            'Tiendas.csv': ['CodigoTienda', 'Descripcion', 'Direccion', 'Localidad', 'Provincia', 'CP', 'TipoTienda'],
-            'Ventas.csv': ['FechaVenta', 'CodigoProducto', 'Producto', 'Cantidad', 'PrecioVenta', 'CodigoCliente', 'Cliente', 'CodigoTienda', 'Tienda'],
-            'Ventas_add.csv': ['FechaVenta', 'CodigoProducto', 'Producto', 'Cantidad', 'PrecioVenta', 'CodigoCliente', 'Cliente', 'CodigoTienda', 'Tienda'],
-            'EstadoDelPedido.csv': ['CodEstado', 'Descripcion_Estado'],
-            'Entregas.csv': ['CodEntrega', 'CodVenta','CodProveedor', 'Proveedor','CodAlmacen', 'Almacen','CodEstado', 'Estado', 'Fecha_Envio', 'Fecha_Entrega'],
-            'Almacenes.csv': ['CodAlmacen', 'Nombre_Almacen', 'Ubicacion']
-        }
-   
-    def connect_db(self):
-        
-        try:
-            server = self.config.get('DATABASE', 'server', fallback='').strip()
-            database = self.config.get('DATABASE', 'database', fallback='').strip()
-            trusted_connection = self.config.get('DATABASE', 'trusted_connection', fallback='').strip()
-            driver = self.config.get('DATABASE', 'driver', fallback='ODBC Driver 17 for SQL Server').strip()
-            
-            if not all([server, database, trusted_connection]):
-                 raise ValueError("Faltan parámetros críticos en config.ini.")
-            
-            print(f" Conectando a: {server} | BD: {database}")
-            connection_string = (
-                f"DRIVER={{{driver}}};SERVER={server};DATABASE={database};Trusted_Connection={trusted_connection};"
-            )
-            self.connection = pyodbc.connect(connection_string, timeout=10)
-            self.connection.autocommit = False 
-            print(" Conexión exitosa!")
-        except Exception as e:
-            print(f" Error de conexión: {e}")
-            raise
-
-    def get_csv_path(self, filename):
-        """Obtener ruta completa del archivo CSV usando la ruta absoluta calculada"""
-        return os.path.join(self.dataset_folder, filename)
-    
-    def run_etl(self):
-        """Ejecutar proceso de extracción y carga."""
-        print(f"\n INICIANDO PROCESO DE EXTRACCION Y CARGA")
-
-        
-        try:
-            # 1. Verificar la carpeta de datos
-            if not os.path.exists(self.dataset_folder):
-                print(f" Carpeta '{self.dataset_folder}' no encontrada.")
-                return
-            
-            print(f" Buscando archivos en: {self.dataset_folder}")
-            
-            # 2. Conectar a BD
-            self.connect_db()
-            cursor = self.connection.cursor()
-            cursor.fast_executemany = True 
-            
-            # 3. Mapeo de archivos 
-            csv_to_staging = {
-                'Clientes.csv': 'STG_Clientes',
-                'Productos.csv': 'STG_Productos', 
-                'Tiendas.csv': 'STG_Tiendas',
-                'Ventas.csv': 'STG_Ventas',
-                'Ventas_add.csv': 'STG_Ventas_Add',
-                'EstadoDelPedido.csv': 'STG_EstadoDelPedido',
-                'Entregas.csv': 'STG_Entregas',
-                'Almacenes.csv': 'STG_Almacenes'
-            }
-            
-            for csv_file, table_name in csv_to_staging.items():
-                csv_path = self.get_csv_path(csv_file)
-                
-                if os.path.exists(csv_path):
-                    expected_columns = self.column_mapping[csv_file]
-                    df = pd.read_csv(csv_path, usecols=expected_columns)
-
-                    # Conversión de fechas para evitar problemas de formato
-                    if csv_file in ['Ventas.csv', 'Ventas_add.csv']:
-                        df['FechaVenta'] = pd.to_datetime(df['FechaVenta'], errors='coerce')
-
-                    if csv_file == 'Entregas.csv':
-                        df['Fecha_Envio'] = pd.to_datetime(df['Fecha_Envio'], errors='coerce')
-                        df['Fecha_Entrega'] = pd.to_datetime(df['Fecha_Entrega'], errors='coerce')
-
-                    # Normalización
-                    df = df.fillna('').astype(str)
-                    df['Fecha_Carga'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    # Truncar e Insertar
-                    cursor.execute(f"TRUNCATE TABLE {table_name}")
-                    columns = ', '.join(df.columns) 
-                    placeholders = ', '.join(['?' for _ in df.columns])
-                    query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-                    
-                    data_to_insert = [tuple(row) for row in df.values]
-                    cursor.executemany(query, data_to_insert)
-                    print(f" OK: {csv_file} → {table_name}")
-                else:
-                    print(f" ADVERTENCIA: {csv_file} no encontrado en {self.dataset_folder}")
-            
-            self.connection.commit()
-            print("\n PROCESO DE EXTRACCION DE DATOS COMPLETADO")
-            
-        except Exception as e:
-            print(f" ERROR FATAL: {e}")
-            if self.connection: self.connection.rollback()
-        finally:
-            if self.connection: self.connection.close()
-
-def main():
-    etl = CSVToSQLServer()
-    etl.run_etl()
-
-if __name__ == "__main__":
-    main()
+import asyncio
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backends import get_backend
+from db_session import BASE_DIR, load_config
+import dataset_columnar
+import lector_csv
+from insercion import EstrategiaInsercion
+from manifest import Manifest, carpeta_dataset, stat_directorio
+from metricas import get_metricas
+from rechazos import SumideroRechazos
+from validacion import ValidadorLotes
+
+
+def leer_tamanos_stg(sql_path):
+    """
+    Lee SQLQuerySTAGING.sql y devuelve {tabla: {columna: largo VARCHAR}}.
+    Se usa para enlazar los parámetros con el tamaño real de cada columna STG.
+    """
+    with open(sql_path, encoding='utf-8') as f:
+        script = f.read()
+
+    tamanos = {}
+    for tabla, cuerpo in re.findall(r'CREATE TABLE (\w+) \((.*?)\);', script, re.S):
+        tamanos[tabla] = {
+            col: int(largo)
+            for col, largo in re.findall(r'^\s*(\w+)\s+VARCHAR\((\d+)\)', cuerpo, re.M)
+        }
+    return tamanos
+
+
+class CSVToSQLServer:
+    """
+    Clase para Extracción y Carga de datos CSV a tablas STAGING en SQL Server.
+    """
+    def __init__(self, config_file='config.ini'):
+        # config.ini se lee una sola vez por proceso (db_session)
+        self.config = load_config(config_file)
+        self.config_file = config_file
+        base_dir = BASE_DIR
+
+        self.connection = None
+        
+        # --- Localizar carpeta DATASET ---
+        # [EXTRACCION] ruta_dataset, por defecto sube un nivel y entra en DATASET
+        self.dataset_folder = carpeta_dataset(self.config)
+        
+        # Definición de columnas 
+        self.column_mapping = {
+            'Clientes.csv': ['CodCliente', 'RazonSocial', 'Telefono', 'Mail', 'Direccion', 'Localidad', 'Provincia', 'CP'],
+            'Productos.csv': ['CodigoProducto', 'Descripcion', 'Categoria', 'Marca', 'PrecioCosto', 'PrecioVentaSugerido'],
+            'Tiendas.csv': ['CodigoTienda', 'Descripcion', 'Direccion', 'Localidad', 'Provincia', 'CP', 'TipoTienda'],
+            'Ventas.csv': ['FechaVenta', 'CodigoProducto', 'Producto', 'Cantidad', 'PrecioVenta', 'CodigoCliente', 'Cliente', 'CodigoTienda', 'Tienda'],
+            'Ventas_add.csv': ['FechaVenta', 'CodigoProducto', 'Producto', 'Cantidad', 'PrecioVenta', 'CodigoCliente', 'Cliente', 'CodigoTienda', 'Tienda'],
+            'EstadoDelPedido.csv': ['CodEstado', 'Descripcion_Estado'],
+            'Entregas.csv': ['CodEntrega', 'CodVenta','CodProveedor', 'Proveedor','CodAlmacen', 'Almacen','CodEstado', 'Estado', 'Fecha_Envio', 'Fecha_Entrega'],
+            'Almacenes.csv': ['CodAlmacen', 'Nombre_Almacen', 'Ubicacion']
+        }
+
+        # Columnas de fecha que se normalizan a 'YYYY-MM-DD'
+        self.date_columns = {
+            'Ventas.csv': ['FechaVenta'],
+            'Ventas_add.csv': ['FechaVenta'],
+            'Entregas.csv': ['Fecha_Envio', 'Fecha_Entrega']
+        }
+
+        # Tipo con que se valida y normaliza cada columna en la carga tipada (el resto viaja tal
+        # cual). Es solo del lado cliente: las columnas de STAGING siguen siendo VARCHAR, el valor
+        # se envía como texto canónico y los SP_STG_to_INT_* lo convierten con TRY_CAST igual
+        self.column_types = {
+            'Productos.csv': {'PrecioCosto': 'decimal', 'PrecioVentaSugerido': 'decimal'},
+            'Ventas.csv': {'FechaVenta': 'date', 'Cantidad': 'int', 'PrecioVenta': 'decimal', 'CodVenta': 'int'},
+            'Ventas_add.csv': {'FechaVenta': 'date', 'Cantidad': 'int', 'PrecioVenta': 'decimal', 'CodVenta': 'int'},
+            'Entregas.csv': {'CodVenta': 'int', 'Fecha_Envio': 'date', 'Fecha_Entrega': 'date'}
+        }
+
+        # Mapeo de archivos CSV -> tablas STAGING
+        self.csv_to_staging = {
+            'Clientes.csv': 'STG_Clientes',
+            'Productos.csv': 'STG_Productos', 
+            'Tiendas.csv': 'STG_Tiendas',
+            'Ventas.csv': 'STG_Ventas',
+            'Ventas_add.csv': 'STG_Ventas_Add',
+            'EstadoDelPedido.csv': 'STG_EstadoDelPedido',
+            'Entregas.csv': 'STG_Entregas',
+            'Almacenes.csv': 'STG_Almacenes'
+        }
+
+        # --- Parámetros de extracción (sección opcional [EXTRACCION]) ---
+        # modo = completo -> lee cada CSV entero y hace un único executemany
+        # modo = stream   -> lee, normaliza e inserta por bloques de tamano_chunk filas
+        # modo = pipeline -> como stream, pero el bloque siguiente se lee y normaliza mientras
+        #                    el anterior se inserta (hasta buffers_pipeline bloques en espera)
+        self.modo = self.config.get('EXTRACCION', 'modo', fallback='completo').strip().lower()
+        self.chunk_size = self.config.getint('EXTRACCION', 'tamano_chunk', fallback=50000)
+        self.commit_cada = self.config.getint('EXTRACCION', 'commit_cada', fallback=10)
+        self.buffers_pipeline = self.config.getint('EXTRACCION', 'buffers_pipeline', fallback=2)
+        # Segundos de lectura e inserción por archivo en modo pipeline (se solapan)
+        self.stats_pipeline = {}
+        # tipado = texto  -> todas las columnas se envían como string (comportamiento original)
+        # tipado = nativo -> int/decimal/date normalizados en el cliente a texto canónico, NULL como
+        #                   NULL y parámetros varchar con los tamaños de SQLQuerySTAGING.sql
+        self.tipado = self.config.get('EXTRACCION', 'tipado', fallback='texto').strip().lower()
+        # workers <= 1 -> carga en serie | workers > 1 -> un hilo y una conexión por archivo
+        self.workers = self.config.getint('EXTRACCION', 'workers', fallback=1)
+        # validar = yes -> Ventas/Entregas se validan por lote antes de STAGING; los rechazos se
+        # cuentan por código de motivo bajo el proceso 'CSV_to_STG' ([RECHAZOS], rechazos.py)
+        self.validar = self.config.getboolean('EXTRACCION', 'validar', fallback=False)
+        self.validador = ValidadorLotes()
+        self.rechazos = {}
+        self.sumidero = None
+        # Duración y filas por archivo (ETL_Control_Detalle) y archivo de métricas de la corrida
+        self.metricas = get_metricas(config_file)
+        # Proceso 'CSV_to_STG' en ETL_Control_Procesos (con validación o métricas)
+        self.id_proceso = None
+        self.inicio_proceso = None
+        # formato = csv     -> los CSV de DATASET
+        # formato = parquet -> formato columnar por año-mes (dataset_columnar.py): solo se leen
+        #                      las columnas de column_mapping y, si se indica, los meses pedidos
+        self.formato = self.config.get('EXTRACCION', 'formato', fallback='csv').strip().lower()
+        ruta_columnar = self.config.get('EXTRACCION', 'ruta_columnar', fallback='../DATASET_columnar').strip()
+        self.columnar_folder = os.path.abspath(os.path.join(base_dir, ruta_columnar))
+        self.meses = dataset_columnar.parsear_meses(self.config.get('EXTRACCION', 'meses', fallback=''))
+        # motor_csv = pandas  -> pd.read_csv (un hilo) y fechas con formato inferido
+        # motor_csv = pyarrow -> archivo mapeado en memoria, parseo multihilo (lector_csv.py)
+        #                        y fechas con formato_fecha explícito
+        self.motor_csv = self.config.get('EXTRACCION', 'motor_csv', fallback='pandas').strip().lower()
+        self.formato_fecha = self.config.get('EXTRACCION', 'formato_fecha', fallback='%Y-%m-%d').strip()
+
+        if self.modo not in ('completo', 'stream', 'pipeline'):
+            raise ValueError(f"Modo de extracción desconocido: '{self.modo}'")
+        if self.tipado not in ('texto', 'nativo'):
+            raise ValueError(f"Tipado de extracción desconocido: '{self.tipado}'")
+        if self.formato not in ('csv', 'parquet'):
+            raise ValueError(f"Formato de extracción desconocido: '{self.formato}'")
+        if self.motor_csv not in ('pandas', 'pyarrow'):
+            raise ValueError(f"Motor de lectura CSV desconocido: '{self.motor_csv}'")
+        if self.meses is not None and self.formato != 'parquet':
+            raise ValueError("[EXTRACCION] meses solo se aplica con formato = parquet.")
+        if self.chunk_size <= 0 or self.commit_cada <= 0:
+            raise ValueError("tamano_chunk y commit_cada deben ser mayores a 0.")
+        if self.buffers_pipeline <= 0:
+            raise ValueError("buffers_pipeline debe ser mayor a 0.")
+
+        # Motor destino (sección [BACKEND]): SQL Server por defecto o el motor local
+        self.backend = get_backend(config_file)
+        if self.workers > 1 and not self.backend.soporta_paralelo:
+            print(f" ADVERTENCIA: el backend '{self.backend.nombre}' no admite carga en paralelo; se usa workers=1.")
+            self.workers = 1
+
+        # Cómo se envían las filas y cuándo se confirma (sección [INSERCION], insercion.py)
+        self.insercion = EstrategiaInsercion.desde_config(self.config, self.backend)
+        self.stats_insercion = {}
+        if self.workers > 1 and self.insercion.commit != 'final':
+            print(f" ADVERTENCIA: en paralelo la carga es todo o nada; se ignora commit={self.insercion.commit}.")
+
+        self.stg_sizes = {}
+        if self.tipado == 'nativo':
+            self.stg_sizes = leer_tamanos_stg(os.path.join(base_dir, 'SQLQuerySTAGING.sql'))
+
+        # Manifiesto de DATASET: los CSV sin cambios desde la última carga no se recargan
+        self.carpeta_origen = self.columnar_folder if self.formato == 'parquet' else self.dataset_folder
+        self.manifest = Manifest(self.dataset_folder, self.backend.destino, config_file, ubicar=self.ruta_origen)
+   
+    def crear_conexion(self, verbose=True):
+        """Toma una conexión del backend configurado (sin autocommit)."""
+        if verbose:
+            if self.backend.nombre == 'sqlserver':
+                server = self.config.get('DATABASE', 'server', fallback='').strip()
+                database = self.config.get('DATABASE', 'database', fallback='').strip()
+                print(f" Conectando a: {server} | BD: {database}")
+            else:
+                print(f" Conectando a: motor local {self.backend.nombre} | {self.backend.ruta}")
+        return self.backend.connect()
+
+    def connect_db(self):
+        
+        try:
+            self.connection = self.crear_conexion()
+            print(" Conexión exitosa!")
+        except Exception as e:
+            print(f" Error de conexión: {e}")
+            raise
+
+    def get_csv_path(self, filename):
+        """Obtener ruta completa del archivo CSV usando la ruta absoluta calculada"""
+        return os.path.join(self.dataset_folder, filename)
+
+    def ruta_origen(self, csv_file):
+        """CSV de DATASET o, en formato columnar, el directorio de la tabla."""
+        if self.formato == 'parquet':
+            return dataset_columnar.ruta_tabla(self.columnar_folder, csv_file)
+        return self.get_csv_path(csv_file)
+
+    def tamano_origen(self, csv_file):
+        ruta = self.ruta_origen(csv_file)
+        return stat_directorio(ruta)[0] if os.path.isdir(ruta) else os.path.getsize(ruta)
+
+    def leer_completo(self, csv_file):
+        """El archivo entero como DataFrame, solo con las columnas de column_mapping (y CodVenta)."""
+        columnas = self.columnas_ventas(csv_file)
+        if self.formato == 'parquet':
+            tabla = dataset_columnar.leer_tabla(self.columnar_folder, csv_file, columnas, self.meses)
+            return dataset_columnar.a_pandas(tabla)
+        if self.motor_csv == 'pyarrow':
+            df = lector_csv.leer(
+                self.get_csv_path(csv_file), columnas,
+                columnas_texto=self.date_columns.get(csv_file, []),
+                todo_texto=self.tipado == 'nativo'
+            )
+        else:
+            df = pd.read_csv(self.get_csv_path(csv_file), usecols=columnas, **self.read_options())
+        if 'CodVenta' in columnas:
+            return df
+        return self.numerar_ventas(df, csv_file, self.primer_cod_venta(csv_file))
+
+    def leer_bloques(self, csv_file):
+        """El archivo por bloques de self.chunk_size filas, todo como texto."""
+        columnas = self.columnas_ventas(csv_file)
+        if self.formato == 'parquet':
+            lotes = dataset_columnar.leer_lotes(
+                self.columnar_folder, csv_file, columnas, self.chunk_size, self.meses
+            )
+            return (dataset_columnar.a_pandas(lote) for lote in lotes if lote.num_rows)
+        if self.motor_csv == 'pyarrow':
+            bloques = lector_csv.leer_bloques(self.get_csv_path(csv_file), columnas, self.chunk_size)
+        else:
+            # dtype=str: el tipo de cada columna no depende del contenido de cada bloque
+            bloques = pd.read_csv(self.get_csv_path(csv_file), usecols=columnas, dtype=str, chunksize=self.chunk_size)
+        if csv_file not in dataset_columnar.NUMERADOS or 'CodVenta' in columnas:
+            return bloques
+        return self.numerar_bloques(bloques, csv_file)
+
+    def columnas_ventas(self, csv_file):
+        """
+        Las columnas de column_mapping y, en Ventas/Ventas_add, el CodVenta guardado en el origen
+        (siempre en parquet; en CSV si el archivo trae la columna, si no se numera por posición).
+        """
+        columnas = self.column_mapping[csv_file]
+        if csv_file not in dataset_columnar.NUMERADOS:
+            return columnas
+        if self.formato == 'parquet' or self.cod_venta_en_csv(csv_file):
+            return columnas + ['CodVenta']
+        return columnas
+
+    def cod_venta_en_csv(self, csv_file):
+        return dataset_columnar.tiene_cod_venta(self.get_csv_path(csv_file))
+
+    def primer_cod_venta(self, csv_file):
+        if csv_file not in dataset_columnar.NUMERADOS:
+            return None
+        return dataset_columnar.primer_cod_venta(self.dataset_folder, csv_file)
+
+    def numerar_ventas(self, df, csv_file, primero):
+        """
+        Agrega CodVenta (número de fila de la venta en el origen, el que usa Entregas.csv)
+        antes de validar, así las filas rechazadas no corren la numeración.
+        """
+        if csv_file not in dataset_columnar.NUMERADOS:
+            return df
+        df['CodVenta'] = range(primero, primero + len(df))
+        return df
+
+    def numerar_bloques(self, bloques, csv_file):
+        primero = self.primer_cod_venta(csv_file)
+        for bloque in bloques:
+            yield self.numerar_ventas(bloque, csv_file, primero)
+            primero += len(bloque)
+    
+    def normalizar(self, df, csv_file):
+        """Normaliza un DataFrame (o un bloque) antes de insertarlo en STAGING."""
+        if self.tipado == 'nativo':
+            return self.normalizar_tipado(df, csv_file)
+
+        # Conversión de fechas para evitar problemas de formato
+        for col in self.date_columns.get(csv_file, []):
+            df[col] = self.parsear_fecha(df[col]).dt.strftime('%Y-%m-%d')
+
+        # Normalización
+        df = df.fillna('').astype(str)
+        df['Fecha_Carga'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return df
+
+    def normalizar_tipado(self, df, csv_file):
+        """
+        Normaliza en el cliente según self.column_types: date -> 'YYYY-MM-DD', int -> '123' y
+        decimal -> '123.45'. Los valores vacíos o inválidos viajan como NULL (None), no como ''.
+        Las columnas de STAGING son VARCHAR: se envía texto, no int/decimal/date nativos.
+        """
+        for col, tipo in self.column_types.get(csv_file, {}).items():
+            if col not in df.columns:
+                continue
+            if tipo == 'date':
+                valores = self.parsear_fecha(df[col]).dt.strftime('%Y-%m-%d')
+            else:
+                valores = self.numero_canonico(df[col], tipo)
+            df[col] = valores.astype(object)
+
+        df = df.astype(object).where(df.notna(), None)
+        # Columna object con datetime de Python (no Timestamp de pandas) para cualquier backend
+        df['Fecha_Carga'] = pd.Series(datetime.now().replace(microsecond=0), index=df.index, dtype=object)
+        return df
+
+    def numero_canonico(self, serie, tipo):
+        """
+        int -> '123' | decimal -> '123.45' (None si no es válido), sin llamadas de Python por valor.
+        El texto que ya viene en esa forma (casi todo el CSV) se envía tal cual; de un decimal
+        solo el resto pasa por to_numeric y se vuelve a formatear. Un entero es solo dígitos,
+        igual que TRY_CAST(... AS INT): '2.0' no es entero válido.
+        """
+        texto = serie.astype('string').str.strip()
+        patron = r'[+-]?\d+' if tipo == 'int' else r'[+-]?\d+\.\d{2}'
+        canonico = texto.str.fullmatch(patron).fillna(False).astype(bool)
+        valores = texto.where(canonico)
+        if tipo == 'int':
+            return valores
+        resto = ~canonico & texto.notna()
+        if resto.any():
+            numeros = pd.to_numeric(texto[resto], errors='coerce').dropna()
+            valores.loc[numeros.index] = np.char.mod('%.2f', numeros.to_numpy(dtype=float)).tolist()
+        return valores
+
+    def parsear_fecha(self, serie):
+        """Texto -> fecha (NaT si es inválida). Con pyarrow el formato es explícito, no inferido."""
+        if self.motor_csv == 'pyarrow':
+            return pd.to_datetime(serie, format=self.formato_fecha, errors='coerce')
+        return pd.to_datetime(serie, errors='coerce')
+
+    def build_input_sizes(self, table_name, columns):
+        """
+        Tipo y largo de parámetro por columna, [(tipo, largo), ...] (solo carga tipada).
+        Cada backend lo traduce a su forma de enlazar parámetros. Todas las columnas de
+        STAGING son VARCHAR salvo Fecha_Carga (DATETIME).
+        """
+        tamanos = self.stg_sizes.get(table_name, {})
+        sizes = []
+        for col in columns:
+            if col == 'Fecha_Carga':
+                sizes.append(('timestamp', 0))
+            else:
+                sizes.append(('varchar', tamanos.get(col, 500)))
+        return sizes
+
+    def insertar(self, cursor, csv_file, table_name, df, confirmar=True):
+        """
+        Inserta el DataFrame con la estrategia de [INSERCION] (en carga tipada, con los
+        tamaños de parámetro de cada columna) y acumula sus tiempos por archivo.
+        """
+        columns = list(df.columns)
+        input_sizes = None
+        if self.tipado == 'nativo':
+            input_sizes = self.build_input_sizes(table_name, columns)
+
+        stats = self.insercion.insertar(
+            cursor, table_name, columns, list(df.itertuples(index=False, name=None)), input_sizes, confirmar
+        )
+        acumulado = self.stats_insercion.setdefault(csv_file, {'filas': 0, 'lotes': 0, 'insert': 0.0, 'commit': 0.0})
+        for clave, valor in stats.items():
+            acumulado[clave] += valor
+        return stats['filas']
+
+    def read_options(self):
+        """Opciones de pd.read_csv según el tipado (en carga tipada todo se lee como texto)."""
+        return {'dtype': str} if self.tipado == 'nativo' else {}
+
+    def separar_invalidos(self, df, csv_file, table_name):
+        """
+        Valida el lote en una pasada (validacion.py): registra las filas rechazadas con su
+        código de motivo y devuelve solo las válidas. Sin validación devuelve el lote intacto.
+        """
+        validas, rechazadas = self.validar_lote(df, csv_file)
+        self.registrar_rechazos(csv_file, table_name, rechazadas)
+        return validas
+
+    def validar_lote(self, df, csv_file):
+        """(válidas, rechazadas o None) del lote, sin tocar la base. Sin validación, (df, None)."""
+        if not self.validar or not self.validador.tiene_reglas(csv_file):
+            return df, None
+        return self.validador.separar(df, csv_file)
+
+    def registrar_rechazos(self, csv_file, table_name, rechazadas):
+        """
+        Pasa las filas rechazadas por validar_lote al sumidero del proceso: no escribe en la
+        base durante la carga (el conteo y la muestra se guardan al cerrar el proceso).
+        """
+        if rechazadas is not None:
+            self.sumidero.agregar(table_name, rechazadas)
+            self.rechazos[csv_file] = self.rechazos.get(csv_file, 0) + len(rechazadas)
+
+    def iniciar_proceso(self):
+        """Registra el proceso 'CSV_to_STG' en ETL_Control_Procesos (confirmado de inmediato)."""
+        self.inicio_proceso = datetime.now()
+        connection = self.crear_conexion(verbose=False)
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                "INSERT INTO ETL_Control_Procesos (Nombre_Proceso, Fecha_Inicio, Estado) "
+                "VALUES ('CSV_to_STG', ?, 'EN_PROCESO')",
+                (self.inicio_proceso.replace(microsecond=0),)
+            )
+            cursor.execute("SELECT MAX(ID_Proceso) FROM ETL_Control_Procesos WHERE Nombre_Proceso = 'CSV_to_STG'")
+            self.id_proceso = cursor.fetchone()[0]
+            connection.commit()
+        finally:
+            connection.close()
+        self.rechazos = {}
+        self.sumidero = SumideroRechazos(self.config, 'CSV_to_STG', self.id_proceso)
+
+    def finalizar_proceso(self, estado, insertadas, mensaje_error=None):
+        """
+        Cierra el proceso 'CSV_to_STG' con las filas cargadas y rechazadas y guarda en
+        ETL_Control_Detalle un paso por archivo cargado más el total de la etapa.
+        """
+        rechazadas = sum(self.rechazos.values())
+        total = self.metricas.registrar_total('CSV_to_STG', self.inicio_proceso, datetime.now(), self.id_proceso)
+        connection = self.crear_conexion(verbose=False)
+        try:
+            cursor = connection.cursor()
+            cursor.execute("""
+                UPDATE ETL_Control_Procesos
+                SET Fecha_Fin = ?, Estado = ?, Registros_Procesados = ?, Registros_Insertados = ?,
+                    Registros_Rechazados = ?, Mensaje_Error = ?
+                WHERE ID_Proceso = ?
+            """, (
+                datetime.now().replace(microsecond=0), estado, insertadas + rechazadas, insertadas,
+                rechazadas, mensaje_error, self.id_proceso
+            ))
+            self.metricas.guardar_detalle(cursor, self.metricas.de_etapa('CSV_to_STG', self.id_proceso) + [total])
+            # Conteo por motivo y muestra de los rechazos, fuera de la transacción de la carga
+            self.sumidero.volcar(connection.cursor())
+            connection.commit()
+        finally:
+            connection.close()
+
+        if self.rechazos:
+            detalle = ', '.join(f"{csv_file}={cantidad}" for csv_file, cantidad in self.rechazos.items())
+            print(f" Rechazados por validación (ID Proceso {self.id_proceso}): {detalle}")
+            for linea in self.sumidero.describir():
+                print(linea)
+        self.metricas.resumen('CSV_to_STG')
+        self.metricas.escribir()
+
+    def cargar_completo(self, cursor, csv_file, table_name, confirmar_bloques=True):
+        """Lee el CSV entero en memoria y lo inserta según la estrategia de [INSERCION]."""
+        df = self.leer_completo(csv_file)
+        df = self.separar_invalidos(df, csv_file, table_name)
+        df = self.normalizar(df, csv_file)
+
+        # Truncar e Insertar
+        self.backend.truncate(cursor, table_name)
+        return self.insertar(cursor, csv_file, table_name, df, confirmar_bloques)
+
+    def cargar_stream(self, cursor, csv_file, table_name, confirmar_bloques=True):
+        """
+        Lee, normaliza e inserta el CSV por bloques de self.chunk_size filas.
+        Solo un bloque vive en memoria a la vez; se hace commit cada self.commit_cada bloques
+        (salvo confirmar_bloques=False, donde el commit queda a cargo de quien llama).
+        """
+        reader = self.leer_bloques(csv_file)
+
+        self.backend.truncate(cursor, table_name)
+        filas = 0
+
+        for n_chunk, chunk in enumerate(reader, start=1):
+            chunk = self.separar_invalidos(chunk, csv_file, table_name)
+            chunk = self.normalizar(chunk, csv_file)
+            filas += self.insertar(cursor, csv_file, table_name, chunk, confirmar_bloques)
+
+            if confirmar_bloques and n_chunk % self.commit_cada == 0:
+                cursor.connection.commit()
+
+        # Commit del último tramo del archivo
+        if confirmar_bloques:
+            cursor.connection.commit()
+        return filas
+
+    def cargar_pipeline(self, cursor, csv_file, table_name, confirmar_bloques=True):
+        """
+        Como cargar_stream, pero en dos etapas que se solapan (asyncio):
+
+            productor  -> lee, valida y normaliza el bloque siguiente (hilo de lectura)
+            consumidor -> registra los rechazos e inserta el bloque anterior (hilo de la conexión)
+
+        Entre ambas hay una cola de self.buffers_pipeline bloques: si la base va más lenta
+        que la lectura, el productor espera (memoria acotada). Toda la escritura pasa por un
+        único hilo, en orden, así que la conexión nunca se usa desde dos hilos a la vez.
+        La duración tiende al máximo entre lectura e inserción y no a su suma.
+        """
+        self.backend.truncate(cursor, table_name)
+        filas = asyncio.run(self._pipeline(cursor, csv_file, table_name, confirmar_bloques))
+
+        # Commit del último tramo del archivo
+        if confirmar_bloques:
+            cursor.connection.commit()
+        return filas
+
+    def preparar_bloque(self, bloques, csv_file):
+        """Siguiente bloque validado y normalizado como (válidas, rechazadas), o None al terminar."""
+        chunk = next(bloques, None)
+        if chunk is None:
+            return None
+        validas, rechazadas = self.validar_lote(chunk, csv_file)
+        return self.normalizar(validas, csv_file), rechazadas
+
+    def insertar_bloque(self, cursor, csv_file, table_name, bloque, n_chunk, confirmar_bloques):
+        validas, rechazadas = bloque
+        self.registrar_rechazos(csv_file, table_name, rechazadas)
+        filas = self.insertar(cursor, csv_file, table_name, validas, confirmar_bloques)
+        if confirmar_bloques and n_chunk % self.commit_cada == 0:
+            cursor.connection.commit()
+        return filas
+
+    async def _pipeline(self, cursor, csv_file, table_name, confirmar_bloques):
+        loop = asyncio.get_running_loop()
+        cola = asyncio.Queue(maxsize=self.buffers_pipeline)
+        bloques = iter(self.leer_bloques(csv_file))
+        tiempos = {'lectura': 0.0, 'insercion': 0.0, 'espera': 0.0}
+
+        async def medido(executor, clave, funcion, *args):
+            inicio = time.perf_counter()
+            resultado = await loop.run_in_executor(executor, funcion, *args)
+            tiempos[clave] += time.perf_counter() - inicio
+            return resultado
+
+        async def productor():
+            while True:
+                bloque = await medido(lectura, 'lectura', self.preparar_bloque, bloques, csv_file)
+                # Con la cola llena se espera a que el consumidor libere un lugar (contrapresión)
+                await cola.put(bloque)
+                if bloque is None:
+                    return
+
+        async def consumidor():
+            filas = 0
+            n_chunk = 0
+            while True:
+                inicio = time.perf_counter()
+                bloque = await cola.get()
+                tiempos['espera'] += time.perf_counter() - inicio
+                if bloque is None:
+                    return filas
+                n_chunk += 1
+                filas += await medido(
+                    escritura, 'insercion', self.insertar_bloque,
+                    cursor, csv_file, table_name, bloque, n_chunk, confirmar_bloques
+                )
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='lectura') as lectura, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='escritura') as escritura:
+            tarea_productor = asyncio.ensure_future(productor())
+            tarea_consumidor = asyncio.ensure_future(consumidor())
+            try:
+                _, filas = await asyncio.gather(tarea_productor, tarea_consumidor)
+            except BaseException:
+                # Si una etapa falla la otra no debe quedar esperando la cola
+                tarea_productor.cancel()
+                tarea_consumidor.cancel()
+                await asyncio.gather(tarea_productor, tarea_consumidor, return_exceptions=True)
+                raise
+        tiempos['real'] = time.perf_counter() - inicio
+        self.stats_pipeline[csv_file] = tiempos
+        return filas
+
+    def cargar_archivo(self, cursor, csv_file, table_name, confirmar_bloques=True):
+        """Carga un archivo según self.modo, registra su paso en las métricas y devuelve (filas, segundos)."""
+        inicio = datetime.now()
+        if self.modo == 'stream':
+            filas = self.cargar_stream(cursor, csv_file, table_name, confirmar_bloques)
+        elif self.modo == 'pipeline':
+            filas = self.cargar_pipeline(cursor, csv_file, table_name, confirmar_bloques)
+        else:
+            filas = self.cargar_completo(cursor, csv_file, table_name, confirmar_bloques)
+        fin = datetime.now()
+
+        rechazadas = self.rechazos.get(csv_file, 0)
+        self.metricas.registrar('CSV_to_STG', csv_file, inicio, fin, filas + rechazadas, filas, rechazadas, self.id_proceso)
+        return filas, (fin - inicio).total_seconds()
+
+    def log_archivo(self, csv_file, table_name, filas, duracion):
+        filas_seg = filas / duracion if duracion > 0 else 0
+        print(f" OK: {csv_file} → {table_name} | {filas} filas en {duracion:.2f}s ({filas_seg:,.0f} filas/seg)")
+        stats = self.stats_insercion.get(csv_file)
+        if stats and stats['lotes']:
+            print(f"     inserción: {stats['lotes']} lote(s) | insert {stats['insert']:.2f}s | commit {stats['commit']:.2f}s")
+        tiempos = self.stats_pipeline.get(csv_file)
+        if tiempos:
+            print(f"     pipeline: lectura {tiempos['lectura']:.2f}s | inserción {tiempos['insercion']:.2f}s | "
+                  f"{tiempos['real']:.2f}s reales (en serie {tiempos['lectura'] + tiempos['insercion']:.2f}s, "
+                  f"inserción esperando bloques {tiempos['espera']:.2f}s)")
+
+    def log_insercion(self):
+        """Totales de la estrategia de inserción, para comparar configuraciones."""
+        filas = sum(stats['filas'] for stats in self.stats_insercion.values())
+        insert = sum(stats['insert'] for stats in self.stats_insercion.values())
+        commit = sum(stats['commit'] for stats in self.stats_insercion.values())
+        filas_seg = filas / insert if insert > 0 else 0
+        print(f" Inserción [{self.insercion.describir()}]: {filas} filas | insert {insert:.2f}s "
+              f"({filas_seg:,.0f} filas/seg) | commit {commit:.2f}s")
+
+    def archivos_a_cargar(self):
+        """Pares (csv, tabla) existentes en DATASET; avisa de los que faltan."""
+        pares = []
+        for csv_file, table_name in self.csv_to_staging.items():
+            if os.path.exists(self.ruta_origen(csv_file)):
+                pares.append((csv_file, table_name))
+            else:
+                print(f" ADVERTENCIA: {csv_file} no encontrado en {self.carpeta_origen}")
+        return pares
+
+    def cargar_en_paralelo(self, pares):
+        """
+        Carga los archivos en paralelo: cada worker (hilo) usa su propia conexión y cursor.
+        Ningún worker confirma por su cuenta; si todos terminan bien se hace commit de
+        todas las conexiones, y si alguno falla se hace rollback de todas (todo o nada).
+        """
+        tamano_pool = self.backend.pool_size
+        if self.workers > tamano_pool:
+            print(f" ADVERTENCIA: workers={self.workers} supera el pool ({tamano_pool}); se usan {tamano_pool}.")
+            self.workers = tamano_pool
+
+        # Los archivos más grandes primero: los chicos se reparten en los huecos
+        pares = sorted(pares, key=lambda par: self.tamano_origen(par[0]), reverse=True)
+        conexiones = []
+        local = threading.local()
+
+        def worker(csv_file, table_name):
+            # Una conexión por hilo, reutilizada para todos los archivos que le toquen
+            if not hasattr(local, 'cursor'):
+                connection = self.crear_conexion(verbose=False)
+                conexiones.append(connection)
+                local.cursor = connection.cursor()
+                self.backend.prepare_cursor(local.cursor)
+            return self.cargar_archivo(local.cursor, csv_file, table_name, confirmar_bloques=False)
+
+        inicio = time.perf_counter()
+        errores = []
+        tiempo_serie = 0.0
+        total_filas = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futuros = {pool.submit(worker, csv_file, table_name): (csv_file, table_name)
+                           for csv_file, table_name in pares}
+                for futuro in as_completed(futuros):
+                    csv_file, table_name = futuros[futuro]
+                    try:
+                        filas, duracion = futuro.result()
+                        tiempo_serie += duracion
+                        total_filas += filas
+                        self.log_archivo(csv_file, table_name, filas, duracion)
+                    except Exception as e:
+                        errores.append((csv_file, e))
+                        print(f" ERROR: {csv_file} → {table_name}: {e}")
+
+            if errores:
+                for connection in conexiones:
+                    connection.rollback()
+                raise RuntimeError(f"{len(errores)} archivo(s) con error; se revirtió la carga completa.")
+
+            for connection in conexiones:
+                connection.commit()
+        finally:
+            for connection in conexiones:
+                connection.close()
+
+        tiempo_real = time.perf_counter() - inicio
+        ahorro = tiempo_serie - tiempo_real
+        porcentaje = (ahorro / tiempo_serie * 100) if tiempo_serie > 0 else 0
+        print(f"\n Paralelo ({self.workers} workers): {tiempo_real:.2f}s reales "
+              f"vs {tiempo_serie:.2f}s en serie → ahorro {ahorro:.2f}s ({porcentaje:.0f}%)")
+        return total_filas
+
+    def run_etl(self):
+        """Ejecutar proceso de extracción y carga. Devuelve False si falló."""
+        print(f"\n INICIANDO PROCESO DE EXTRACCION Y CARGA")
+        print(f" Modo: {self.modo} | Tipado: {self.tipado} | Workers: {max(self.workers, 1)}" + (f" (chunk={self.chunk_size}, commit cada {self.commit_cada} chunks)" if self.modo in ('stream', 'pipeline') else '') + (f", {self.buffers_pipeline} bloque(s) en cola" if self.modo == 'pipeline' else ''))
+
+        
+        try:
+            # 1. Verificar la carpeta de datos
+            if not os.path.exists(self.carpeta_origen):
+                print(f" Carpeta '{self.carpeta_origen}' no encontrada.")
+                return False
+            
+            print(f" Buscando archivos en: {self.carpeta_origen} (formato {self.formato})")
+            if self.meses is not None:
+                filtro = 'ultimo' if self.meses == 'ultimo' else ','.join('-'.join(m) for m in self.meses)
+                print(f" Meses a cargar (Ventas/Entregas): {filtro}")
+            
+            pares = self.archivos_a_cargar()
+
+            # Solo los archivos que cambiaron desde la última carga confirmada
+            archivos = [csv_file for csv_file, _ in pares]
+            # Las tablas leídas con [EXTRACCION] meses se confirman junto con esos meses
+            if self.meses is not None:
+                for archivo in archivos:
+                    if archivo in dataset_columnar.PARTICIONADOS:
+                        self.manifest.filtrar(archivo, filtro)
+            pendientes = self.manifest.pendientes('stg', archivos)
+            # En un CSV sin columna CodVenta el de Ventas_add.csv sigue a las filas de Ventas.csv:
+            # si cambia Ventas.csv se renumera también Ventas_add.csv
+            if (self.formato == 'csv' and 'Ventas.csv' in pendientes
+                    and 'Ventas_add.csv' in archivos and 'Ventas_add.csv' not in pendientes
+                    and not self.cod_venta_en_csv('Ventas_add.csv')):
+                pendientes.append('Ventas_add.csv')
+            self.manifest.log_omitidos('stg', archivos, pendientes)
+            pares = [(csv_file, table_name) for csv_file, table_name in pares if csv_file in pendientes]
+            if not pares:
+                print(" Ningún archivo cambió desde la última carga: no hay nada que extraer.")
+                return True
+
+            if self.validar or self.metricas.habilitado:
+                self.iniciar_proceso()
+
+            # 2. Carga paralela: una conexión por worker
+            if self.workers > 1:
+                total_filas = self.cargar_en_paralelo(pares)
+                self.log_insercion()
+                self.manifest.confirmar('stg', pendientes)
+                if self.id_proceso is not None:
+                    self.finalizar_proceso('COMPLETADO', total_filas)
+                print("\n PROCESO DE EXTRACCION DE DATOS COMPLETADO")
+                return True
+
+            # 3. Carga en serie: una sola conexión
+            self.connect_db()
+            cursor = self.connection.cursor()
+            self.backend.prepare_cursor(cursor)
+            
+            total_filas = 0
+            for csv_file, table_name in pares:
+                filas, duracion = self.cargar_archivo(cursor, csv_file, table_name)
+                if self.insercion.commit == 'archivo':
+                    inicio = time.perf_counter()
+                    self.connection.commit()
+                    self.stats_insercion[csv_file]['commit'] += time.perf_counter() - inicio
+                self.log_archivo(csv_file, table_name, filas, duracion)
+                total_filas += filas
+            
+            self.connection.commit()
+            self.log_insercion()
+            self.manifest.confirmar('stg', pendientes)
+            if self.id_proceso is not None:
+                self.connection.close()
+                self.connection = None
+                self.finalizar_proceso('COMPLETADO', total_filas)
+            print("\n PROCESO DE EXTRACCION DE DATOS COMPLETADO")
+            return True
+            
+        except Exception as e:
+            print(f" ERROR FATAL: {e}")
+            if self.connection:
+                self.connection.rollback()
+                if self.modo in ('stream', 'pipeline'):
+                    print(f" ADVERTENCIA: en modo {self.modo} los bloques ya confirmados no se revierten.")
+                if self.insercion.commit != 'final':
+                    print(f" ADVERTENCIA: con commit={self.insercion.commit} lo ya confirmado no se revierte.")
+                self.connection.close()
+                self.connection = None
+            if self.id_proceso is not None:
+                try:
+                    self.finalizar_proceso('ERROR', 0, str(e))
+                except Exception as error_cierre:
+                    print(f" No se pudo cerrar el proceso CSV_to_STG: {error_cierre}")
+            return False
+        finally:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+
+def main():
+    etl = CSVToSQLServer()
+    etl.run_etl()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Estrategias de inserción en STAGING (sección opcional [INSERCION] de config.ini).
+
+    estrategia       = executemany -> un INSERT de una fila, enviado con executemany
+                       multifila   -> INSERT ... VALUES (...), (...), ... de filas_por_values
+                                      filas por sentencia (menos viajes y menos sentencias)
+    tamano_lote      = filas por envío (0 = todo el archivo o bloque en un solo envío)
+    filas_por_values = filas por sentencia en multifila (SQL Server admite hasta 1000 filas
+                       y 2100 parámetros por sentencia; se ajusta solo)
+    commit           = final   -> un único commit al terminar la extracción (todo o nada)
+                       archivo -> commit después de cada archivo
+                       lote    -> commit después de cada lote (log de transacciones acotado)
+
+Con commit = archivo o lote, lo ya confirmado no se revierte si un archivo posterior falla.
+Cada inserción devuelve sus tiempos (insert y commit por separado) para comparar
+configuraciones contra el servidor real.
+"""
+import time
+
+
+ESTRATEGIAS = ('executemany', 'multifila')
+COMMITS = ('final', 'archivo', 'lote')
+
+# Límites de SQL Server para una sentencia INSERT ... VALUES
+MAX_FILAS_VALUES = 1000
+MAX_PARAMETROS = 2100
+
+
+def sentencia_insert(table_name, columns, filas=1):
+    """INSERT parametrizado para `filas` filas (una tupla de ? por fila)."""
+    tupla = '(' + ', '.join('?' for _ in columns) + ')'
+    return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES " + ', '.join([tupla] * filas)
+
+
+class EstrategiaInsercion:
+    """Inserta filas en una tabla según la estrategia, el tamaño de lote y la política de commit."""
+
+    def __init__(self, backend, estrategia='executemany', tamano_lote=0, filas_por_values=100, commit='final'):
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia de inserción desconocida: '{estrategia}'")
+        if commit not in COMMITS:
+            raise ValueError(f"Política de commit desconocida: '{commit}'")
+        if tamano_lote < 0 or filas_por_values <= 0:
+            raise ValueError("tamano_lote debe ser >= 0 y filas_por_values mayor a 0.")
+
+        self.backend = backend
+        self.estrategia = estrategia
+        self.tamano_lote = tamano_lote
+        self.filas_por_values = min(filas_por_values, MAX_FILAS_VALUES)
+        self.commit = commit
+
+    @classmethod
+    def desde_config(cls, config, backend):
+        return cls(
+            backend,
+            estrategia=config.get('INSERCION', 'estrategia', fallback='executemany').strip().lower(),
+            tamano_lote=config.getint('INSERCION', 'tamano_lote', fallback=0),
+            filas_por_values=config.getint('INSERCION', 'filas_por_values', fallback=100),
+            commit=config.get('INSERCION', 'commit', fallback='final').strip().lower(),
+        )
+
+    def describir(self):
+        estrategia = self.estrategia
+        if estrategia == 'multifila':
+            estrategia += f"({self.filas_por_values} filas/sentencia)"
+        lote = self.tamano_lote or 'completo'
+        return f"{estrategia} | lote={lote} | commit={self.commit}"
+
+    def filas_por_sentencia(self, columns):
+        if self.estrategia == 'executemany':
+            return 1
+        return max(1, min(self.filas_por_values, (MAX_PARAMETROS - 1) // len(columns)))
+
+    def insertar(self, cursor, table_name, columns, filas, input_sizes=None, confirmar=True):
+        """
+        Inserta `filas` (lista de tuplas) en lotes de self.tamano_lote.
+        input_sizes: [(tipo, largo)] por columna (carga tipada) o None.
+        confirmar=False ignora commit = lote (la carga en paralelo confirma todo junto).
+        Devuelve {'filas', 'lotes', 'insert', 'commit'} con los segundos de cada parte.
+        """
+        stats = {'filas': len(filas), 'lotes': 0, 'insert': 0.0, 'commit': 0.0}
+        if not filas:
+            return stats
+
+        columns = list(columns)
+        por_sentencia = self.filas_por_sentencia(columns)
+        lote = self.tamano_lote or len(filas)
+        # En multifila el lote se redondea a un múltiplo de filas por sentencia
+        if por_sentencia > 1:
+            lote = max(por_sentencia, lote - lote % por_sentencia)
+
+        ultima_forma = None
+        for desde in range(0, len(filas), lote):
+            bloque = filas[desde:desde + lote]
+            inicio = time.perf_counter()
+            ultima_forma = self._enviar(cursor, table_name, columns, bloque, por_sentencia, input_sizes, ultima_forma)
+            stats['insert'] += time.perf_counter() - inicio
+            stats['lotes'] += 1
+
+            if confirmar and self.commit == 'lote':
+                inicio = time.perf_counter()
+                cursor.connection.commit()
+                stats['commit'] += time.perf_counter() - inicio
+        return stats
+
+    def _enviar(self, cursor, table_name, columns, bloque, por_sentencia, input_sizes, ultima_forma):
+        """
+        Envía un lote. Las filas que no completan una sentencia multifila van en una
+        sentencia más corta al final. Devuelve la cantidad de filas por sentencia de la
+        última sentencia enviada (para no volver a fijar los tamaños de parámetro).
+        """
+        completas = len(bloque) - len(bloque) % por_sentencia
+        grupos = [(por_sentencia, bloque[:completas]), (len(bloque) - completas, bloque[completas:])]
+
+        for filas_sentencia, filas in grupos:
+            if not filas:
+                continue
+            if input_sizes is not None and filas_sentencia != ultima_forma:
+                self.backend.set_input_sizes(cursor, input_sizes * filas_sentencia)
+            ultima_forma = filas_sentencia
+
+            query = sentencia_insert(table_name, columns, filas_sentencia)
+            if filas_sentencia == 1:
+                cursor.executemany(query, filas)
+            else:
+                # Cada "fila" de executemany es una sentencia completa con sus parámetros aplanados
+                parametros = [
+                    tuple(valor for fila in filas[i:i + filas_sentencia] for valor in fila)
+                    for i in range(0, len(filas), filas_sentencia)
+                ]
+                cursor.executemany(query, parametros)
+        return ultima_forma
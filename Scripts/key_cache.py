@@ -0,0 +1,311 @@
+"""
+Resolución de claves sustitutas en memoria para cargar Fact_Ventas.
+
+SP_INT_to_DW_Fact_Ventas une INT_Ventas con Dim_Producto, Dim_Cliente y Dim_Tienda por
+LTRIM(RTRIM(...)) = LTRIM(RTRIM(...)), que no puede usar los índices de código. Las
+dimensiones son chicas: se leen una vez a diccionarios {clave natural: clave sustituta},
+INT_Ventas se recorre por lotes (paginado por ID_INT) y cada fila se resuelve con
+búsquedas O(1). A Fact_Ventas llegan filas con las claves ya resueltas.
+
+Se activa con [DW] claves = python en config.ini (por defecto las resuelve el SP).
+"""
+from datetime import datetime
+
+import pandas as pd
+
+from rechazos import (
+    CLIENTE_SIN_DIMENSION, FECHA_SIN_DIM_TIEMPO, PRODUCTO_SIN_DIMENSION, TIENDA_SIN_DIMENSION,
+)
+
+
+def normalizar_codigo(valor):
+    """Igual que LTRIM(RTRIM(...)) con la intercalación (case-insensitive) de la base."""
+    return None if valor is None else str(valor).strip().upper()
+
+
+def normalizar_fecha(valor):
+    """date, datetime o 'YYYY-MM-DD...' -> 'YYYY-MM-DD'."""
+    return None if valor is None else str(valor)[:10]
+
+
+def fecha_de_tiempo_key(tiempo_key):
+    """20240131 -> '2024-01-31'."""
+    return f"{tiempo_key // 10000:04d}-{tiempo_key // 100 % 100:02d}-{tiempo_key % 100:02d}"
+
+
+def rango_mes(anio_mes):
+    """202403 -> ('2024-03-01', '2024-04-01'): FechaVenta >= desde AND FechaVenta < hasta."""
+    anio, mes = divmod(anio_mes, 100)
+    siguiente = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return f"{anio:04d}-{mes:02d}-01", f"{siguiente[0]:04d}-{siguiente[1]:02d}-01"
+
+
+class KeyCache:
+    """Mapas clave natural -> clave sustituta de las dimensiones de Fact_Ventas."""
+
+    DIMENSIONES = {
+        'tiempo': ("SELECT Fecha, Tiempo_Key FROM Dim_Tiempo", normalizar_fecha),
+        'producto': ("SELECT CodigoProducto, ID_Producto FROM Dim_Producto", normalizar_codigo),
+        'cliente': ("SELECT CodigoCliente, ID_Cliente FROM Dim_Cliente", normalizar_codigo),
+        'tienda': ("SELECT CodigoTienda, ID_Tienda FROM Dim_Tienda", normalizar_codigo),
+    }
+
+    def __init__(self):
+        self.mapas = {}
+
+    def cargar(self, cursor):
+        """Lee cada dimensión una sola vez; devuelve {dimension: cantidad de claves}."""
+        for nombre, (sql, normalizar) in self.DIMENSIONES.items():
+            cursor.execute(sql)
+            self.mapas[nombre] = {normalizar(natural): sustituta for natural, sustituta in cursor.fetchall()}
+        return {nombre: len(mapa) for nombre, mapa in self.mapas.items()}
+
+    def resolver_ventas(self, filas):
+        """
+        filas: (ID_INT, FechaVenta, CodigoProducto, CodigoCliente, CodigoTienda, Cantidad, PrecioVenta, Total_IVA,
+                CodVenta)
+        Devuelve (resueltas, rechazadas):
+            resueltas  -> (Tiempo_Key, ID_Producto, ID_Cliente, ID_Tienda, Cantidad, PrecioVenta, Total_IVA, CodVenta)
+            rechazadas -> (Registro_Original, Codigo, Motivo_Rechazo, fila), mismos códigos y textos que el SP
+        """
+        tiempo = self.mapas['tiempo'].get
+        producto = self.mapas['producto'].get
+        cliente = self.mapas['cliente'].get
+        tienda = self.mapas['tienda'].get
+
+        resueltas = []
+        rechazadas = []
+        for fila in filas:
+            _, fecha, cod_producto, cod_cliente, cod_tienda, cantidad, precio, total_iva, cod_venta = fila
+            fecha = normalizar_fecha(fecha)
+            tiempo_key = tiempo(fecha)
+            id_producto = producto(normalizar_codigo(cod_producto))
+            id_cliente = cliente(normalizar_codigo(cod_cliente))
+            id_tienda = tienda(normalizar_codigo(cod_tienda))
+
+            if None not in (tiempo_key, id_producto, id_cliente, id_tienda):
+                resueltas.append((tiempo_key, id_producto, id_cliente, id_tienda, cantidad, precio, total_iva, cod_venta))
+                continue
+
+            registro = f"Fecha={fecha}, Producto={cod_producto}, Cliente={cod_cliente}, Tienda={cod_tienda}"
+            if tiempo_key is None:
+                codigo, motivo = FECHA_SIN_DIM_TIEMPO, f"Fecha [{fecha}] no existe en Dim_Tiempo"
+            elif id_producto is None:
+                codigo, motivo = PRODUCTO_SIN_DIMENSION, f"Producto [{cod_producto}] no existe en Dim_Producto"
+            elif id_cliente is None:
+                codigo, motivo = CLIENTE_SIN_DIMENSION, f"Cliente [{cod_cliente}] no existe en Dim_Cliente"
+            else:
+                codigo, motivo = TIENDA_SIN_DIMENSION, f"Tienda [{cod_tienda}] no existe en Dim_Tienda"
+            rechazadas.append((registro, codigo, motivo, fila))
+
+        return resueltas, rechazadas
+
+
+COLUMNAS_INT_VENTAS = (
+    "ID_INT, FechaVenta, CodigoProducto, CodigoCliente, CodigoTienda, Cantidad, PrecioVenta, Total_IVA, CodVenta"
+)
+
+# FechaCarga con el reloj de la base ({ahora}), como GETDATE() en el SP: SP_DW_Actualizar_Agregados
+# elige los meses a recalcular comparándola con el inicio del proceso, también tomado en la base
+INSERT_DIRECTO = """
+    INSERT INTO Fact_Ventas (
+        Tiempo_Key, ID_Producto, ID_Cliente, ID_Tienda, Cantidad, PrecioVenta, Total_IVA, CodVenta, FechaCarga
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, {ahora})
+"""
+
+TIPOS_DIRECTO = [('int', 0)] * 5 + [('decimal', 0), ('decimal', 0), ('int', 0)]
+
+# Con filas previas en Fact_Ventas las resueltas se juntan en una tabla temporal y pasan a
+# Fact_Ventas en un solo INSERT ... SELECT con el anti-join del SP
+COLUMNAS_LOTE = (
+    "Tiempo_Key INT, ID_Producto INT, ID_Cliente INT, ID_Tienda INT, Cantidad INT, "
+    "PrecioVenta DECIMAL(18,2), Total_IVA DECIMAL(18,2), CodVenta BIGINT"
+)
+
+INSERT_LOTE = """
+    INSERT INTO {lote} (
+        Tiempo_Key, ID_Producto, ID_Cliente, ID_Tienda, Cantidad, PrecioVenta, Total_IVA, CodVenta
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+TIPOS_LOTE = TIPOS_DIRECTO
+
+# Mismo criterio de duplicados que el SP: con CodVenta, un seek sobre IDX_Ventas_CodVenta; sin él,
+# igualdades sobre enteros (usa IDX_Fecha). ID_Venta <= ? limita esa comparación a lo cargado
+# antes de esta corrida, como el anti-join del SP.
+INSERT_DESDE_LOTE = """
+    INSERT INTO Fact_Ventas (
+        Tiempo_Key, ID_Producto, ID_Cliente, ID_Tienda, Cantidad, PrecioVenta, Total_IVA, CodVenta, FechaCarga
+    )
+    SELECT l.Tiempo_Key, l.ID_Producto, l.ID_Cliente, l.ID_Tienda, l.Cantidad, l.PrecioVenta, l.Total_IVA,
+           l.CodVenta, {ahora}
+    FROM {lote} l
+    WHERE (l.CodVenta IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM Fact_Ventas fv WHERE fv.CodVenta = l.CodVenta
+        ))
+       OR (l.CodVenta IS NULL AND NOT EXISTS (
+            SELECT 1 FROM Fact_Ventas fv
+            WHERE fv.Tiempo_Key = l.Tiempo_Key AND fv.ID_Producto = l.ID_Producto
+              AND fv.ID_Cliente = l.ID_Cliente AND fv.ID_Tienda = l.ID_Tienda
+              AND fv.Cantidad = l.Cantidad AND fv.PrecioVenta = l.PrecioVenta AND fv.ID_Venta <= ?
+        ))
+"""
+
+
+class FactVentasLoader:
+    """Carga Fact_Ventas desde INT_Ventas resolviendo las claves con KeyCache."""
+
+    def __init__(self, backend, sumidero, tamano_lote=50000):
+        self.backend = backend
+        # Rechazos del proceso (rechazos.SumideroRechazos): conteo por motivo, muestra y detalle
+        self.sumidero = sumidero
+        self.tamano_lote = tamano_lote
+        # (leídas, insertadas, rechazadas) de la última carga, para las métricas del paso
+        self.conteos = (0, 0, 0)
+
+    def cargar(self, connection, id_proceso, reprocesar=0, incremental=0):
+        """
+        Mismo resultado que SP_INT_to_DW_Fact_Ventas (reproceso, marca de agua, reproceso por
+        meses y rechazos). No hace commit: queda en la transacción del loader. Devuelve los mensajes del proceso.
+        """
+        lectura = connection.cursor()
+        escritura = connection.cursor()
+        self.backend.prepare_cursor(escritura)
+        mensajes = []
+
+        cache = KeyCache()
+        tamanos = cache.cargar(lectura)
+        mensajes.append("   Claves en memoria: " + ', '.join(f"{k}={v}" for k, v in tamanos.items()))
+
+        # Reproceso por meses: SP_DW_Reprocesar_Meses ya vació esos meses; solo se leen sus ventas
+        lectura.execute(
+            "SELECT AnioMes FROM ETL_Reproceso_Meses WHERE ID_Proceso = ? AND Tabla = 'Fact_Ventas' ORDER BY AnioMes",
+            (id_proceso,)
+        )
+        meses = [fila[0] for fila in lectura.fetchall()]
+
+        ultimo_cod_venta = None
+        if meses:
+            mensajes.append(f"   Reproceso por meses: {', '.join(str(mes) for mes in meses)}")
+        elif reprocesar:
+            # Fact_Entregas referencia a Fact_Ventas: se vacía antes (el SP de entregas la recarga completa)
+            escritura.execute("DELETE FROM Fact_Entregas")
+            escritura.execute("""
+                DELETE FROM Fact_Ventas
+                WHERE Tiempo_Key IN (
+                    SELECT dt.Tiempo_Key FROM INT_Ventas iv
+                    INNER JOIN Dim_Tiempo dt ON dt.Fecha = iv.FechaVenta
+                )
+            """)
+            mensajes.append(f"   Registros eliminados para reproceso: {escritura.rowcount}")
+        elif incremental:
+            lectura.execute("SELECT Ultimo_CodVenta FROM ETL_Watermark WHERE Tabla = 'Fact_Ventas'")
+            fila = lectura.fetchone()
+            ultimo_cod_venta = fila[0] if fila else None
+            mensajes.append(f"   Incremental desde CodVenta: {ultimo_cod_venta or 'sin marca (carga completa)'}")
+
+        lectura.execute("SELECT MAX(ID_Venta) FROM Fact_Ventas")
+        max_previo = lectura.fetchone()[0] or 0
+
+        # Sin filas previas o con reproceso no puede haber duplicados. Por encima de la marca sí:
+        # una venta rechazada la retiene y las cargadas después de ella se vuelven a leer
+        sondear = not reprocesar and not meses and max_previo > 0
+        if sondear:
+            lote = self.backend.crear_temporal(connection.cursor(), 'Fact_Ventas_Lote', COLUMNAS_LOTE)
+            insert_sql, tipos = INSERT_LOTE.format(lote=lote), TIPOS_LOTE
+        else:
+            insert_sql, tipos = INSERT_DIRECTO.format(ahora=self.backend.ahora_sql), TIPOS_DIRECTO
+
+        filtro = "WHERE ID_INT > ?" + (" AND (CodVenta > ? OR CodVenta IS NULL)" if ultimo_cod_venta else "")
+        params_filtro = (ultimo_cod_venta,) if ultimo_cod_venta else ()
+        if meses:
+            filtro += " AND (" + " OR ".join("(FechaVenta >= ? AND FechaVenta < ?)" for _ in meses) + ")"
+            params_filtro = tuple(fecha for mes in meses for fecha in rango_mes(mes))
+        consulta = self.backend.seleccionar_top(
+            COLUMNAS_INT_VENTAS, f"FROM INT_Ventas {filtro} ORDER BY ID_INT", self.tamano_lote
+        )
+
+        ultimo_id = 0
+        leidas = 0
+        rechazados = 0
+        while True:
+            lectura.execute(consulta, (ultimo_id,) + params_filtro)
+            filas = lectura.fetchall()
+            if not filas:
+                break
+            ultimo_id = filas[-1][0]
+            leidas += len(filas)
+
+            resueltas, rechazadas = cache.resolver_ventas(filas)
+
+            if resueltas:
+                self.backend.set_input_sizes(escritura, tipos)
+                escritura.executemany(insert_sql, resueltas)
+
+            if rechazadas:
+                detalle = pd.DataFrame(
+                    [fila for _, _, _, fila in rechazadas], columns=[c.strip() for c in COLUMNAS_INT_VENTAS.split(',')]
+                )
+                detalle.insert(0, 'Registro_Original', [registro for registro, _, _, _ in rechazadas])
+                detalle.insert(1, 'Codigo', [codigo for _, codigo, _, _ in rechazadas])
+                detalle.insert(2, 'Motivo_Rechazo', [motivo for _, _, motivo, _ in rechazadas])
+                self.sumidero.agregar('INT_Ventas', detalle)
+                rechazados += len(rechazadas)
+
+        if sondear:
+            # Un solo anti-join contra Fact_Ventas para todas las filas resueltas
+            final = connection.cursor()
+            final.execute(INSERT_DESDE_LOTE.format(lote=lote, ahora=self.backend.ahora_sql), (max_previo,))
+            final.execute(f"DROP TABLE {lote}")
+
+        lectura.execute("SELECT COUNT(*) FROM Fact_Ventas WHERE ID_Venta > ?", (max_previo,))
+        insertados = lectura.fetchone()[0]
+        self.actualizar_watermark(lectura, connection.cursor(), id_proceso, ultimo_cod_venta)
+        self.sumidero.volcar(connection.cursor())
+        self.conteos = (leidas, insertados, rechazados)
+
+        mensajes.append(
+            f"Fact_Ventas (claves en memoria): {leidas} leídos, {insertados} insertados, {rechazados} rechazados"
+        )
+        return mensajes
+
+    def actualizar_watermark(self, lectura, escritura, id_proceso, marca_previa=None):
+        """
+        Marca de agua de Fact_Ventas = último CodVenta y última fecha cargados (igual que el SP).
+        El CodVenta no pasa a la primera venta leída (por encima de marca_previa) que no quedó
+        cargada, así una venta rechazada vuelve a leerse en la corrida incremental siguiente.
+        escritura debe ser un cursor sin tamaños de parámetro fijados.
+        """
+        lectura.execute("SELECT MAX(Tiempo_Key), MAX(CodVenta) FROM Fact_Ventas")
+        max_tiempo_key, max_cod_venta = lectura.fetchone()
+        if max_tiempo_key is None:
+            return
+
+        lectura.execute("""
+            SELECT MIN(iv.CodVenta) FROM INT_Ventas iv
+            WHERE iv.CodVenta IS NOT NULL
+              AND (? IS NULL OR iv.CodVenta > ?)
+              AND NOT EXISTS (SELECT 1 FROM Fact_Ventas fv WHERE fv.CodVenta = iv.CodVenta)
+        """, (marca_previa, marca_previa))
+        primer_pendiente = lectura.fetchone()[0]
+        if primer_pendiente is not None and max_cod_venta is not None and primer_pendiente <= max_cod_venta:
+            max_cod_venta = primer_pendiente - 1
+
+        valores = (
+            max_tiempo_key, fecha_de_tiempo_key(max_tiempo_key), max_cod_venta, id_proceso,
+            datetime.now().replace(microsecond=0)
+        )
+        escritura.execute("""
+            UPDATE ETL_Watermark
+            SET Ultimo_Tiempo_Key = ?, Ultima_Fecha = ?, Ultimo_CodVenta = ?, ID_Proceso = ?, Fecha_Actualizacion = ?
+            WHERE Tabla = 'Fact_Ventas'
+        """, valores)
+        if escritura.rowcount == 0:
+            escritura.execute("""
+                INSERT INTO ETL_Watermark (
+                    Ultimo_Tiempo_Key, Ultima_Fecha, Ultimo_CodVenta, ID_Proceso, Fecha_Actualizacion, Tabla
+                )
+                VALUES (?, ?, ?, ?, ?, 'Fact_Ventas')
+            """, valores)
@@ -0,0 +1,73 @@
+"""
+Motor de lectura de CSV con pyarrow para la extracción ([EXTRACCION] motor_csv = pyarrow).
+
+El archivo se mapea en memoria y se parsea en varios hilos con pyarrow.csv; las fechas se
+leen como texto y se convierten después con un formato explícito (formato_fecha), sin que
+pandas tenga que inferirlo fila por fila. Devuelve DataFrames con las mismas columnas y
+los mismos valores que pd.read_csv, así que el resto de la extracción no cambia:
+
+    - tipos inferidos (carga texto, modo completo): enteros, decimales y texto como pandas;
+      las columnas de fecha siempre como texto
+    - todo como texto (carga nativa o modo stream): igual que pd.read_csv(dtype=str)
+    - vacíos y marcadores de nulo ('NA', 'NULL', ...) como NaN/None
+
+pyarrow solo se importa si se elige este motor.
+"""
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.csv
+    except ImportError as e:
+        raise ImportError("motor_csv = pyarrow requiere pyarrow (pip install pyarrow).") from e
+    return pyarrow
+
+
+def opciones(ruta, columnas, columnas_texto, bloque=None):
+    """ReadOptions/ConvertOptions: solo las columnas pedidas, las de texto forzadas a string."""
+    pa = _pyarrow()
+    read_options = pa.csv.ReadOptions(use_threads=True)
+    if bloque:
+        read_options.block_size = bloque
+    convert_options = pa.csv.ConvertOptions(
+        include_columns=list(columnas),
+        column_types={columna: pa.string() for columna in columnas_texto},
+        strings_can_be_null=True,
+    )
+    return read_options, convert_options
+
+
+def leer(ruta, columnas, columnas_texto=(), todo_texto=False):
+    """
+    El CSV entero como DataFrame con las columnas en el orden de `columnas`.
+    columnas_texto: columnas que no se infieren (fechas); todo_texto: ninguna se infiere.
+    """
+    pa = _pyarrow()
+    textos = columnas if todo_texto else [c for c in columnas_texto if c in columnas]
+    read_options, convert_options = opciones(ruta, columnas, textos)
+    with pa.memory_map(ruta, 'r') as origen:
+        tabla = pa.csv.read_csv(origen, read_options=read_options, convert_options=convert_options)
+    return tabla.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def leer_bloques(ruta, columnas, tamano, bloque=8 * 1024 * 1024):
+    """
+    El CSV por bloques de exactamente `tamano` filas (el último, el resto), todo como texto.
+    pyarrow lee por bloques de bytes: se acumulan y se cortan a la cantidad de filas pedida.
+    """
+    pa = _pyarrow()
+    read_options, convert_options = opciones(ruta, columnas, columnas, bloque)
+    with pa.memory_map(ruta, 'r') as origen:
+        lector = pa.csv.open_csv(origen, read_options=read_options, convert_options=convert_options)
+        pendientes = []
+        filas = 0
+        for lote in lector:
+            pendientes.append(lote)
+            filas += lote.num_rows
+            while filas >= tamano:
+                tabla = pa.Table.from_batches(pendientes)
+                yield tabla.slice(0, tamano).to_pandas()
+                resto = tabla.slice(tamano)
+                pendientes = resto.to_batches()
+                filas = resto.num_rows
+        if filas:
+            yield pa.Table.from_batches(pendientes).to_pandas()
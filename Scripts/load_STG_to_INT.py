@@ -1,92 +1,136 @@
-import pyodbc
-from configparser import ConfigParser
-import os
-
-class DWLoader:
-    def __init__(self, config_file='config.ini'):
-        self.config = ConfigParser()
-        self.config.optionxform = str
-        
-        # --- Localizar config.ini ---
-        # Obtiene la ruta de la carpeta donde esta este script
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        # Une la carpeta con el nombre del archivo config.ini
-        ruta_absoluta_config = os.path.join(base_dir, config_file)
-        
-        # Verifica que el archivo de configuración exista y se lea correctamente
-        if not os.path.exists(ruta_absoluta_config) or not self.config.read(ruta_absoluta_config):
-            print(f" ERROR: No se encontró config.ini en: {ruta_absoluta_config}")
-            raise FileNotFoundError(f"No se pudo leer el archivo de configuración: {config_file}")
-        
-        self.connection = None
-
-    def connect_db(self):
-        """Conectar a SQL Server"""
-        try:
-            server = self.config.get('DATABASE', 'server').strip()
-            database = self.config.get('DATABASE', 'database').strip()
-            trusted_connection = self.config.get('DATABASE', 'trusted_connection').strip()
-            driver = self.config.get('DATABASE', 'driver', fallback='ODBC Driver 17 for SQL Server').strip()
-
-            connection_string = (
-                f"DRIVER={{{driver}}};"
-                f"SERVER={server};"
-                f"DATABASE={database};"
-                f"Trusted_Connection={trusted_connection};"
-            )
-
-            print(f"Conectando a {server} | BD: {database}")
-            self.connection = pyodbc.connect(connection_string, timeout=10)
-            self.connection.autocommit = False
-            print("Conexión exitosa")
-        except Exception as e:
-            print(f"Error de conexión: {e}")
-            raise
-
-    def run_orchestrator(self):
-        """Ejecuta el SP orquestador STG -> INT"""
-        cursor = self.connection.cursor()
-
-        print("\nEjecutando SP_Orquestador_STG_to_INT...\n")
-
-        try:
-            cursor.execute("EXEC SP_Orquestador_STG_to_INT")
-
-            # Consumir mensajes PRINT del SQL para que no queden pendientes
-            while cursor.nextset():
-                pass
-
-            print("SP_Orquestador_STG_to_INT ejecutado correctamente")
-
-        except Exception as e:
-            print(f"Error al ejecutar el orquestador: {e}")
-            raise
-
-    def run(self):
-        try:
-            self.connect_db()
-            self.run_orchestrator()
-
-            self.connection.commit()
-            print("\nCARGA STG → INT COMPLETADA EXITOSAMENTE")
-
-        except Exception as e:
-            print(f"\nERROR FATAL: {e}")
-            if self.connection:
-                self.connection.rollback()
-                print("ROLLBACK ejecutado")
-
-        finally:
-            if self.connection:
-                self.connection.close()
-                print("Conexión cerrada")
-
-
-# EJECUCIÓN
-
-def main():
-    loader = DWLoader()
-    loader.run()
-
-if __name__ == "__main__":
-    main()
+from datetime import datetime
+
+from backends import get_backend
+from db_session import load_config
+from manifest import Manifest, ORDEN_SP_STG_TO_INT, SP_POR_ARCHIVO, carpeta_dataset, sps_para
+from metricas import get_metricas, ultimo_id_proceso
+from rechazos import sincronizar_topes
+from planificador import (
+    GRAFO_STG_TO_INT, TABLAS_INT, Planificador, finalizar_proceso, iniciar_proceso, marcar_error,
+    paralelo_configurado, paso_sp,
+)
+
+class DWLoader:
+    def __init__(self, config_file='config.ini'):
+        # config.ini se lee una sola vez por proceso (db_session)
+        self.config = load_config(config_file)
+        self.config_file = config_file
+        self.connection = None
+        # SQL Server (SP_Orquestador_STG_to_INT) o el motor local, según [BACKEND]
+        self.backend = get_backend(config_file)
+        # Solo se transforman los archivos que cambiaron desde el último STG -> INT
+        self.manifest = Manifest(carpeta_dataset(self.config), self.backend.destino, config_file)
+        # Duración y filas por SP (ETL_Control_Detalle) y archivo de métricas de la corrida
+        self.metricas = get_metricas(config_file)
+        # 1 = SP_Orquestador_STG_to_INT (en serie) | >1 = SPs en paralelo (planificador.py)
+        self.paralelo = paralelo_configurado(self.config, self.backend)
+
+    def connect_db(self):
+        """Tomar una conexión del backend (se reutiliza si ya hay una abierta)"""
+        if self.connection is not None:
+            return
+        try:
+            if self.backend.nombre == 'sqlserver':
+                server = self.config.get('DATABASE', 'server').strip()
+                database = self.config.get('DATABASE', 'database').strip()
+                print(f"Conectando a {server} | BD: {database}")
+            else:
+                print(f"Conectando a motor local {self.backend.nombre} | {self.backend.ruta}")
+            self.connection = self.backend.connect()
+            print("Conexión exitosa")
+        except Exception as e:
+            print(f"Error de conexión: {e}")
+            raise
+
+    def run_orchestrator(self, procesos=None):
+        """Ejecuta el SP orquestador STG -> INT (procesos=None: todos los SP)"""
+        print("\nEjecutando SP_Orquestador_STG_to_INT...\n")
+
+        try:
+            # El backend consume todos los result sets y devuelve los mensajes PRINT
+            for mensaje in self.backend.run_stg_to_int(self.connection, procesos):
+                print(mensaje)
+
+            print("SP_Orquestador_STG_to_INT ejecutado correctamente")
+
+        except Exception as e:
+            print(f"Error al ejecutar el orquestador: {e}")
+            raise
+
+    def run_planificado(self, procesos=None):
+        """Los SP_STG_to_INT_* en paralelo, cada uno en su conexión (procesos=None: todos)"""
+        print(f"\nEjecutando SP_STG_to_INT_* con el planificador ({self.paralelo} en paralelo)...\n")
+        id_proceso = iniciar_proceso(self.backend, 'STG_to_INT_Completo')
+        planificador = Planificador(GRAFO_STG_TO_INT, paso_sp(self.backend, id_proceso), self.paralelo)
+        try:
+            planificador.run(procesos)
+        except Exception as e:
+            marcar_error(self.backend, id_proceso, e)
+            print(f"Error en el planificador STG -> INT: {e}")
+            raise
+        finalizar_proceso(self.backend, id_proceso, TABLAS_INT)
+        planificador.resumen()
+
+    def registrar_metricas(self, inicio, fin):
+        """
+        Conteos por SP tal como los registró cada uno en ETL_Control_Detalle (no se
+        interpretan los PRINT) y el total de la etapa medido desde acá.
+        """
+        cursor = self.connection.cached_cursor()
+        id_proceso = ultimo_id_proceso(cursor, 'STG_to_INT_Completo')
+        self.metricas.leer_detalle(cursor, id_proceso)
+        total = self.metricas.registrar_total('STG_to_INT', inicio, fin, id_proceso)
+        self.metricas.guardar_detalle(cursor, [total])
+
+    def run(self):
+        """Carga STG -> INT. Devuelve False si falló."""
+        try:
+            archivos = list(SP_POR_ARCHIVO)
+            pendientes = self.manifest.pendientes('int', archivos)
+            self.manifest.log_omitidos('int', archivos, pendientes)
+            if not pendientes:
+                print("\nSin cambios en STAGING desde la última corrida: se omite STG → INT")
+                return True
+
+            procesos = sps_para(pendientes)
+            # Topes de [RECHAZOS] para los SP (en su propia conexión, antes de tomar la del loader)
+            sincronizar_topes(self.backend, self.config)
+            self.connect_db()
+            inicio = datetime.now()
+            procesos = None if procesos == ORDEN_SP_STG_TO_INT else procesos
+            if self.paralelo > 1:
+                self.run_planificado(procesos)
+            else:
+                self.run_orchestrator(procesos)
+            self.registrar_metricas(inicio, datetime.now())
+
+            self.connection.commit()
+            self.manifest.confirmar('int', pendientes)
+            self.metricas.resumen('STG_to_INT')
+            self.metricas.escribir()
+            print("\nCARGA STG → INT COMPLETADA EXITOSAMENTE")
+            return True
+
+        except Exception as e:
+            print(f"\nERROR FATAL: {e}")
+            if self.connection:
+                self.connection.rollback()
+                print("ROLLBACK ejecutado")
+            return False
+
+        finally:
+            if self.connection:
+                # Devuelve la conexión al pool para la siguiente etapa
+                self.connection.close()
+                self.connection = None
+                print("Conexión devuelta al pool")
+
+
+# EJECUCIÓN
+
+def main():
+    loader = DWLoader()
+    loader.run()
+
+if __name__ == "__main__":
+    main()
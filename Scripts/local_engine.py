@@ -0,0 +1,1482 @@
+"""
+Motor local embebido (SQLite) para correr STG -> INT -> DW sin SQL Server.
+
+Reproduce los esquemas de SQLQuerySTAGING.sql, SQLQueryINT.sql y SQLQueryCreateDW.sql y
+las mismas reglas de los Stored Procedures (validaciones, claves sustitutas y rechazos),
+para poder medir el pipeline completo en una notebook o en CI.
+
+Diferencias conocidas con SQL Server:
+    - TRY_CAST se emula con funciones Python (try_date, try_int, try_dec); una fecha vacía
+      es inválida (en SQL Server TRY_CAST('' AS DATE) devuelve 1900-01-01).
+    - DECIMAL(18,2) se guarda como REAL redondeado a 2 decimales.
+    - Semana_ISO de Dim_Tiempo es la semana ISO real (el SP usa DATEPART(WEEK)).
+"""
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from calendario import INSERT_DIM_TIEMPO, calendario, filas
+from rechazos import MOTIVOS
+
+
+# Tipos Python -> SQLite (Decimal como texto para no perder precisión al insertar en STG)
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(sep=' '))
+
+AHORA = "datetime('now', 'localtime')"
+
+_ENTERO = re.compile(r'^[+-]?\d+$')
+
+
+# ----------------------------------------------------------------------
+# Emulación de TRY_CAST
+def try_date(valor):
+    """TRY_CAST(valor AS DATE) -> 'YYYY-MM-DD' o None."""
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    for formato in ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y%m%d'):
+        try:
+            return datetime.strptime(texto, formato).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def try_int(valor):
+    """TRY_CAST(valor AS INT) -> int o None (sin decimales, rango de 32 bits)."""
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    if not _ENTERO.match(texto):
+        return None
+    numero = int(texto)
+    return numero if -2**31 <= numero < 2**31 else None
+
+
+def try_dec(valor):
+    """TRY_CAST(REPLACE(valor, ',', '.') AS DECIMAL(18,2)) -> float o None."""
+    if valor is None:
+        return None
+    try:
+        numero = Decimal(str(valor).strip().replace(',', '.'))
+    except InvalidOperation:
+        return None
+    if not numero.is_finite() or abs(numero) >= Decimal('1e16'):
+        return None
+    return float(numero.quantize(Decimal('0.01')))
+
+
+# ----------------------------------------------------------------------
+# Esquema STG / INT / DW / Control
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS STG_EstadoDelPedido (
+    CodEstado TEXT, Descripcion_Estado TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS STG_Almacenes (
+    CodAlmacen TEXT, Nombre_Almacen TEXT, Ubicacion TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS STG_Clientes (
+    CodCliente TEXT, RazonSocial TEXT, Telefono TEXT, Mail TEXT, Direccion TEXT,
+    Localidad TEXT, Provincia TEXT, CP TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS STG_Productos (
+    CodigoProducto TEXT, Descripcion TEXT, Categoria TEXT, Marca TEXT,
+    PrecioCosto TEXT, PrecioVentaSugerido TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS STG_Tiendas (
+    CodigoTienda TEXT, Descripcion TEXT, Direccion TEXT, Localidad TEXT,
+    Provincia TEXT, CP TEXT, TipoTienda TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS STG_Ventas (
+    FechaVenta TEXT, CodigoProducto TEXT, Producto TEXT, Cantidad TEXT, PrecioVenta TEXT,
+    CodigoCliente TEXT, Cliente TEXT, CodigoTienda TEXT, Tienda TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime')),
+    CodVenta TEXT
+);
+CREATE TABLE IF NOT EXISTS STG_Ventas_Add (
+    FechaVenta TEXT, CodigoProducto TEXT, Producto TEXT, Cantidad TEXT, PrecioVenta TEXT,
+    CodigoCliente TEXT, Cliente TEXT, CodigoTienda TEXT, Tienda TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime')),
+    CodVenta TEXT
+);
+CREATE TABLE IF NOT EXISTS STG_Entregas (
+    CodEntrega TEXT, CodVenta TEXT, CodProveedor TEXT, Proveedor TEXT, CodAlmacen TEXT,
+    Almacen TEXT, CodEstado TEXT, Estado TEXT, Fecha_Envio TEXT, Fecha_Entrega TEXT,
+    Fecha_Carga TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS INT_EstadoPedido (
+    CodEstado TEXT NOT NULL PRIMARY KEY,
+    Descripcion_Estado TEXT NOT NULL,
+    Tipo_Estado TEXT NOT NULL,
+    Orden_Secuencia INTEGER NOT NULL,
+    EsEstadoFinal INTEGER NOT NULL DEFAULT 0,
+    Fecha_Proceso TEXT, ID_Proceso INTEGER
+);
+CREATE TABLE IF NOT EXISTS INT_Almacen (
+    CodAlmacen TEXT NOT NULL PRIMARY KEY,
+    NombreAlmacen TEXT NOT NULL, Ubicacion TEXT NOT NULL,
+    Ciudad TEXT, Provincia TEXT, CodigoPostal TEXT, TipoAlmacen TEXT, Activo INTEGER DEFAULT 1,
+    Fecha_Proceso TEXT, ID_Proceso INTEGER
+);
+CREATE TABLE IF NOT EXISTS INT_Cliente (
+    CodCliente TEXT NOT NULL PRIMARY KEY,
+    RazonSocial TEXT NOT NULL, Telefono TEXT, Mail TEXT, Direccion TEXT,
+    Localidad TEXT NOT NULL, Provincia TEXT NOT NULL, CP TEXT,
+    Fecha_Proceso TEXT, ID_Proceso INTEGER
+);
+CREATE TABLE IF NOT EXISTS INT_Producto (
+    CodigoProducto TEXT NOT NULL PRIMARY KEY,
+    Descripcion TEXT NOT NULL, Categoria TEXT NOT NULL, Marca TEXT NOT NULL,
+    PrecioCosto REAL NOT NULL DEFAULT 0, PrecioVentaSugerido REAL NOT NULL DEFAULT 0,
+    Fecha_Proceso TEXT, ID_Proceso INTEGER
+);
+CREATE TABLE IF NOT EXISTS INT_Tienda (
+    CodigoTienda TEXT NOT NULL PRIMARY KEY,
+    Descripcion TEXT NOT NULL, Direccion TEXT, Localidad TEXT NOT NULL,
+    Provincia TEXT NOT NULL, CP TEXT, TipoTienda TEXT NOT NULL,
+    Fecha_Proceso TEXT, ID_Proceso INTEGER
+);
+CREATE TABLE IF NOT EXISTS INT_Proveedor (
+    CodProveedor TEXT NOT NULL PRIMARY KEY,
+    NombreProveedor TEXT NOT NULL, TipoServicio TEXT, Activo INTEGER DEFAULT 1,
+    Fecha_Proceso TEXT, ID_Proceso INTEGER
+);
+CREATE TABLE IF NOT EXISTS INT_Ventas (
+    ID_INT INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodVenta INTEGER,
+    FechaVenta TEXT NOT NULL,
+    CodigoProducto TEXT NOT NULL, CodigoCliente TEXT NOT NULL, CodigoTienda TEXT NOT NULL,
+    Cantidad INTEGER NOT NULL CHECK (Cantidad > 0),
+    PrecioVenta REAL NOT NULL CHECK (PrecioVenta >= 0),
+    Total_IVA REAL NOT NULL,
+    Fecha_Proceso TEXT, ID_Proceso INTEGER
+);
+CREATE INDEX IF NOT EXISTS IDX_INT_Ventas_Fecha ON INT_Ventas(FechaVenta);
+CREATE TABLE IF NOT EXISTS INT_Entregas (
+    ID_INT INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodEntrega TEXT NOT NULL UNIQUE,
+    CodVenta INTEGER,
+    CodProveedor TEXT NOT NULL, CodAlmacen TEXT NOT NULL, CodEstado TEXT NOT NULL,
+    Fecha_Envio TEXT NOT NULL, Fecha_Entrega TEXT, FechaEstimadaEntrega TEXT,
+    CantidadProductos INTEGER NOT NULL DEFAULT 1 CHECK (CantidadProductos > 0),
+    PesoKg REAL, VolumenM3 REAL, DistanciaKm REAL,
+    CostoEntrega REAL NOT NULL DEFAULT 0 CHECK (CostoEntrega >= 0),
+    Fecha_Proceso TEXT, ID_Proceso INTEGER,
+    CHECK (Fecha_Entrega IS NULL OR Fecha_Entrega >= Fecha_Envio)
+);
+CREATE INDEX IF NOT EXISTS IDX_INT_Entregas_CodVenta ON INT_Entregas(CodVenta);
+
+CREATE TABLE IF NOT EXISTS ETL_Control_Procesos (
+    ID_Proceso INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nombre_Proceso TEXT NOT NULL,
+    Fecha_Inicio TEXT NOT NULL,
+    Fecha_Fin TEXT,
+    Estado TEXT NOT NULL,
+    Registros_Procesados INTEGER, Registros_Insertados INTEGER,
+    Registros_Actualizados INTEGER, Registros_Rechazados INTEGER,
+    Mensaje_Error TEXT,
+    Usuario_Ejecucion TEXT DEFAULT 'local'
+);
+CREATE TABLE IF NOT EXISTS ETL_Registros_Rechazados (
+    ID_Rechazo INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Proceso INTEGER NOT NULL REFERENCES ETL_Control_Procesos(ID_Proceso),
+    Tabla_Origen TEXT NOT NULL,
+    Registro_Original TEXT NOT NULL,
+    Motivo_Rechazo TEXT NOT NULL,
+    Fecha_Rechazo TEXT DEFAULT (datetime('now', 'localtime')),
+    Codigo_Motivo INTEGER
+);
+CREATE INDEX IF NOT EXISTS IDX_ETL_Rechazos_Proceso ON ETL_Registros_Rechazados(ID_Proceso);
+CREATE TABLE IF NOT EXISTS ETL_Rechazos_Motivos (
+    Codigo_Motivo INTEGER PRIMARY KEY,
+    Descripcion TEXT NOT NULL,
+    Tope INTEGER
+);
+CREATE TABLE IF NOT EXISTS ETL_Rechazos_Resumen (
+    ID_Proceso INTEGER NOT NULL,
+    Tabla_Origen TEXT NOT NULL,
+    Codigo_Motivo INTEGER NOT NULL,
+    Cantidad INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IDX_ETL_Rechazos_Resumen_Proceso ON ETL_Rechazos_Resumen(ID_Proceso);
+CREATE TABLE IF NOT EXISTS ETL_Control_Detalle (
+    ID_Detalle INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Proceso INTEGER NOT NULL REFERENCES ETL_Control_Procesos(ID_Proceso),
+    Etapa TEXT NOT NULL,
+    Paso TEXT NOT NULL,
+    Fecha_Inicio TEXT NOT NULL,
+    Fecha_Fin TEXT NOT NULL,
+    Duracion_Seg REAL NOT NULL,
+    Filas_Entrada INTEGER, Filas_Salida INTEGER, Filas_Rechazadas INTEGER,
+    Filas_Seg REAL
+);
+CREATE INDEX IF NOT EXISTS IDX_ETL_Detalle_Proceso ON ETL_Control_Detalle(ID_Proceso);
+CREATE TABLE IF NOT EXISTS ETL_Watermark (
+    Tabla TEXT NOT NULL PRIMARY KEY,
+    Ultimo_Tiempo_Key INTEGER NOT NULL,
+    Ultima_Fecha TEXT NOT NULL,
+    ID_Proceso INTEGER,
+    Fecha_Actualizacion TEXT DEFAULT (datetime('now', 'localtime')),
+    Ultimo_CodVenta INTEGER
+);
+CREATE TABLE IF NOT EXISTS ETL_Reproceso_Meses (
+    ID_Proceso INTEGER NOT NULL,
+    Tabla TEXT NOT NULL,
+    AnioMes INTEGER NOT NULL,
+    Fecha_Registro TEXT DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (ID_Proceso, Tabla, AnioMes)
+);
+
+CREATE TABLE IF NOT EXISTS Dim_Tiempo (
+    Tiempo_Key INTEGER NOT NULL PRIMARY KEY,
+    Fecha TEXT NOT NULL UNIQUE,
+    Anio INTEGER NOT NULL, Mes INTEGER NOT NULL, Dia INTEGER NOT NULL,
+    Mes_Nombre TEXT NOT NULL, Mes_Nombre_Corto TEXT NOT NULL, Mes_Anio TEXT NOT NULL,
+    Semana_ISO INTEGER NOT NULL, Anio_ISO INTEGER NOT NULL, Dia_Semana_ISO INTEGER NOT NULL,
+    Dia_Nombre TEXT NOT NULL, Es_Fin_Semana INTEGER NOT NULL,
+    Trimestre INTEGER NOT NULL, Trimestre_Nombre TEXT NOT NULL, Semestre INTEGER NOT NULL,
+    Es_Feriado INTEGER NOT NULL DEFAULT 0, Es_Dia_Laboral INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS Dim_Producto (
+    ID_Producto INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodigoProducto TEXT NOT NULL UNIQUE,
+    Descripcion TEXT NOT NULL, Categoria TEXT NOT NULL, Marca TEXT NOT NULL,
+    PrecioCosto REAL NOT NULL DEFAULT 0, PrecioVentaSugerido REAL NOT NULL DEFAULT 0,
+    FechaCreacion TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS Dim_Cliente (
+    ID_Cliente INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodigoCliente TEXT NOT NULL UNIQUE,
+    RazonSocial TEXT NOT NULL, Telefono TEXT, Mail TEXT, Direccion TEXT,
+    Localidad TEXT NOT NULL, Provincia TEXT NOT NULL, CP TEXT,
+    FechaCreacion TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS Dim_Tienda (
+    ID_Tienda INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodigoTienda TEXT NOT NULL UNIQUE,
+    Descripcion TEXT NOT NULL, Direccion TEXT, Localidad TEXT NOT NULL,
+    Provincia TEXT NOT NULL, CP TEXT, TipoTienda TEXT NOT NULL,
+    FechaCreacion TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS Dim_EstadoPedido (
+    ID_Estado INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodigoEstado TEXT NOT NULL UNIQUE,
+    Descripcion_Estado TEXT NOT NULL, Tipo_Estado TEXT NOT NULL,
+    Orden_Secuencia INTEGER NOT NULL, EsEstadoFinal INTEGER DEFAULT 0,
+    FechaCreacion TEXT, FechaModificacion TEXT
+);
+CREATE TABLE IF NOT EXISTS Dim_Proveedor (
+    ID_Proveedor INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodigoProveedor TEXT NOT NULL UNIQUE,
+    NombreProveedor TEXT NOT NULL, TipoServicio TEXT, Telefono TEXT, Mail TEXT,
+    CostoPromedioPorKm REAL, CalificacionPromedio REAL, TiempoPromedioEntrega INTEGER,
+    Activo INTEGER DEFAULT 1, FechaCreacion TEXT, FechaModificacion TEXT
+);
+CREATE TABLE IF NOT EXISTS Dim_Almacen (
+    ID_Almacen INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodigoAlmacen TEXT NOT NULL UNIQUE,
+    NombreAlmacen TEXT NOT NULL, Ubicacion TEXT NOT NULL, Ciudad TEXT, Provincia TEXT,
+    CodigoPostal TEXT, CapacidadM3 REAL, TipoAlmacen TEXT, Activo INTEGER DEFAULT 1,
+    FechaCreacion TEXT, FechaModificacion TEXT
+);
+CREATE TABLE IF NOT EXISTS Fact_Ventas (
+    ID_Venta INTEGER PRIMARY KEY AUTOINCREMENT,
+    Tiempo_Key INTEGER NOT NULL REFERENCES Dim_Tiempo(Tiempo_Key),
+    ID_Producto INTEGER NOT NULL REFERENCES Dim_Producto(ID_Producto),
+    ID_Cliente INTEGER NOT NULL REFERENCES Dim_Cliente(ID_Cliente),
+    ID_Tienda INTEGER NOT NULL REFERENCES Dim_Tienda(ID_Tienda),
+    Cantidad INTEGER NOT NULL CHECK (Cantidad > 0),
+    PrecioVenta REAL NOT NULL CHECK (PrecioVenta >= 0),
+    Total_IVA REAL NOT NULL,
+    FechaCarga TEXT DEFAULT (datetime('now', 'localtime')),
+    CodVenta INTEGER
+);
+CREATE INDEX IF NOT EXISTS IDX_Fecha ON Fact_Ventas (Tiempo_Key);
+CREATE TABLE IF NOT EXISTS Fact_Entregas (
+    ID_Entrega INTEGER PRIMARY KEY AUTOINCREMENT,
+    CodigoEntrega TEXT NOT NULL UNIQUE,
+    ID_Venta INTEGER NOT NULL REFERENCES Fact_Ventas(ID_Venta),
+    Tiempo_Key_Envio INTEGER NOT NULL,
+    Tiempo_Key_Entrega INTEGER,
+    ID_Proveedor INTEGER NOT NULL, ID_Almacen INTEGER NOT NULL, ID_Estado INTEGER NOT NULL,
+    ID_Cliente INTEGER NOT NULL, ID_Tienda INTEGER NOT NULL,
+    CantidadProductos INTEGER NOT NULL CHECK (CantidadProductos > 0),
+    PesoKg REAL, VolumenM3 REAL, DistanciaKm REAL,
+    CostoEntrega REAL NOT NULL DEFAULT 0,
+    FechaEstimadaEntrega TEXT, Observaciones TEXT,
+    FechaCarga TEXT DEFAULT (datetime('now', 'localtime')),
+    FechaActualizacion TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS IDX_Entregas_Venta ON Fact_Entregas (ID_Venta);
+CREATE INDEX IF NOT EXISTS IDX_Ventas_FechaCarga ON Fact_Ventas (FechaCarga);
+CREATE INDEX IF NOT EXISTS IDX_Entregas_FechaCarga ON Fact_Entregas (FechaCarga);
+CREATE TABLE IF NOT EXISTS Agg_Ventas_Mes (
+    AnioMes INTEGER NOT NULL, Anio INTEGER NOT NULL, Mes INTEGER NOT NULL,
+    ID_Producto INTEGER NOT NULL, ID_Tienda INTEGER NOT NULL,
+    Cant_Ventas INTEGER NOT NULL, Cantidad INTEGER NOT NULL, Importe REAL NOT NULL, Total_IVA REAL NOT NULL,
+    FechaActualizacion TEXT DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (AnioMes, ID_Producto, ID_Tienda)
+);
+CREATE TABLE IF NOT EXISTS Agg_Entregas_Mes (
+    AnioMes INTEGER NOT NULL, Anio INTEGER NOT NULL, Mes INTEGER NOT NULL,
+    ID_Proveedor INTEGER NOT NULL, ID_Almacen INTEGER NOT NULL, ID_Estado INTEGER NOT NULL,
+    Cant_Entregas INTEGER NOT NULL, Cantidad_Productos INTEGER NOT NULL, Costo_Entrega REAL NOT NULL,
+    Entregas_Entregadas INTEGER NOT NULL, Entregas_A_Tiempo INTEGER NOT NULL,
+    FechaActualizacion TEXT DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (AnioMes, ID_Proveedor, ID_Almacen, ID_Estado)
+);
+"""
+
+# Columnas agregadas después de crear el esquema: CREATE TABLE IF NOT EXISTS no las suma a
+# una base local existente (van al final, como el ALTER TABLE de los scripts de SQL Server)
+COLUMNAS_AGREGADAS = [
+    ('STG_Ventas', 'CodVenta', 'TEXT'),
+    ('STG_Ventas_Add', 'CodVenta', 'TEXT'),
+    ('INT_Ventas', 'CodVenta', 'INTEGER'),
+    ('Fact_Ventas', 'CodVenta', 'INTEGER'),
+    ('ETL_Registros_Rechazados', 'Codigo_Motivo', 'INTEGER'),
+    ('ETL_Watermark', 'Ultimo_CodVenta', 'INTEGER'),
+]
+
+# Rechazos de cada paso (por conexión) antes de contarlos y muestrearlos (SP_ETL_Registrar_Rechazos)
+RECHAZOS_TEMP = """
+CREATE TEMP TABLE IF NOT EXISTS Rechazos (
+    Tabla_Origen TEXT NOT NULL,
+    Registro_Original TEXT NOT NULL,
+    Codigo_Motivo INTEGER NOT NULL,
+    Motivo_Rechazo TEXT
+)
+"""
+
+# Conteo por tabla y código, y como mucho Tope filas al azar por tabla y código (NULL = todas)
+RECHAZOS_RESUMEN = """
+    INSERT INTO ETL_Rechazos_Resumen (ID_Proceso, Tabla_Origen, Codigo_Motivo, Cantidad)
+    SELECT :id_proceso, Tabla_Origen, Codigo_Motivo, COUNT(*)
+    FROM temp.Rechazos
+    GROUP BY Tabla_Origen, Codigo_Motivo
+"""
+
+RECHAZOS_MUESTRA = """
+    INSERT INTO ETL_Registros_Rechazados (ID_Proceso, Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
+    SELECT :id_proceso, r.Tabla_Origen, r.Registro_Original, r.Codigo_Motivo,
+           IFNULL(r.Motivo_Rechazo, '[' || r.Codigo_Motivo || '] ' || IFNULL(m.Descripcion, ''))
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY Tabla_Origen, Codigo_Motivo ORDER BY random()) AS Orden
+        FROM temp.Rechazos
+    ) r
+    LEFT JOIN ETL_Rechazos_Motivos m ON m.Codigo_Motivo = r.Codigo_Motivo
+    WHERE m.Tope IS NULL OR r.Orden <= m.Tope
+"""
+
+INDICES_AGREGADOS = """
+CREATE INDEX IF NOT EXISTS IDX_INT_Ventas_CodVenta ON INT_Ventas(CodVenta);
+CREATE UNIQUE INDEX IF NOT EXISTS IDX_Ventas_CodVenta ON Fact_Ventas (CodVenta) WHERE CodVenta IS NOT NULL;
+"""
+
+
+# ----------------------------------------------------------------------
+# Transformaciones STG -> INT (equivalentes a SP_STG_to_INT_*)
+STG_TO_INT = [
+    ('SP_STG_to_INT_EstadoPedido', 'INT_EstadoPedido', f"""
+        INSERT INTO INT_EstadoPedido (
+            CodEstado, Descripcion_Estado, Tipo_Estado, Orden_Secuencia, EsEstadoFinal,
+            Fecha_Proceso, ID_Proceso
+        )
+        SELECT DISTINCT
+            UPPER(TRIM(CodEstado)),
+            TRIM(Descripcion_Estado),
+            CASE
+                WHEN LOWER(Descripcion_Estado) LIKE '%entregad%'
+                  OR LOWER(Descripcion_Estado) LIKE '%completad%' THEN 'Completado'
+                WHEN LOWER(Descripcion_Estado) LIKE '%cancelad%'
+                  OR LOWER(Descripcion_Estado) LIKE '%devuelt%' THEN 'Cancelado'
+                ELSE 'En Proceso'
+            END,
+            CASE
+                WHEN LOWER(Descripcion_Estado) LIKE '%preparaci%' THEN 1
+                WHEN LOWER(Descripcion_Estado) LIKE '%empaqu%' THEN 2
+                WHEN LOWER(Descripcion_Estado) LIKE '%despach%'
+                  OR LOWER(Descripcion_Estado) LIKE '%env%' THEN 3
+                WHEN LOWER(Descripcion_Estado) LIKE '%tr%nsito%'
+                  OR LOWER(Descripcion_Estado) LIKE '%camino%' THEN 4
+                WHEN LOWER(Descripcion_Estado) LIKE '%entregad%' THEN 5
+                WHEN LOWER(Descripcion_Estado) LIKE '%devuelt%' THEN 6
+                WHEN LOWER(Descripcion_Estado) LIKE '%cancelad%' THEN 7
+                ELSE 99
+            END,
+            CASE
+                WHEN LOWER(Descripcion_Estado) LIKE '%entregad%'
+                  OR LOWER(Descripcion_Estado) LIKE '%cancelad%'
+                  OR LOWER(Descripcion_Estado) LIKE '%devuelt%' THEN 1
+                ELSE 0
+            END,
+            {AHORA}, :id_proceso
+        FROM STG_EstadoDelPedido
+        WHERE CodEstado IS NOT NULL AND TRIM(CodEstado) <> ''
+          AND Descripcion_Estado IS NOT NULL AND TRIM(Descripcion_Estado) <> ''
+    """, """
+        INSERT INTO temp.Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
+        SELECT
+            'STG_EstadoDelPedido',
+            'CodEstado: ' || IFNULL(CodEstado, 'NULL') || ', Descripcion: ' || IFNULL(Descripcion_Estado, 'NULL'),
+            CASE WHEN CodEstado IS NULL OR TRIM(CodEstado) = '' THEN 30 ELSE 31 END,
+            CASE
+                WHEN CodEstado IS NULL OR TRIM(CodEstado) = '' THEN 'CodEstado nulo o vacío (STG)'
+                ELSE 'Descripcion_Estado nulo o vacío'
+            END
+        FROM STG_EstadoDelPedido
+        WHERE CodEstado IS NULL OR TRIM(CodEstado) = ''
+           OR Descripcion_Estado IS NULL OR TRIM(Descripcion_Estado) = ''
+    """),
+
+    ('SP_STG_to_INT_Almacen', 'INT_Almacen', f"""
+        INSERT INTO INT_Almacen (
+            CodAlmacen, NombreAlmacen, Ubicacion, Ciudad, Provincia, CodigoPostal,
+            TipoAlmacen, Activo, Fecha_Proceso, ID_Proceso
+        )
+        SELECT DISTINCT
+            UPPER(TRIM(CodAlmacen)),
+            TRIM(Nombre_Almacen),
+            TRIM(Ubicacion),
+            CASE WHEN instr(Ubicacion, ',') > 0
+                 THEN TRIM(substr(Ubicacion, 1, instr(Ubicacion, ',') - 1)) END,
+            CASE WHEN instr(Ubicacion, ',') > 0
+                 THEN TRIM(substr(Ubicacion, instr(Ubicacion, ',') + 1))
+                 ELSE TRIM(Ubicacion) END,
+            NULL, 'Principal', 1,
+            {AHORA}, :id_proceso
+        FROM STG_Almacenes
+        WHERE CodAlmacen IS NOT NULL AND TRIM(CodAlmacen) <> ''
+          AND Nombre_Almacen IS NOT NULL AND TRIM(Nombre_Almacen) <> ''
+    """, """
+        INSERT INTO temp.Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
+        SELECT
+            'STG_Almacenes',
+            'CodAlmacen: ' || IFNULL(CodAlmacen, 'NULL') || ', Nombre: ' || IFNULL(Nombre_Almacen, 'NULL'),
+            32, 'Campos críticos nulos o vacíos'
+        FROM STG_Almacenes
+        WHERE CodAlmacen IS NULL OR TRIM(CodAlmacen) = ''
+           OR Nombre_Almacen IS NULL OR TRIM(Nombre_Almacen) = ''
+    """),
+
+    ('SP_STG_to_INT_Cliente', 'INT_Cliente', f"""
+        INSERT INTO INT_Cliente (
+            CodCliente, RazonSocial, Telefono, Mail, Direccion,
+            Localidad, Provincia, CP, Fecha_Proceso, ID_Proceso
+        )
+        SELECT DISTINCT
+            UPPER(TRIM(CodCliente)),
+            TRIM(RazonSocial),
+            NULLIF(TRIM(Telefono), ''),
+            NULLIF(TRIM(LOWER(Mail)), ''),
+            NULLIF(TRIM(Direccion), ''),
+            TRIM(Localidad),
+            UPPER(TRIM(Provincia)),
+            NULLIF(TRIM(CP), ''),
+            {AHORA}, :id_proceso
+        FROM STG_Clientes
+        WHERE CodCliente IS NOT NULL AND TRIM(CodCliente) <> ''
+          AND RazonSocial IS NOT NULL AND TRIM(RazonSocial) <> ''
+          AND Localidad IS NOT NULL AND TRIM(Localidad) <> ''
+          AND Provincia IS NOT NULL AND TRIM(Provincia) <> ''
+    """, None),
+
+    ('SP_STG_to_INT_Producto', 'INT_Producto', f"""
+        INSERT INTO INT_Producto (
+            CodigoProducto, Descripcion, Categoria, Marca,
+            PrecioCosto, PrecioVentaSugerido, Fecha_Proceso, ID_Proceso
+        )
+        SELECT DISTINCT
+            UPPER(TRIM(CodigoProducto)),
+            TRIM(Descripcion),
+            UPPER(TRIM(Categoria)),
+            UPPER(TRIM(Marca)),
+            CASE WHEN try_dec(PrecioCosto) IS NULL OR try_dec(PrecioCosto) < 0 THEN 0
+                 ELSE try_dec(PrecioCosto) END,
+            CASE WHEN try_dec(PrecioVentaSugerido) IS NULL OR try_dec(PrecioVentaSugerido) < 0 THEN 0
+                 ELSE try_dec(PrecioVentaSugerido) END,
+            {AHORA}, :id_proceso
+        FROM STG_Productos
+        WHERE CodigoProducto IS NOT NULL AND TRIM(CodigoProducto) <> ''
+          AND Descripcion IS NOT NULL AND TRIM(Descripcion) <> ''
+          AND Categoria IS NOT NULL AND TRIM(Categoria) <> ''
+          AND Marca IS NOT NULL AND TRIM(Marca) <> ''
+    """, None),
+
+    ('SP_STG_to_INT_Tienda', 'INT_Tienda', f"""
+        INSERT INTO INT_Tienda (
+            CodigoTienda, Descripcion, Direccion, Localidad,
+            Provincia, CP, TipoTienda, Fecha_Proceso, ID_Proceso
+        )
+        SELECT DISTINCT
+            UPPER(TRIM(CodigoTienda)),
+            TRIM(Descripcion),
+            NULLIF(TRIM(Direccion), ''),
+            TRIM(Localidad),
+            UPPER(TRIM(Provincia)),
+            NULLIF(TRIM(CP), ''),
+            UPPER(TRIM(TipoTienda)),
+            {AHORA}, :id_proceso
+        FROM STG_Tiendas
+        WHERE CodigoTienda IS NOT NULL AND TRIM(CodigoTienda) <> ''
+          AND Descripcion IS NOT NULL AND TRIM(Descripcion) <> ''
+          AND Localidad IS NOT NULL AND TRIM(Localidad) <> ''
+          AND Provincia IS NOT NULL AND TRIM(Provincia) <> ''
+          AND TipoTienda IS NOT NULL AND TRIM(TipoTienda) <> ''
+    """, None),
+
+    # Proveedor no trunca INT_Proveedor: solo agrega códigos nuevos
+    ('SP_STG_to_INT_Proveedor', None, f"""
+        INSERT INTO INT_Proveedor (
+            CodProveedor, NombreProveedor, TipoServicio, Activo, Fecha_Proceso, ID_Proceso
+        )
+        SELECT CodProveedor, MAX(NombreProveedor), 'Estándar', 1, {AHORA}, :id_proceso
+        FROM (
+            SELECT CAST(try_int(CodProveedor) AS TEXT) AS CodProveedor,
+                   UPPER(TRIM(Proveedor)) AS NombreProveedor
+            FROM STG_Entregas
+            WHERE CodProveedor IS NOT NULL AND Proveedor IS NOT NULL
+              AND TRIM(CodProveedor) <> ''
+        ) s
+        WHERE NOT EXISTS (SELECT 1 FROM INT_Proveedor p WHERE p.CodProveedor = s.CodProveedor)
+        GROUP BY CodProveedor
+    """, None),
+
+    ('SP_STG_to_INT_Ventas', 'INT_Ventas', f"""
+        INSERT INTO INT_Ventas (
+            CodVenta, FechaVenta, CodigoProducto, CodigoCliente, CodigoTienda,
+            Cantidad, PrecioVenta, Total_IVA, Fecha_Proceso, ID_Proceso
+        )
+        SELECT
+            try_int(CodVenta),
+            try_date(FechaVenta),
+            UPPER(TRIM(CodigoProducto)),
+            UPPER(TRIM(CodigoCliente)),
+            UPPER(TRIM(CodigoTienda)),
+            try_int(Cantidad),
+            try_dec(PrecioVenta),
+            ROUND(try_dec(PrecioVenta) * try_int(Cantidad) * 0.21, 2),
+            {AHORA}, :id_proceso
+        FROM (
+            SELECT * FROM STG_Ventas
+            UNION ALL
+            SELECT * FROM STG_Ventas_Add
+        )
+        WHERE try_date(FechaVenta) IS NOT NULL
+          AND CodigoProducto IS NOT NULL AND TRIM(CodigoProducto) <> ''
+          AND CodigoCliente IS NOT NULL AND TRIM(CodigoCliente) <> ''
+          AND CodigoTienda IS NOT NULL AND TRIM(CodigoTienda) <> ''
+          AND try_int(Cantidad) > 0
+          AND try_dec(PrecioVenta) >= 0
+    """, """
+        INSERT INTO temp.Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo)
+        SELECT
+            Tabla_Origen,
+            'Fecha=' || IFNULL(FechaVenta, 'NULL') || ' | Producto=' || IFNULL(CodigoProducto, 'NULL'),
+            -- Primera regla incumplida, con los códigos de validacion.py
+            CASE
+                WHEN try_date(FechaVenta) IS NULL THEN 10
+                WHEN CodigoProducto IS NULL OR TRIM(CodigoProducto) = '' THEN 11
+                WHEN CodigoCliente IS NULL OR TRIM(CodigoCliente) = '' THEN 12
+                WHEN CodigoTienda IS NULL OR TRIM(CodigoTienda) = '' THEN 13
+                WHEN try_int(Cantidad) IS NULL OR try_int(Cantidad) <= 0 THEN 14
+                ELSE 15
+            END
+        FROM (
+            SELECT 'STG_Ventas' AS Tabla_Origen, * FROM STG_Ventas
+            UNION ALL
+            SELECT 'STG_Ventas_Add', * FROM STG_Ventas_Add
+        )
+        WHERE try_date(FechaVenta) IS NULL
+           OR CodigoProducto IS NULL OR TRIM(CodigoProducto) = ''
+           OR CodigoCliente IS NULL OR TRIM(CodigoCliente) = ''
+           OR CodigoTienda IS NULL OR TRIM(CodigoTienda) = ''
+           OR try_int(Cantidad) IS NULL OR try_int(Cantidad) <= 0
+           OR try_dec(PrecioVenta) IS NULL OR try_dec(PrecioVenta) < 0
+    """),
+
+    ('SP_STG_to_INT_Entregas', 'INT_Entregas', f"""
+        INSERT INTO INT_Entregas (
+            CodEntrega, CodVenta, CodProveedor, CodAlmacen, CodEstado,
+            Fecha_Envio, Fecha_Entrega, FechaEstimadaEntrega,
+            CantidadProductos, PesoKg, VolumenM3, DistanciaKm, CostoEntrega,
+            Fecha_Proceso, ID_Proceso
+        )
+        SELECT
+            UPPER(TRIM(CodEntrega)),
+            try_int(CodVenta),
+            UPPER(TRIM(CodProveedor)),
+            UPPER(TRIM(CodAlmacen)),
+            UPPER(TRIM(CodEstado)),
+            try_date(Fecha_Envio),
+            try_date(NULLIF(Fecha_Entrega, '')),
+            date(try_date(Fecha_Envio), '+5 day'),
+            1, 0.00, 0.000, 0.00, 150.00,
+            {AHORA}, :id_proceso
+        FROM STG_Entregas
+        WHERE CodEntrega IS NOT NULL AND TRIM(CodEntrega) <> ''
+          AND CodProveedor IS NOT NULL AND TRIM(CodProveedor) <> ''
+          AND CodEstado IS NOT NULL AND TRIM(CodEstado) <> ''
+          AND try_date(Fecha_Envio) IS NOT NULL
+          AND (
+              try_date(NULLIF(Fecha_Entrega, '')) IS NULL
+              OR try_date(NULLIF(Fecha_Entrega, '')) >= try_date(Fecha_Envio)
+          )
+    """, None),
+]
+
+
+# ----------------------------------------------------------------------
+# Cargas INT -> DW (equivalentes a SP_INT_to_DW_*)
+DIMENSIONES = [
+    ('SP_INT_to_DW_Dim_EstadoPedido', f"""
+        INSERT INTO Dim_EstadoPedido (
+            CodigoEstado, Descripcion_Estado, Tipo_Estado, Orden_Secuencia, EsEstadoFinal,
+            FechaCreacion, FechaModificacion
+        )
+        SELECT CodEstado, Descripcion_Estado, Tipo_Estado, Orden_Secuencia, EsEstadoFinal, {AHORA}, {AHORA}
+        FROM INT_EstadoPedido WHERE true
+        ON CONFLICT (CodigoEstado) DO UPDATE SET
+            Descripcion_Estado = excluded.Descripcion_Estado,
+            Tipo_Estado = excluded.Tipo_Estado,
+            Orden_Secuencia = excluded.Orden_Secuencia,
+            EsEstadoFinal = excluded.EsEstadoFinal,
+            FechaModificacion = excluded.FechaModificacion
+    """),
+    ('SP_INT_to_DW_Dim_Almacen', f"""
+        INSERT INTO Dim_Almacen (
+            CodigoAlmacen, NombreAlmacen, Ubicacion, Ciudad, Provincia,
+            CodigoPostal, TipoAlmacen, Activo, FechaCreacion, FechaModificacion
+        )
+        SELECT CodAlmacen, NombreAlmacen, Ubicacion, Ciudad, Provincia,
+               CodigoPostal, TipoAlmacen, Activo, {AHORA}, {AHORA}
+        FROM INT_Almacen WHERE true
+        ON CONFLICT (CodigoAlmacen) DO UPDATE SET
+            NombreAlmacen = excluded.NombreAlmacen, Ubicacion = excluded.Ubicacion,
+            Ciudad = excluded.Ciudad, Provincia = excluded.Provincia,
+            CodigoPostal = excluded.CodigoPostal, TipoAlmacen = excluded.TipoAlmacen,
+            Activo = excluded.Activo, FechaModificacion = excluded.FechaModificacion
+    """),
+    ('SP_INT_to_DW_Dim_Cliente', f"""
+        INSERT INTO Dim_Cliente (
+            CodigoCliente, RazonSocial, Telefono, Mail, Direccion, Localidad, Provincia, CP, FechaCreacion
+        )
+        SELECT CodCliente, RazonSocial, Telefono, Mail, Direccion, Localidad, Provincia, CP, {AHORA}
+        FROM INT_Cliente WHERE true
+        ON CONFLICT (CodigoCliente) DO UPDATE SET
+            RazonSocial = excluded.RazonSocial, Telefono = excluded.Telefono, Mail = excluded.Mail,
+            Direccion = excluded.Direccion, Localidad = excluded.Localidad,
+            Provincia = excluded.Provincia, CP = excluded.CP
+    """),
+    ('SP_INT_to_DW_Dim_Producto', f"""
+        INSERT INTO Dim_Producto (
+            CodigoProducto, Descripcion, Categoria, Marca, PrecioCosto, PrecioVentaSugerido, FechaCreacion
+        )
+        SELECT CodigoProducto, Descripcion, Categoria, Marca, PrecioCosto, PrecioVentaSugerido, {AHORA}
+        FROM INT_Producto WHERE true
+        ON CONFLICT (CodigoProducto) DO UPDATE SET
+            Descripcion = excluded.Descripcion, Categoria = excluded.Categoria, Marca = excluded.Marca,
+            PrecioCosto = excluded.PrecioCosto, PrecioVentaSugerido = excluded.PrecioVentaSugerido
+    """),
+    ('SP_INT_to_DW_Dim_Tienda', f"""
+        INSERT INTO Dim_Tienda (
+            CodigoTienda, Descripcion, Direccion, Localidad, Provincia, CP, TipoTienda, FechaCreacion
+        )
+        SELECT CodigoTienda, Descripcion, Direccion, Localidad, Provincia, CP, TipoTienda, {AHORA}
+        FROM INT_Tienda WHERE true
+        ON CONFLICT (CodigoTienda) DO UPDATE SET
+            Descripcion = excluded.Descripcion, Direccion = excluded.Direccion,
+            Localidad = excluded.Localidad, Provincia = excluded.Provincia,
+            CP = excluded.CP, TipoTienda = excluded.TipoTienda
+    """),
+    ('SP_INT_to_DW_Dim_Proveedor', f"""
+        INSERT INTO Dim_Proveedor (
+            CodigoProveedor, NombreProveedor, TipoServicio, Activo, FechaCreacion, FechaModificacion
+        )
+        SELECT CodProveedor, NombreProveedor, TipoServicio, Activo, {AHORA}, {AHORA}
+        FROM INT_Proveedor WHERE true
+        ON CONFLICT (CodigoProveedor) DO UPDATE SET
+            NombreProveedor = excluded.NombreProveedor, TipoServicio = excluded.TipoServicio,
+            Activo = excluded.Activo, FechaModificacion = excluded.FechaModificacion
+    """),
+]
+
+FACT_VENTAS_REPROCESO = """
+    DELETE FROM Fact_Ventas
+    WHERE Tiempo_Key IN (
+        SELECT dt.Tiempo_Key FROM INT_Ventas iv
+        INNER JOIN Dim_Tiempo dt ON dt.Fecha = iv.FechaVenta
+    )
+"""
+
+FACT_VENTAS = f"""
+    INSERT INTO Fact_Ventas (
+        Tiempo_Key, ID_Producto, ID_Cliente, ID_Tienda, Cantidad, PrecioVenta, Total_IVA, FechaCarga,
+        CodVenta
+    )
+    SELECT dt.Tiempo_Key, dp.ID_Producto, dc.ID_Cliente, dtie.ID_Tienda,
+           iv.Cantidad, iv.PrecioVenta, iv.Total_IVA, {AHORA}, iv.CodVenta
+    FROM INT_Ventas iv
+    INNER JOIN Dim_Tiempo dt ON dt.Fecha = iv.FechaVenta
+    INNER JOIN Dim_Producto dp ON TRIM(iv.CodigoProducto) = TRIM(dp.CodigoProducto)
+    INNER JOIN Dim_Cliente dc ON TRIM(iv.CodigoCliente) = TRIM(dc.CodigoCliente)
+    INNER JOIN Dim_Tienda dtie ON TRIM(iv.CodigoTienda) = TRIM(dtie.CodigoTienda)
+    WHERE (:ultimo_cod_venta IS NULL OR iv.CodVenta > :ultimo_cod_venta OR iv.CodVenta IS NULL)
+      AND (
+           :por_meses = 0
+        OR dt.Tiempo_Key / 100 IN (
+            SELECT AnioMes FROM ETL_Reproceso_Meses WHERE ID_Proceso = :id_proceso AND Tabla = 'Fact_Ventas'
+        )
+      )
+      AND (
+           :reprocesar = 1
+        OR :por_meses = 1
+        OR (iv.CodVenta IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM Fact_Ventas fv WHERE fv.CodVenta = iv.CodVenta
+        ))
+        OR (iv.CodVenta IS NULL AND NOT EXISTS (
+            SELECT 1 FROM Fact_Ventas fv
+            WHERE fv.Tiempo_Key = dt.Tiempo_Key
+              AND fv.ID_Producto = dp.ID_Producto
+              AND fv.ID_Cliente = dc.ID_Cliente
+              AND fv.ID_Tienda = dtie.ID_Tienda
+              AND fv.Cantidad = iv.Cantidad
+              AND fv.PrecioVenta = iv.PrecioVenta
+        ))
+      )
+    ORDER BY iv.ID_INT
+"""
+
+FACT_VENTAS_RECHAZOS = """
+    INSERT INTO temp.Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
+    SELECT
+        'INT_Ventas',
+        'Fecha=' || iv.FechaVenta || ', Producto=' || iv.CodigoProducto ||
+            ', Cliente=' || iv.CodigoCliente || ', Tienda=' || iv.CodigoTienda,
+        CASE
+            WHEN dt.Tiempo_Key IS NULL THEN 40
+            WHEN dp.ID_Producto IS NULL THEN 41
+            WHEN dc.ID_Cliente IS NULL THEN 42
+            WHEN dtie.ID_Tienda IS NULL THEN 43
+            ELSE 99
+        END,
+        CASE
+            WHEN dt.Tiempo_Key IS NULL THEN 'Fecha [' || iv.FechaVenta || '] no existe en Dim_Tiempo'
+            WHEN dp.ID_Producto IS NULL THEN 'Producto [' || iv.CodigoProducto || '] no existe en Dim_Producto'
+            WHEN dc.ID_Cliente IS NULL THEN 'Cliente [' || iv.CodigoCliente || '] no existe en Dim_Cliente'
+            WHEN dtie.ID_Tienda IS NULL THEN 'Tienda [' || iv.CodigoTienda || '] no existe en Dim_Tienda'
+            ELSE 'Error desconocido'
+        END
+    FROM INT_Ventas iv
+    LEFT JOIN Dim_Tiempo dt ON dt.Fecha = iv.FechaVenta
+    LEFT JOIN Dim_Producto dp ON TRIM(iv.CodigoProducto) = TRIM(dp.CodigoProducto)
+    LEFT JOIN Dim_Cliente dc ON TRIM(iv.CodigoCliente) = TRIM(dc.CodigoCliente)
+    LEFT JOIN Dim_Tienda dtie ON TRIM(iv.CodigoTienda) = TRIM(dtie.CodigoTienda)
+    WHERE (:ultimo_cod_venta IS NULL OR iv.CodVenta > :ultimo_cod_venta OR iv.CodVenta IS NULL)
+      AND (
+           :por_meses = 0
+        OR CAST(strftime('%Y%m', iv.FechaVenta) AS INTEGER) IN (
+            SELECT AnioMes FROM ETL_Reproceso_Meses WHERE ID_Proceso = :id_proceso AND Tabla = 'Fact_Ventas'
+        )
+      )
+      AND (dt.Tiempo_Key IS NULL OR dp.ID_Producto IS NULL
+           OR dc.ID_Cliente IS NULL OR dtie.ID_Tienda IS NULL)
+"""
+
+FACT_VENTAS_WATERMARK = f"""
+    INSERT INTO ETL_Watermark (
+        Tabla, Ultimo_Tiempo_Key, Ultima_Fecha, Ultimo_CodVenta, ID_Proceso, Fecha_Actualizacion
+    )
+    SELECT 'Fact_Ventas', dt.Tiempo_Key, dt.Fecha, (
+        -- No pasa a la primera venta leída que no quedó cargada (rechazada)
+        SELECT MIN(MAX(fv.CodVenta), COALESCE((
+            SELECT MIN(iv.CodVenta) - 1 FROM INT_Ventas iv
+            WHERE iv.CodVenta IS NOT NULL
+              AND (:ultimo_cod_venta IS NULL OR iv.CodVenta > :ultimo_cod_venta)
+              AND NOT EXISTS (SELECT 1 FROM Fact_Ventas f WHERE f.CodVenta = iv.CodVenta)
+        ), MAX(fv.CodVenta)))
+        FROM Fact_Ventas fv
+    ), :id_proceso, {AHORA}
+    FROM Dim_Tiempo dt
+    WHERE dt.Tiempo_Key = (SELECT MAX(Tiempo_Key) FROM Fact_Ventas)
+    ON CONFLICT (Tabla) DO UPDATE SET
+        Ultimo_Tiempo_Key = excluded.Ultimo_Tiempo_Key,
+        Ultima_Fecha = excluded.Ultima_Fecha,
+        Ultimo_CodVenta = excluded.Ultimo_CodVenta,
+        ID_Proceso = excluded.ID_Proceso,
+        Fecha_Actualizacion = excluded.Fecha_Actualizacion
+"""
+
+FACT_ENTREGAS = f"""
+    INSERT INTO Fact_Entregas (
+        CodigoEntrega, ID_Venta, Tiempo_Key_Envio, Tiempo_Key_Entrega,
+        ID_Proveedor, ID_Almacen, ID_Estado, ID_Cliente, ID_Tienda,
+        CantidadProductos, PesoKg, VolumenM3, DistanciaKm, CostoEntrega,
+        FechaEstimadaEntrega, FechaCarga
+    )
+    SELECT
+        ie.CodEntrega,
+        fv.ID_Venta,
+        dt_env.Tiempo_Key,
+        dt_ent.Tiempo_Key,
+        IFNULL(dp.ID_Proveedor, -1),
+        IFNULL(da.ID_Almacen, -1),
+        IFNULL(de.ID_Estado, -1),
+        fv.ID_Cliente,
+        fv.ID_Tienda,
+        1, 0, 0, 0, 0,
+        date(substr(fv.Tiempo_Key, 1, 4) || '-' || substr(fv.Tiempo_Key, 5, 2) || '-' ||
+             substr(fv.Tiempo_Key, 7, 2), '+5 day'),
+        {AHORA}
+    FROM INT_Entregas ie
+    INNER JOIN Fact_Ventas fv ON fv.CodVenta = ie.CodVenta
+    LEFT JOIN Dim_Tiempo dt_env ON ie.Fecha_Envio = dt_env.Fecha
+    LEFT JOIN Dim_Tiempo dt_ent ON ie.Fecha_Entrega = dt_ent.Fecha
+    LEFT JOIN Dim_Proveedor dp ON try_int(ie.CodProveedor) = try_int(dp.CodigoProveedor)
+    LEFT JOIN Dim_Almacen da ON try_int(ie.CodAlmacen) = try_int(da.CodigoAlmacen)
+    LEFT JOIN Dim_EstadoPedido de ON try_int(ie.CodEstado) = try_int(de.CodigoEstado)
+    WHERE NOT EXISTS (SELECT 1 FROM Fact_Entregas fe WHERE fe.CodigoEntrega = ie.CodEntrega)
+    ORDER BY ie.ID_INT
+"""
+
+FACT_ENTREGAS_RECHAZOS = """
+    INSERT INTO temp.Rechazos (Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo)
+    SELECT
+        'INT_Entregas',
+        'CodEntrega=' || ie.CodEntrega,
+        CASE
+            WHEN fv.ID_Venta IS NULL THEN 50
+            WHEN dt_ent.Tiempo_Key IS NULL THEN 51
+            ELSE 99
+        END,
+        CASE
+            WHEN fv.ID_Venta IS NULL THEN 'Venta inexistente'
+            WHEN dt_ent.Tiempo_Key IS NULL THEN 'Fecha de entrega inválida'
+            ELSE 'Error desconocido'
+        END
+    FROM INT_Entregas ie
+    LEFT JOIN Fact_Ventas fv ON fv.CodVenta = ie.CodVenta
+    LEFT JOIN Dim_Tiempo dt_ent ON ie.Fecha_Entrega = dt_ent.Fecha
+    WHERE fv.ID_Venta IS NULL OR dt_ent.Tiempo_Key IS NULL
+"""
+
+# SP_DW_Reprocesar_Meses con 'auto': meses de las ventas de INT_Ventas que no están en Fact_Ventas o
+# que cambiaron (por CodVenta), tanto el mes en INT como el mes en Fact_Ventas
+REPROCESO_MESES_AUTO = """
+    WITH cambios AS (
+        SELECT CAST(strftime('%Y%m', iv.FechaVenta) AS INTEGER) AS Mes_INT, fv.Tiempo_Key / 100 AS Mes_DW
+        FROM INT_Ventas iv
+        LEFT JOIN Fact_Ventas fv ON fv.CodVenta = iv.CodVenta
+        LEFT JOIN Dim_Producto dp ON dp.ID_Producto = fv.ID_Producto
+        LEFT JOIN Dim_Cliente dc ON dc.ID_Cliente = fv.ID_Cliente
+        LEFT JOIN Dim_Tienda dtie ON dtie.ID_Tienda = fv.ID_Tienda
+        WHERE iv.CodVenta IS NOT NULL
+          AND iv.FechaVenta IS NOT NULL
+          AND (
+               fv.ID_Venta IS NULL
+            OR fv.Tiempo_Key <> CAST(strftime('%Y%m%d', iv.FechaVenta) AS INTEGER)
+            OR TRIM(dp.CodigoProducto) <> TRIM(iv.CodigoProducto)
+            OR TRIM(dc.CodigoCliente) <> TRIM(iv.CodigoCliente)
+            OR TRIM(dtie.CodigoTienda) <> TRIM(iv.CodigoTienda)
+            OR fv.Cantidad <> iv.Cantidad
+            OR fv.PrecioVenta <> iv.PrecioVenta
+            OR fv.Total_IVA <> iv.Total_IVA
+          )
+    )
+    SELECT Mes_INT FROM cambios
+    UNION
+    SELECT Mes_DW FROM cambios WHERE Mes_DW IS NOT NULL
+"""
+
+# SP_DW_Reprocesar_Meses: meses de envío de las entregas de las ventas de los meses pedidos
+# (se registran antes de borrar) y borrado por lotes de :lote filas
+REPROCESO_MESES_ENTREGAS = """
+    INSERT OR IGNORE INTO ETL_Reproceso_Meses (ID_Proceso, Tabla, AnioMes)
+    SELECT DISTINCT :id_proceso, 'Fact_Entregas', fe.Tiempo_Key_Envio / 100
+    FROM Fact_Ventas fv
+    INNER JOIN Fact_Entregas fe ON fe.ID_Venta = fv.ID_Venta
+    WHERE fv.Tiempo_Key / 100 IN (
+        SELECT AnioMes FROM ETL_Reproceso_Meses WHERE ID_Proceso = :id_proceso AND Tabla = 'Fact_Ventas'
+    )
+"""
+
+REPROCESO_LOTE_ENTREGAS = """
+    DELETE FROM Fact_Entregas
+    WHERE ID_Entrega IN (
+        SELECT fe.ID_Entrega FROM Fact_Entregas fe
+        INNER JOIN Fact_Ventas fv ON fv.ID_Venta = fe.ID_Venta
+        WHERE fv.Tiempo_Key BETWEEN :anio_mes * 100 AND :anio_mes * 100 + 99
+        LIMIT :lote
+    )
+"""
+
+REPROCESO_LOTE_VENTAS = """
+    DELETE FROM Fact_Ventas
+    WHERE ID_Venta IN (
+        SELECT ID_Venta FROM Fact_Ventas
+        WHERE Tiempo_Key BETWEEN :anio_mes * 100 AND :anio_mes * 100 + 99
+        LIMIT :lote
+    )
+"""
+
+# SP_DW_Actualizar_Agregados: meses (AnioMes = Tiempo_Key / 100) con filas cargadas desde
+# :desde (Fecha_Inicio del proceso) más los reprocesados por el proceso (también los que
+# quedaron vacíos); :completo = 1 reconstruye el agregado entero
+AGREGADOS = [
+    ('Agg_Ventas_Mes', 'Cant_Ventas', """
+        SELECT Tiempo_Key / 100 FROM Fact_Ventas
+        WHERE :completo = 1 OR FechaCarga >= :desde
+        UNION
+        SELECT AnioMes FROM ETL_Reproceso_Meses
+        WHERE :completo = 0 AND ID_Proceso = :id_proceso AND Tabla = 'Fact_Ventas'
+    """, f"""
+        INSERT INTO Agg_Ventas_Mes (
+            AnioMes, Anio, Mes, ID_Producto, ID_Tienda, Cant_Ventas, Cantidad, Importe, Total_IVA,
+            FechaActualizacion
+        )
+        SELECT fv.Tiempo_Key / 100, fv.Tiempo_Key / 10000, fv.Tiempo_Key / 100 % 100,
+               fv.ID_Producto, fv.ID_Tienda, COUNT(*), SUM(fv.Cantidad), SUM(fv.Cantidad * fv.PrecioVenta),
+               SUM(fv.Total_IVA), {AHORA}
+        FROM Fact_Ventas fv
+        WHERE fv.Tiempo_Key / 100 IN (SELECT AnioMes FROM temp.Meses_Agregado)
+        GROUP BY fv.Tiempo_Key / 100, fv.ID_Producto, fv.ID_Tienda
+    """),
+    ('Agg_Entregas_Mes', 'Cant_Entregas', """
+        SELECT Tiempo_Key_Envio / 100 FROM Fact_Entregas
+        WHERE :completo = 1 OR FechaCarga >= :desde
+        UNION
+        SELECT AnioMes FROM ETL_Reproceso_Meses
+        WHERE :completo = 0 AND ID_Proceso = :id_proceso AND Tabla = 'Fact_Entregas'
+    """, f"""
+        INSERT INTO Agg_Entregas_Mes (
+            AnioMes, Anio, Mes, ID_Proveedor, ID_Almacen, ID_Estado, Cant_Entregas, Cantidad_Productos,
+            Costo_Entrega, Entregas_Entregadas, Entregas_A_Tiempo, FechaActualizacion
+        )
+        SELECT fe.Tiempo_Key_Envio / 100, fe.Tiempo_Key_Envio / 10000, fe.Tiempo_Key_Envio / 100 % 100,
+               fe.ID_Proveedor, fe.ID_Almacen, fe.ID_Estado,
+               COUNT(*), SUM(fe.CantidadProductos), SUM(fe.CostoEntrega),
+               SUM(CASE WHEN fe.Tiempo_Key_Entrega IS NOT NULL THEN 1 ELSE 0 END),
+               SUM(CASE WHEN fe.Tiempo_Key_Entrega <= CAST(strftime('%Y%m%d', fe.FechaEstimadaEntrega) AS INTEGER)
+                        THEN 1 ELSE 0 END),
+               {AHORA}
+        FROM Fact_Entregas fe
+        WHERE fe.Tiempo_Key_Envio / 100 IN (SELECT AnioMes FROM temp.Meses_Agregado)
+        GROUP BY fe.Tiempo_Key_Envio / 100, fe.ID_Proveedor, fe.ID_Almacen, fe.ID_Estado
+    """),
+]
+
+# Tablas leídas por cada SP: Filas_Entrada de su paso en ETL_Control_Detalle
+ORIGEN_POR_SP = {
+    'SP_STG_to_INT_EstadoPedido': ['STG_EstadoDelPedido'],
+    'SP_STG_to_INT_Almacen': ['STG_Almacenes'],
+    'SP_STG_to_INT_Cliente': ['STG_Clientes'],
+    'SP_STG_to_INT_Producto': ['STG_Productos'],
+    'SP_STG_to_INT_Tienda': ['STG_Tiendas'],
+    'SP_STG_to_INT_Proveedor': ['STG_Entregas'],
+    'SP_STG_to_INT_Ventas': ['STG_Ventas', 'STG_Ventas_Add'],
+    'SP_STG_to_INT_Entregas': ['STG_Entregas'],
+    'SP_INT_to_DW_Dim_EstadoPedido': ['INT_EstadoPedido'],
+    'SP_INT_to_DW_Dim_Almacen': ['INT_Almacen'],
+    'SP_INT_to_DW_Dim_Cliente': ['INT_Cliente'],
+    'SP_INT_to_DW_Dim_Producto': ['INT_Producto'],
+    'SP_INT_to_DW_Dim_Tienda': ['INT_Tienda'],
+    'SP_INT_to_DW_Dim_Proveedor': ['INT_Proveedor'],
+    'SP_INT_to_DW_Fact_Ventas': ['INT_Ventas'],
+    'SP_INT_to_DW_Fact_Entregas': ['INT_Entregas'],
+}
+
+
+class LocalConnection:
+    """Conexión SQLite con la misma forma que las conexiones del pool (close, cached_cursor)."""
+
+    autocommit = False
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._cached_cursor = None
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def cursor(self):
+        return self._raw.cursor()
+
+    def cached_cursor(self):
+        if self._cached_cursor is None:
+            self._cached_cursor = self._raw.cursor()
+        return self._cached_cursor
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        self._raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class SQLiteBackend:
+    """Backend local: un archivo SQLite con el esquema completo y las reglas de los SPs."""
+
+    nombre = 'sqlite'
+    # SQLite serializa las escrituras: la carga en paralelo con todo-o-nada se bloquearía
+    soporta_paralelo = False
+    pool_size = 1
+    # Fecha y hora de la base (FechaCarga, inicio de los procesos)
+    ahora_sql = AHORA
+    Error = sqlite3.Error
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.destino = f"sqlite:{ruta if ruta == ':memory:' else os.path.abspath(ruta)}"
+        self._esquema_creado = False
+
+    # ------------------------------------------------------------------
+    def connect(self):
+        # Una conexión la puede usar otro hilo que el que la creó (el de escritura del modo
+        # pipeline de la extracción), siempre de a un hilo por vez
+        raw = sqlite3.connect(self.ruta, timeout=60, check_same_thread=False)
+        raw.create_function('try_date', 1, try_date, deterministic=True)
+        raw.create_function('try_int', 1, try_int, deterministic=True)
+        raw.create_function('try_dec', 1, try_dec, deterministic=True)
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute("PRAGMA synchronous = NORMAL")
+
+        if not self._esquema_creado:
+            raw.executescript(SCHEMA)
+            for tabla, columna, tipo in COLUMNAS_AGREGADAS:
+                existentes = [fila[1] for fila in raw.execute(f"PRAGMA table_info({tabla})")]
+                if columna not in existentes:
+                    raw.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+            raw.executescript(INDICES_AGREGADOS)
+            # Upsert: una base creada con una versión anterior recibe las descripciones nuevas
+            raw.executemany(
+                "INSERT INTO ETL_Rechazos_Motivos (Codigo_Motivo, Descripcion) VALUES (?, ?) "
+                "ON CONFLICT (Codigo_Motivo) DO UPDATE SET Descripcion = excluded.Descripcion",
+                MOTIVOS.items()
+            )
+            raw.commit()
+            self._esquema_creado = True
+        raw.execute(RECHAZOS_TEMP)
+
+        return LocalConnection(raw)
+
+    def prepare_cursor(self, cursor):
+        pass
+
+    def truncate(self, cursor, tabla):
+        cursor.execute(f"DELETE FROM {tabla}")
+
+    def crear_temporal(self, cursor, nombre, columnas):
+        """Tabla temporal de la conexión (vacía); devuelve el nombre con que se la usa en SQL."""
+        cursor.execute(f"DROP TABLE IF EXISTS temp.{nombre}")
+        cursor.execute(f"CREATE TEMP TABLE {nombre} ({columnas})")
+        return f"temp.{nombre}"
+
+    def set_input_sizes(self, cursor, columnas):
+        pass
+
+    # ------------------------------------------------------------------
+    def _iniciar_proceso(self, cursor, nombre):
+        cursor.execute(
+            f"INSERT INTO ETL_Control_Procesos (Nombre_Proceso, Fecha_Inicio, Estado) "
+            f"VALUES (?, {AHORA}, 'EN_PROCESO')",
+            (nombre,)
+        )
+        return cursor.lastrowid
+
+    def _finalizar_proceso(self, cursor, id_proceso, procesados):
+        cursor.execute(f"""
+            UPDATE ETL_Control_Procesos
+            SET Fecha_Fin = {AHORA},
+                Estado = 'COMPLETADO',
+                Registros_Procesados = ?,
+                Registros_Rechazados = (
+                    SELECT IFNULL(SUM(Cantidad), 0) FROM ETL_Rechazos_Resumen WHERE ID_Proceso = ?
+                )
+            WHERE ID_Proceso = ?
+        """, (procesados, id_proceso, id_proceso))
+
+    def _registrar_rechazos(self, cursor, id_proceso):
+        """Equivalente a SP_ETL_Registrar_Rechazos: cuenta y muestrea temp.Rechazos y lo vacía."""
+        rechazados = self.count(cursor, 'temp.Rechazos')
+        if rechazados:
+            cursor.execute(RECHAZOS_RESUMEN, {'id_proceso': id_proceso})
+            cursor.execute(RECHAZOS_MUESTRA, {'id_proceso': id_proceso})
+            cursor.execute("DELETE FROM temp.Rechazos")
+        return rechazados
+
+    def _filas_entrada(self, cursor, sp):
+        return sum(self.count(cursor, tabla) for tabla in ORIGEN_POR_SP[sp])
+
+    def _registrar_detalle(self, cursor, id_proceso, etapa, sp, inicio, entrada, salida, rechazadas):
+        """Equivalente a SP_ETL_Registrar_Detalle (inicio: datetime del comienzo del paso)."""
+        if id_proceso is None:
+            return
+        fin = datetime.now()
+        duracion = round((fin - inicio).total_seconds(), 3)
+        cursor.execute("""
+            INSERT INTO ETL_Control_Detalle (
+                ID_Proceso, Etapa, Paso, Fecha_Inicio, Fecha_Fin, Duracion_Seg,
+                Filas_Entrada, Filas_Salida, Filas_Rechazadas, Filas_Seg
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            id_proceso, etapa, sp,
+            inicio.isoformat(sep=' ', timespec='milliseconds'), fin.isoformat(sep=' ', timespec='milliseconds'),
+            duracion, entrada, salida, rechazadas,
+            round(salida / duracion, 1) if duracion > 0 else None
+        ))
+
+    def _marcar_error(self, connection, id_proceso, error):
+        """Como el CATCH de los orquestadores: deja el proceso en ERROR (fuera de la transacción)."""
+        connection.rollback()
+        if id_proceso is None:
+            return
+        cursor = connection.cursor()
+        cursor.execute(
+            f"UPDATE ETL_Control_Procesos SET Fecha_Fin = {AHORA}, Estado = 'ERROR', Mensaje_Error = ? "
+            f"WHERE ID_Proceso = ?",
+            (str(error), id_proceso)
+        )
+        connection.commit()
+
+    # ------------------------------------------------------------------
+    def run_stg_to_int(self, connection, procesos=None):
+        """
+        Equivalente a SP_Orquestador_STG_to_INT (sin commit: lo hace el loader).
+        procesos: nombres de los SP a ejecutar (None = todos), como @Procesos.
+        """
+        cursor = connection.cursor()
+        mensajes = []
+        id_proceso = None
+
+        try:
+            id_proceso = self._iniciar_proceso(cursor, 'STG_to_INT_Completo')
+            # El registro de inicio queda confirmado aunque la transformación falle
+            connection.commit()
+            mensajes.append(f"INICIANDO PROCESO ETL: STG -> INT | ID Proceso: {id_proceso}")
+
+            for sp, _, _, _ in STG_TO_INT:
+                if procesos is not None and sp not in procesos:
+                    mensajes.append(f"Omitido (sin cambios): {sp}")
+                    continue
+                mensajes.append(self._stg_to_int(cursor, id_proceso, sp))
+
+            self._finalizar_proceso(cursor, id_proceso, self._procesados_int(cursor))
+            mensajes.append("PROCESO ETL: STG -> INT COMPLETADO")
+            return mensajes
+
+        except Exception as e:
+            self._marcar_error(connection, id_proceso, e)
+            raise
+
+    def _stg_to_int(self, cursor, id_proceso, sp):
+        """Un SP_STG_to_INT_* (vacía su tabla INT, inserta y registra los rechazos)."""
+        _, tabla_int, insertar, rechazar = next(paso for paso in STG_TO_INT if paso[0] == sp)
+        params = {'id_proceso': id_proceso}
+        inicio = datetime.now()
+        entrada = self._filas_entrada(cursor, sp)
+        if tabla_int:
+            cursor.execute(f"DELETE FROM {tabla_int}")
+        cursor.execute(insertar, params)
+        procesados = cursor.rowcount
+        rechazados = 0
+        if rechazar:
+            cursor.execute(rechazar, params)
+            rechazados = self._registrar_rechazos(cursor, id_proceso)
+        self._registrar_detalle(cursor, id_proceso, 'STG_to_INT', sp, inicio, entrada, procesados, rechazados)
+        return f"{sp}: {procesados} procesados, {rechazados} rechazados"
+
+    def _procesados_int(self, cursor):
+        """Registros_Procesados de STG_to_INT_Completo: filas de todas las tablas INT."""
+        return sum(
+            self.count(cursor, tabla) for _, tabla, _, _ in STG_TO_INT if tabla
+        ) + self.count(cursor, 'INT_Proveedor')
+
+    def run_int_to_dw(self, connection, reprocesar=0, incremental=0, cargar_hechos=1, meses=None,
+                      tamano_lote=50000):
+        """
+        Equivalente a SP_Orquestador_INT_to_DW (sin commit: lo hace el loader, salvo los lotes
+        del reproceso por meses). cargar_hechos=0 carga solo las dimensiones (los hechos los
+        carga un paso aparte: key_cache.py o las etapas DW_Fact_* del pipeline).
+        """
+        cursor = connection.cursor()
+        mensajes = []
+        id_proceso = None
+
+        try:
+            id_proceso = self._iniciar_proceso(cursor, 'INT_to_DW_Completo')
+            connection.commit()
+            mensajes.append(
+                f"INICIANDO PROCESO ETL COMPLETO | ID Proceso: {id_proceso} | "
+                f"Reprocesar: {reprocesar} | Incremental: {incremental}"
+            )
+
+            # Inicialización de Dim_Tiempo, igual que el orquestador (2020-2030)
+            mensajes.extend(self._dim_tiempo(cursor))
+
+            # PASO 1: Dimensiones
+            for sp, _ in DIMENSIONES:
+                mensajes.append(self._dimension(cursor, id_proceso, sp))
+
+            # PASO 2: Hechos
+            if cargar_hechos and meses is not None:
+                mensajes.extend(self._reproceso_meses(connection, id_proceso, meses, tamano_lote))
+                mensajes.extend(self._fact_ventas(cursor, id_proceso, 0, incremental))
+                mensajes.extend(self._fact_entregas(cursor, id_proceso, 0))
+                mensajes.extend(self._agregados(cursor, id_proceso, 0))
+            elif cargar_hechos:
+                mensajes.extend(self._fact_ventas(cursor, id_proceso, reprocesar, incremental))
+                mensajes.extend(self._fact_entregas(cursor, id_proceso, reprocesar))
+                # PASO 3: Agregados del tablero
+                mensajes.extend(self._agregados(cursor, id_proceso, reprocesar))
+            else:
+                mensajes.append("Hechos: omitidos (cargar_hechos = 0, se cargan en un paso aparte)")
+
+            procesados = self.count(cursor, 'Fact_Ventas') + self.count(cursor, 'Fact_Entregas')
+            self._finalizar_proceso(cursor, id_proceso, procesados)
+            mensajes.append("PROCESO ETL COMPLETADO EXITOSAMENTE")
+            return mensajes
+
+        except Exception as e:
+            self._marcar_error(connection, id_proceso, e)
+            raise
+
+    def _dim_tiempo(self, cursor):
+        """Equivalente a Sp_Genera_Dim_Tiempo 2020-2030, solo si Dim_Tiempo está vacía."""
+        if self.count(cursor, 'Dim_Tiempo') > 0:
+            return []
+        cursor.executemany(INSERT_DIM_TIEMPO, filas(calendario(date(2020, 1, 1), date(2030, 12, 31))))
+        return [f"Dim_Tiempo poblada con {self.count(cursor, 'Dim_Tiempo')} registros"]
+
+    def _dimension(self, cursor, id_proceso, sp):
+        """Un SP_INT_to_DW_Dim_*."""
+        sql = dict(DIMENSIONES)[sp]
+        inicio = datetime.now()
+        entrada = self._filas_entrada(cursor, sp)
+        cursor.execute(sql)
+        salida = cursor.rowcount
+        self._registrar_detalle(cursor, id_proceso, 'INT_to_DW', sp, inicio, entrada, salida, 0)
+        return f"{sp}: {salida} insertados/actualizados"
+
+    def _fact_ventas(self, cursor, id_proceso, reprocesar, incremental):
+        """Equivalente a SP_INT_to_DW_Fact_Ventas."""
+        inicio = datetime.now()
+        entrada = self._filas_entrada(cursor, 'SP_INT_to_DW_Fact_Ventas')
+        mensajes = []
+        cursor.execute(
+            "SELECT COUNT(*) FROM ETL_Reproceso_Meses WHERE ID_Proceso = ? AND Tabla = 'Fact_Ventas'",
+            (id_proceso,)
+        )
+        por_meses = 1 if cursor.fetchone()[0] else 0
+        ultimo_cod_venta = None
+        if incremental and not reprocesar and not por_meses:
+            cursor.execute("SELECT Ultimo_CodVenta FROM ETL_Watermark WHERE Tabla = 'Fact_Ventas'")
+            fila = cursor.fetchone()
+            ultimo_cod_venta = fila[0] if fila else None
+            mensajes.append(f"   Incremental desde CodVenta: {ultimo_cod_venta or 'sin marca (carga completa)'}")
+            if ultimo_cod_venta is not None:
+                # Filas de entrada del paso: solo las que quedan por encima de la marca
+                cursor.execute(
+                    "SELECT COUNT(*) FROM INT_Ventas WHERE CodVenta > ? OR CodVenta IS NULL", (ultimo_cod_venta,)
+                )
+                entrada = cursor.fetchone()[0]
+
+        if reprocesar:
+            # Fact_Entregas referencia a Fact_Ventas (se recarga completa en el paso siguiente)
+            cursor.execute("DELETE FROM Fact_Entregas")
+            cursor.execute(FACT_VENTAS_REPROCESO)
+            mensajes.append(f"   Registros eliminados para reproceso: {cursor.rowcount}")
+
+        parametros = {
+            'reprocesar': int(reprocesar), 'ultimo_cod_venta': ultimo_cod_venta,
+            'por_meses': por_meses, 'id_proceso': id_proceso,
+        }
+        cursor.execute(FACT_VENTAS, parametros)
+        insertados = cursor.rowcount
+        cursor.execute(FACT_VENTAS_RECHAZOS, parametros)
+        rechazados = self._registrar_rechazos(cursor, id_proceso)
+        mensajes.append(f"SP_INT_to_DW_Fact_Ventas: {insertados} insertados, {rechazados} rechazados")
+        cursor.execute(FACT_VENTAS_WATERMARK, {'id_proceso': id_proceso, 'ultimo_cod_venta': ultimo_cod_venta})
+        self._registrar_detalle(
+            cursor, id_proceso, 'INT_to_DW', 'SP_INT_to_DW_Fact_Ventas', inicio, entrada, insertados, rechazados
+        )
+        return mensajes
+
+    def _fact_entregas(self, cursor, id_proceso, reprocesar):
+        """Equivalente a SP_INT_to_DW_Fact_Entregas."""
+        inicio = datetime.now()
+        entrada = self._filas_entrada(cursor, 'SP_INT_to_DW_Fact_Entregas')
+        if reprocesar:
+            cursor.execute("DELETE FROM Fact_Entregas")
+        cursor.execute(FACT_ENTREGAS)
+        insertados = cursor.rowcount
+        cursor.execute(FACT_ENTREGAS_RECHAZOS, {'id_proceso': id_proceso})
+        rechazados = self._registrar_rechazos(cursor, id_proceso)
+        self._registrar_detalle(
+            cursor, id_proceso, 'INT_to_DW', 'SP_INT_to_DW_Fact_Entregas', inicio, entrada, insertados, rechazados
+        )
+        return [
+            f"Fact_Entregas -> Insertados: {insertados}",
+            f"Fact_Entregas -> Rechazados: {rechazados}",
+        ]
+
+    def _reproceso_meses(self, connection, id_proceso, meses, tamano_lote):
+        """
+        Equivalente a SP_DW_Reprocesar_Meses: registra los meses del proceso y borra sus
+        entregas y ventas mes por mes, en lotes de tamano_lote filas con un commit por lote.
+        """
+        if tamano_lote <= 0:
+            raise ValueError("tamano_lote debe ser mayor a 0")
+        cursor = connection.cursor()
+        inicio = datetime.now()
+        mensajes = []
+        if meses == 'auto':
+            cursor.execute(REPROCESO_MESES_AUTO)
+            meses = sorted(fila[0] for fila in cursor.fetchall())
+            mensajes.append(f"   Meses con cambios en INT_Ventas: {len(meses)}")
+
+        cursor.executemany(
+            "INSERT OR IGNORE INTO ETL_Reproceso_Meses (ID_Proceso, Tabla, AnioMes) VALUES (?, 'Fact_Ventas', ?)",
+            [(id_proceso, mes) for mes in meses]
+        )
+        cursor.execute(REPROCESO_MESES_ENTREGAS, {'id_proceso': id_proceso})
+        connection.commit()
+
+        total_ventas = total_entregas = 0
+        for mes in meses:
+            eliminadas = {}
+            for tabla, borrar in (('Fact_Entregas', REPROCESO_LOTE_ENTREGAS), ('Fact_Ventas', REPROCESO_LOTE_VENTAS)):
+                eliminadas[tabla] = 0
+                while True:
+                    cursor.execute(borrar, {'anio_mes': mes, 'lote': tamano_lote})
+                    filas = cursor.rowcount
+                    connection.commit()
+                    eliminadas[tabla] += filas
+                    if filas == 0:
+                        break
+            total_ventas += eliminadas['Fact_Ventas']
+            total_entregas += eliminadas['Fact_Entregas']
+            mensajes.append(
+                f"   {mes}: {eliminadas['Fact_Ventas']} ventas, {eliminadas['Fact_Entregas']} entregas eliminadas"
+            )
+
+        self._registrar_detalle(
+            cursor, id_proceso, 'INT_to_DW', 'SP_DW_Reprocesar_Meses', inicio, None,
+            total_ventas + total_entregas, 0
+        )
+        mensajes.append(
+            f"SP_DW_Reprocesar_Meses: {len(meses)} meses, {total_ventas} ventas y {total_entregas} entregas eliminadas"
+        )
+        return mensajes
+
+    def _agregados(self, cursor, id_proceso, reprocesar):
+        """Equivalente a SP_DW_Actualizar_Agregados: solo los meses que tocó el proceso."""
+        inicio = datetime.now()
+        desde = None
+        if id_proceso is not None:
+            cursor.execute("SELECT Fecha_Inicio FROM ETL_Control_Procesos WHERE ID_Proceso = ?", (id_proceso,))
+            fila = cursor.fetchone()
+            desde = fila[0] if fila else None
+
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS Meses_Agregado (AnioMes INTEGER PRIMARY KEY)")
+        mensajes = []
+        entrada = salida = 0
+        for tabla, columna_filas, meses, insertar in AGREGADOS:
+            completo = 1 if reprocesar or desde is None or self.count(cursor, tabla) == 0 else 0
+            cursor.execute("DELETE FROM temp.Meses_Agregado")
+            cursor.execute(
+                f"INSERT INTO temp.Meses_Agregado (AnioMes) {meses}",
+                {'completo': completo, 'desde': desde, 'id_proceso': id_proceso}
+            )
+            cantidad_meses = cursor.rowcount
+            cursor.execute(f"DELETE FROM {tabla} WHERE AnioMes IN (SELECT AnioMes FROM temp.Meses_Agregado)")
+            cursor.execute(insertar)
+            filas = cursor.rowcount
+            cursor.execute(
+                f"SELECT IFNULL(SUM({columna_filas}), 0) FROM {tabla} "
+                f"WHERE AnioMes IN (SELECT AnioMes FROM temp.Meses_Agregado)"
+            )
+            entrada += cursor.fetchone()[0]
+            salida += filas
+            mensajes.append(
+                f"{tabla:<16} -> {cantidad_meses} meses{' (completo)' if completo else ''}, {filas} filas"
+            )
+        self._registrar_detalle(
+            cursor, id_proceso, 'INT_to_DW', 'SP_DW_Actualizar_Agregados', inicio, entrada, salida, 0
+        )
+        return mensajes
+
+    def run_sp(self, connection, sp, id_proceso, reprocesar=0, incremental=0):
+        """Un paso suelto del planificador (sin commit): SP_STG_to_INT_*, SP_INT_to_DW_*, Dim_Tiempo o agregados."""
+        cursor = connection.cursor()
+        if sp == 'Sp_Genera_Dim_Tiempo':
+            return self._dim_tiempo(cursor)
+        if sp == 'SP_INT_to_DW_Fact_Ventas':
+            return self._fact_ventas(cursor, id_proceso, reprocesar, incremental)
+        if sp == 'SP_INT_to_DW_Fact_Entregas':
+            return self._fact_entregas(cursor, id_proceso, reprocesar)
+        if sp == 'SP_DW_Actualizar_Agregados':
+            return self._agregados(cursor, id_proceso, reprocesar)
+        if sp in dict(DIMENSIONES):
+            return [self._dimension(cursor, id_proceso, sp)]
+        return [self._stg_to_int(cursor, id_proceso, sp)]
+
+    def run_fact_ventas(self, connection, id_proceso, reprocesar=0, incremental=0):
+        return self._fact_ventas(connection.cursor(), id_proceso, reprocesar, incremental)
+
+    def run_fact_entregas(self, connection, id_proceso, reprocesar=0):
+        return self._fact_entregas(connection.cursor(), id_proceso, reprocesar)
+
+    def run_agregados(self, connection, id_proceso, reprocesar=0):
+        return self._agregados(connection.cursor(), id_proceso, reprocesar)
+
+    def run_reproceso_meses(self, connection, id_proceso, meses, tamano_lote=50000):
+        return self._reproceso_meses(connection, id_proceso, meses, tamano_lote)
+
+    def seleccionar_top(self, columnas, resto, n):
+        return f"SELECT {columnas} {resto} LIMIT {int(n)}"
+
+    # ------------------------------------------------------------------
+    def ultimo_proceso(self, cursor, nombre):
+        cursor.execute("""
+            SELECT Estado, Registros_Procesados, Registros_Rechazados,
+                   CAST(strftime('%s', Fecha_Fin) - strftime('%s', Fecha_Inicio) AS INTEGER)
+            FROM ETL_Control_Procesos
+            WHERE Nombre_Proceso = ?
+            ORDER BY ID_Proceso DESC
+            LIMIT 1
+        """, (nombre,))
+        return cursor.fetchone()
+
+    def top_rechazos(self, cursor, limite=5, id_proceso=None):
+        cursor.execute("""
+            SELECT r.Tabla_Origen, '[' || r.Codigo_Motivo || '] ' || IFNULL(m.Descripcion, ''), SUM(r.Cantidad)
+            FROM ETL_Rechazos_Resumen r
+            LEFT JOIN ETL_Rechazos_Motivos m ON m.Codigo_Motivo = r.Codigo_Motivo
+            WHERE r.ID_Proceso = IFNULL(?, (SELECT MAX(ID_Proceso) FROM ETL_Control_Procesos))
+            GROUP BY r.Tabla_Origen, r.Codigo_Motivo, m.Descripcion
+            ORDER BY SUM(r.Cantidad) DESC
+            LIMIT ?
+        """, (id_proceso, int(limite)))
+        return cursor.fetchall()
+
+    def count(self, cursor, tabla):
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        return cursor.fetchone()[0]
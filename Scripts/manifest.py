@@ -0,0 +1,215 @@
+"""
+Manifiesto de archivos de DATASET para detectar cambios entre corridas.
+
+Por cada CSV se guarda tamaño, mtime y hash SHA-256 del contenido, y por cada etapa del
+pipeline (stg, int, dw) el hash que se procesó por última vez. Un archivo cuyo hash no
+cambió desde la última carga exitosa de una etapa se saltea en esa etapa.
+
+Las etapas se confirman solo después del commit; si una corrida falla, los archivos
+quedan pendientes y se vuelven a procesar en la siguiente. Para forzar una recarga
+completa basta con borrar el archivo del manifiesto (o poner habilitado = no).
+
+Sección opcional [MANIFEST] de config.ini:
+    habilitado = yes
+    ruta       = manifest_dataset.json   (relativa a Scripts)
+"""
+import hashlib
+import json
+import os
+
+from db_session import BASE_DIR, load_config
+
+
+# Etapas en orden: cada una compara contra el hash confirmado por la anterior
+ETAPAS = ('stg', 'int', 'dw')
+
+# Archivo CSV -> SPs STG -> INT que dependen de él.
+# SP_STG_to_INT_Ventas une STG_Ventas y STG_Ventas_Add, por eso depende de ambos archivos.
+SP_POR_ARCHIVO = {
+    'EstadoDelPedido.csv': ['SP_STG_to_INT_EstadoPedido'],
+    'Almacenes.csv': ['SP_STG_to_INT_Almacen'],
+    'Clientes.csv': ['SP_STG_to_INT_Cliente'],
+    'Productos.csv': ['SP_STG_to_INT_Producto'],
+    'Tiendas.csv': ['SP_STG_to_INT_Tienda'],
+    'Ventas.csv': ['SP_STG_to_INT_Ventas'],
+    'Ventas_add.csv': ['SP_STG_to_INT_Ventas'],
+    'Entregas.csv': ['SP_STG_to_INT_Proveedor', 'SP_STG_to_INT_Entregas'],
+}
+
+# Orden de ejecución de SP_Orquestador_STG_to_INT
+ORDEN_SP_STG_TO_INT = [
+    'SP_STG_to_INT_EstadoPedido', 'SP_STG_to_INT_Almacen', 'SP_STG_to_INT_Cliente',
+    'SP_STG_to_INT_Producto', 'SP_STG_to_INT_Tienda', 'SP_STG_to_INT_Proveedor',
+    'SP_STG_to_INT_Ventas', 'SP_STG_to_INT_Entregas',
+]
+
+
+def hash_archivo(ruta, tamano_bloque=1024 * 1024):
+    """SHA-256 del archivo leído por bloques (memoria constante)."""
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def hash_directorio(ruta, tamano_bloque=1024 * 1024):
+    """
+    SHA-256 de un directorio (tabla del formato columnar): ruta relativa y contenido de
+    cada archivo, en orden. Devuelve (sha, tamaño total, mtime_ns más reciente).
+    """
+    sha = hashlib.sha256()
+    tamano = 0
+    mtime = 0
+    for archivo in archivos_de(ruta):
+        stat = os.stat(archivo)
+        tamano += stat.st_size
+        mtime = max(mtime, stat.st_mtime_ns)
+        sha.update(os.path.relpath(archivo, ruta).replace(os.sep, '/').encode('utf-8'))
+        with open(archivo, 'rb') as f:
+            for bloque in iter(lambda: f.read(tamano_bloque), b''):
+                sha.update(bloque)
+    return sha.hexdigest(), tamano, mtime
+
+
+def archivos_de(ruta):
+    archivos = []
+    for carpeta, _, nombres in os.walk(ruta):
+        archivos.extend(os.path.join(carpeta, nombre) for nombre in nombres)
+    return sorted(archivos)
+
+
+def stat_directorio(ruta):
+    """(tamaño total, mtime_ns más reciente) sin leer el contenido."""
+    stats = [os.stat(archivo) for archivo in archivos_de(ruta)]
+    return sum(s.st_size for s in stats), max((s.st_mtime_ns for s in stats), default=0)
+
+
+def sps_para(archivos):
+    """SPs STG -> INT a ejecutar para un conjunto de archivos, en el orden del orquestador."""
+    pedidos = {sp for archivo in archivos for sp in SP_POR_ARCHIVO.get(archivo, [])}
+    return [sp for sp in ORDEN_SP_STG_TO_INT if sp in pedidos]
+
+
+def carpeta_dataset(config):
+    """Carpeta de los CSV: [EXTRACCION] ruta_dataset, relativa a Scripts (../DATASET por defecto)."""
+    ruta = config.get('EXTRACCION', 'ruta_dataset', fallback='../DATASET').strip()
+    return os.path.abspath(os.path.join(BASE_DIR, ruta))
+
+
+class Manifest:
+    """
+    Estado persistido de los archivos de DATASET por destino (backend + base de datos),
+    para que un manifiesto de SQL Server no haga saltear cargas en la base local o viceversa.
+    """
+
+    def __init__(self, dataset_folder, destino, config_file='config.ini', ubicar=None):
+        config = load_config(config_file)
+        self.habilitado = config.getboolean('MANIFEST', 'habilitado', fallback=True)
+        ruta = config.get('MANIFEST', 'ruta', fallback='manifest_dataset.json').strip()
+        self.ruta = ruta if os.path.isabs(ruta) else os.path.join(BASE_DIR, ruta)
+
+        self.dataset_folder = dataset_folder
+        self.destino = destino
+        # ubicar(archivo) -> ruta real: el CSV o, en formato columnar, el directorio de la tabla
+        self.ubicar = ubicar or (lambda archivo: os.path.join(self.dataset_folder, archivo))
+        self._datos = self._leer()
+        self._huellas = {}
+        # archivo -> filtro con que se leyó (p. ej. los meses de [EXTRACCION] meses)
+        self._filtros = {}
+
+    # ------------------------------------------------------------------
+    def _leer(self):
+        if not self.habilitado or not os.path.exists(self.ruta):
+            return {'archivos': {}, 'destinos': {}}
+        try:
+            with open(self.ruta, encoding='utf-8') as f:
+                datos = json.load(f)
+            datos.setdefault('archivos', {})
+            datos.setdefault('destinos', {})
+            return datos
+        except (OSError, ValueError) as e:
+            # Un manifiesto ilegible equivale a no tenerlo: se recarga todo
+            print(f" ADVERTENCIA: manifiesto ilegible ({e}); se procesan todos los archivos.")
+            return {'archivos': {}, 'destinos': {}}
+
+    def guardar(self):
+        """Escritura atómica: un corte a mitad de escritura no deja el manifiesto corrupto."""
+        if not self.habilitado:
+            return
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._datos, f, indent=2, sort_keys=True)
+        os.replace(temporal, self.ruta)
+
+    # ------------------------------------------------------------------
+    def huella(self, archivo):
+        """
+        {'tamano', 'mtime', 'sha256'} del archivo actual.
+        Si tamaño y mtime coinciden con lo registrado se reutiliza el hash sin releer el archivo.
+        """
+        if archivo in self._huellas:
+            return self._huellas[archivo]
+
+        ruta = self.ubicar(archivo)
+        if os.path.isdir(ruta):
+            tamano, mtime = stat_directorio(ruta)
+        else:
+            stat = os.stat(ruta)
+            tamano, mtime = stat.st_size, stat.st_mtime_ns
+        previa = self._datos['archivos'].get(archivo, {})
+
+        if previa.get('tamano') == tamano and previa.get('mtime') == mtime:
+            sha = previa['sha256']
+        elif os.path.isdir(ruta):
+            sha = hash_directorio(ruta)[0]
+        else:
+            sha = hash_archivo(ruta)
+
+        huella = {'tamano': tamano, 'mtime': mtime, 'sha256': sha}
+        self._datos['archivos'][archivo] = huella
+        self._huellas[archivo] = huella
+        return huella
+
+    def _estado(self, archivo):
+        return self._datos['destinos'].setdefault(self.destino, {}).setdefault(archivo, {})
+
+    def filtrar(self, archivo, filtro):
+        """
+        El archivo se lee solo en parte (`filtro`, p. ej. '2025-03'): la etapa stg confirma el
+        hash junto con el filtro, así una corrida sin filtro (u otro) no lo da por cargado entero.
+        """
+        self._filtros[archivo] = filtro
+
+    def _hash_origen(self, etapa, archivo):
+        """Hash que debería haber procesado la etapa: el del archivo (stg) o el de la etapa anterior."""
+        if etapa == 'stg':
+            sha = self.huella(archivo)['sha256']
+            filtro = self._filtros.get(archivo)
+            return f"{sha}|{filtro}" if filtro else sha
+        anterior = ETAPAS[ETAPAS.index(etapa) - 1]
+        return self._estado(archivo).get(anterior)
+
+    def pendientes(self, etapa, archivos):
+        """Archivos que la etapa todavía no procesó en su versión actual (todos si está deshabilitado)."""
+        if not self.habilitado:
+            return list(archivos)
+        return [
+            archivo for archivo in archivos
+            if self._hash_origen(etapa, archivo) is None
+            or self._estado(archivo).get(etapa) != self._hash_origen(etapa, archivo)
+        ]
+
+    def confirmar(self, etapa, archivos):
+        """Marca los archivos como procesados por la etapa (llamar después del commit)."""
+        for archivo in archivos:
+            origen = self._hash_origen(etapa, archivo)
+            if origen is not None:
+                self._estado(archivo)[etapa] = origen
+        self.guardar()
+
+    def log_omitidos(self, etapa, archivos, pendientes):
+        omitidos = [archivo for archivo in archivos if archivo not in pendientes]
+        if omitidos:
+            print(f" Sin cambios ({etapa.upper()}), se omiten: {', '.join(omitidos)}")
+        return omitidos
@@ -0,0 +1,203 @@
+"""
+Métricas estructuradas por etapa, archivo y Stored Procedure (sección [METRICAS] de config.ini).
+
+Cada paso medido tiene la misma forma en todas las etapas:
+
+    Etapa, Paso, Fecha_Inicio, Fecha_Fin, Duracion_Seg,
+    Filas_Entrada, Filas_Salida, Filas_Rechazadas, Filas_Seg
+
+    CSV_to_STG -> un paso por archivo (lectura, validación e inserción)
+    STG_to_INT -> un paso por SP_STG_to_INT_*
+    INT_to_DW  -> un paso por SP_INT_to_DW_* (o la carga de Fact_Ventas de key_cache.py)
+
+y cada etapa suma un paso 'TOTAL' medido desde Python (incluye la ida y vuelta al servidor).
+
+Los SP registran sus propios conteos en ETL_Control_Detalle (SP_ETL_Registrar_Detalle);
+los loaders los leen de esa tabla por ID_Proceso en lugar de interpretar los PRINT, y
+guardan ahí también los pasos medidos en Python. Al terminar cada etapa se reescribe el
+archivo de la corrida, con todas las etapas que corrieron en el mismo proceso:
+
+    metricas/metricas_AAAAMMDD_HHMMSS.json
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+from db_session import BASE_DIR, load_config
+
+
+TOTAL = 'TOTAL'
+
+COLUMNAS = (
+    'Etapa', 'Paso', 'Fecha_Inicio', 'Fecha_Fin', 'Duracion_Seg',
+    'Filas_Entrada', 'Filas_Salida', 'Filas_Rechazadas', 'Filas_Seg',
+)
+
+_colectores = {}
+_lock = threading.Lock()
+
+
+def filas_por_segundo(filas, duracion):
+    if filas is None or not duracion or duracion <= 0:
+        return None
+    return round(filas / duracion, 1)
+
+
+def texto_fecha(valor):
+    """datetime (SQL Server) o texto (SQLite) -> 'YYYY-MM-DD HH:MM:SS.fff'."""
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=' ', timespec='milliseconds')
+    return None if valor is None else str(valor)
+
+
+def ultimo_id_proceso(cursor, nombre):
+    """ID_Proceso de la última corrida de `nombre` en ETL_Control_Procesos."""
+    cursor.execute("SELECT MAX(ID_Proceso) FROM ETL_Control_Procesos WHERE Nombre_Proceso = ?", (nombre,))
+    return cursor.fetchone()[0]
+
+
+class Metricas:
+    """Junta los pasos medidos de la corrida, los guarda en ETL_Control_Detalle y en el archivo local."""
+
+    def __init__(self, config_file='config.ini'):
+        config = load_config(config_file)
+        self.habilitado = config.getboolean('METRICAS', 'habilitado', fallback=True)
+        carpeta = config.get('METRICAS', 'carpeta', fallback='metricas').strip()
+        self.carpeta = carpeta if os.path.isabs(carpeta) else os.path.join(BASE_DIR, carpeta)
+        self.corrida = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.pasos = []
+
+    @property
+    def ruta(self):
+        return os.path.join(self.carpeta, f"metricas_{self.corrida}.json")
+
+    def registrar(self, etapa, paso, inicio, fin, filas_entrada=None, filas_salida=None,
+                  filas_rechazadas=None, id_proceso=None):
+        """Agrega un paso medido en Python (inicio/fin: datetime). Devuelve el paso."""
+        duracion = round((fin - inicio).total_seconds(), 3)
+        medido = {
+            'ID_Proceso': id_proceso,
+            'Etapa': etapa,
+            'Paso': paso,
+            'Fecha_Inicio': texto_fecha(inicio),
+            'Fecha_Fin': texto_fecha(fin),
+            'Duracion_Seg': duracion,
+            'Filas_Entrada': filas_entrada,
+            'Filas_Salida': filas_salida,
+            'Filas_Rechazadas': filas_rechazadas,
+            'Filas_Seg': filas_por_segundo(filas_salida, duracion),
+        }
+        if self.habilitado:
+            self.pasos.append(medido)
+        return medido
+
+    def registrar_total(self, etapa, inicio, fin, id_proceso=None):
+        """Paso 'TOTAL' de la etapa: la duración medida y la suma de las filas de sus pasos."""
+        pasos = self.de_etapa(etapa, id_proceso)
+
+        def suma(columna):
+            valores = [paso[columna] for paso in pasos if paso[columna] is not None]
+            return sum(valores) if valores else None
+
+        return self.registrar(
+            etapa, TOTAL, inicio, fin,
+            suma('Filas_Entrada'), suma('Filas_Salida'), suma('Filas_Rechazadas'), id_proceso
+        )
+
+    def de_etapa(self, etapa, id_proceso=None):
+        return [
+            paso for paso in self.pasos
+            if paso['Etapa'] == etapa and paso['Paso'] != TOTAL
+            and (id_proceso is None or paso['ID_Proceso'] == id_proceso)
+        ]
+
+    # ------------------------------------------------------------------
+    # ETL_Control_Detalle
+    def leer_detalle(self, cursor, id_proceso):
+        """Agrega los pasos que los SP registraron para id_proceso (conteos ya numéricos)."""
+        if not self.habilitado or id_proceso is None:
+            return []
+        cursor.execute(f"""
+            SELECT {', '.join(COLUMNAS)}
+            FROM ETL_Control_Detalle
+            WHERE ID_Proceso = ?
+            ORDER BY ID_Detalle
+        """, (id_proceso,))
+        leidos = []
+        for fila in cursor.fetchall():
+            paso = dict(zip(COLUMNAS, fila))
+            paso['ID_Proceso'] = id_proceso
+            paso['Fecha_Inicio'] = texto_fecha(paso['Fecha_Inicio'])
+            paso['Fecha_Fin'] = texto_fecha(paso['Fecha_Fin'])
+            for columna in ('Duracion_Seg', 'Filas_Seg'):
+                if paso[columna] is not None:
+                    paso[columna] = float(paso[columna])
+            for columna in ('Filas_Entrada', 'Filas_Salida', 'Filas_Rechazadas'):
+                if paso[columna] is not None:
+                    paso[columna] = int(paso[columna])
+            leidos.append(paso)
+        self.pasos.extend(leidos)
+        return leidos
+
+    def guardar_detalle(self, cursor, pasos):
+        """Inserta en ETL_Control_Detalle los pasos medidos en Python (no hace commit)."""
+        pasos = [paso for paso in pasos if paso['ID_Proceso'] is not None]
+        if not self.habilitado or not pasos:
+            return
+        cursor.executemany(f"""
+            INSERT INTO ETL_Control_Detalle (ID_Proceso, {', '.join(COLUMNAS)})
+            VALUES (?, {', '.join('?' for _ in COLUMNAS)})
+        """, [(paso['ID_Proceso'],) + tuple(paso[columna] for columna in COLUMNAS) for paso in pasos])
+
+    # ------------------------------------------------------------------
+    # Archivo local y consola
+    def escribir(self):
+        """Reescribe el archivo de la corrida con todos los pasos registrados hasta ahora."""
+        if not self.habilitado or not self.pasos:
+            return None
+        os.makedirs(self.carpeta, exist_ok=True)
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'corrida': self.corrida, 'pasos': self.pasos}, f, indent=2, ensure_ascii=False)
+        os.replace(temporal, self.ruta)
+        print(f" Métricas de la corrida: {self.ruta}")
+        return self.ruta
+
+    def resumen(self, etapa):
+        """Tabla de pasos de la etapa con el porcentaje del tiempo total de cada uno."""
+        if not self.habilitado:
+            return
+        # En orden de ejecución, con el total al final (los pasos de SP y de Python se mezclan)
+        pasos = sorted(
+            (paso for paso in self.pasos if paso['Etapa'] == etapa),
+            key=lambda paso: (paso['Paso'] == TOTAL, paso['Fecha_Inicio'] or '', paso['Fecha_Fin'] or '')
+        )
+        if not pasos:
+            return
+        totales = [paso for paso in pasos if paso['Paso'] == TOTAL]
+        duracion_total = totales[-1]['Duracion_Seg'] if totales else sum(p['Duracion_Seg'] for p in pasos)
+
+        def numero(valor, formato='{:,}'):
+            return '-' if valor is None else formato.format(valor)
+
+        print(f"\n MÉTRICAS {etapa}")
+        print(f" {'Paso':<36}{'Seg':>9}{'%':>6}{'Entrada':>12}{'Salida':>12}{'Rechaz.':>10}{'Filas/seg':>12}")
+        for paso in pasos:
+            porcentaje = paso['Duracion_Seg'] / duracion_total * 100 if duracion_total else 0
+            print(
+                f" {paso['Paso'][:35]:<36}{paso['Duracion_Seg']:>9.2f}{porcentaje:>5.0f}%"
+                f"{numero(paso['Filas_Entrada']):>12}{numero(paso['Filas_Salida']):>12}"
+                f"{numero(paso['Filas_Rechazadas']):>10}{numero(paso['Filas_Seg'], '{:,.0f}'):>12}"
+            )
+
+
+def get_metricas(config_file='config.ini'):
+    """
+    Colector compartido del proceso: las etapas que corren en el mismo proceso
+    escriben en el mismo archivo de corrida.
+    """
+    with _lock:
+        if config_file not in _colectores:
+            _colectores[config_file] = Metricas(config_file)
+        return _colectores[config_file]
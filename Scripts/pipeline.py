@@ -0,0 +1,367 @@
+"""
+Pipeline completo DATASET -> DW por etapas, con checkpoint por etapa y reanudación.
+
+    SQL_STAGING, SQL_INT, SQL_DW, SQL_SP  -> scripts SQL (solo con --esquema)
+    CSV_to_STG        -> extract_data.py
+    STG_to_INT        -> load_STG_to_INT.py
+    DW_Dimensiones    -> SP_Orquestador_INT_to_DW con @CargarHechos = 0 (y Dim_Tiempo)
+    DW_Reproceso_Meses -> SP_DW_Reprocesar_Meses (solo con --meses o [DW] meses_reproceso)
+    DW_Fact_Ventas    -> SP_INT_to_DW_Fact_Ventas o key_cache.py ([DW] claves)
+    DW_Fact_Entregas  -> SP_INT_to_DW_Fact_Entregas
+    DW_Agregados      -> SP_DW_Actualizar_Agregados (meses tocados por el proceso)
+
+Cada etapa se confirma por separado y deja su checkpoint en ETL_Control_Procesos:
+
+    Nombre_Proceso = 'Pipeline'             -> la corrida (EN_PROCESO / COMPLETADO / ERROR)
+    Nombre_Proceso = 'Pipeline:<etapa>'     -> cada etapa, con Mensaje_Error si falló
+
+Las etapas de una corrida son las filas 'Pipeline:%' con ID_Proceso mayor al de su fila
+'Pipeline'. Si la última corrida no terminó, la siguiente la reanuda: saltea las etapas
+COMPLETADO y sigue desde la que falló. Una falla en Fact_Entregas no vuelve a extraer los
+CSV ni a recargar Fact_Ventas, y nada vacía el DW (a diferencia de orquestador.py); para
+recargar los hechos está --reprocesar (@Reprocesar de los SP) y, para recargar solo
+algunos meses, --meses AAAAMM,AAAAMM (o 'auto': los meses con ventas nuevas o cambiadas en INT_Ventas).
+
+Los scripts SQL borran y recrean las tablas, ETL_Control_Procesos incluida: no se
+reanudan, corren enteros con --esquema y abren una corrida nueva. Con el motor local
+(sqlite) el esquema lo crea local_engine.py y esas etapas se omiten.
+
+Uso: python pipeline.py [--esquema] [--desde-cero] [--reprocesar | --meses AAAAMM,...] [--estado]
+                        [--config config.ini]
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import datetime
+
+from backends import get_backend, lista_meses
+from db_session import BASE_DIR, close_pools, load_config
+from metricas import ultimo_id_proceso
+
+
+PROCESO = 'Pipeline'
+
+ETAPAS_ESQUEMA = [
+    ('SQL_STAGING', 'SQLQuerySTAGING.sql'),
+    ('SQL_INT', 'SQLQueryINT.sql'),
+    ('SQL_DW', 'SQLQueryCreateDW.sql'),
+    ('SQL_SP', 'SQLQueryStoreProcedures.sql'),
+]
+
+ETAPAS = [
+    'CSV_to_STG', 'STG_to_INT', 'DW_Dimensiones', 'DW_Reproceso_Meses', 'DW_Fact_Ventas', 'DW_Fact_Entregas',
+    'DW_Agregados',
+]
+
+ETAPAS_DW = ('DW_Dimensiones', 'DW_Reproceso_Meses', 'DW_Fact_Ventas', 'DW_Fact_Entregas', 'DW_Agregados')
+
+
+def nombre_etapa(etapa):
+    return f"{PROCESO}:{etapa}"
+
+
+def lotes_sql(ruta):
+    """Script SQL -> lotes separados por GO (como SSMS/sqlcmd)."""
+    with open(ruta, encoding='utf-8-sig') as f:
+        texto = f.read()
+    return [lote for lote in re.split(r'^\s*GO\s*$', texto, flags=re.MULTILINE | re.IGNORECASE) if lote.strip()]
+
+
+class Pipeline:
+    """Ejecuta las etapas en orden, con checkpoint en ETL_Control_Procesos."""
+
+    def __init__(self, config_file='config.ini', reprocesar=0, meses=None):
+        self.config = load_config(config_file)
+        self.config_file = config_file
+        self.reprocesar = reprocesar
+        # None = [DW] meses_reproceso de config.ini
+        self.meses = meses
+        self.backend = get_backend(config_file)
+        self.id_pipeline = None
+        # Loader INT -> DW compartido por las etapas DW (misma conexión, un commit por etapa)
+        self.dw = None
+        self.pendientes_dw = None
+        self.inicio_dw = None
+
+    def log(self, message, level="INFO"):
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f"[{timestamp}] [{level}] {message}")
+
+    # ------------------------------------------------------------------
+    # ETL_Control_Procesos
+    def _ejecutar(self, sql, params=(), consulta=False):
+        """
+        Sentencia de control en una conexión propia que se confirma y se devuelve al pool
+        enseguida: no retiene conexiones que necesitan las etapas (workers de la extracción).
+        """
+        connection = self.backend.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            filas = cursor.fetchall() if consulta else None
+            connection.commit()
+            return filas
+        finally:
+            connection.close()
+
+    def _nuevo_proceso(self, nombre):
+        connection = self.backend.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                "INSERT INTO ETL_Control_Procesos (Nombre_Proceso, Fecha_Inicio, Estado) VALUES (?, ?, 'EN_PROCESO')",
+                (nombre, datetime.now().replace(microsecond=0))
+            )
+            id_proceso = ultimo_id_proceso(cursor, nombre)
+            connection.commit()
+            return id_proceso
+        finally:
+            connection.close()
+
+    def _cerrar_proceso(self, id_proceso, estado, mensaje=None):
+        self._ejecutar(
+            "UPDATE ETL_Control_Procesos SET Fecha_Fin = ?, Estado = ?, Mensaje_Error = ? WHERE ID_Proceso = ?",
+            (datetime.now().replace(microsecond=0), estado, mensaje, id_proceso)
+        )
+
+    def ultima_corrida(self):
+        """(ID_Proceso, Estado) de la última corrida del pipeline, o None."""
+        filas = self._ejecutar(
+            "SELECT ID_Proceso, Estado FROM ETL_Control_Procesos WHERE ID_Proceso = "
+            "(SELECT MAX(ID_Proceso) FROM ETL_Control_Procesos WHERE Nombre_Proceso = ?)",
+            (PROCESO,), consulta=True
+        )
+        return tuple(filas[0]) if filas else None
+
+    def checkpoints(self, id_pipeline):
+        """[(etapa, estado, fecha_inicio, fecha_fin, mensaje)] de la corrida, en orden."""
+        filas = self._ejecutar("""
+            SELECT Nombre_Proceso, Estado, Fecha_Inicio, Fecha_Fin, Mensaje_Error
+            FROM ETL_Control_Procesos
+            WHERE Nombre_Proceso LIKE ?
+              AND ID_Proceso > ?
+              AND ID_Proceso < COALESCE(
+                  (SELECT MIN(ID_Proceso) FROM ETL_Control_Procesos
+                   WHERE Nombre_Proceso = ? AND ID_Proceso > ?), 2147483647)
+            ORDER BY ID_Proceso
+        """, (PROCESO + ':%', id_pipeline, PROCESO, id_pipeline), consulta=True)
+        return [(nombre.split(':', 1)[1],) + tuple(resto) for nombre, *resto in filas]
+
+    def completadas(self, id_pipeline):
+        return {etapa for etapa, estado, *_ in self.checkpoints(id_pipeline) if estado == 'COMPLETADO'}
+
+    # ------------------------------------------------------------------
+    # Etapas
+    def crear_esquema(self):
+        """Los cuatro scripts SQL, en orden. Devuelve [(etapa, inicio, fin)]."""
+        if self.backend.nombre != 'sqlserver':
+            self.log("Motor local: el esquema lo crea local_engine.py, se omiten los scripts SQL")
+            return []
+
+        ejecutadas = []
+        connection = self.backend.connect()
+        try:
+            # CREATE DATABASE y los DROP/CREATE no pueden ir dentro de una transacción
+            connection.autocommit = True
+            cursor = connection.cursor()
+            for etapa, script in ETAPAS_ESQUEMA:
+                inicio = datetime.now()
+                self.log(f"{etapa}: ejecutando {script}")
+                for lote in lotes_sql(os.path.join(BASE_DIR, script)):
+                    cursor.execute(lote)
+                    while True:
+                        try:
+                            if not cursor.nextset():
+                                break
+                        except self.backend.Error:
+                            break
+                ejecutadas.append((etapa, inicio, datetime.now()))
+        finally:
+            connection.autocommit = False
+            connection.close()
+        return ejecutadas
+
+    def etapa_csv_to_stg(self):
+        from extract_data import CSVToSQLServer
+        return CSVToSQLServer(self.config_file).run_etl()
+
+    def etapa_stg_to_int(self):
+        from load_STG_to_INT import DWLoader
+        return DWLoader(self.config_file).run()
+
+    def etapa_dw(self, etapa):
+        """Una de las etapas DW, confirmada sola. Sin cambios en INT (manifest) se omite."""
+        from dw_loader import ELTDataWarehouseLoader
+        from manifest import SP_POR_ARCHIVO
+
+        if self.dw is None:
+            self.dw = ELTDataWarehouseLoader(self.config_file)
+            self.dw.reprocesar = self.reprocesar
+            if self.meses is not None:
+                self.dw.meses_reproceso = self.meses
+            if not self.dw.connect_db():
+                raise RuntimeError("Sin conexion a BD para INT -> DW")
+            self.pendientes_dw = self.dw.manifest.pendientes('dw', list(SP_POR_ARCHIVO))
+            self.inicio_dw = datetime.now()
+
+        if not self.pendientes_dw and not self.reprocesar and self.dw.meses_reproceso is None:
+            self.log(f"{etapa}: sin cambios en INT desde la última carga al DW, se omite")
+            return True
+        if etapa == 'DW_Reproceso_Meses' and self.dw.meses_reproceso is None:
+            self.log(f"{etapa}: sin meses para reprocesar, se omite")
+            return True
+
+        pasos = {
+            'DW_Dimensiones': self.dw.cargar_dimensiones,
+            'DW_Reproceso_Meses': self.dw.reprocesar_meses,
+            'DW_Fact_Ventas': self.dw.cargar_fact_ventas,
+            'DW_Fact_Entregas': self.dw.cargar_fact_entregas,
+            'DW_Agregados': self.dw.cargar_agregados,
+        }
+        try:
+            pasos[etapa]()
+            if etapa == ETAPAS_DW[-1]:
+                self.dw.registrar_metricas(self.inicio_dw, datetime.now())
+            self.dw.connection.commit()
+        except Exception:
+            self.dw.connection.rollback()
+            raise
+
+        if etapa == ETAPAS_DW[-1]:
+            self.dw.manifest.confirmar('dw', self.pendientes_dw)
+            self.dw.show_summary()
+            self.dw.metricas.resumen('INT_to_DW')
+            self.dw.metricas.escribir()
+        return True
+
+    def ejecutar_etapa(self, etapa):
+        if etapa == 'CSV_to_STG':
+            return self.etapa_csv_to_stg()
+        if etapa == 'STG_to_INT':
+            return self.etapa_stg_to_int()
+        return self.etapa_dw(etapa)
+
+    # ------------------------------------------------------------------
+    def run(self, esquema=False, desde_cero=False):
+        print("\n" + "=" * 70)
+        print("PIPELINE DATASHOP: DATASET -> STAGING -> INT -> DW")
+        print("=" * 70)
+        inicio = datetime.now()
+
+        try:
+            hechas = set()
+            esquema_ejecutado = self.crear_esquema() if esquema else []
+
+            anterior = None if (esquema or desde_cero) else self.ultima_corrida()
+            if anterior and anterior[1] != 'COMPLETADO':
+                # Reanudar la corrida que no terminó desde la etapa que falló
+                self.id_pipeline = anterior[0]
+                hechas = self.completadas(self.id_pipeline)
+                self._ejecutar(
+                    "UPDATE ETL_Control_Procesos SET Estado = 'EN_PROCESO', Fecha_Fin = NULL, "
+                    "Mensaje_Error = NULL WHERE ID_Proceso = ?", (self.id_pipeline,)
+                )
+                self.log(f"Reanudando corrida {self.id_pipeline}; etapas ya completadas: "
+                         f"{', '.join(e for e in ETAPAS if e in hechas) or 'ninguna'}")
+            else:
+                self.id_pipeline = self._nuevo_proceso(PROCESO)
+                self.log(f"Corrida nueva: ID_Proceso {self.id_pipeline}")
+
+            for etapa, inicio_etapa, fin_etapa in esquema_ejecutado:
+                self._ejecutar(
+                    "INSERT INTO ETL_Control_Procesos (Nombre_Proceso, Fecha_Inicio, Fecha_Fin, Estado) "
+                    "VALUES (?, ?, ?, 'COMPLETADO')",
+                    (nombre_etapa(etapa), inicio_etapa.replace(microsecond=0), fin_etapa.replace(microsecond=0))
+                )
+
+            for etapa in ETAPAS:
+                if etapa in hechas:
+                    self.log(f"{etapa}: completada en la corrida anterior, se saltea")
+                    continue
+
+                print("\n" + "-" * 70)
+                self.log(f"ETAPA {etapa}", "PROCESS")
+                print("-" * 70)
+                id_etapa = self._nuevo_proceso(nombre_etapa(etapa))
+                try:
+                    if not self.ejecutar_etapa(etapa):
+                        raise RuntimeError(f"La etapa {etapa} terminó con errores (ver el log de arriba)")
+                except Exception as e:
+                    self._cerrar_proceso(id_etapa, 'ERROR', str(e))
+                    self._cerrar_proceso(self.id_pipeline, 'ERROR', f"{etapa}: {e}")
+                    self.log(f"{etapa}: {e}", "ERROR")
+                    self.log("Volver a ejecutar pipeline.py reanuda desde esta etapa", "WARNING")
+                    return False
+                self._cerrar_proceso(id_etapa, 'COMPLETADO')
+                self.log(f"{etapa}: checkpoint registrado", "SUCCESS")
+
+            self._cerrar_proceso(self.id_pipeline, 'COMPLETADO')
+            print("\n" + "=" * 70)
+            print("PIPELINE COMPLETADO")
+            print(f"Duracion total: {(datetime.now() - inicio).total_seconds():.1f} segundos")
+            print("=" * 70 + "\n")
+            return True
+
+        finally:
+            if self.dw is not None and self.dw.connection:
+                self.dw.connection.close()
+                self.dw.connection = None
+
+    def mostrar_estado(self):
+        """Checkpoints de la última corrida."""
+        anterior = self.ultima_corrida()
+        if not anterior:
+            print("Sin corridas del pipeline en ETL_Control_Procesos")
+            return
+        id_pipeline, estado = anterior
+        print(f"\nCorrida {id_pipeline}: {estado}")
+        registradas = {}
+        for etapa, estado_etapa, fecha_inicio, fecha_fin, mensaje in self.checkpoints(id_pipeline):
+            # Si la etapa se reintentó vale el último intento
+            registradas[etapa] = (estado_etapa, fecha_inicio, fecha_fin, mensaje)
+        for etapa in [e for e, _ in ETAPAS_ESQUEMA] + ETAPAS:
+            if etapa not in registradas:
+                if etapa in ETAPAS:
+                    print(f"  {etapa:<18} PENDIENTE")
+                continue
+            estado_etapa, fecha_inicio, fecha_fin, mensaje = registradas[etapa]
+            print(f"  {etapa:<18} {estado_etapa:<11} {fecha_inicio} -> {fecha_fin or ''}")
+            if mensaje:
+                print(f"  {'':<18} {mensaje}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline DATASET -> DW con checkpoint y reanudación")
+    parser.add_argument('--esquema', action='store_true',
+                        help="ejecutar antes los scripts SQL (borra y recrea las tablas)")
+    parser.add_argument('--desde-cero', action='store_true',
+                        help="corrida nueva aunque la anterior no haya terminado")
+    parser.add_argument('--reprocesar', action='store_true',
+                        help="@Reprocesar = 1 en las etapas DW (recarga los hechos)")
+    parser.add_argument('--meses', default=None,
+                        help="reprocesar solo estos meses de los hechos: AAAAMM,AAAAMM o 'auto' "
+                             "(por defecto, [DW] meses_reproceso)")
+    parser.add_argument('--estado', action='store_true', help="mostrar los checkpoints de la última corrida")
+    parser.add_argument('--config', default='config.ini', help="archivo de configuración (relativo a Scripts)")
+    args = parser.parse_args()
+    try:
+        meses = lista_meses(args.meses)
+    except ValueError as e:
+        parser.error(str(e))
+    if meses is not None and args.reprocesar:
+        parser.error("--meses y --reprocesar son excluyentes")
+
+    try:
+        pipeline = Pipeline(args.config, reprocesar=1 if args.reprocesar else 0, meses=meses)
+        if args.estado:
+            pipeline.mostrar_estado()
+            return
+        ok = pipeline.run(esquema=args.esquema, desde_cero=args.desde_cero)
+        sys.exit(0 if ok else 1)
+    finally:
+        close_pools()
+
+
+if __name__ == "__main__":
+    main()
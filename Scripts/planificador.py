@@ -0,0 +1,260 @@
+"""
+Planificador de los pasos STG -> INT e INT -> DW según sus dependencias ([PLANIFICADOR]).
+
+SP_Orquestador_STG_to_INT y SP_Orquestador_INT_to_DW ejecutan sus SP en serie aunque
+escriban tablas distintas. Con paralelo > 1 los loaders declaran el grafo de pasos y cada
+paso se lanza en cuanto terminaron sus dependencias, en su propia conexión y con hasta
+`paralelo` pasos a la vez: la duración tiende al camino crítico y no a la suma.
+
+    STG -> INT : los 8 SP_STG_to_INT_* son independientes (cada uno escribe su tabla INT)
+    INT -> DW  : Dim_Tiempo y las 6 dimensiones son independientes
+                 Fact_Ventas   <- Dim_Tiempo, Dim_Producto, Dim_Cliente, Dim_Tienda
+                 Fact_Entregas <- Fact_Ventas, Dim_Proveedor, Dim_Almacen, Dim_EstadoPedido
+                 Agregados     <- Fact_Ventas, Fact_Entregas
+
+Cada paso se confirma al terminar: el siguiente corre en otra conexión y tiene que ver lo
+que escribió su dependencia. A diferencia del SP orquestador, si un paso falla los que ya
+terminaron quedan confirmados; todos se pueden volver a ejecutar (las tablas INT se
+vacían y las dimensiones y los hechos no se duplican), así que alcanza con reintentar.
+
+Sección opcional [PLANIFICADOR] de config.ini:
+    paralelo = 1   (1 = el SP orquestador, en serie)
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from manifest import ORDEN_SP_STG_TO_INT
+from metricas import ultimo_id_proceso
+
+
+DIM_TIEMPO = 'Sp_Genera_Dim_Tiempo'
+AGREGADOS = 'SP_DW_Actualizar_Agregados'
+
+DIMENSIONES_DW = [
+    'SP_INT_to_DW_Dim_EstadoPedido', 'SP_INT_to_DW_Dim_Almacen', 'SP_INT_to_DW_Dim_Cliente',
+    'SP_INT_to_DW_Dim_Producto', 'SP_INT_to_DW_Dim_Tienda', 'SP_INT_to_DW_Dim_Proveedor',
+]
+
+# Paso -> pasos que tienen que terminar antes
+GRAFO_STG_TO_INT = {sp: () for sp in ORDEN_SP_STG_TO_INT}
+
+GRAFO_INT_TO_DW = {
+    DIM_TIEMPO: (),
+    **{sp: () for sp in DIMENSIONES_DW},
+    'SP_INT_to_DW_Fact_Ventas': (
+        DIM_TIEMPO, 'SP_INT_to_DW_Dim_Producto', 'SP_INT_to_DW_Dim_Cliente', 'SP_INT_to_DW_Dim_Tienda',
+    ),
+    'SP_INT_to_DW_Fact_Entregas': (
+        'SP_INT_to_DW_Fact_Ventas', 'SP_INT_to_DW_Dim_Proveedor', 'SP_INT_to_DW_Dim_Almacen',
+        'SP_INT_to_DW_Dim_EstadoPedido',
+    ),
+    AGREGADOS: ('SP_INT_to_DW_Fact_Ventas', 'SP_INT_to_DW_Fact_Entregas'),
+}
+
+# Registros_Procesados de cada proceso, como en los SP orquestadores
+TABLAS_INT = [
+    'INT_EstadoPedido', 'INT_Almacen', 'INT_Cliente', 'INT_Producto',
+    'INT_Tienda', 'INT_Proveedor', 'INT_Ventas', 'INT_Entregas',
+]
+TABLAS_FACT = ['Fact_Ventas', 'Fact_Entregas']
+
+
+def paralelo_configurado(config, backend):
+    """[PLANIFICADOR] paralelo, acotado a lo que admite el backend y su pool."""
+    paralelo = config.getint('PLANIFICADOR', 'paralelo', fallback=1)
+    if paralelo <= 1:
+        return 1
+    if not backend.soporta_paralelo:
+        print(f" ADVERTENCIA: el backend '{backend.nombre}' no admite pasos en paralelo; se usa paralelo=1.")
+        return 1
+    # El loader retiene una conexión propia mientras corren los pasos
+    disponibles = max(1, backend.pool_size - 1)
+    if paralelo > disponibles:
+        print(f" ADVERTENCIA: paralelo={paralelo} supera las conexiones libres del pool ({disponibles}); "
+              f"se usan {disponibles}.")
+        return disponibles
+    return paralelo
+
+
+def orden_topologico(grafo):
+    """Pasos en un orden que respeta las dependencias (el de declaración ante empates)."""
+    for paso, dependencias in grafo.items():
+        desconocidas = [d for d in dependencias if d not in grafo]
+        if desconocidas:
+            raise ValueError(f"{paso} depende de pasos inexistentes: {', '.join(desconocidas)}")
+
+    orden, hechos = [], set()
+    while len(orden) < len(grafo):
+        listos = [p for p in grafo if p not in hechos and all(d in hechos for d in grafo[p])]
+        if not listos:
+            raise ValueError("El grafo de pasos tiene un ciclo: " + ', '.join(p for p in grafo if p not in hechos))
+        orden.extend(listos)
+        hechos.update(listos)
+    return orden
+
+
+def camino_critico(grafo, duraciones):
+    """(segundos, [pasos]) del camino más largo entre los pasos ejecutados."""
+    largo, previo = {}, {}
+    for paso in orden_topologico(grafo):
+        if paso not in duraciones:
+            continue
+        anteriores = [d for d in grafo[paso] if d in largo]
+        mejor = max(anteriores, key=largo.get, default=None)
+        largo[paso] = duraciones[paso] + (largo[mejor] if mejor else 0)
+        previo[paso] = mejor
+    if not largo:
+        return 0.0, []
+    paso = max(largo, key=largo.get)
+    total = largo[paso]
+    camino = []
+    while paso:
+        camino.append(paso)
+        paso = previo[paso]
+    return total, camino[::-1]
+
+
+def en_conexion(backend, funcion):
+    """funcion(connection) en una conexión propia, confirmada al terminar (rollback si falla)."""
+    connection = backend.connect()
+    try:
+        resultado = funcion(connection)
+        connection.commit()
+        return resultado
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def paso_sp(backend, id_proceso, reprocesar=0, incremental=0):
+    """ejecutar(sp) para el Planificador: cada SP en su conexión, con los parámetros del orquestador."""
+    def ejecutar(sp):
+        return en_conexion(
+            backend, lambda connection: backend.run_sp(connection, sp, id_proceso, reprocesar, incremental)
+        )
+    return ejecutar
+
+
+# ----------------------------------------------------------------------
+# ETL_Control_Procesos (lo que hace cada SP orquestador al empezar y al terminar)
+
+def iniciar_proceso(backend, nombre):
+    def insertar(connection):
+        cursor = connection.cursor()
+        # Fecha_Inicio con el reloj de la base: SP_DW_Actualizar_Agregados la compara con FechaCarga
+        cursor.execute(
+            "INSERT INTO ETL_Control_Procesos (Nombre_Proceso, Fecha_Inicio, Estado) "
+            f"VALUES (?, {backend.ahora_sql}, 'EN_PROCESO')",
+            (nombre,)
+        )
+        return ultimo_id_proceso(cursor, nombre)
+    return en_conexion(backend, insertar)
+
+
+def finalizar_proceso(backend, id_proceso, tablas):
+    """COMPLETADO, con las filas de `tablas` como procesados y los rechazos del proceso."""
+    def actualizar(connection):
+        cursor = connection.cursor()
+        procesados = sum(backend.count(cursor, tabla) for tabla in tablas)
+        cursor.execute(f"""
+            UPDATE ETL_Control_Procesos
+            SET Fecha_Fin = {backend.ahora_sql},
+                Estado = 'COMPLETADO',
+                Registros_Procesados = ?,
+                Registros_Rechazados = (
+                    SELECT COALESCE(SUM(Cantidad), 0) FROM ETL_Rechazos_Resumen WHERE ID_Proceso = ?
+                )
+            WHERE ID_Proceso = ?
+        """, (procesados, id_proceso, id_proceso))
+    en_conexion(backend, actualizar)
+
+
+def marcar_error(backend, id_proceso, error):
+    def actualizar(connection):
+        connection.cursor().execute(
+            f"UPDATE ETL_Control_Procesos SET Fecha_Fin = {backend.ahora_sql}, Estado = 'ERROR', "
+            "Mensaje_Error = ? WHERE ID_Proceso = ?",
+            (str(error), id_proceso)
+        )
+    en_conexion(backend, actualizar)
+
+
+# ----------------------------------------------------------------------
+class Planificador:
+    """Ejecuta los pasos de un grafo en hilos, cada uno en cuanto terminan sus dependencias."""
+
+    def __init__(self, grafo, ejecutar, paralelo=1):
+        self.grafo = grafo
+        self.orden = orden_topologico(grafo)
+        # ejecutar(paso) corre en un hilo y devuelve los mensajes del paso (o None)
+        self.ejecutar = ejecutar
+        self.paralelo = max(1, paralelo)
+        self.duraciones = {}
+        self.segundos = 0.0
+
+        # Entre los pasos listos van primero los que destraban más pasos (el camino a los hechos)
+        self.siguientes = {paso: 0 for paso in grafo}
+        for paso in reversed(self.orden):
+            for dependencia in grafo[paso]:
+                self.siguientes[dependencia] += 1 + self.siguientes[paso]
+
+    def _medido(self, paso):
+        inicio = time.perf_counter()
+        mensajes = self.ejecutar(paso)
+        return mensajes, time.perf_counter() - inicio
+
+    def run(self, pasos=None):
+        """
+        Ejecuta `pasos` (None = todo el grafo) respetando las dependencias; las que quedan
+        fuera de `pasos` se dan por cumplidas. Ante el primer error no se lanzan pasos
+        nuevos, se esperan los que están en curso y se relanza el error.
+        """
+        seleccion = [paso for paso in self.orden if pasos is None or paso in pasos]
+        pendientes = list(seleccion)
+        hechos = set()
+        en_curso = {}
+        error = None
+        inicio = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.paralelo) as executor:
+            while en_curso or (pendientes and error is None):
+                if error is None:
+                    listos = [
+                        paso for paso in pendientes
+                        if all(d in hechos or d not in seleccion for d in self.grafo[paso])
+                    ]
+                    listos.sort(key=lambda paso: -self.siguientes[paso])
+                    for paso in listos[:self.paralelo - len(en_curso)]:
+                        pendientes.remove(paso)
+                        en_curso[executor.submit(self._medido, paso)] = paso
+
+                terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    paso = en_curso.pop(futuro)
+                    try:
+                        mensajes, segundos = futuro.result()
+                    except Exception as e:
+                        print(f" ERROR en {paso}: {e}")
+                        error = error or e
+                        continue
+                    hechos.add(paso)
+                    self.duraciones[paso] = segundos
+                    for mensaje in mensajes or []:
+                        print(mensaje)
+                    print(f" OK: {paso} ({segundos:.2f}s)")
+
+        self.segundos = time.perf_counter() - inicio
+        if error is not None:
+            raise error
+        return self.duraciones
+
+    def resumen(self):
+        """Duración real frente a la suma de los pasos y al camino crítico."""
+        if not self.duraciones:
+            return
+        critico, camino = camino_critico(self.grafo, self.duraciones)
+        print(f"\n Planificador ({self.paralelo} en paralelo): {self.segundos:.2f}s reales | "
+              f"suma de pasos {sum(self.duraciones.values()):.2f}s | camino crítico {critico:.2f}s")
+        print(f" Camino crítico: {' -> '.join(camino)}")
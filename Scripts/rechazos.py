@@ -0,0 +1,239 @@
+"""
+Registro compacto de rechazos: códigos de motivo, conteos por regla y una muestra acotada.
+
+Antes cada rechazo era una fila de ETL_Registros_Rechazados (texto concatenado y motivo
+libre) escrita en la misma transacción que la carga y sin límite: un archivo malo podía
+duplicar lo que se escribe en la base. Ahora:
+
+    ETL_Rechazos_Motivos      -> catálogo de códigos (MOTIVOS) y tope de filas por regla
+    ETL_Rechazos_Resumen      -> cantidad de rechazos por proceso, tabla y código (el total real)
+    ETL_Registros_Rechazados  -> como mucho `Tope` filas por proceso, tabla y código, elegidas
+                                 al azar entre todas las rechazadas (Tope NULL = todas)
+
+En los SP (y en el motor local) los rechazos de cada paso se juntan en #Rechazos y
+SP_ETL_Registrar_Rechazos escribe el conteo y la muestra. Los rechazos que se detectan en
+Python (validación de la extracción y Fact_Ventas con claves en memoria) pasan por
+SumideroRechazos, que además puede volcar el detalle completo de cada fila a un archivo
+JSONL local, por tandas y fuera de la transacción de la carga.
+
+Sección opcional [RECHAZOS] de config.ini:
+    tope    = filas de detalle por regla y proceso en la base (vacío = sin tope, 0 = solo conteos)
+    topes   = topes por código, 'codigo:tope, ...' (reemplazan a tope en esas reglas)
+    detalle = no | jsonl (detalle completo en carpeta/, un archivo por proceso)
+    carpeta = carpeta del detalle (relativa a Scripts)
+    lote    = filas por escritura del archivo de detalle
+"""
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from db_session import BASE_DIR
+from planificador import en_conexion
+import validacion
+
+
+# Códigos de los SP (los de la extracción están en validacion.py)
+ESTADO_VACIO_STG = 30
+DESCRIPCION_ESTADO_VACIA = 31
+ALMACEN_INCOMPLETO = 32
+
+FECHA_SIN_DIM_TIEMPO = 40
+PRODUCTO_SIN_DIMENSION = 41
+CLIENTE_SIN_DIMENSION = 42
+TIENDA_SIN_DIMENSION = 43
+
+VENTA_INEXISTENTE = 50
+FECHA_ENTREGA_SIN_DIM_TIEMPO = 51
+
+ERROR_DESCONOCIDO = 99
+
+# Catálogo completo; SQLQueryINT.sql carga los mismos códigos en ETL_Rechazos_Motivos
+MOTIVOS = {
+    **validacion.MOTIVOS,
+    ESTADO_VACIO_STG: 'CodEstado nulo o vacío (STG)',
+    DESCRIPCION_ESTADO_VACIA: 'Descripcion_Estado nulo o vacío',
+    ALMACEN_INCOMPLETO: 'CodAlmacen o Nombre_Almacen nulo o vacío',
+    FECHA_SIN_DIM_TIEMPO: 'Fecha no existe en Dim_Tiempo',
+    PRODUCTO_SIN_DIMENSION: 'Producto no existe en Dim_Producto',
+    CLIENTE_SIN_DIMENSION: 'Cliente no existe en Dim_Cliente',
+    TIENDA_SIN_DIMENSION: 'Tienda no existe en Dim_Tienda',
+    VENTA_INEXISTENTE: 'Venta inexistente',
+    FECHA_ENTREGA_SIN_DIM_TIEMPO: 'Fecha de entrega inválida',
+    ERROR_DESCONOCIDO: 'Error desconocido',
+}
+
+DETALLES = ('no', 'jsonl')
+
+
+def leer_tope(texto):
+    """'' -> None (sin tope) | '100' -> 100."""
+    texto = (texto or '').strip()
+    if not texto:
+        return None
+    tope = int(texto)
+    if tope < 0:
+        raise ValueError(f"Tope de rechazos inválido: '{texto}'")
+    return tope
+
+
+def topes_configurados(config):
+    """(tope por defecto, {código: tope}) de [RECHAZOS]."""
+    tope = leer_tope(config.get('RECHAZOS', 'tope', fallback=''))
+    topes = {}
+    for par in config.get('RECHAZOS', 'topes', fallback='').split(','):
+        if not par.strip():
+            continue
+        codigo, _, valor = par.partition(':')
+        codigo = int(codigo)
+        if codigo not in MOTIVOS:
+            raise ValueError(f"Código de motivo desconocido: '{codigo}'")
+        topes[codigo] = leer_tope(valor)
+    return tope, topes
+
+
+def sincronizar_topes(backend, config):
+    """
+    Copia los topes de [RECHAZOS] a ETL_Rechazos_Motivos, que es donde los leen los SP.
+    Va en su propia conexión y se confirma enseguida: los pasos del planificador usan otras.
+    """
+    tope, topes = topes_configurados(config)
+
+    def actualizar(connection):
+        cursor = connection.cursor()
+        cursor.execute("UPDATE ETL_Rechazos_Motivos SET Tope = ?", (tope,))
+        for codigo, valor in topes.items():
+            cursor.execute("UPDATE ETL_Rechazos_Motivos SET Tope = ? WHERE Codigo_Motivo = ?", (valor, codigo))
+    en_conexion(backend, actualizar)
+
+
+class SumideroRechazos:
+    """
+    Junta los rechazos detectados en Python: cuenta todos, guarda una muestra de hasta
+    `tope` filas por tabla y código (muestreo de reservorio, uniforme sobre todo el proceso)
+    y, con detalle = jsonl, escribe cada fila completa al archivo por tandas de `lote`.
+    volcar() escribe el conteo y la muestra en la base. Se puede usar desde varios hilos.
+    """
+
+    def __init__(self, config, etapa, id_proceso):
+        self.tope, self.topes = topes_configurados(config)
+        self.detalle = config.get('RECHAZOS', 'detalle', fallback='no').strip().lower()
+        self.lote = config.getint('RECHAZOS', 'lote', fallback=10000)
+        if self.detalle not in DETALLES:
+            raise ValueError(f"Detalle de rechazos desconocido: '{self.detalle}'")
+        if self.lote <= 0:
+            raise ValueError("[RECHAZOS] lote debe ser mayor a 0.")
+
+        self.etapa = etapa
+        self.id_proceso = id_proceso
+        self.ruta = None
+        if self.detalle == 'jsonl':
+            carpeta = os.path.join(BASE_DIR, config.get('RECHAZOS', 'carpeta', fallback='rechazos').strip())
+            marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.ruta = os.path.join(carpeta, f"rechazos_{etapa}_{id_proceso}_{marca}.jsonl")
+
+        self.conteos = {}
+        self.muestras = {}
+        self.pendientes = []
+        self.filas_pendientes = 0
+        self.azar = np.random.default_rng(id_proceso)
+        self.lock = threading.Lock()
+
+    def tope_de(self, codigo):
+        return self.topes.get(codigo, self.tope)
+
+    def agregar(self, tabla, rechazadas):
+        """
+        rechazadas: DataFrame con Codigo, Motivo_Rechazo y Registro_Original; el resto de
+        sus columnas (la fila original) solo va al archivo de detalle.
+        """
+        if rechazadas is None or rechazadas.empty:
+            return
+        with self.lock:
+            for codigo, grupo in rechazadas.groupby('Codigo', sort=False):
+                self.muestrear((tabla, int(codigo)), grupo)
+            if self.ruta:
+                self.pendientes.append(rechazadas.assign(ID_Proceso=self.id_proceso, Tabla_Origen=tabla))
+                self.filas_pendientes += len(rechazadas)
+                if self.filas_pendientes >= self.lote:
+                    self.escribir()
+
+    def muestrear(self, clave, grupo):
+        vistos = self.conteos.get(clave, 0)
+        self.conteos[clave] = vistos + len(grupo)
+        tope = self.tope_de(clave[1])
+        filas = list(zip(grupo['Registro_Original'], grupo['Motivo_Rechazo']))
+        muestra = self.muestras.setdefault(clave, [])
+
+        if tope is None:
+            muestra.extend(filas)
+            return
+        libres = max(0, tope - vistos)
+        muestra.extend(filas[:libres])
+        if len(filas) <= libres:
+            return
+        # Reservorio: la fila i-ésima del proceso reemplaza a una de la muestra con probabilidad tope/i
+        posiciones = vistos + np.arange(libres, len(filas))
+        sorteo = self.azar.integers(0, posiciones + 1)
+        for fila, lugar in zip(filas[libres:], sorteo):
+            if lugar < tope:
+                muestra[lugar] = fila
+
+    def escribir(self):
+        """Agrega al archivo de detalle las filas pendientes (con el lock tomado)."""
+        if not self.pendientes:
+            return
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        columnas = ['ID_Proceso', 'Tabla_Origen', 'Codigo', 'Motivo_Rechazo']
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            # Cada tabla con sus propias columnas (no se concatenan archivos distintos)
+            for tanda in self.pendientes:
+                tanda = tanda[columnas + [c for c in tanda.columns if c not in columnas]]
+                texto = tanda.to_json(orient='records', lines=True, force_ascii=False, default_handler=str)
+                # Algunas versiones de pandas no terminan la última línea
+                f.write(texto if texto.endswith('\n') else texto + '\n')
+        self.pendientes = []
+        self.filas_pendientes = 0
+
+    def total(self, tabla=None):
+        return sum(n for (t, _), n in self.conteos.items() if tabla is None or t == tabla)
+
+    def volcar(self, cursor):
+        """
+        Escribe el conteo por tabla y código y la muestra (sin commit) y termina el archivo
+        de detalle. Devuelve las filas de detalle que quedaron en la base.
+        """
+        with self.lock:
+            if self.ruta:
+                self.escribir()
+            if not self.conteos:
+                return 0
+            cursor.executemany(
+                "INSERT INTO ETL_Rechazos_Resumen (ID_Proceso, Tabla_Origen, Codigo_Motivo, Cantidad) "
+                "VALUES (?, ?, ?, ?)",
+                [(self.id_proceso, tabla, codigo, cantidad) for (tabla, codigo), cantidad in self.conteos.items()]
+            )
+            muestra = [
+                (self.id_proceso, tabla, registro, codigo, motivo)
+                for (tabla, codigo), filas in self.muestras.items()
+                for registro, motivo in filas
+            ]
+            if muestra:
+                cursor.executemany(
+                    "INSERT INTO ETL_Registros_Rechazados "
+                    "(ID_Proceso, Tabla_Origen, Registro_Original, Codigo_Motivo, Motivo_Rechazo) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    muestra
+                )
+            return len(muestra)
+
+    def describir(self):
+        """Resumen por tabla y código para el log."""
+        lineas = []
+        for (tabla, codigo), cantidad in sorted(self.conteos.items()):
+            guardadas = len(self.muestras.get((tabla, codigo), []))
+            lineas.append(f"   {tabla} [{codigo}] {MOTIVOS.get(codigo, '')}: {cantidad} ({guardadas} en la base)")
+        if self.ruta and self.conteos:
+            lineas.append(f"   Detalle completo: {self.ruta}")
+        return lineas
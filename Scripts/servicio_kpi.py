@@ -0,0 +1,334 @@
+"""
+Servicio local de KPIs del tablero, con caché de resultados (sección [SERVICIO_KPI] de config.ini).
+
+Responde las consultas de indicadores del tablero desde los agregados mensuales que
+mantiene SP_DW_Actualizar_Agregados (Agg_Ventas_Mes y Agg_Entregas_Mes), no desde los hechos:
+
+    GET /kpi/ventas    -> ventas, unidades, importe, IVA y total por período
+                          (filtro opcional: tienda, producto)
+    GET /kpi/entregas  -> entregas, entregadas, a tiempo, tasa de entrega a tiempo y costo
+                          por período (filtro opcional: proveedor, almacen, estado)
+    GET /estado        -> versión de la carga y estadísticas de la caché
+
+    Parámetros comunes: periodo = mes | trimestre | anio (mes por defecto)
+                        desde, hasta = AAAAMM (inclusive)
+
+Los datos cambian solo cuando el ETL confirma una carga al DW, así que los resultados se
+guardan en una caché LRU acotada por cantidad de entradas y de filas. La caché se vacía
+sola cuando cambia la última fila 'INT_to_DW_Completo' de ETL_Control_Procesos (un
+proceso nuevo, o el mismo que termina o actualiza sus conteos): entre cargas las
+consultas repetidas se sirven de memoria. Para no consultar ETL_Control_Procesos en cada
+pedido, la versión se verifica como mucho cada `verificar_cada` segundos.
+
+    host, puerto    = dirección del servicio (127.0.0.1:8050)
+    cache_entradas  = resultados guardados como máximo
+    cache_filas     = filas guardadas como máximo entre todos los resultados
+    verificar_cada  = segundos entre verificaciones de la versión (0 = en cada consulta)
+
+Uso: python servicio_kpi.py [--config config.ini] [--puerto 8050]
+"""
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from backends import get_backend
+from db_session import close_pools, load_config
+
+
+PROCESO_DW = 'INT_to_DW_Completo'
+
+# Período -> columnas de agrupación sobre AnioMes/Anio/Mes de los agregados
+PERIODOS = {
+    'mes': 'Anio, Mes',
+    'trimestre': 'Anio, (Mes - 1) / 3 + 1',
+    'anio': 'Anio',
+}
+
+# KPI -> (tabla, columnas sumadas, filtros admitidos {parámetro: columna})
+KPIS = {
+    'ventas': (
+        'Agg_Ventas_Mes',
+        ['Cant_Ventas', 'Cantidad', 'Importe', 'Total_IVA'],
+        {'tienda': 'ID_Tienda', 'producto': 'ID_Producto'},
+    ),
+    'entregas': (
+        'Agg_Entregas_Mes',
+        ['Cant_Entregas', 'Entregas_Entregadas', 'Entregas_A_Tiempo', 'Costo_Entrega'],
+        {'proveedor': 'ID_Proveedor', 'almacen': 'ID_Almacen', 'estado': 'ID_Estado'},
+    ),
+}
+
+
+def etiqueta_periodo(periodo, claves):
+    if periodo == 'mes':
+        return f"{claves[0]}-{claves[1]:02d}"
+    if periodo == 'trimestre':
+        return f"{claves[0]}-T{claves[1]}"
+    return str(claves[0])
+
+
+def numero(valor):
+    """DECIMAL de SQL Server -> float para JSON (SQLite ya devuelve float/int)."""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return 0 if valor is None else valor
+
+
+class CacheLRU:
+    """Resultados por clave, acotados por entradas y por filas; descarta los menos usados."""
+
+    def __init__(self, max_entradas=256, max_filas=100000):
+        if max_entradas <= 0 or max_filas <= 0:
+            raise ValueError("cache_entradas y cache_filas deben ser mayores a 0.")
+        self.max_entradas = max_entradas
+        self.max_filas = max_filas
+        self._datos = OrderedDict()
+        self.filas = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+
+    def obtener(self, clave):
+        if clave not in self._datos:
+            self.fallos += 1
+            return None
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return self._datos[clave]
+
+    def guardar(self, clave, filas):
+        # Un resultado más grande que la caché entera no se guarda
+        if len(filas) > self.max_filas:
+            return
+        if clave in self._datos:
+            self.filas -= len(self._datos.pop(clave))
+        self._datos[clave] = filas
+        self.filas += len(filas)
+        while len(self._datos) > self.max_entradas or self.filas > self.max_filas:
+            _, descartado = self._datos.popitem(last=False)
+            self.filas -= len(descartado)
+            self.descartes += 1
+
+    def limpiar(self):
+        self._datos.clear()
+        self.filas = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class ServicioKPI:
+    """KPIs del tablero desde los agregados, con caché invalidada por carga al DW."""
+
+    def __init__(self, config_file='config.ini'):
+        config = load_config(config_file)
+        self.backend = get_backend(config_file)
+        self.cache = CacheLRU(
+            config.getint('SERVICIO_KPI', 'cache_entradas', fallback=256),
+            config.getint('SERVICIO_KPI', 'cache_filas', fallback=100000),
+        )
+        self.verificar_cada = config.getfloat('SERVICIO_KPI', 'verificar_cada', fallback=5)
+        self.version = None
+        self.invalidaciones = 0
+        self._verificado = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def _consultar(self, sql, params=()):
+        connection = self.backend.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            filas = cursor.fetchall()
+            # Solo lectura: cierra la transacción implícita antes de devolver la conexión
+            connection.rollback()
+            return filas
+        finally:
+            connection.close()
+
+    def version_actual(self):
+        """Última fila INT_to_DW_Completo: (ID_Proceso, Estado, Fecha_Fin) o None."""
+        filas = self._consultar("""
+            SELECT ID_Proceso, Estado, Fecha_Fin
+            FROM ETL_Control_Procesos
+            WHERE ID_Proceso = (
+                SELECT MAX(ID_Proceso) FROM ETL_Control_Procesos WHERE Nombre_Proceso = ?
+            )
+        """, (PROCESO_DW,))
+        if not filas:
+            return None
+        id_proceso, estado, fecha_fin = filas[0]
+        return (id_proceso, estado, None if fecha_fin is None else str(fecha_fin))
+
+    def verificar_version(self):
+        """Vacía la caché si hubo una carga al DW desde la última verificación."""
+        ahora = time.monotonic()
+        with self._lock:
+            if self._verificado is not None and ahora - self._verificado < self.verificar_cada:
+                return self.version
+        version = self.version_actual()
+        with self._lock:
+            self._verificado = ahora
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidaciones += 1
+                    print(f" Cambió la carga del DW ({self.version} -> {version}): se vacía la caché")
+                self.cache.limpiar()
+                self.version = version
+            return self.version
+
+    # ------------------------------------------------------------------
+    def kpi(self, nombre, periodo='mes', desde=None, hasta=None, **filtros):
+        """Filas del KPI por período (lista de dicts), de la caché si la carga no cambió."""
+        if nombre not in KPIS:
+            raise ValueError(f"KPI desconocido: '{nombre}' (disponibles: {', '.join(KPIS)})")
+        if periodo not in PERIODOS:
+            raise ValueError(f"Período desconocido: '{periodo}' (disponibles: {', '.join(PERIODOS)})")
+        tabla, columnas, admitidos = KPIS[nombre]
+        desconocidos = [filtro for filtro in filtros if filtro not in admitidos]
+        if desconocidos:
+            raise ValueError(f"Filtros no admitidos para {nombre}: {', '.join(desconocidos)}")
+
+        desde = int(desde) if desde is not None else 0
+        hasta = int(hasta) if hasta is not None else 999999
+        filtros = {filtro: int(valor) for filtro, valor in filtros.items() if valor is not None}
+        clave = (nombre, periodo, desde, hasta, tuple(sorted(filtros.items())))
+
+        version = self.verificar_version()
+        with self._lock:
+            filas = self.cache.obtener(clave)
+        if filas is not None:
+            return filas
+
+        filas = self._calcular(nombre, tabla, columnas, admitidos, periodo, desde, hasta, filtros)
+        with self._lock:
+            # Si entró una carga mientras se calculaba, el resultado puede ser de la anterior
+            if self.version == version:
+                self.cache.guardar(clave, filas)
+        return filas
+
+    def _calcular(self, nombre, tabla, columnas, admitidos, periodo, desde, hasta, filtros):
+        grupo = PERIODOS[periodo]
+        condiciones = ['AnioMes BETWEEN ? AND ?']
+        params = [desde, hasta]
+        for filtro, valor in filtros.items():
+            condiciones.append(f"{admitidos[filtro]} = ?")
+            params.append(valor)
+        sumas = ', '.join(f"SUM({columna})" for columna in columnas)
+        filas = self._consultar(f"""
+            SELECT {grupo}, {sumas}
+            FROM {tabla}
+            WHERE {' AND '.join(condiciones)}
+            GROUP BY {grupo}
+            ORDER BY {grupo}
+        """, params)
+
+        claves = len(grupo.split(','))
+        resultado = []
+        for fila in filas:
+            valores = [numero(valor) for valor in fila[claves:]]
+            item = {'periodo': etiqueta_periodo(periodo, fila[:claves])}
+            if nombre == 'ventas':
+                ventas, unidades, importe, iva = valores
+                item.update({
+                    'ventas': ventas,
+                    'unidades': unidades,
+                    'importe': round(importe, 2),
+                    'iva': round(iva, 2),
+                    'total': round(importe + iva, 2),
+                })
+            else:
+                entregas, entregadas, a_tiempo, costo = valores
+                item.update({
+                    'entregas': entregas,
+                    'entregadas': entregadas,
+                    'a_tiempo': a_tiempo,
+                    'tasa_a_tiempo': round(a_tiempo / entregadas, 4) if entregadas else None,
+                    'costo': round(costo, 2),
+                })
+            resultado.append(item)
+        return resultado
+
+    def estado(self):
+        with self._lock:
+            return {
+                'version': self.version,
+                'invalidaciones': self.invalidaciones,
+                'cache': {
+                    'entradas': len(self.cache),
+                    'filas': self.cache.filas,
+                    'max_entradas': self.cache.max_entradas,
+                    'max_filas': self.cache.max_filas,
+                    'aciertos': self.cache.aciertos,
+                    'fallos': self.cache.fallos,
+                    'descartes': self.cache.descartes,
+                },
+            }
+
+
+# ----------------------------------------------------------------------
+# API HTTP (JSON)
+def crear_handler(servicio):
+    class Handler(BaseHTTPRequestHandler):
+
+        def _responder(self, codigo, cuerpo):
+            datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(codigo)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+            try:
+                if url.path == '/estado':
+                    self._responder(200, servicio.estado())
+                elif url.path.startswith('/kpi/'):
+                    nombre = url.path[len('/kpi/'):]
+                    self._responder(200, servicio.kpi(nombre, **params))
+                else:
+                    self._responder(404, {'error': f"Ruta desconocida: {url.path}"})
+            except (ValueError, TypeError) as e:
+                self._responder(400, {'error': str(e)})
+            except servicio.backend.Error as e:
+                self._responder(503, {'error': f"Error de base de datos: {e}"})
+
+        def log_message(self, formato, *args):
+            print(f" {self.address_string()} {formato % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de KPIs del tablero con caché por carga")
+    parser.add_argument('--config', default='config.ini', help="archivo de configuración (relativo a Scripts)")
+    parser.add_argument('--host', default=None, help="dirección (por defecto [SERVICIO_KPI] host)")
+    parser.add_argument('--puerto', type=int, default=None, help="puerto (por defecto [SERVICIO_KPI] puerto)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    host = args.host or config.get('SERVICIO_KPI', 'host', fallback='127.0.0.1').strip()
+    puerto = args.puerto or config.getint('SERVICIO_KPI', 'puerto', fallback=8050)
+
+    servicio = ServicioKPI(args.config)
+    servidor = ThreadingHTTPServer((host, puerto), crear_handler(servicio))
+    print(f" Servicio de KPIs en http://{host}:{puerto} (motor: {servicio.backend.nombre})")
+    print(" Rutas: /kpi/ventas, /kpi/entregas, /estado")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n Servicio detenido")
+    finally:
+        servidor.server_close()
+        close_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Validación vectorizada de lotes en la extracción (CSV -> STG).
+
+Cada regla se evalúa una sola vez por lote sobre columnas completas (pandas/NumPy) y cada
+fila recibe el código de la primera regla que incumple (0 = válida). El lote se separa en
+una sola pasada en filas válidas, que van a STAGING, y filas rechazadas con su código de
+motivo, que van al registro de rechazos (rechazos.py).
+
+Las reglas son las mismas que aplican SP_STG_to_INT_Ventas y SP_STG_to_INT_Entregas, y
+se aplican también a Ventas_add.csv (el SP solo registra rechazos de STG_Ventas).
+"""
+import numpy as np
+import pandas as pd
+
+
+# Códigos de motivo de rechazo
+FECHA_VENTA_INVALIDA = 10
+PRODUCTO_VACIO = 11
+CLIENTE_VACIO = 12
+TIENDA_VACIA = 13
+CANTIDAD_INVALIDA = 14
+PRECIO_INVALIDO = 15
+
+ENTREGA_VACIA = 20
+PROVEEDOR_VACIO = 21
+ESTADO_VACIO = 22
+FECHA_ENVIO_INVALIDA = 23
+FECHAS_INCOHERENTES = 24
+
+MOTIVOS = {
+    FECHA_VENTA_INVALIDA: 'FechaVenta nula o inválida',
+    PRODUCTO_VACIO: 'CodigoProducto nulo o vacío',
+    CLIENTE_VACIO: 'CodigoCliente nulo o vacío',
+    TIENDA_VACIA: 'CodigoTienda nulo o vacío',
+    CANTIDAD_INVALIDA: 'Cantidad no entera o <= 0',
+    PRECIO_INVALIDO: 'PrecioVenta no numérico o negativo',
+    ENTREGA_VACIA: 'CodEntrega nulo o vacío',
+    PROVEEDOR_VACIO: 'CodProveedor nulo o vacío',
+    ESTADO_VACIO: 'CodEstado nulo o vacío',
+    FECHA_ENVIO_INVALIDA: 'Fecha_Envio nula o inválida',
+    FECHAS_INCOHERENTES: 'Fecha_Entrega anterior a Fecha_Envio',
+}
+
+
+# ----------------------------------------------------------------------
+# Conversiones vectorizadas (equivalentes a TRY_CAST)
+def vacio(serie):
+    """NULL o solo espacios."""
+    return serie.isna() | (serie.astype(str).str.strip() == '')
+
+
+def parsear_fechas(serie):
+    """TRY_CAST(... AS DATE): 'YYYY-MM-DD' por la vía rápida y el resto con el parser general."""
+    fechas = pd.to_datetime(serie, errors='coerce', format='%Y-%m-%d')
+    pendientes = fechas.isna() & ~vacio(serie)
+    if pendientes.any():
+        fechas[pendientes] = pd.to_datetime(serie[pendientes], errors='coerce')
+    return fechas
+
+
+def parsear_enteros(serie):
+    """TRY_CAST(... AS INT): solo texto entero ('2', ' +2 '); '2.0', '2,5' o fuera de rango -> NaN."""
+    texto = serie.astype(str).str.strip()
+    enteros = pd.to_numeric(texto.where(texto.str.fullmatch(r'[+-]?\d+', na=False)), errors='coerce')
+    return enteros.where((enteros >= -2**31) & (enteros < 2**31))
+
+
+def parsear_numeros(serie):
+    """TRY_CAST(REPLACE(..., ',', '.') AS DECIMAL)."""
+    return pd.to_numeric(serie.astype(str).str.strip().str.replace(',', '.', regex=False), errors='coerce')
+
+
+# ----------------------------------------------------------------------
+# Reglas por archivo: lista ordenada de (código, máscara de filas que incumplen)
+def reglas_ventas(df):
+    cantidad = parsear_enteros(df['Cantidad'])
+    precio = parsear_numeros(df['PrecioVenta'])
+    return [
+        (FECHA_VENTA_INVALIDA, parsear_fechas(df['FechaVenta']).isna()),
+        (PRODUCTO_VACIO, vacio(df['CodigoProducto'])),
+        (CLIENTE_VACIO, vacio(df['CodigoCliente'])),
+        (TIENDA_VACIA, vacio(df['CodigoTienda'])),
+        # NaN falla todas las comparaciones: nulos y no numéricos quedan rechazados
+        (CANTIDAD_INVALIDA, ~(cantidad > 0)),
+        (PRECIO_INVALIDO, ~(precio >= 0)),
+    ]
+
+
+def reglas_entregas(df):
+    envio = parsear_fechas(df['Fecha_Envio'])
+    entrega = parsear_fechas(df['Fecha_Entrega'])
+    return [
+        (ENTREGA_VACIA, vacio(df['CodEntrega'])),
+        (PROVEEDOR_VACIO, vacio(df['CodProveedor'])),
+        (ESTADO_VACIO, vacio(df['CodEstado'])),
+        (FECHA_ENVIO_INVALIDA, envio.isna()),
+        # Igual que el SP: una Fecha_Entrega vacía o inválida se toma como "sin entregar"
+        (FECHAS_INCOHERENTES, entrega.notna() & envio.notna() & (entrega < envio)),
+    ]
+
+
+def registro_ventas(df):
+    return 'Fecha=' + df['FechaVenta'].fillna('NULL').astype(str) + ' | Producto=' + df['CodigoProducto'].fillna('NULL').astype(str)
+
+
+def registro_entregas(df):
+    return (
+        'CodEntrega=' + df['CodEntrega'].fillna('NULL').astype(str) +
+        ' | Envio=' + df['Fecha_Envio'].fillna('NULL').astype(str) +
+        ' | Entrega=' + df['Fecha_Entrega'].fillna('NULL').astype(str)
+    )
+
+
+REGLAS = {
+    'Ventas.csv': (reglas_ventas, registro_ventas),
+    'Ventas_add.csv': (reglas_ventas, registro_ventas),
+    'Entregas.csv': (reglas_entregas, registro_entregas),
+}
+
+
+class ValidadorLotes:
+    """Separa cada lote en filas válidas y rechazadas (con código de motivo) en una pasada."""
+
+    def tiene_reglas(self, csv_file):
+        return csv_file in REGLAS
+
+    def codigos(self, df, csv_file):
+        """Array con el código de la primera regla incumplida por fila (0 = válida)."""
+        reglas, _ = REGLAS[csv_file]
+        evaluadas = reglas(df)
+        return np.select(
+            [mascara.to_numpy(dtype=bool) for _, mascara in evaluadas],
+            [codigo for codigo, _ in evaluadas],
+            default=0
+        )
+
+    def separar(self, df, csv_file):
+        """
+        Devuelve (validas, rechazadas).
+        rechazadas: las filas originales más Registro_Original, Codigo y Motivo_Rechazo
+                    ('[código] descripción').
+        """
+        if csv_file not in REGLAS or df.empty:
+            return df, None
+
+        codigos = self.codigos(df, csv_file)
+        invalidas = codigos != 0
+        if not invalidas.any():
+            return df, None
+
+        _, registro = REGLAS[csv_file]
+        codigos_invalidos = pd.Series(codigos[invalidas], index=df.index[invalidas])
+        rechazadas = df[invalidas].assign(
+            Registro_Original=registro(df[invalidas]),
+            Codigo=codigos_invalidos,
+            Motivo_Rechazo=codigos_invalidos.map(lambda c: f"[{c}] {MOTIVOS[c]}"),
+        )
+        return df[~invalidas], rechazadas